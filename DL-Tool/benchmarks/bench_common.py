@@ -0,0 +1,123 @@
+"""Helpers shared by the VisionAce benchmark scripts.
+
+Importing this module puts the application directory on ``sys.path`` so the
+scripts can import ``core`` / ``ui`` when run as ``python benchmarks/<x>.py``.
+
+Results are plain dictionaries ``{case: {metric: value}}``.  A baseline is a
+results file saved earlier with ``--update-baseline``; :func:`compare` flags
+every case whose gated metric grew by more than the tolerance.  Baselines
+are machine-specific, so they live next to the scripts but are not tracked
+(``*.json`` is git-ignored).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parent.parent
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+DEFAULT_TOLERANCE: float = 0.25
+
+
+def percentiles(samples_ms: list[float]) -> dict[str, float]:
+    """Summary of per-event latencies in milliseconds."""
+    if not samples_ms:
+        return {"count": 0}
+    ms = np.asarray(samples_ms, dtype=np.float64)
+    p50, p90, p99 = (float(v) for v in np.percentile(ms, [50, 90, 99]))
+    return {
+        "count": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": p50,
+        "p90_ms": p90,
+        "p99_ms": p99,
+        "max_ms": float(ms.max()),
+    }
+
+
+def timed(fn, *args, **kwargs) -> tuple[float, Any]:
+    """Run *fn* once and return ``(elapsed_ms, result)``."""
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - t0) * 1000.0, result
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (0 if unknown)."""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes.
+        return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+    except ImportError:
+        pass
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / (1024.0 * 1024.0)
+    except (ImportError, AttributeError):
+        return 0.0
+
+
+def system_info() -> dict[str, Any]:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    metric: str,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> tuple[dict[str, dict[str, float]], list[str]]:
+    """Compare *metric* of every case present in both result sets.
+
+    Returns ``(comparison, regressions)`` where ``comparison[case]`` holds
+    the baseline value, the current value and their ratio, and
+    ``regressions`` lists human-readable lines for ratios above
+    ``1 + tolerance``.
+    """
+    comparison: dict[str, dict[str, float]] = {}
+    regressions: list[str] = []
+    for case, values in results.items():
+        old = baseline.get(case, {}).get(metric)
+        new = values.get(metric)
+        if not old or new is None:
+            continue
+        ratio = new / old
+        comparison[case] = {"baseline": old, "current": new, "ratio": ratio}
+        if ratio > 1.0 + tolerance:
+            regressions.append(
+                f"{case}: {metric} {new:.3f} vs baseline {old:.3f} ({ratio:.2f}x)"
+            )
+    return comparison, regressions
@@ -0,0 +1,270 @@
+"""Headless canvas benchmark for VisionAce.
+
+Runs :class:`ui.canvas_widget.CanvasWidget` under ``QT_QPA_PLATFORM=offscreen``
+and replays scripted interactions through the same handlers the view's
+signals call:
+
+* ``load_image@<W>x<H>``      -- :meth:`CanvasWidget.load_image` for growing images
+* ``display_labels@<N>``      -- :meth:`CanvasWidget.display_labels` with N boxes/polygons
+* ``select_click@<N>``        -- a left click on a label in SELECT mode with N labels
+* ``brush_move@<W>x<H>``      -- brush strokes via ``_on_mouse_press`` / ``_on_mouse_move``
+* ``zoom@<N>`` / ``pan@<N>``  -- wheel zoom and scroll-bar panning with N labels shown
+
+Each event is followed by a synchronous repaint of the viewport (disable with
+``--no-paint``), so the latency covers the handler and the frame it causes.
+Per-event latencies are reported as percentiles together with the peak RSS
+of the process.  With ``--baseline`` the ``p90_ms`` of each case is compared
+with a stored run and the exit code is non-zero on regressions.  Usage::
+
+    python benchmarks/canvas_benchmark.py
+    python benchmarks/canvas_benchmark.py --labels 10,100,1000,10000 --json canvas.json
+    python benchmarks/canvas_benchmark.py --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+from bench_common import (
+    BASELINE_DIR, DEFAULT_TOLERANCE, compare, load_baseline, peak_rss_mb,
+    percentiles, system_info, timed, write_json,
+)
+
+DEFAULT_BASELINE = BASELINE_DIR / "canvas_benchmark.json"
+GATED_METRIC = "p90_ms"
+
+DEFAULT_IMAGE_SIZES = "640x480,1920x1080,4000x3000"
+DEFAULT_LABEL_COUNTS = "10,100,1000,10000"
+VIEWPORT_SIZE = (1280, 800)
+
+
+class CanvasBench:
+    """Drives one :class:`CanvasWidget` and collects per-event latencies."""
+
+    def __init__(self, workdir: Path, paint: bool = True, seed: int = 0) -> None:
+        from PySide6.QtWidgets import QApplication
+        from ui.canvas_widget import CanvasWidget
+
+        self._app = QApplication.instance() or QApplication(sys.argv[:1])
+        self._workdir = workdir
+        self._paint = paint
+        self._rng = np.random.default_rng(seed)
+        self.canvas = CanvasWidget()
+        self.canvas.resize(*VIEWPORT_SIZE)
+        self.canvas.show()
+        self._app.processEvents()
+        self.results: dict[str, dict[str, float]] = {}
+
+    # -- Helpers ---------------------------------------------------------------
+
+    def _frame(self) -> None:
+        if self._paint:
+            self.canvas._view.viewport().repaint()
+
+    def _event(self, fn, *args) -> float:
+        """Run one event handler plus the repaint; return its latency in ms."""
+        def run():
+            fn(*args)
+            self._frame()
+        return timed(run)[0]
+
+    def _record(self, case: str, samples: list[float]) -> None:
+        if not samples:
+            return
+        summary = percentiles(samples)
+        self.results[case] = summary
+        print(f"  {case:28s} p50 {summary['p50_ms']:8.2f} ms  "
+              f"p90 {summary['p90_ms']:8.2f} ms  p99 {summary['p99_ms']:8.2f} ms  "
+              f"(n={summary['count']})")
+
+    def image(self, width: int, height: int) -> str:
+        import cv2
+
+        path = self._workdir / f"image_{width}x{height}.png"
+        if not path.exists():
+            img = self._rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+            cv2.imwrite(str(path), cv2.GaussianBlur(img, (0, 0), 3))
+        return str(path)
+
+    def labels(self, count: int, width: int, height: int) -> list:
+        """*count* labels, two thirds boxes and one third polygons."""
+        from core.label_manager import LabelItem
+
+        labels = []
+        for i in range(count):
+            cid = i % 10
+            x, y = self._rng.uniform(0, width * 0.95), self._rng.uniform(0, height * 0.95)
+            bw, bh = self._rng.uniform(6, width * 0.05), self._rng.uniform(6, height * 0.05)
+            if i % 3 == 2:
+                n = 8
+                angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+                pts = [(x + bw * np.cos(a), y + bh * np.sin(a)) for a in angles]
+                labels.append(LabelItem(cid, f"class_{cid}", "polygon", pts, "#3cb44b"))
+            else:
+                pts = [(x, y), (x + bw, y), (x + bw, y + bh), (x, y + bh)]
+                labels.append(LabelItem(cid, f"class_{cid}", "bbox", pts, "#e6194b"))
+        return labels
+
+    def view_pos(self, x: float, y: float):
+        from PySide6.QtCore import QPointF
+
+        return self.canvas._view.mapFromScene(QPointF(x, y))
+
+    # -- Scenarios -------------------------------------------------------------
+
+    def bench_load_image(self, sizes: list[tuple[int, int]], repeats: int) -> None:
+        for w, h in sizes:
+            path = self.image(w, h)
+            samples = [self._event(self.canvas.load_image, path) for _ in range(repeats)]
+            self._record(f"load_image@{w}x{h}", samples)
+
+    def bench_labels(self, counts: list[int], repeats: int) -> None:
+        from ui.toolbar_widget import ToolMode
+
+        w, h = 1920, 1080
+        self.canvas.load_image(self.image(w, h))
+        self.canvas.set_mode(ToolMode.SELECT)
+        for count in counts:
+            labels = self.labels(count, w, h)
+            samples = [self._event(self.canvas.display_labels, labels) for _ in range(repeats)]
+            self._record(f"display_labels@{count}", samples)
+
+            clicks = []
+            for label in labels[:: max(1, count // 20)][:20]:
+                xs, ys = zip(*label.points)
+                pos = self.view_pos(sum(xs) / len(xs), sum(ys) / len(ys))
+                clicks.append(self._event(self.canvas._on_mouse_press, pos))
+                self.canvas._on_mouse_release(pos)
+            self._record(f"select_click@{count}", clicks)
+
+            zooms = [self._event(self.canvas._on_wheel_zoom, 120 if i % 2 == 0 else -120, None)
+                     for i in range(20)]
+            self._record(f"zoom@{count}", zooms)
+
+            # Zoom in so there is something to pan, then scroll like a middle drag.
+            for _ in range(6):
+                self.canvas._on_wheel_zoom(120, None)
+            bar_h = self.canvas._view.horizontalScrollBar()
+            bar_v = self.canvas._view.verticalScrollBar()
+            pans = []
+            for i in range(40):
+                step = 25 if (i // 10) % 2 == 0 else -25
+                pans.append(self._event(
+                    lambda s=step: (bar_h.setValue(bar_h.value() + s),
+                                    bar_v.setValue(bar_v.value() + s))
+                ))
+            self._record(f"pan@{count}", pans)
+            self.canvas._view.fitInView(self.canvas._pixmap_item)
+
+    def bench_brush(self, sizes: list[tuple[int, int]], strokes: int, steps: int) -> None:
+        from PySide6.QtCore import Qt
+        from ui.toolbar_widget import ToolMode
+
+        for w, h in sizes:
+            self.canvas.set_mode(ToolMode.SEGMENTATION)
+            self.canvas.load_image(self.image(w, h))
+            self.canvas.set_brush_size(30)
+            presses, moves = [], []
+            for _ in range(strokes):
+                x0, y0 = self._rng.uniform(0.1 * w, 0.9 * w), self._rng.uniform(0.1 * h, 0.9 * h)
+                dx, dy = self._rng.uniform(-0.3 * w, 0.3 * w), self._rng.uniform(-0.3 * h, 0.3 * h)
+                path = [self.view_pos(x0 + dx * t, y0 + dy * t) for t in np.linspace(0, 1, steps)]
+                presses.append(self._event(
+                    self.canvas._on_mouse_press, path[0], Qt.MouseButton.LeftButton
+                ))
+                moves.extend(self._event(self.canvas._on_mouse_move, p) for p in path[1:])
+                self.canvas._on_mouse_release(path[-1])
+            self._record(f"brush_press@{w}x{h}", presses)
+            self._record(f"brush_move@{w}x{h}", moves)
+            self.canvas.discard_pending_mask()
+        self.canvas.set_mode(ToolMode.SELECT)
+
+
+def _parse_sizes(text: str) -> list[tuple[int, int]]:
+    sizes = []
+    for token in text.split(","):
+        if token.strip():
+            w, h = token.lower().split("x")
+            sizes.append((int(w), int(h)))
+    return sizes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--image-sizes", default=DEFAULT_IMAGE_SIZES,
+                        help="comma-separated WxH sizes for load_image and brush cases")
+    parser.add_argument("--labels", default=DEFAULT_LABEL_COUNTS,
+                        help="comma-separated label counts for display/select/zoom/pan")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="repetitions of load_image / display_labels")
+    parser.add_argument("--strokes", type=int, default=5, help="brush strokes per image size")
+    parser.add_argument("--steps", type=int, default=40, help="mouse moves per stroke")
+    parser.add_argument("--no-paint", action="store_true",
+                        help="time the handlers only, without repainting the viewport")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default="",
+                        help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE),
+                        help="results file to compare against")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed p90 slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = _parse_sizes(args.image_sizes)
+    counts = [int(v) for v in args.labels.split(",") if v.strip()]
+    repeats = max(1, args.repeats)
+    workdir = Path(tempfile.mkdtemp(prefix="visionace_canvas_bench_"))
+    try:
+        bench = CanvasBench(workdir, paint=not args.no_paint, seed=args.seed)
+        print(f"canvas {VIEWPORT_SIZE[0]}x{VIEWPORT_SIZE[1]}, "
+              f"paint {'on' if not args.no_paint else 'off'}")
+        bench.bench_load_image(sizes, repeats)
+        bench.bench_labels(counts, repeats)
+        bench.bench_brush(sizes, max(1, args.strokes), max(2, args.steps))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "system": system_info(),
+        "paint": not args.no_paint,
+        "peak_rss_mb": peak_rss_mb(),
+        "results": bench.results,
+    }
+    print(f"peak RSS: {report['peak_rss_mb']:.1f} MB")
+
+    regressions: list[str] = []
+    baseline_path = Path(args.baseline)
+    baseline = None if args.update_baseline else load_baseline(baseline_path)
+    if baseline is not None:
+        report["comparison"], regressions = compare(
+            bench.results, baseline.get("results", {}), GATED_METRIC, args.tolerance
+        )
+        print(f"compared with {baseline_path}: {len(report['comparison'])} cases")
+    report["passed"] = not regressions
+
+    if args.json_path:
+        write_json(Path(args.json_path), report)
+    if args.update_baseline:
+        write_json(baseline_path, report)
+        print(f"baseline saved to {baseline_path}")
+
+    for msg in regressions:
+        print(f"FAIL: {msg}")
+    if not regressions:
+        print("PASS")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
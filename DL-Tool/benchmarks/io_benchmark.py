@@ -0,0 +1,309 @@
+"""Project I/O benchmark for VisionAce.
+
+Generates synthetic projects (N images, M classes, a configurable number of
+boxes / polygons / masks per image) and times the operations whose cost
+grows with the project:
+
+* ``open_folder``          -- :meth:`ProjectManager.open_folder`
+* ``has_labels``           -- :meth:`ProjectManager.has_labels` for every image
+* ``save_all_images``      -- :meth:`SaveManager.save_all_images`
+* ``load_labels_from_disk``-- :meth:`SaveManager.load_labels_from_disk` for every image
+* ``*_db``                 -- the same with the ``annotations.db`` backend
+* ``load_yolo_txt`` / ``save_yolo_txt`` -- :class:`ExportManager` per file
+* ``save_semantic_mask``   -- :meth:`ExportManager.save_semantic_mask` per image
+
+Every case is run for each project size given with ``--images``; results are
+keyed ``<op>@<N>`` and report the median wall time and the per-item cost, so
+a per-item cost that grows with N shows up as a scaling regression.  With
+``--baseline`` (default ``benchmarks/baselines/io_benchmark.json``, if it
+exists) the per-item cost of each case is compared with the stored run and
+the exit code is non-zero on regressions.  Usage::
+
+    python benchmarks/io_benchmark.py --images 100,1000 --masks 1
+    python benchmarks/io_benchmark.py --images 1000 --update-baseline
+    python benchmarks/io_benchmark.py --images 1000 --json io.json --tolerance 0.3
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from bench_common import (
+    BASELINE_DIR, DEFAULT_TOLERANCE, compare, load_baseline, peak_rss_mb,
+    system_info, timed, write_json,
+)
+
+DEFAULT_BASELINE = BASELINE_DIR / "io_benchmark.json"
+GATED_METRIC = "per_item_us"
+
+
+@dataclass
+class ProjectSpec:
+    images: int = 200
+    classes: int = 5
+    boxes: int = 5  # per image
+    polygons: int = 2
+    masks: int = 1
+    width: int = 640
+    height: int = 480
+    seed: int = 0
+
+
+def synthetic_labels(spec: ProjectSpec, rng: np.random.Generator) -> list:
+    """Random boxes, polygons and masks for one image."""
+    import cv2
+    from core.label_manager import LabelItem
+
+    w, h = spec.width, spec.height
+    labels = []
+    for _ in range(spec.boxes):
+        cid = int(rng.integers(spec.classes))
+        x1, y1 = rng.uniform(0, w * 0.8), rng.uniform(0, h * 0.8)
+        x2, y2 = x1 + rng.uniform(8, w * 0.2), y1 + rng.uniform(8, h * 0.2)
+        labels.append(LabelItem(cid, f"class_{cid}", "bbox",
+                                [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]))
+    for _ in range(spec.polygons):
+        cid = int(rng.integers(spec.classes))
+        cx, cy = rng.uniform(0.2 * w, 0.8 * w), rng.uniform(0.2 * h, 0.8 * h)
+        n = int(rng.integers(6, 24))
+        angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+        radii = rng.uniform(10, min(w, h) * 0.15, n)
+        pts = np.stack([cx + radii * np.cos(angles), cy + radii * np.sin(angles)], axis=1)
+        labels.append(LabelItem(cid, f"class_{cid}", "polygon",
+                                [tuple(p) for p in pts.tolist()]))
+    for _ in range(spec.masks):
+        cid = int(rng.integers(spec.classes))
+        mask = np.zeros((h, w), dtype=np.uint8)
+        center = (int(rng.integers(w)), int(rng.integers(h)))
+        axes = (int(rng.integers(10, w // 4)), int(rng.integers(10, h // 4)))
+        cv2.ellipse(mask, center, axes, float(rng.uniform(0, 180)), 0, 360, 255, -1)
+        labels.append(LabelItem(cid, f"class_{cid}", "mask", [], mask_data=mask))
+    return labels
+
+
+def generate_project(root: Path, spec: ProjectSpec) -> dict[str, list]:
+    """Write *spec.images* JPEGs into *root* and return their synthetic labels."""
+    import cv2
+
+    rng = np.random.default_rng(spec.seed)
+    root.mkdir(parents=True, exist_ok=True)
+    # One noise image written N times: decoding cost is realistic, generation is fast.
+    ok, encoded = cv2.imencode(
+        ".jpg", rng.integers(0, 255, (spec.height, spec.width, 3), dtype=np.uint8)
+    )
+    labels: dict[str, list] = {}
+    for i in range(spec.images):
+        path = root / f"img_{i:06d}.jpg"
+        path.write_bytes(encoded.tobytes())
+        labels[str(path.resolve())] = synthetic_labels(spec, rng)
+    return labels
+
+
+def _summary(times_ms: list[float], items: int) -> dict[str, float]:
+    median = statistics.median(times_ms)
+    return {
+        "median_ms": median,
+        "min_ms": min(times_ms),
+        "items": items,
+        "per_item_us": median * 1000.0 / max(1, items),
+    }
+
+
+def run_size(spec: ProjectSpec, repeats: int, workdir: Path) -> dict[str, dict[str, float]]:
+    """Run every case on one synthetic project of *spec.images* images."""
+    from core.annotation_store import BACKEND_SQLITE
+    from core.export_manager import ExportManager
+    from core.label_manager import LabelManager
+    from core.project_manager import ProjectManager
+    from core.save_manager import SaveManager
+
+    root = workdir / f"project_{spec.images}"
+    labels = generate_project(root, spec)
+    class_names = {i: f"class_{i}" for i in range(spec.classes)}
+    size = (spec.width, spec.height)
+    n = spec.images
+    results: dict[str, dict[str, float]] = {}
+
+    def case(name: str, items: int, fn=None, setup=None) -> None:
+        """Time *fn*, or the callable returned by the untimed *setup*."""
+        times = [timed(setup() if setup is not None else fn)[0] for _ in range(repeats)]
+        key = f"{name}@{n}"
+        results[key] = _summary(times, items)
+        print(f"  {name:24s} {results[key]['median_ms']:10.1f} ms"
+              f"  {results[key]['per_item_us']:10.1f} us/item")
+
+    # Persist the synthetic labels (this also creates labels/ and gt_image/).
+    project = ProjectManager()
+    project.open_folder(str(root))
+    manager = LabelManager()
+    for path, items in labels.items():
+        manager.set_labels(path, items)
+    saver = SaveManager(manager, project)
+    case("save_all_images", n, lambda: saver.save_all_images(class_names))
+
+    case("open_folder", n, lambda: ProjectManager().open_folder(str(root)))
+
+    def opened() -> ProjectManager:
+        pm = ProjectManager()
+        pm.open_folder(str(root))
+        return pm
+
+    def has_labels_setup():
+        pm = opened()
+        return lambda: [pm.has_labels(p) for p in pm.image_list]
+    case("has_labels", n, setup=has_labels_setup)
+
+    def load_setup():
+        pm = opened()
+        loader = SaveManager(LabelManager(), pm)
+        names = dict(class_names)
+
+        def register(name: str) -> int:
+            names[len(names)] = name
+            return len(names) - 1
+
+        return lambda: [
+            loader.load_labels_from_disk(p, size, names, register) for p in pm.image_list
+        ]
+    case("load_labels_from_disk", n, setup=load_setup)
+
+    # The same project persisted to annotations.db.
+    db_project = ProjectManager()
+    db_project.open_folder(str(root))
+    db_project.annotation_backend = BACKEND_SQLITE
+    db_saver = SaveManager(manager, db_project)
+    case("save_all_images_db", n, lambda: db_saver.save_all_images(class_names))
+    db_project.close_annotation_store()
+
+    def db_opened() -> ProjectManager:
+        pm = opened()
+        pm.annotation_backend = BACKEND_SQLITE
+        return pm
+
+    def has_labels_db_setup():
+        pm = db_opened()
+        return lambda: [pm.has_labels(p) for p in pm.image_list]
+    case("has_labels_db", n, setup=has_labels_db_setup)
+
+    def load_db_setup():
+        pm = db_opened()
+        loader = SaveManager(LabelManager(), pm)
+        names = dict(class_names)
+
+        def register(name: str) -> int:
+            names[len(names)] = name
+            return len(names) - 1
+
+        return lambda: [
+            loader.load_labels_from_disk(p, size, names, register) for p in pm.image_list
+        ]
+    case("load_labels_from_disk_db", n, setup=load_db_setup)
+
+    txt_paths = [project.get_label_path(p) for p in labels]
+    case("load_yolo_txt", n, lambda: [
+        ExportManager.load_yolo_txt(t, spec.width, spec.height, class_names) for t in txt_paths
+    ])
+
+    out_dir = workdir / f"out_{n}"
+    out_dir.mkdir(exist_ok=True)
+    shapes = [
+        [lb for lb in items if lb.label_type in ("bbox", "polygon")]
+        for items in labels.values()
+    ]
+    case("save_yolo_txt", n, lambda: [
+        ExportManager.save_yolo_txt(items, spec.width, spec.height,
+                                    str(out_dir / f"{i}.txt"), class_names)
+        for i, items in enumerate(shapes)
+    ])
+    case("save_semantic_mask", n, lambda: [
+        ExportManager.save_semantic_mask(items, spec.width, spec.height,
+                                         str(out_dir / f"{i}.png"))
+        for i, items in enumerate(labels.values())
+    ])
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", default="100,1000",
+                        help="comma-separated project sizes (number of images)")
+    parser.add_argument("--classes", type=int, default=5)
+    parser.add_argument("--boxes", type=int, default=5, help="boxes per image")
+    parser.add_argument("--polygons", type=int, default=2, help="polygons per image")
+    parser.add_argument("--masks", type=int, default=1, help="masks per image")
+    parser.add_argument("--size", default="640x480", help="image size WxH")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default="",
+                        help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE),
+                        help="results file to compare against")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed per-item slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--keep", action="store_true",
+                        help="keep the generated projects and print their location")
+    args = parser.parse_args(argv)
+
+    from PySide6.QtCore import QCoreApplication
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])  # noqa: F841
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    sizes = [int(v) for v in args.images.split(",") if v.strip()]
+    workdir = Path(tempfile.mkdtemp(prefix="visionace_io_bench_"))
+    results: dict[str, dict[str, float]] = {}
+    try:
+        for n in sizes:
+            spec = ProjectSpec(n, args.classes, args.boxes, args.polygons, args.masks,
+                               width, height, args.seed)
+            print(f"project: {n} images, {args.classes} classes, "
+                  f"{args.boxes} boxes / {args.polygons} polygons / {args.masks} masks per image")
+            results.update(run_size(spec, max(1, args.repeats), workdir))
+    finally:
+        if args.keep:
+            print(f"projects kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "system": system_info(),
+        "spec": {k: v for k, v in asdict(spec).items() if k != "images"} | {"images": sizes},
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+
+    regressions: list[str] = []
+    baseline_path = Path(args.baseline)
+    baseline = None if args.update_baseline else load_baseline(baseline_path)
+    if baseline is not None:
+        report["comparison"], regressions = compare(
+            results, baseline.get("results", {}), GATED_METRIC, args.tolerance
+        )
+        print(f"compared with {baseline_path}: {len(report['comparison'])} cases")
+    report["passed"] = not regressions
+
+    if args.json_path:
+        write_json(Path(args.json_path), report)
+    if args.update_baseline:
+        write_json(baseline_path, report)
+        print(f"baseline saved to {baseline_path}")
+
+    for msg in regressions:
+        print(f"FAIL: {msg}")
+    if not regressions:
+        print("PASS")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
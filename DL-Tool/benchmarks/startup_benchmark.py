@@ -0,0 +1,191 @@
+"""Cold-start benchmark for VisionAce.
+
+Launches ``main.py --startup-benchmark`` in fresh interpreters with
+``-X importtime``, parses the import-time report and checks two things:
+
+* the median time until the main window's first event-loop iteration stays
+  below ``--threshold-ms``;
+* none of the modules that must stay off the startup path (``cv2``,
+  ``ultralytics``, ``torch``, ``tensorflow``, ``yaml`` and the dialog
+  modules) was imported.
+
+The exit code is non-zero when either check fails, so the script can gate
+a build.  Usage::
+
+    python benchmarks/startup_benchmark.py --runs 5 --threshold-ms 1000
+    python benchmarks/startup_benchmark.py --json startup.json --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Top-level packages / modules that must not be imported before the window
+# is shown.
+DEFERRED_MODULES: tuple[str, ...] = (
+    "cv2",
+    "ultralytics",
+    "torch",
+    "tensorflow",
+    "keras",
+    "yaml",
+    "ui.auto_label_dialog",
+    "ui.training_dialog",
+    "ui.help_dialog",
+    "core.export_manager",
+    "core.auto_labeler",
+    "core.trainer",
+)
+
+DEFAULT_THRESHOLD_MS: float = 1000.0
+
+# "import time:       412 |        913 |   PySide6.QtCore"
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$")
+_STARTUP_LINE = re.compile(r"startup_ms=([\d.]+)")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class RunResult:
+    startup_ms: float
+    import_total_ms: float
+    imports: list[ImportRecord] = field(default_factory=list)
+
+    def imported(self, name: str) -> bool:
+        prefix = name + "."
+        return any(r.module == name or r.module.startswith(prefix) for r in self.imports)
+
+
+def parse_importtime(stderr: str) -> list[ImportRecord]:
+    """Parse the ``-X importtime`` report written to *stderr*."""
+    records: list[ImportRecord] = []
+    for line in stderr.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, indent, module = m.groups()
+        records.append(
+            ImportRecord(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(indent) - 1) // 2,
+            )
+        )
+    return records
+
+
+def run_once(isolated_home: bool) -> RunResult:
+    """Start the application once and collect its timings."""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    tmp_home = None
+    if isolated_home:
+        tmp_home = tempfile.TemporaryDirectory(prefix="visionace_home_")
+        env["HOME"] = env["USERPROFILE"] = tmp_home.name
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "main.py", "--startup-benchmark"],
+            cwd=APP_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+    finally:
+        if tmp_home is not None:
+            tmp_home.cleanup()
+
+    m = _STARTUP_LINE.search(proc.stdout)
+    if proc.returncode != 0 or not m:
+        raise RuntimeError(
+            f"main.py --startup-benchmark failed (exit {proc.returncode}):\n"
+            f"{proc.stdout}\n{proc.stderr[-2000:]}"
+        )
+    imports = parse_importtime(proc.stderr)
+    return RunResult(
+        startup_ms=float(m.group(1)),
+        import_total_ms=sum(r.self_us for r in imports) / 1000.0,
+        imports=imports,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts")
+    parser.add_argument("--threshold-ms", type=float, default=DEFAULT_THRESHOLD_MS,
+                        help="fail if the median startup time exceeds this")
+    parser.add_argument("--top", type=int, default=10,
+                        help="number of slowest top-level imports to list")
+    parser.add_argument("--json", dest="json_path", default="",
+                        help="write the summary to this JSON file")
+    parser.add_argument("--isolated-home", action="store_true",
+                        help="run with an empty ~/.visionace (no recent folders)")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.isolated_home) for _ in range(max(1, args.runs))]
+    startup = [r.startup_ms for r in runs]
+    median_ms = statistics.median(startup)
+    last = runs[-1]
+
+    top_level = sorted(
+        (r for r in last.imports if r.depth == 0),
+        key=lambda r: r.cumulative_us,
+        reverse=True,
+    )[: args.top]
+    leaked = [name for name in DEFERRED_MODULES if last.imported(name)]
+
+    print(f"startup: median {median_ms:.1f} ms  "
+          f"(min {min(startup):.1f}, max {max(startup):.1f}, runs {len(runs)})")
+    print(f"imports: {len(last.imports)} modules, {last.import_total_ms:.1f} ms")
+    print("slowest top-level imports (cumulative):")
+    for rec in top_level:
+        print(f"  {rec.cumulative_us / 1000.0:8.1f} ms  {rec.module}")
+
+    failures: list[str] = []
+    if median_ms > args.threshold_ms:
+        failures.append(
+            f"median startup {median_ms:.1f} ms exceeds threshold {args.threshold_ms:.1f} ms"
+        )
+    if leaked:
+        failures.append("deferred modules imported at startup: " + ", ".join(leaked))
+
+    if args.json_path:
+        summary = {
+            "median_ms": median_ms,
+            "runs_ms": startup,
+            "threshold_ms": args.threshold_ms,
+            "import_total_ms": last.import_total_ms,
+            "top_imports": [asdict(r) for r in top_level],
+            "leaked_modules": leaked,
+            "passed": not failures,
+        }
+        Path(args.json_path).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    for msg in failures:
+        print(f"FAIL: {msg}")
+    if not failures:
+        print("PASS")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
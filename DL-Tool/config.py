@@ -25,6 +25,15 @@ class AppConfig:
     recent_directories: list = field(default_factory=list)  # List of recently opened directories
     recent_models: list = field(default_factory=list)  # List of recently loaded models
     default_save_extension: str = ""  # Empty = use original extension, or ".png", ".jpg", etc.
+    autolabel_cache_enabled: bool = True  # Reuse raw detections across auto-label runs
+    autolabel_cache_max_mb: int = 2048  # Raw detection cache budget; least recently used entries are evicted (0 = unbounded)
+    model_pool_size: int = 3  # Max. number of models kept loaded for instant switching
+    model_pool_memory_mb: int = 4096  # Max. estimated weight memory of pooled models
+    inference_options: dict = field(default_factory=dict)  # Last auto-label InferenceOptions
+    gt_mask_layout: str = "folders"  # "folders" (gt_image/<class>/) or "packed" (gt_packed/)
+    annotation_backend: str = "files"  # "files" (labels/, gt_image/) or "sqlite" (annotations.db)
+    import_hard_links: bool = False  # Hard-link external labels/GT instead of copying
+    interrupted_import: dict = field(default_factory=dict)  # {"source", "project"} of an unfinished import
 
     def add_recent_directory(self, path: str, max_recent: int = 10):
         """Add a directory to recent directories list (most recent first)."""
@@ -0,0 +1,422 @@
+"""Single-file SQLite annotation store, an alternative to per-image files.
+
+The file backend keeps a project's labels in ``labels/<stem>.txt`` plus one
+PNG per mask class in ``gt_image/<class>/`` (or ``gt_packed/``), so saving
+an image means several file creates and every listing touches thousands of
+small files.  With the database backend everything lives in
+``<image_dir>/annotations.db``:
+
+* ``images``  -- one row per image file name, with its size and label count;
+* ``shapes``  -- bboxes and polygons in absolute pixels, one row per label,
+  with the bounds as columns and polygon vertices as a float32 blob;
+* ``masks``   -- one row per (image, mask class); the mask is stored as
+  ``zlib(np.packbits(mask > 0))``, overlapping classes stay separate;
+* ``meta``    -- small key/value settings of the database itself, such as
+  the class list the files were last exported with.
+
+The database runs in WAL mode with ``synchronous=FULL``: a save is one
+transaction and one fsync, and readers on other threads (the dataset export
+workers) never block the writer.  Use :meth:`AnnotationStore.batch` to group
+many images into one transaction.  Indexes serve the queries by class
+(:meth:`~AnnotationStore.images_with_class`) and by label count
+(:meth:`~AnnotationStore.images_by_label_count`).
+
+An image with a row but no labels is an explicit "cleared" record: it hides
+files from the other backend that may still exist for that image.  YOLO txt
+and GT PNG files are only produced by an explicit export, see
+:meth:`core.save_manager.SaveManager.export_store`; each image remembers
+when it was last exported so repeated exports only rewrite what changed.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from core.label_manager import LabelItem
+from core.yolo_codec import color_for_class
+
+logger = logging.getLogger(__name__)
+
+DB_NAME: str = "annotations.db"
+
+# Label persistence backends selectable per project (see AppConfig.annotation_backend).
+BACKEND_FILES: str = "files"
+BACKEND_SQLITE: str = "sqlite"
+
+_SCHEMA_VERSION: int = 2
+_MASK_COMPRESSION: int = 1  # zlib level; packed bits already shrink masks 8x
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE,
+    width       INTEGER NOT NULL DEFAULT 0,
+    height      INTEGER NOT NULL DEFAULT 0,
+    label_count INTEGER NOT NULL DEFAULT 0,
+    modified    REAL NOT NULL,
+    exported    REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS images_label_count ON images (label_count);
+CREATE TABLE IF NOT EXISTS shapes (
+    image_id   INTEGER NOT NULL REFERENCES images (id) ON DELETE CASCADE,
+    seq        INTEGER NOT NULL,
+    class_name TEXT NOT NULL,
+    label_type TEXT NOT NULL,
+    x1 REAL NOT NULL, y1 REAL NOT NULL, x2 REAL NOT NULL, y2 REAL NOT NULL,
+    points     BLOB,
+    PRIMARY KEY (image_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS shapes_class ON shapes (class_name, image_id);
+CREATE TABLE IF NOT EXISTS masks (
+    image_id   INTEGER NOT NULL REFERENCES images (id) ON DELETE CASCADE,
+    class_name TEXT NOT NULL,
+    width      INTEGER NOT NULL,
+    height     INTEGER NOT NULL,
+    data       BLOB NOT NULL,
+    PRIMARY KEY (image_id, class_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS masks_class ON masks (class_name, image_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def encode_mask(mask: np.ndarray) -> bytes:
+    """Compress a mask to ``zlib(packbits(mask > 0))``."""
+    return zlib.compress(np.packbits(mask > 0).tobytes(), _MASK_COMPRESSION)
+
+
+def decode_mask(data: bytes, width: int, height: int) -> np.ndarray:
+    """Inverse of :func:`encode_mask`; returns a 0/255 uint8 mask."""
+    bits = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+    plane = np.unpackbits(bits, count=width * height).reshape(height, width)
+    return plane * np.uint8(255)
+
+
+class AnnotationStore:
+    """Reads and writes the ``annotations.db`` of one project folder.
+
+    Parameters
+    ----------
+    path:
+        The database file.  It is created (with its schema) on first use,
+        so constructing a store is free.
+
+    Every thread gets its own connection.  Writes are meant to come from the
+    GUI thread only; reads may happen on any thread.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = Path(path)
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def exists(self) -> bool:
+        """``True`` if the database file has been created."""
+        return self._path.is_file()
+
+    # -- Queries ---------------------------------------------------------------
+
+    def contains(self, name: str) -> bool:
+        """``True`` if *name* has a record, even one without labels."""
+        return self._image_row(name) is not None
+
+    def label_count(self, name: str) -> Optional[int]:
+        """Number of labels stored for *name*, ``None`` if it has no record."""
+        row = self._image_row(name)
+        return row[3] if row is not None else None
+
+    def image_size(self, name: str) -> Optional[tuple[int, int]]:
+        """``(width, height)`` recorded for *name*, if known."""
+        row = self._image_row(name)
+        if row is None or not row[1] or not row[2]:
+            return None
+        return row[1], row[2]
+
+    def image_names(self) -> list[str]:
+        """Every image with a record, labelled or cleared."""
+        return [r[0] for r in self._db().execute("SELECT name FROM images ORDER BY name")]
+
+    def class_names(self) -> list[str]:
+        """Every class used by a stored shape or mask."""
+        rows = self._db().execute(
+            "SELECT class_name FROM shapes UNION SELECT class_name FROM masks"
+        )
+        return sorted(r[0] for r in rows)
+
+    def classes_for(self, name: str) -> list[str]:
+        """Classes used by the labels of *name*."""
+        rows = self._db().execute(
+            "SELECT class_name FROM shapes JOIN images ON images.id = image_id"
+            " WHERE name = ?1"
+            " UNION SELECT class_name FROM masks JOIN images ON images.id = image_id"
+            " WHERE name = ?1",
+            (name,),
+        )
+        return sorted(r[0] for r in rows)
+
+    def images_with_class(self, class_name: str) -> list[str]:
+        """Images with at least one shape or mask of *class_name*."""
+        rows = self._db().execute(
+            "SELECT name FROM images WHERE id IN ("
+            " SELECT image_id FROM shapes WHERE class_name = ?1"
+            " UNION SELECT image_id FROM masks WHERE class_name = ?1"
+            ") ORDER BY name",
+            (class_name,),
+        )
+        return [r[0] for r in rows]
+
+    def images_by_label_count(
+        self, min_count: int = 1, max_count: Optional[int] = None
+    ) -> list[str]:
+        """Images whose label count lies in ``[min_count, max_count]``."""
+        if max_count is None:
+            rows = self._db().execute(
+                "SELECT name FROM images WHERE label_count >= ? ORDER BY name",
+                (min_count,),
+            )
+        else:
+            rows = self._db().execute(
+                "SELECT name FROM images WHERE label_count BETWEEN ? AND ? ORDER BY name",
+                (min_count, max_count),
+            )
+        return [r[0] for r in rows]
+
+    def image_names_to_export(self) -> list[str]:
+        """Images modified since they were last passed to :meth:`mark_exported`."""
+        rows = self._db().execute(
+            "SELECT name FROM images WHERE exported < modified ORDER BY name"
+        )
+        return [r[0] for r in rows]
+
+    def read(
+        self,
+        name: str,
+        class_names: dict[int, str],
+        size: Optional[tuple[int, int]] = None,
+    ) -> list[LabelItem]:
+        """Return the labels of *name*, shapes first, then masks.
+
+        Class ids are resolved from *class_names* (unknown names get id 0,
+        like :meth:`ExportManager.load_gt_masks`).  Masks stored at another
+        resolution than *size* are resized with nearest-neighbour sampling.
+        """
+        row = self._image_row(name)
+        if row is None:
+            return []
+        image_id = row[0]
+        db = self._db()
+        name_to_id = {n: cid for cid, n in class_names.items()}
+        labels: list[LabelItem] = []
+
+        for class_name, label_type, x1, y1, x2, y2, blob in db.execute(
+            "SELECT class_name, label_type, x1, y1, x2, y2, points FROM shapes"
+            " WHERE image_id = ? ORDER BY seq",
+            (image_id,),
+        ):
+            class_id = name_to_id.get(class_name, 0)
+            item = LabelItem(class_id, class_name, label_type, color=color_for_class(class_id))
+            if blob is None:
+                item.set_bbox(x1, y1, x2, y2)
+            else:
+                item.points = np.frombuffer(blob, dtype=np.float32).reshape(-1, 2)
+            labels.append(item)
+
+        for class_name, w, h, data in db.execute(
+            "SELECT class_name, width, height, data FROM masks"
+            " WHERE image_id = ? ORDER BY class_name",
+            (image_id,),
+        ):
+            try:
+                mask = decode_mask(data, w, h)
+            except (zlib.error, ValueError) as exc:
+                logger.warning("Skipping corrupt %s mask of %s: %s", class_name, name, exc)
+                continue
+            if size is not None and size != (w, h):
+                import cv2
+
+                mask = cv2.resize(mask, size, interpolation=cv2.INTER_NEAREST)
+            class_id = name_to_id.get(class_name, 0)
+            labels.append(
+                LabelItem(
+                    class_id=class_id,
+                    class_name=class_name,
+                    label_type="mask",
+                    color=color_for_class(class_id),
+                    mask_data=mask,
+                )
+            )
+        return labels
+
+    # -- Updates ---------------------------------------------------------------
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Run the enclosed writes as one transaction (nesting is allowed)."""
+        db = self._db()
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            db.execute("BEGIN IMMEDIATE")
+        self._local.depth = depth + 1
+        try:
+            yield
+        except BaseException:
+            self._local.depth = depth
+            if depth == 0:
+                db.execute("ROLLBACK")
+            raise
+        self._local.depth = depth
+        if depth == 0:
+            db.execute("COMMIT")
+
+    def write(
+        self,
+        name: str,
+        labels: Sequence[LabelItem],
+        size: Optional[tuple[int, int]] = None,
+    ) -> None:
+        """Replace the labels of *name*.
+
+        Masks of the same class are merged; blank masks are dropped.  An
+        empty *labels* leaves a cleared record (see the module docstring).
+        """
+        shapes = []
+        masks: dict[str, np.ndarray] = {}
+        for label in labels:
+            if label.label_type == "mask":
+                if label.mask_data is None:
+                    continue
+                binary = label.mask_data > 0
+                if label.class_name in masks:
+                    masks[label.class_name] |= binary
+                else:
+                    masks[label.class_name] = binary
+                continue
+            bounds = label.bounds
+            if bounds is None:
+                continue
+            blob = None if label.label_type == "bbox" else label.xy.tobytes()
+            shapes.append((len(shapes), label.class_name, label.label_type, *bounds, blob))
+        mask_rows = []
+        for class_name, mask in masks.items():
+            if mask.any():
+                h, w = mask.shape[:2]
+                mask_rows.append((class_name, w, h, encode_mask(mask)))
+        if size is None and mask_rows:
+            size = (mask_rows[0][1], mask_rows[0][2])
+        w, h = size if size is not None else (0, 0)
+
+        with self.batch():
+            db = self._db()
+            image_id = db.execute(
+                "INSERT INTO images (name, width, height, label_count, modified)"
+                " VALUES (?1, ?2, ?3, ?4, ?5)"
+                " ON CONFLICT (name) DO UPDATE SET"
+                "  width = CASE WHEN ?2 > 0 THEN ?2 ELSE width END,"
+                "  height = CASE WHEN ?3 > 0 THEN ?3 ELSE height END,"
+                "  label_count = ?4, modified = ?5"
+                " RETURNING id",
+                (name, w, h, len(shapes) + len(mask_rows), time.time()),
+            ).fetchone()[0]
+            db.execute("DELETE FROM shapes WHERE image_id = ?", (image_id,))
+            db.execute("DELETE FROM masks WHERE image_id = ?", (image_id,))
+            db.executemany(
+                "INSERT INTO shapes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(image_id, *s) for s in shapes],
+            )
+            db.executemany(
+                "INSERT INTO masks VALUES (?, ?, ?, ?, ?)",
+                [(image_id, *m) for m in mask_rows],
+            )
+
+    def mark_exported(self, names: Sequence[str]) -> None:
+        """Record that the files of *names* match the database."""
+        now = time.time()
+        with self.batch():
+            self._db().executemany(
+                "UPDATE images SET exported = ? WHERE name = ?",
+                [(now, name) for name in names],
+            )
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Value stored under *key* by :meth:`set_meta`, or ``None``."""
+        row = self._db().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """Store *value* under *key* (replacing an earlier value)."""
+        with self.batch():
+            self._db().execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def clear(self, name: str) -> None:
+        """Remove the labels of *name*, keeping a cleared record."""
+        self.write(name, [])
+
+    def delete(self, name: str) -> bool:
+        """Forget *name* entirely; return ``True`` if it had a record."""
+        with self.batch():
+            cursor = self._db().execute("DELETE FROM images WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+    def close(self) -> None:
+        """Close the connections of all threads."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    # -- Internal helpers ------------------------------------------------------
+
+    def _image_row(self, name: str) -> Optional[tuple]:
+        return self._db().execute(
+            "SELECT id, width, height, label_count FROM images WHERE name = ?", (name,)
+        ).fetchone()
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: transactions are managed explicitly by batch().
+        conn = sqlite3.connect(self._path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = FULL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < _SCHEMA_VERSION:
+            # Every statement is IF NOT EXISTS: creates a new database and
+            # adds the tables introduced since *version* to an older one.
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        elif version != _SCHEMA_VERSION:
+            conn.close()
+            raise sqlite3.DatabaseError(
+                f"Unsupported annotation database version {version} in {self._path}"
+            )
+        self._local.conn = conn
+        with self._lock:
+            self._connections.append(conn)
+        return conn
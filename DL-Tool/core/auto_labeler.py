@@ -2,6 +2,10 @@
 from __future__ import annotations
 
 import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Optional
 
 import cv2
@@ -9,10 +13,19 @@ import numpy as np
 from PySide6.QtCore import QThread, Signal
 
 from core.label_manager import LabelItem
-from core.model_manager import ModelManager, DEFAULT_INFER_SIZE
+from core.model_manager import ModelManager, InferenceOptions, DEFAULT_INFER_SIZE
+from core.profiling import hot_path
+from core.result_cache import AutoLabelResultCache, RawDetections, file_digest
 
 logger = logging.getLogger(__name__)
 
+# Per-image pipeline stages.  ``apply`` (adding the labels in the GUI thread,
+# in batches) is measured by the main window, the others by the worker.
+STAGES: tuple[str, ...] = ("decode", "preprocess", "inference", "postprocess", "apply")
+
+# Number of recent images the rolling stage means and img/s are taken over.
+RATE_WINDOW: int = 8
+
 # Default color palette for auto-generated labels (cycled if needed).
 _DEFAULT_COLORS: list[str] = [
     "#FF3838", "#FF9D97", "#FF701F", "#FFB21D", "#CFD231",
@@ -148,6 +161,111 @@ def _xyxy_to_four_corners(
     ]
 
 
+def _results_speed(results) -> dict[str, float]:
+    """Sum Ultralytics' per-result ``speed`` (ms per stage) over *results*."""
+    total: dict[str, float] = {}
+    for result in results:
+        for stage, ms in (getattr(result, "speed", None) or {}).items():
+            if ms is not None:
+                total[stage] = total.get(stage, 0.0) + float(ms)
+    return total
+
+
+def _read_image(image_path: str) -> Optional[np.ndarray]:
+    """Decode an image to BGR; unlike ``cv2.imread`` this accepts non-ASCII
+    paths on Windows."""
+    try:
+        data = np.fromfile(image_path, dtype=np.uint8)
+    except OSError:
+        return None
+    if data.size == 0:
+        return None
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+
+@dataclass
+class ImageTiming:
+    """Stage timings of one auto-labeled image, emitted by the worker."""
+
+    image_path: str
+    stages_ms: dict[str, float]
+    cached: bool = False  # raw detections came from the result cache
+    images_per_sec: float = 0.0  # worker throughput over the last RATE_WINDOW images
+
+
+@dataclass
+class TimingSummary:
+    """Accumulates :class:`ImageTiming` of one run.
+
+    Keeps overall totals per stage plus a rolling window of the most recent
+    values, and renders the run summary written to the auto-label log.
+    """
+
+    window: int = RATE_WINDOW
+    images: int = 0
+    cached: int = 0
+    images_per_sec: float = 0.0
+    _totals: dict[str, float] = field(default_factory=dict)
+    _counts: dict[str, int] = field(default_factory=dict)
+    _recent: dict[str, deque] = field(default_factory=dict)
+
+    def record(self, stage: str, elapsed_ms: float, images: int = 1) -> None:
+        """Add *elapsed_ms* spent on *images* images in *stage*."""
+        self._totals[stage] = self._totals.get(stage, 0.0) + elapsed_ms
+        self._counts[stage] = self._counts.get(stage, 0) + images
+        recent = self._recent.get(stage)
+        if recent is None:
+            recent = self._recent[stage] = deque(maxlen=self.window)
+        recent.extend([elapsed_ms / images] * min(images, self.window))
+
+    def add(self, timing: ImageTiming) -> None:
+        self.images += 1
+        self.cached += int(timing.cached)
+        self.images_per_sec = timing.images_per_sec
+        for stage, ms in timing.stages_ms.items():
+            self.record(stage, ms)
+
+    def rolling_ms(self) -> dict[str, float]:
+        """Mean per stage over the recent window, in :data:`STAGES` order."""
+        return {
+            stage: sum(self._recent[stage]) / len(self._recent[stage])
+            for stage in STAGES if self._recent.get(stage)
+        }
+
+    def mean_ms(self) -> dict[str, float]:
+        """Mean per stage over the whole run, in :data:`STAGES` order."""
+        return {
+            stage: self._totals[stage] / self._counts[stage]
+            for stage in STAGES if self._counts.get(stage)
+        }
+
+    def format(self, elapsed_s: float, context: dict[str, object]) -> str:
+        """Multi-line run summary: *context* (model, thresholds, ...) and
+        mean / total time per stage."""
+        rate = self.images / elapsed_s if elapsed_s > 0 else 0.0
+        lines = [
+            f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] auto-label run: "
+            f"{self.images} images ({self.cached} cached) in {elapsed_s:.1f} s, "
+            f"{rate:.2f} img/s",
+        ]
+        lines += [f"  {key}: {value}" for key, value in context.items()]
+        means = self.mean_ms()
+        total = sum(self._totals.get(stage, 0.0) for stage in means) or 1.0
+        for stage, mean in means.items():
+            share = self._totals[stage] / total * 100.0
+            lines.append(
+                f"  {stage:12s} mean {mean:9.2f} ms  total {self._totals[stage] / 1000.0:8.2f} s"
+                f"  ({share:4.1f}%)"
+            )
+        return "\n".join(lines) + "\n"
+
+    def write_log(self, path: str, elapsed_s: float, context: dict[str, object]) -> None:
+        """Append the run summary to the log file at *path*."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(self.format(elapsed_s, context) + "\n")
+
+
 class AutoLabelWorker(QThread):
     """Background worker that runs auto-labeling on a list of images.
 
@@ -166,15 +284,30 @@ class AutoLabelWorker(QThread):
        **original image** pixel space (Ultralytics back-projects automatically;
        Keras mask outputs are scaled here).
 
+    When a :class:`~core.result_cache.AutoLabelResultCache` is supplied, the
+    raw YOLO / RT-DETR detections of step 2 are cached per model and image
+    content.  A later run with the same ``infer_size``, ``confidence`` and
+    inference options but a different ``score_threshold`` then skips the
+    model entirely.
+
+    Every image's decode / preprocess / inference / post-process times are
+    emitted as an :class:`ImageTiming` just before its ``image_done``.  For
+    YOLO / RT-DETR the preprocess and inference split comes from
+    Ultralytics' own ``Results.speed``; Keras models report their whole
+    ``predict`` call as inference.
+
     Signals:
         progress(int, int): ``(current_index, total_count)``
         image_done(str, list): ``(image_path, list_of_LabelItem)``
+        timing(object): :class:`ImageTiming` of the image about to be
+            reported by ``image_done``.
         finished_all(): Emitted when all images have been processed.
         error(str): Emitted when an unrecoverable error occurs.
     """
 
     progress = Signal(int, int)
     image_done = Signal(str, list)
+    timing = Signal(object)
     finished_all = Signal()
     error = Signal(str)
 
@@ -185,6 +318,8 @@ class AutoLabelWorker(QThread):
         confidence: float = 0.25,
         score_threshold: float = 0.50,
         infer_size: int = DEFAULT_INFER_SIZE,
+        result_cache: Optional[AutoLabelResultCache] = None,
+        inference_options: Optional[InferenceOptions] = None,
         parent: Optional[QThread] = None,
     ) -> None:
         """Initialise the worker.
@@ -203,6 +338,11 @@ class AutoLabelWorker(QThread):
                         resized to this resolution before being fed to
                         YOLO / RT-DETR.  Coordinates are back-projected to the
                         original image space automatically.  Default: 480.
+            result_cache: Optional raw-detection cache.  ``None`` disables
+                          caching.  Keras models are never cached.
+            inference_options: Precision, thread and filter settings for
+                               this run.  ``None`` uses the model manager's
+                               defaults.
             parent: Optional Qt parent object.
         """
         super().__init__(parent)
@@ -211,6 +351,14 @@ class AutoLabelWorker(QThread):
         self._confidence = confidence
         self._score_threshold = max(confidence, score_threshold)
         self._infer_size = infer_size
+        self._result_cache = result_cache
+        self._options = (
+            inference_options if inference_options is not None
+            else model_manager.inference_options
+        )
+        self._model_digest: Optional[str] = None
+        self._stage_ms: dict[str, float] = {}
+        self._cached = False
         self._abort = False
 
     # -- Control -------------------------------------------------------------
@@ -229,13 +377,23 @@ class AutoLabelWorker(QThread):
 
         total = len(self._image_paths)
         class_names = self._model_manager.get_class_names()
+        self._model_digest = self._resolve_model_digest()
 
+        finished_at: deque = deque(maxlen=RATE_WINDOW + 1)
         for idx, image_path in enumerate(self._image_paths):
             if self._abort:
                 break
 
             try:
                 labels = self._process_image(image_path, class_names)
+                finished_at.append(time.perf_counter())
+                span = finished_at[-1] - finished_at[0]
+                self.timing.emit(ImageTiming(
+                    image_path,
+                    self._stage_ms,
+                    self._cached,
+                    (len(finished_at) - 1) / span if span > 0 else 0.0,
+                ))
                 self.image_done.emit(image_path, labels)
             except Exception as exc:
                 logger.exception("Auto-label failed for %s", image_path)
@@ -247,6 +405,22 @@ class AutoLabelWorker(QThread):
 
     # -- Internal helpers ----------------------------------------------------
 
+    def _resolve_model_digest(self) -> Optional[str]:
+        """Return the model content hash used as cache key, if caching applies."""
+        if self._result_cache is None:
+            return None
+        if self._model_manager.get_model_type() not in ("YOLO", "RT-DETR"):
+            return None
+        model_path = self._model_manager.get_model_path()
+        if not model_path:
+            return None
+        try:
+            return self._result_cache.model_digest(model_path)
+        except OSError as exc:
+            logger.warning("Result cache disabled, cannot hash model: %s", exc)
+            return None
+
+    @hot_path("autolabel.process_image")
     def _process_image(
         self,
         image_path: str,
@@ -259,91 +433,179 @@ class AutoLabelWorker(QThread):
         original image resolution, so all returned ``LabelItem`` coordinates
         are in original pixel space.
         """
+        stages = self._stage_ms = dict.fromkeys(STAGES[:-1], 0.0)
+        self._cached = False
+        clock = time.perf_counter
+
+        image_digest: Optional[str] = None
+        if self._model_digest is not None:
+            image_digest = file_digest(image_path)
+            detections = self._result_cache.get(
+                self._model_digest, image_digest,
+                self._infer_size, self._confidence, self._options.cache_tag(),
+            )
+            if detections is not None:
+                self._cached = True
+                t0 = clock()
+                labels = self._detections_to_labels(detections, class_names)
+                stages["postprocess"] = (clock() - t0) * 1000.0
+                return labels
+
+        t0 = clock()
+        image = _read_image(image_path)
+        t1 = clock()
+        stages["decode"] = (t1 - t0) * 1000.0
+        if image is None:
+            logger.warning("Cannot decode %s, skipped", image_path)
+            return []
+
         results = self._model_manager.predict(
-            image_path, self._confidence, self._infer_size
+            image, self._confidence, self._infer_size, self._options
         )
+        t2 = clock()
+        predict_ms = (t2 - t1) * 1000.0
         if results is None:
+            stages["inference"] = predict_ms
             return []
 
         # Handle Keras model results (dict with 'model_type' key).
         if isinstance(results, dict) and results.get("model_type") == "KERAS":
-            return self._process_keras_results(results, class_names)
+            stages["inference"] = predict_ms
+            labels = self._process_keras_results(results, class_names)
+            if self._options.classes:
+                wanted = set(self._options.classes)
+                labels = [lb for lb in labels if lb.class_id in wanted]
+            stages["postprocess"] = (clock() - t2) * 1000.0
+            return labels
+
+        # Ultralytics times its own stages; whatever it spends outside of
+        # them (source setup, letterbox bookkeeping) counts as preprocess.
+        speed = _results_speed(results)
+        stages["inference"] = min(speed.get("inference", predict_ms), predict_ms)
+        stages["postprocess"] = speed.get("postprocess", 0.0)
+        stages["preprocess"] = max(
+            0.0, predict_ms - stages["inference"] - stages["postprocess"]
+        )
 
-        labels: list[LabelItem] = []
+        detections = self._extract_detections(
+            results, with_polygons=not self._options.boxes_only
+        )
+        if image_digest is not None:
+            self._result_cache.put(
+                self._model_digest, image_digest,
+                self._infer_size, self._confidence, detections,
+                self._options.cache_tag(),
+            )
+        labels = self._detections_to_labels(detections, class_names)
+        stages["postprocess"] += (clock() - t2) * 1000.0
+        return labels
 
-        for result in results:
-            orig_shape = result.orig_shape  # (height, width) in original px
-
-            # --- Bounding boxes -------------------------------------------
-            if result.boxes is not None and len(result.boxes):
-                boxes = result.boxes
-                for i in range(len(boxes)):
-                    # Post-processing score filter.
-                    conf_score = float(boxes.conf[i].item())
-                    if conf_score < self._score_threshold:
-                        continue
+    @staticmethod
+    def _extract_detections(results, with_polygons: bool = True) -> RawDetections:
+        """Collect unfiltered detections from Ultralytics ``Results``.
 
-                    cls_id = int(boxes.cls[i].item())
-                    cls_name = class_names.get(cls_id, str(cls_id))
-                    # xyxy is already in original image coordinates.
-                    x1, y1, x2, y2 = boxes.xyxy[i].tolist()
-                    points = _xyxy_to_four_corners(x1, y1, x2, y2)
+        Polygons are simplified here (the simplification does not depend on
+        any threshold), so cached entries can be post-processed directly.
+        With ``with_polygons=False`` the masks are never touched, which skips
+        Ultralytics' lazy full-resolution contour extraction.
+        """
+        boxes_all: list[np.ndarray] = []
+        scores_all: list[np.ndarray] = []
+        classes_all: list[np.ndarray] = []
+        polygons: list[np.ndarray] = []
 
-                    label = LabelItem(
-                        class_id=cls_id,
-                        class_name=cls_name,
-                        label_type="bbox",
-                        points=points,
-                        color=_color_for_class(cls_id),
-                    )
-                    labels.append(label)
+        for result in results:
+            if result.boxes is None or not len(result.boxes):
+                continue
+            boxes = result.boxes.cpu().numpy()
+            n = len(boxes)
+            boxes_all.append(boxes.xyxy)
+            scores_all.append(boxes.conf)
+            classes_all.append(boxes.cls)
+
+            masks = result.masks if with_polygons else None
+            n_masks = len(masks) if masks is not None else 0
+            for i in range(n):
+                if i >= n_masks:
+                    polygons.append(np.zeros((0, 2), dtype=np.float32))
+                    continue
+                # --- Noise-free polygon extraction ------------------------
+                # Use masks.xy[i] instead of masks.data[i].
+                #
+                # masks.data[i] is the raw mask at model output resolution
+                # (e.g. 120×120 for imgsz=480).  Extracting a contour at
+                # that scale and then multiplying coordinates by the ratio
+                # (orig / 120) amplifies every 1-pixel boundary irregularity
+                # by the scale factor — this is the main source of "noisy"
+                # polygon outlines.
+                #
+                # masks.xy[i] is computed by Ultralytics as follows:
+                #   1. Upsample the float probability mask to orig resolution
+                #      with bilinear interpolation (gradient preserved).
+                #   2. Threshold at the full resolution.
+                #   3. Run cv2.findContours on the full-res binary.
+                #   4. Return pixel coordinates in original image space.
+                #
+                # We then apply approxPolyDP in the original space so
+                # simplification also happens at full resolution — no
+                # coordinate amplification at any stage.
+                pts = _simplify_polygon_pts(masks.xy[i])
+                polygons.append(np.asarray(pts, dtype=np.float32).reshape(-1, 2))
+
+        if not scores_all:
+            return RawDetections.empty()
+        return RawDetections.from_parts(
+            np.concatenate(boxes_all),
+            np.concatenate(scores_all),
+            np.concatenate(classes_all),
+            polygons,
+        )
 
-            # --- Masks (instance segmentation) ----------------------------
-            if result.masks is not None and len(result.masks):
-                masks = result.masks
-                for i in range(len(masks)):
-                    # Post-processing score filter (same boxes tensor).
-                    if result.boxes is not None and len(result.boxes) > i:
-                        conf_score = float(result.boxes.conf[i].item())
-                        if conf_score < self._score_threshold:
-                            continue
-
-                    cls_id = int(result.boxes.cls[i].item())
-                    cls_name = class_names.get(cls_id, str(cls_id))
-
-                    # --- Noise-free polygon extraction --------------------
-                    # Use masks.xy[i] instead of masks.data[i].
-                    #
-                    # masks.data[i] is the raw mask at model output resolution
-                    # (e.g. 120×120 for imgsz=480).  Extracting a contour at
-                    # that scale and then multiplying coordinates by the ratio
-                    # (orig / 120) amplifies every 1-pixel boundary irregularity
-                    # by the scale factor — this is the main source of "noisy"
-                    # polygon outlines.
-                    #
-                    # masks.xy[i] is computed by Ultralytics as follows:
-                    #   1. Upsample the float probability mask to orig resolution
-                    #      with bilinear interpolation (gradient preserved).
-                    #   2. Threshold at the full resolution.
-                    #   3. Run cv2.findContours on the full-res binary.
-                    #   4. Return pixel coordinates in original image space.
-                    #
-                    # We then apply approxPolyDP in the original space so
-                    # simplification also happens at full resolution — no
-                    # coordinate amplification at any stage.
-                    xy = masks.xy[i]  # np.ndarray (N, 2), original image space
-                    polygon_pts = _simplify_polygon_pts(xy)
-                    if len(polygon_pts) < 3:
-                        continue
+    def _detections_to_labels(
+        self,
+        detections: RawDetections,
+        class_names: dict[int, str],
+    ) -> list[LabelItem]:
+        """Apply the score filter and build ``LabelItem`` objects.
 
-                    label = LabelItem(
+        Bounding boxes come first, followed by the polygons of detections
+        that carry a mask (same order as the model output).
+        """
+        keep = np.flatnonzero(detections.scores >= self._score_threshold)
+        if not len(keep):
+            return []
+
+        labels: list[LabelItem] = []
+        boxes = detections.boxes[keep].tolist()
+        classes = detections.classes[keep].tolist()
+
+        # --- Bounding boxes -----------------------------------------------
+        for (x1, y1, x2, y2), cls_id in zip(boxes, classes):
+            labels.append(
+                LabelItem(
+                    class_id=cls_id,
+                    class_name=class_names.get(cls_id, str(cls_id)),
+                    label_type="bbox",
+                    points=_xyxy_to_four_corners(x1, y1, x2, y2),
+                    color=_color_for_class(cls_id),
+                )
+            )
+
+        # --- Masks (instance segmentation) --------------------------------
+        if len(detections.poly_xy):
+            for i, cls_id in zip(keep.tolist(), classes):
+                pts = detections.polygon(i)
+                if len(pts) < 3:
+                    continue
+                labels.append(
+                    LabelItem(
                         class_id=cls_id,
-                        class_name=cls_name,
+                        class_name=class_names.get(cls_id, str(cls_id)),
                         label_type="polygon",
-                        points=polygon_pts,
+                        points=pts,
                         color=_color_for_class(cls_id),
                     )
-                    labels.append(label)
+                )
 
         return labels
 
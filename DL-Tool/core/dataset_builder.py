@@ -0,0 +1,512 @@
+"""Incremental YOLO dataset builder for training.
+
+Turns the labeled images of a project into the ``images/{train,val}`` /
+``labels/{train,val}`` layout expected by Ultralytics, together with its
+``data.yaml``::
+
+    <output_dir>/
+        images/train/<name>     labels/train/<stem>.txt
+        images/val/<name>       labels/val/<stem>.txt
+        data.yaml
+        .build_manifest.json
+
+Images are hard-linked (or reflinked, where the filesystem supports it)
+instead of copied, so the dataset takes no additional disk space.  The
+manifest records the size / mtime of every source image and label file
+together with its split, and a rebuild only touches entries whose sources
+changed.  Split assignments are sticky: an image never moves between train
+and val once assigned.
+
+The train/val split is stratified by class frequency: every image is
+placed in the stratum of its rarest class, and each stratum contributes
+``val_ratio`` of its images to the validation set, so rare classes are
+represented in both splits.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from PySide6.QtCore import QThread, Signal
+
+from core.yolo_codec import read_yolo_file
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME: str = ".build_manifest.json"
+DEFAULT_VAL_RATIO: float = 0.2
+
+# Bump when the manifest layout changes; older manifests trigger a full rebuild.
+_MANIFEST_VERSION: int = 1
+
+# Stratum of images whose label file is empty (background images).
+_BACKGROUND: int = -1
+
+# Linux ioctl that clones a file's extents (btrfs, XFS, ...).
+_FICLONE: int = 0x40049409
+
+# Progress callback: ``(done, total)``.
+BuildProgress = Callable[[int, int], None]
+
+
+def generate_data_yaml(
+    train_path: str,
+    val_path: str,
+    class_names: list[str],
+    output_path: str,
+) -> str:
+    """Create a YOLO-format ``data.yaml`` file.
+
+    Args:
+        train_path: Absolute path to the training images directory.
+        val_path: Absolute path to the validation images directory.
+        class_names: Ordered list of class names (index == class id).
+        output_path: Where to write the YAML file.
+
+    Returns:
+        The absolute path to the written YAML file.
+    """
+    import yaml
+
+    data: dict[str, Any] = {
+        "train": train_path,
+        "val": val_path,
+        "nc": len(class_names),
+        "names": class_names,
+    }
+
+    out = Path(output_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        yaml.dump(data, fh, default_flow_style=False, sort_keys=False)
+
+    logger.info("data.yaml written to %s", out)
+    return str(out.resolve())
+
+
+class BuildCancelled(Exception):
+    """Raised inside :meth:`DatasetBuilder.build` when the build is cancelled."""
+
+
+@dataclass
+class DatasetBuildResult:
+    """Summary of one :meth:`DatasetBuilder.build` call."""
+
+    dataset_dir: str
+    data_yaml: str
+    train_count: int = 0
+    val_count: int = 0
+    linked: int = 0  # images hard-linked or reflinked
+    copied: int = 0  # images copied (cross-device or unsupported FS)
+    unchanged: int = 0
+    removed: int = 0
+    class_counts: dict[int, int] = field(default_factory=dict)
+
+
+def _file_signature(path: str) -> Optional[list[int]]:
+    """Return ``[size, mtime_ns]`` of *path*, or ``None`` if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_label_classes(label_path: str) -> tuple[list[int], bool]:
+    """Return the class ids in a YOLO txt file and whether it is standard.
+
+    Files written in the legacy ``<class_name> <class_id> ...`` layout are
+    reported as non-standard; they must be rewritten before Ultralytics can
+    read them.
+    """
+    labels = read_yolo_file(label_path)
+    return labels.class_ids.tolist(), labels.is_standard
+
+
+def _write_standard_label(src: str, dst: Path) -> None:
+    """Write *src* to *dst* with any leading class-name column removed."""
+    lines: list[str] = []
+    with open(src, "r", encoding="utf-8") as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) < 5:
+                continue
+            try:
+                int(parts[0])
+            except ValueError:
+                parts = parts[1:]
+            lines.append(" ".join(parts))
+    # *dst* may still be a hard link to a source file; never write through it.
+    try:
+        dst.unlink()
+    except FileNotFoundError:
+        pass
+    with open(dst, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(lines))
+        if lines:
+            fh.write("\n")
+
+
+def _reflink(src: str, dst: Path) -> bool:
+    """Clone *src* into *dst* via ``FICLONE``; return ``False`` if unsupported."""
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        try:
+            dst.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def link_or_copy(src: str, dst: Path) -> bool:
+    """Place *src* at *dst* without duplicating data where possible.
+
+    Tries a hard link, then a reflink, and finally falls back to a copy.
+
+    Returns:
+        ``True`` if the file was linked or cloned, ``False`` if it was copied.
+    """
+    try:
+        dst.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        pass
+    if _reflink(src, dst):
+        return True
+    shutil.copy2(src, dst)
+    return False
+
+
+class DatasetBuilder:
+    """Builds or incrementally updates a YOLO dataset from project labels.
+
+    Only images with a label file are included; an empty label file marks
+    a background image.
+
+    Args:
+        image_paths: Project images (e.g. ``ProjectManager.image_list``).
+        label_path_fn: Maps an image path to its YOLO txt path
+            (e.g. ``ProjectManager.get_label_path``).
+        class_names: Ordered class names (index == class id).  Ids found in
+            label files beyond this list are named after their id.
+        output_dir: Dataset root; created if missing.
+        val_ratio: Fraction of each stratum assigned to the validation set.
+        seed: Seed of the deterministic split order.
+    """
+
+    def __init__(
+        self,
+        image_paths: list[str],
+        label_path_fn: Callable[[str], str],
+        class_names: list[str],
+        output_dir: str,
+        val_ratio: float = DEFAULT_VAL_RATIO,
+        seed: int = 0,
+    ) -> None:
+        self._image_paths = list(image_paths)
+        self._label_path_fn = label_path_fn
+        self._class_names = list(class_names)
+        self._root = Path(output_dir)
+        self._val_ratio = min(max(val_ratio, 0.0), 0.9)
+        self._seed = seed
+
+    @property
+    def dataset_dir(self) -> Path:
+        return self._root
+
+    # -- Public API ----------------------------------------------------------
+
+    def build(
+        self,
+        progress: Optional[BuildProgress] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> DatasetBuildResult:
+        """Synchronise the dataset with the project and write ``data.yaml``.
+
+        The manifest is saved after every run, including a cancelled one, so
+        the work already done is reused by the next build.
+
+        Raises:
+            BuildCancelled: If *is_cancelled* returned ``True``.
+        """
+        for split in ("train", "val"):
+            (self._root / "images" / split).mkdir(parents=True, exist_ok=True)
+            (self._root / "labels" / split).mkdir(parents=True, exist_ok=True)
+
+        old = self._load_manifest()
+        entries = self._scan(old)
+        result = DatasetBuildResult(
+            dataset_dir=str(self._root.resolve()),
+            data_yaml=str((self._root / "data.yaml").resolve()),
+        )
+
+        # Drop entries whose image left the project or lost its labels.
+        for name, entry in old.items():
+            if name not in entries:
+                self._remove_files(name, entry)
+                result.removed += 1
+
+        self._assign_splits(entries, old)
+
+        total = len(entries)
+        done = 0
+        new_manifest: dict[str, dict] = {}
+        try:
+            for name, entry in entries.items():
+                if is_cancelled is not None and is_cancelled():
+                    raise BuildCancelled()
+                prev = old.get(name)
+                if prev is not None and self._is_current(prev, entry):
+                    result.unchanged += 1
+                else:
+                    if prev is not None and prev["split"] != entry["split"]:
+                        self._remove_files(name, prev)
+                    if self._materialise(name, entry, prev):
+                        result.linked += 1
+                    else:
+                        result.copied += 1
+                new_manifest[name] = entry
+                done += 1
+                if progress is not None and (done % 256 == 0 or done == total):
+                    progress(done, total)
+        finally:
+            # Keep unfinished old entries so their files are reconciled later.
+            for name, entry in old.items():
+                if name in entries and name not in new_manifest:
+                    new_manifest[name] = entry
+            self._save_manifest(new_manifest)
+
+        counts: Counter[int] = Counter()
+        for entry in entries.values():
+            if entry["split"] == "val":
+                result.val_count += 1
+            else:
+                result.train_count += 1
+            counts.update(entry["classes"])
+        result.class_counts = dict(sorted(counts.items()))
+
+        names = list(self._class_names)
+        max_id = max(counts, default=-1)
+        names.extend(str(i) for i in range(len(names), max_id + 1))
+        generate_data_yaml(
+            str((self._root / "images" / "train").resolve()),
+            str((self._root / "images" / "val").resolve()),
+            names,
+            result.data_yaml,
+        )
+        return result
+
+    # -- Scanning ------------------------------------------------------------
+
+    def _scan(self, old: dict[str, dict]) -> dict[str, dict]:
+        """Collect the current manifest entry of every labeled image.
+
+        Label files are only read when their signature changed; unchanged
+        entries reuse the class ids stored in the manifest.
+        """
+        entries: dict[str, dict] = {}
+        for image_path in self._image_paths:
+            label_path = self._label_path_fn(image_path)
+            label_sig = _file_signature(label_path)
+            if label_sig is None:
+                continue
+            image_sig = _file_signature(image_path)
+            if image_sig is None:
+                continue
+
+            name = Path(image_path).name
+            prev = old.get(name)
+            if (
+                prev is not None
+                and prev["label"] == label_path
+                and prev["label_sig"] == label_sig
+            ):
+                classes, standard = prev["classes"], prev["standard"]
+            else:
+                try:
+                    classes, standard = _read_label_classes(label_path)
+                except (OSError, UnicodeDecodeError) as exc:
+                    logger.warning("Skipping unreadable label %s: %s", label_path, exc)
+                    continue
+
+            entries[name] = {
+                "image": image_path,
+                "image_sig": image_sig,
+                "label": label_path,
+                "label_sig": label_sig,
+                "classes": classes,
+                "standard": standard,
+                "split": prev["split"] if prev is not None else "",
+            }
+        return entries
+
+    # -- Splitting -----------------------------------------------------------
+
+    def _assign_splits(self, entries: dict[str, dict], old: dict[str, dict]) -> None:
+        """Assign a split to every entry that does not have one yet.
+
+        Each image belongs to the stratum of its rarest class.  Within a
+        stratum, new images are taken in a seeded hash order and sent to
+        ``val`` until the stratum reaches ``val_ratio``.
+        """
+        freq: Counter[int] = Counter()
+        for entry in entries.values():
+            freq.update(set(entry["classes"]))
+
+        strata: dict[int, list[str]] = defaultdict(list)
+        for name, entry in entries.items():
+            classes = set(entry["classes"])
+            key = min(classes, key=lambda c: (freq[c], c)) if classes else _BACKGROUND
+            strata[key].append(name)
+
+        for names in strata.values():
+            target_val = round(len(names) * self._val_ratio)
+            val_count = sum(1 for n in names if entries[n]["split"] == "val")
+            pending = sorted(
+                (n for n in names if not entries[n]["split"]),
+                key=self._split_order,
+            )
+            for name in pending:
+                if val_count < target_val:
+                    entries[name]["split"] = "val"
+                    val_count += 1
+                else:
+                    entries[name]["split"] = "train"
+
+    def _split_order(self, name: str) -> str:
+        return hashlib.blake2b(
+            f"{self._seed}:{name}".encode("utf-8"), digest_size=8
+        ).hexdigest()
+
+    # -- File operations -----------------------------------------------------
+
+    def _image_dst(self, name: str, split: str) -> Path:
+        return self._root / "images" / split / name
+
+    def _label_dst(self, name: str, split: str) -> Path:
+        return self._root / "labels" / split / (Path(name).stem + ".txt")
+
+    @staticmethod
+    def _is_current(prev: dict, entry: dict) -> bool:
+        return (
+            prev["split"] == entry["split"]
+            and prev["image"] == entry["image"]
+            and prev["image_sig"] == entry["image_sig"]
+            and prev["label_sig"] == entry["label_sig"]
+        )
+
+    def _materialise(self, name: str, entry: dict, prev: Optional[dict]) -> bool:
+        """Link the image and label of *entry*; return ``True`` if linked."""
+        split = entry["split"]
+        linked = True
+        image_changed = (
+            prev is None
+            or prev["split"] != split
+            or prev["image"] != entry["image"]
+            or prev["image_sig"] != entry["image_sig"]
+        )
+        if image_changed:
+            linked = link_or_copy(entry["image"], self._image_dst(name, split))
+
+        label_dst = self._label_dst(name, split)
+        if entry["standard"]:
+            link_or_copy(entry["label"], label_dst)
+        else:
+            _write_standard_label(entry["label"], label_dst)
+        return linked
+
+    def _remove_files(self, name: str, entry: dict) -> None:
+        for path in (
+            self._image_dst(name, entry["split"]),
+            self._label_dst(name, entry["split"]),
+        ):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    # -- Manifest ------------------------------------------------------------
+
+    def _load_manifest(self) -> dict[str, dict]:
+        path = self._root / MANIFEST_NAME
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != _MANIFEST_VERSION or data.get("seed") != self._seed:
+            return {}
+        return data.get("entries", {})
+
+    def _save_manifest(self, entries: dict[str, dict]) -> None:
+        path = self._root / MANIFEST_NAME
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"version": _MANIFEST_VERSION, "seed": self._seed, "entries": entries},
+                fh,
+                separators=(",", ":"),
+            )
+        os.replace(tmp, path)
+
+
+class DatasetBuildWorker(QThread):
+    """Runs a :class:`DatasetBuilder` in a background thread.
+
+    Signals:
+        progress(int, int): ``(done, total)`` images synchronised.
+        finished_build(object): The :class:`DatasetBuildResult`.
+        cancelled(): Emitted when the build was cancelled.
+        error(str): Emitted when the build fails.
+    """
+
+    progress = Signal(int, int)
+    finished_build = Signal(object)
+    cancelled = Signal()
+    error = Signal(str)
+
+    def __init__(self, builder: DatasetBuilder, parent: Optional[QThread] = None) -> None:
+        super().__init__(parent)
+        self._builder = builder
+        self._cancel = False
+
+    def cancel(self) -> None:
+        """Request the build to stop after the current image."""
+        self._cancel = True
+
+    def run(self) -> None:  # noqa: D401
+        """Build the dataset and report the result."""
+        try:
+            result = self._builder.build(
+                progress=self.progress.emit,
+                is_cancelled=lambda: self._cancel,
+            )
+        except BuildCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as exc:
+            logger.exception("Dataset build failed: %s", exc)
+            self.error.emit(str(exc))
+            return
+        self.finished_build.emit(result)
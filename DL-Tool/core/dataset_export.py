@@ -0,0 +1,444 @@
+"""Streaming COCO / Pascal VOC export of a labeled project.
+
+:class:`DatasetExporter` walks the project images on a thread pool and
+writes the annotations as it goes, so memory stays bounded no matter how
+many images the project has:
+
+* **COCO** -- a single instance JSON.  Image and annotation entries are
+  serialised by the workers and appended to two part files; the final
+  ``instances.json`` is assembled from them by streaming copies.  Mask
+  labels are stored as compressed RLE (the ``counts`` string format of
+  ``pycocotools``), computed with vectorized run-length encoding.
+* **VOC** -- one ``Annotations/<stem>.xml`` per image with the bounding
+  box of every label.
+
+At most ``workers * _INFLIGHT_PER_WORKER`` images are in flight at any time;
+results are consumed in image order so the output is deterministic.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+from xml.etree import ElementTree as ET
+
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+
+from core.label_manager import LabelItem
+
+logger = logging.getLogger(__name__)
+
+FORMAT_COCO: str = "coco"
+FORMAT_VOC: str = "voc"
+
+COCO_NAME: str = "instances.json"
+VOC_DIR: str = "Annotations"
+
+_INFLIGHT_PER_WORKER: int = 4
+
+# Returns ``(width, height, labels)`` for an image path; ``None`` to skip it.
+LabelLoader = Callable[[str], Optional[tuple[int, int, list[LabelItem]]]]
+
+
+class ExportCancelled(Exception):
+    """Raised by :meth:`DatasetExporter.export` when cancelled."""
+
+
+@dataclass
+class DatasetExportResult:
+    images: int = 0
+    annotations: int = 0
+    skipped: int = 0  # images without labels or unreadable
+    coco_path: str = ""
+    voc_dir: str = ""
+
+
+# ---------------------------------------------------------------------------
+# Geometry helpers
+# ---------------------------------------------------------------------------
+
+def rle_counts(mask: np.ndarray) -> np.ndarray:
+    """Run lengths of *mask* in column-major order, starting with a 0-run."""
+    flat = mask.ravel(order="F") > 0
+    n = flat.size
+    if n == 0:
+        return np.zeros(1, dtype=np.int64)
+    change = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate(([0], change, [n]))
+    counts = np.diff(bounds)
+    if flat[0]:
+        counts = np.concatenate(([0], counts))
+    return counts
+
+
+def rle_to_string(counts: np.ndarray) -> str:
+    """Compress run lengths into the COCO ``counts`` string (``rleToString``)."""
+    cnts = counts.tolist()
+    out: list[str] = []
+    for i, x in enumerate(cnts):
+        if i > 2:
+            x -= cnts[i - 2]
+        more = True
+        while more:
+            c = x & 0x1F
+            x >>= 5
+            more = x != -1 if c & 0x10 else x != 0
+            if more:
+                c |= 0x20
+            out.append(chr(c + 48))
+    return "".join(out)
+
+
+def _mask_bbox(mask: np.ndarray) -> Optional[list[float]]:
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    x1, y1 = int(cols[0]), int(rows[0])
+    return [float(x1), float(y1), float(cols[-1] - x1 + 1), float(rows[-1] - y1 + 1)]
+
+
+def _points_bbox(points: np.ndarray) -> list[float]:
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    return [float(lo[0]), float(lo[1]), float(hi[0] - lo[0]), float(hi[1] - lo[1])]
+
+
+def _polygon_area(points: np.ndarray) -> float:
+    x, y = points[:, 0], points[:, 1]
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2.0)
+
+
+def _label_geometry(label: LabelItem) -> Optional[tuple[list[float], float, object]]:
+    """Return ``(bbox xywh, area, segmentation)`` of *label*, or ``None``."""
+    if label.label_type == "mask":
+        if label.mask_data is None:
+            return None
+        mask = label.mask_data > 0
+        bbox = _mask_bbox(mask)
+        if bbox is None:
+            return None
+        h, w = mask.shape[:2]
+        rle = {"size": [h, w], "counts": rle_to_string(rle_counts(mask))}
+        return bbox, float(np.count_nonzero(mask)), rle
+
+    if not label.num_points:
+        return None
+    pts = label.xy.astype(np.float64)
+    bbox = _points_bbox(pts)
+    if label.label_type == "polygon":
+        if len(pts) < 3:
+            return None
+        seg = [[round(v, 2) for v in pts.ravel().tolist()]]
+        return bbox, _polygon_area(pts), seg
+    return bbox, bbox[2] * bbox[3], []
+
+
+# ---------------------------------------------------------------------------
+# Exporter
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _ImageExport:
+    image_id: int
+    image_json: str
+    annotation_json: list[str]
+    classes: dict[int, str]
+
+
+class DatasetExporter:
+    """Exports the labels of *image_paths* as COCO JSON and/or VOC XML.
+
+    Args:
+        image_paths: Images in export order.
+        class_names: Mapping of class id to class name.  COCO category ids
+            are ``class_id + 1``; ids missing from the mapping become
+            categories named after the labels that use them.
+        output_dir: Destination folder.
+        load_labels: Called from worker threads to get the size and labels
+            of one image (see :func:`project_label_loader`).
+        formats: Any of :data:`FORMAT_COCO` and :data:`FORMAT_VOC`.
+        workers: Thread pool size.
+    """
+
+    def __init__(
+        self,
+        image_paths: list[str],
+        class_names: dict[int, str],
+        output_dir: str,
+        load_labels: LabelLoader,
+        formats: tuple[str, ...] = (FORMAT_COCO,),
+        workers: int = 4,
+    ) -> None:
+        self._image_paths = list(image_paths)
+        self._class_names = dict(class_names)
+        self._output_dir = Path(output_dir)
+        self._load_labels = load_labels
+        self._formats = formats
+        self._workers = max(1, workers)
+
+    def export(
+        self,
+        progress: Optional[Callable[[int, int], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> DatasetExportResult:
+        out = self._output_dir
+        out.mkdir(parents=True, exist_ok=True)
+        result = DatasetExportResult()
+        coco = FORMAT_COCO in self._formats
+        if FORMAT_VOC in self._formats:
+            (out / VOC_DIR).mkdir(exist_ok=True)
+            result.voc_dir = str(out / VOC_DIR)
+
+        images_part = out / (COCO_NAME + ".images.part")
+        anns_part = out / (COCO_NAME + ".annotations.part")
+        images_fh = open(images_part, "w", encoding="utf-8") if coco else None
+        anns_fh = open(anns_part, "w", encoding="utf-8") if coco else None
+        total = len(self._image_paths)
+        window = self._workers * _INFLIGHT_PER_WORKER
+        ann_id = 0
+        try:
+            with ThreadPoolExecutor(self._workers, thread_name_prefix="export") as pool:
+                pending: list[Future] = []
+                next_index = 0
+                done = 0
+                while done < total:
+                    if is_cancelled is not None and is_cancelled():
+                        for fut in pending:
+                            fut.cancel()
+                        raise ExportCancelled()
+                    while next_index < total and len(pending) < window:
+                        pending.append(pool.submit(
+                            self._export_image, next_index + 1,
+                            self._image_paths[next_index], coco,
+                        ))
+                        next_index += 1
+
+                    item: Optional[_ImageExport] = pending.pop(0).result()
+                    done += 1
+                    if item is None:
+                        result.skipped += 1
+                    else:
+                        if coco:
+                            images_fh.write(("," if result.images else "") + item.image_json)
+                            for body in item.annotation_json:
+                                # Ids are global, so they are prefixed here.
+                                ann_id += 1
+                                anns_fh.write(
+                                    ("," if ann_id > 1 else "")
+                                    + f'{{"id": {ann_id}, "image_id": {item.image_id}, '
+                                    + body[1:]
+                                )
+                        for cid, name in item.classes.items():
+                            self._class_names.setdefault(cid, name)
+                        result.images += 1
+                        result.annotations += len(item.annotation_json)
+                    if progress is not None:
+                        progress(done, total)
+        except BaseException:
+            if coco:
+                images_fh.close()
+                anns_fh.close()
+                images_part.unlink(missing_ok=True)
+                anns_part.unlink(missing_ok=True)
+            raise
+
+        if coco:
+            images_fh.close()
+            anns_fh.close()
+            result.coco_path = str(self._assemble_coco(images_part, anns_part))
+        return result
+
+    # -- Internal helpers ------------------------------------------------------
+
+    def _export_image(self, image_id: int, image_path: str, coco: bool) -> Optional[_ImageExport]:
+        try:
+            loaded = self._load_labels(image_path)
+        except Exception as exc:
+            logger.warning("Cannot load labels of %s: %s", image_path, exc)
+            return None
+        if loaded is None:
+            return None
+        w, h, labels = loaded
+
+        objects: list[tuple[LabelItem, list[float], float, object]] = []
+        classes: dict[int, str] = {}
+        for label in labels:
+            geom = _label_geometry(label)
+            if geom is not None:
+                objects.append((label, *geom))
+                classes.setdefault(label.class_id, label.class_name)
+        if not objects:
+            return None
+
+        if FORMAT_VOC in self._formats:
+            self._write_voc(image_path, w, h, objects)
+
+        annotations: list[str] = []
+        image_json = ""
+        if coco:
+            image_json = json.dumps({
+                "id": image_id,
+                "file_name": os.path.basename(image_path),
+                "width": w,
+                "height": h,
+            })
+            for label, bbox, area, seg in objects:
+                annotations.append(json.dumps({
+                    "category_id": label.class_id + 1,
+                    "bbox": [round(v, 2) for v in bbox],
+                    "area": round(area, 2),
+                    "segmentation": seg,
+                    "iscrowd": 0,
+                }))
+        else:
+            annotations = [""] * len(objects)  # counted only
+        return _ImageExport(image_id, image_json, annotations, classes)
+
+    def _write_voc(self, image_path: str, w: int, h: int, objects) -> None:
+        root = ET.Element("annotation")
+        ET.SubElement(root, "folder").text = os.path.basename(os.path.dirname(image_path))
+        ET.SubElement(root, "filename").text = os.path.basename(image_path)
+        size = ET.SubElement(root, "size")
+        ET.SubElement(size, "width").text = str(w)
+        ET.SubElement(size, "height").text = str(h)
+        ET.SubElement(size, "depth").text = "3"
+        ET.SubElement(root, "segmented").text = "0"
+        for label, (x, y, bw, bh), _, _ in objects:
+            obj = ET.SubElement(root, "object")
+            ET.SubElement(obj, "name").text = self._class_names.get(
+                label.class_id, label.class_name
+            )
+            ET.SubElement(obj, "pose").text = "Unspecified"
+            ET.SubElement(obj, "truncated").text = "0"
+            ET.SubElement(obj, "difficult").text = "0"
+            box = ET.SubElement(obj, "bndbox")
+            ET.SubElement(box, "xmin").text = str(int(round(x)))
+            ET.SubElement(box, "ymin").text = str(int(round(y)))
+            ET.SubElement(box, "xmax").text = str(int(round(x + bw)))
+            ET.SubElement(box, "ymax").text = str(int(round(y + bh)))
+        ET.indent(root)
+        dest = self._output_dir / VOC_DIR / (Path(image_path).stem + ".xml")
+        ET.ElementTree(root).write(dest, encoding="utf-8", xml_declaration=False)
+
+    def _assemble_coco(self, images_part: Path, anns_part: Path) -> Path:
+        categories = [
+            {"id": cid + 1, "name": name, "supercategory": ""}
+            for cid, name in sorted(self._class_names.items())
+        ]
+        head = {
+            "info": {
+                "description": "VisionAce export",
+                "date_created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "licenses": [],
+            "categories": categories,
+        }
+        path = self._output_dir / COCO_NAME
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as out:
+            out.write(json.dumps(head)[:-1] + ', "images": [')
+            with open(images_part, "r", encoding="utf-8") as src:
+                shutil.copyfileobj(src, out)
+            out.write('], "annotations": [')
+            with open(anns_part, "r", encoding="utf-8") as src:
+                shutil.copyfileobj(src, out)
+            out.write("]}")
+        os.replace(tmp, path)
+        images_part.unlink(missing_ok=True)
+        anns_part.unlink(missing_ok=True)
+        return path
+
+
+def project_label_loader(
+    project,
+    class_names: dict[int, str],
+    in_memory: dict[str, list[LabelItem]],
+) -> LabelLoader:
+    """Return a :data:`LabelLoader` for a :class:`ProjectManager` folder.
+
+    Images in *in_memory* (a snapshot of the label manager taken on the GUI
+    thread) use those labels; the others are read from the annotation
+    database (if the project uses it and has a record of the image) or from
+    the YOLO txt files and GT masks on disk.  The image size comes from the
+    file header.
+    """
+    from PySide6.QtGui import QImageReader
+
+    from core.export_manager import ExportManager
+
+    index = project.gt_index
+    store = project.mask_store
+    # Scan once here; the worker threads then only do lookups.
+    gt_dir = str(index.gt_dir)
+    index.class_names()
+    store.class_names()
+    db = project.annotation_store if project.uses_database else None
+
+    def load(image_path: str) -> Optional[tuple[int, int, list[LabelItem]]]:
+        size = QImageReader(image_path).size()
+        w, h = size.width(), size.height()
+        if w <= 0 or h <= 0:
+            return None
+        if image_path in in_memory:
+            return w, h, in_memory[image_path]
+        if db is not None:
+            name = os.path.basename(image_path)
+            if db.contains(name):
+                return w, h, db.read(name, class_names, (w, h))
+        labels: list[LabelItem] = []
+        label_path = project.get_label_path(image_path)
+        if os.path.isfile(label_path):
+            labels.extend(ExportManager.load_yolo_txt(label_path, w, h, class_names))
+        labels.extend(ExportManager.load_gt_masks(
+            gt_dir, image_path, w, h, class_names, index=index, packed=store
+        ))
+        return w, h, labels
+
+    return load
+
+
+class DatasetExportWorker(QThread):
+    """Runs :meth:`DatasetExporter.export` in a background thread.
+
+    Signals:
+        progress(int, int): ``(done, total)`` images exported.
+        finished_export(object): The :class:`DatasetExportResult`.
+        cancelled(): Emitted when the export was cancelled.
+        error(str): Emitted when the export fails.
+    """
+
+    progress = Signal(int, int)
+    finished_export = Signal(object)
+    cancelled = Signal()
+    error = Signal(str)
+
+    def __init__(self, exporter: DatasetExporter, parent=None) -> None:
+        super().__init__(parent)
+        self._exporter = exporter
+        self._cancel = False
+
+    def cancel(self) -> None:
+        self._cancel = True
+
+    def run(self) -> None:  # noqa: D401
+        try:
+            result = self._exporter.export(
+                progress=self.progress.emit,
+                is_cancelled=lambda: self._cancel,
+            )
+        except ExportCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as exc:
+            logger.exception("Dataset export failed: %s", exc)
+            self.error.emit(str(exc))
+            return
+        self.finished_export.emit(result)
@@ -3,17 +3,58 @@
 from __future__ import annotations
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 import cv2
 import numpy as np
 
+from core.gt_index import GtMaskIndex
 from core.label_manager import LabelItem, LabelManager
+from core.mask_store import PackedMaskStore
 from core.project_manager import ProjectManager
+from core.yolo_codec import (
+    YoloLabels, color_for_class as _color_for_class, read_yolo_file,
+    read_yolo_files, write_yolo_file,
+)
 
 logger = logging.getLogger(__name__)
 
+_GT_DECODE_WORKERS: int = min(8, os.cpu_count() or 1)
+_gt_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _gt_decode_pool() -> ThreadPoolExecutor:
+    global _gt_pool
+    if _gt_pool is None:
+        _gt_pool = ThreadPoolExecutor(
+            max_workers=_GT_DECODE_WORKERS, thread_name_prefix="gt-decode"
+        )
+    return _gt_pool
+
+
+def _decode_gt_mask(path: str, size: tuple[int, int]) -> Optional[np.ndarray]:
+    """Read one GT mask as a 0/255 array of *size* ``(w, h)``; ``None`` if blank."""
+    mask = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if mask is None:
+        return None
+    return _normalize_gt_mask(mask, size)
+
+
+def _normalize_gt_mask(mask: np.ndarray, size: tuple[int, int]) -> Optional[np.ndarray]:
+    # Resize if needed (always use INTER_NEAREST to avoid interpolation artifacts)
+    w, h = size
+    if mask.shape != (h, w):
+        mask = cv2.resize(mask, (w, h), interpolation=cv2.INTER_NEAREST)
+
+    # Threshold to binary with high threshold (128) to reject JPEG compression noise
+    _, mask = cv2.threshold(mask, 127, 255, cv2.THRESH_BINARY)
+    if not mask.any():
+        return None
+    return mask
+
 
 class ExportManager:
     """Handles reading and writing label files in YOLO format as well as
@@ -54,74 +95,73 @@ class ExportManager:
 
         out = Path(output_path)
         out.parent.mkdir(parents=True, exist_ok=True)
+        write_yolo_file(
+            str(out), ExportManager.labels_to_yolo(labels, image_width, image_height)
+        )
 
-        lines: list[str] = []
-        for label in labels:
+    @staticmethod
+    def labels_to_yolo(
+        labels: list[LabelItem], img_w: int, img_h: int
+    ) -> YoloLabels:
+        """Convert LabelItems to normalized YOLO rows, keeping their order.
+
+        Bboxes are converted in one vectorized pass; masks are turned into
+        polygon contours.  Labels that yield no row are skipped.
+        """
+        bbox_idx = [
+            i for i, lb in enumerate(labels)
+            if lb.label_type == "bbox" and lb.bounds is not None
+        ]
+        bbox_rows: dict[int, list[float]] = {}
+        if bbox_idx:
+            bbox_rows = dict(zip(bbox_idx, ExportManager._bboxes_to_yolo(
+                [labels[i] for i in bbox_idx]
+            ).tolist()))
+
+        # Rows are collected flat in pixels (x/y alternating, which also
+        # holds for cx cy w h) and normalized in one step.
+        class_ids: list[int] = []
+        lengths: list[int] = []
+        flat: list[float] = []
+        for i, label in enumerate(labels):
             if label.label_type == "bbox":
-                line = ExportManager._bbox_to_yolo_line(
-                    label, image_width, image_height
-                )
+                row = bbox_rows.get(i)
+                if row is None:
+                    continue
+                flat.extend(row)
             elif label.label_type == "polygon":
-                line = ExportManager._polygon_to_yolo_line(
-                    label, image_width, image_height
-                )
+                if not label.num_points:
+                    continue
+                row = label.xy.ravel().tolist()
+                flat.extend(row)
             elif label.label_type == "mask":
-                # Convert mask to polygon contours
-                line = ExportManager._mask_to_yolo_line(
-                    label, image_width, image_height
-                )
+                row = ExportManager._mask_to_yolo_coords(label)
+                if row is None:
+                    continue
+                flat.extend(row)
             else:
                 logger.warning("Unknown label type: %s", label.label_type)
                 continue
-            if line:
-                lines.append(line)
-
-        with open(out, "w", encoding="utf-8") as fh:
-            fh.write("\n".join(lines))
-            if lines:
-                fh.write("\n")
-
-    @staticmethod
-    def _bbox_to_yolo_line(
-        label: LabelItem, img_w: int, img_h: int
-    ) -> str:
-        """Convert a bbox LabelItem to a standard YOLO detection line.
-
-        Standard YOLO format: ``<class_id> <cx> <cy> <w> <h>``
-        """
-        xs = [p[0] for p in label.points]
-        ys = [p[1] for p in label.points]
-        x_min, x_max = min(xs), max(xs)
-        y_min, y_max = min(ys), max(ys)
-
-        cx = ((x_min + x_max) / 2.0) / img_w
-        cy = ((y_min + y_max) / 2.0) / img_h
-        w = (x_max - x_min) / img_w
-        h = (y_max - y_min) / img_h
+            class_ids.append(label.class_id)
+            lengths.append(len(row))
 
-        return f"{label.class_id} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}"
+        coords = np.asarray(flat, dtype=np.float64)
+        coords[0::2] /= img_w
+        coords[1::2] /= img_h
+        return YoloLabels.from_flat(class_ids, lengths, coords)
 
     @staticmethod
-    def _polygon_to_yolo_line(
-        label: LabelItem, img_w: int, img_h: int
-    ) -> str:
-        """Convert a polygon LabelItem to a standard YOLO segmentation line.
-
-        Standard YOLO format: ``<class_id> <x1> <y1> <x2> <y2> ... <xn> <yn>``
-        """
-        coords: list[str] = []
-        for x, y in label.points:
-            coords.append(f"{x / img_w:.6f}")
-            coords.append(f"{y / img_h:.6f}")
-        return f"{label.class_id} " + " ".join(coords)
+    def _bboxes_to_yolo(labels: list[LabelItem]) -> np.ndarray:
+        """Return ``(k, 4)`` ``cx cy w h`` in pixels for bbox labels."""
+        xyxy = np.array([lb.bounds for lb in labels], dtype=np.float64).reshape(-1, 4)
+        lo, hi = xyxy[:, :2], xyxy[:, 2:]
+        return np.hstack(((lo + hi) / 2.0, hi - lo))
 
     @staticmethod
-    def _mask_to_yolo_line(
-        label: LabelItem, img_w: int, img_h: int
-    ) -> str:
-        """Convert a mask LabelItem to YOLO segmentation line by finding contours."""
+    def _mask_to_yolo_coords(label: LabelItem) -> Optional[list[float]]:
+        """Convert a mask label to flat pixel polygon coordinates via contours."""
         if label.mask_data is None:
-            return ""
+            return None
 
         # Find contours in the mask
         contours, _ = cv2.findContours(
@@ -129,7 +169,7 @@ class ExportManager:
         )
 
         if not contours:
-            return ""
+            return None
 
         # Use the largest contour
         largest_contour = max(contours, key=cv2.contourArea)
@@ -138,17 +178,10 @@ class ExportManager:
         epsilon = 0.005 * cv2.arcLength(largest_contour, True)
         approx = cv2.approxPolyDP(largest_contour, epsilon, True)
 
-        # Convert to normalized coordinates
-        coords: list[str] = []
-        for point in approx:
-            x, y = point[0]
-            coords.append(f"{x / img_w:.6f}")
-            coords.append(f"{y / img_h:.6f}")
-
-        if len(coords) < 6:  # At least 3 points
-            return ""
+        if len(approx) < 3:  # At least 3 points
+            return None
 
-        return f"{label.class_id} " + " ".join(coords)
+        return approx.reshape(-1).astype(np.float64).tolist()
 
     # ------------------------------------------------------------------
     # YOLO TXT – load
@@ -175,67 +208,21 @@ class ExportManager:
         Returns:
             List of ``LabelItem`` instances.
         """
-        path = Path(txt_path)
-        if not path.is_file():
+        if not Path(txt_path).is_file():
             return []
+        return read_yolo_file(txt_path).to_label_items(
+            image_width, image_height, class_names
+        )
 
-        labels: list[LabelItem] = []
-        with open(path, "r", encoding="utf-8") as fh:
-            for raw_line in fh:
-                line = raw_line.strip()
-                if not line:
-                    continue
-                parts = line.split()
-                if len(parts) < 5:
-                    continue
-
-                # Detect format: new format has class_name as first token (non-numeric)
-                try:
-                    float(parts[0])
-                    # Old format: class_id first
-                    class_id = int(parts[0])
-                    cls_name = class_names.get(class_id, str(class_id))
-                    values = [float(v) for v in parts[1:]]
-                except ValueError:
-                    # New format: class_name class_id ...
-                    cls_name = parts[0]
-                    class_id = int(parts[1])
-                    values = [float(v) for v in parts[2:]]
-
-                if len(values) == 4:
-                    # bbox: cx cy w h (normalized)
-                    cx, cy, w, h = values
-                    x_min = (cx - w / 2.0) * image_width
-                    y_min = (cy - h / 2.0) * image_height
-                    x_max = (cx + w / 2.0) * image_width
-                    y_max = (cy + h / 2.0) * image_height
-                    points = [
-                        (x_min, y_min),
-                        (x_max, y_min),
-                        (x_max, y_max),
-                        (x_min, y_max),
-                    ]
-                    label_type = "bbox"
-                else:
-                    # polygon: x1 y1 x2 y2 ... (normalized)
-                    points = []
-                    for i in range(0, len(values) - 1, 2):
-                        px = values[i] * image_width
-                        py = values[i + 1] * image_height
-                        points.append((px, py))
-                    label_type = "polygon"
-
-                labels.append(
-                    LabelItem(
-                        class_id=class_id,
-                        class_name=cls_name,
-                        label_type=label_type,
-                        points=points,
-                        color=_color_for_class(class_id),
-                    )
-                )
+    @staticmethod
+    def load_yolo_batch(txt_paths: list[str]) -> YoloLabels:
+        """Parse many annotation files at once without creating LabelItems.
 
-        return labels
+        Use :attr:`YoloLabels.file_index` / :meth:`YoloLabels.for_file` to
+        split the rows per file, and :meth:`YoloLabels.to_label_items` only
+        for the files that need them.
+        """
+        return read_yolo_files(txt_paths)
 
     # ------------------------------------------------------------------
     # GT mask loading
@@ -248,67 +235,68 @@ class ExportManager:
         image_width: int,
         image_height: int,
         class_names: dict[int, str],
+        index: Optional[GtMaskIndex] = None,
+        packed: Optional[PackedMaskStore] = None,
     ) -> list[LabelItem]:
         """Load GT masks from gt_image/<class_name>/ directory structure.
 
+        Masks stored in the packed layout (``gt_packed/``, see
+        :mod:`core.mask_store`) are merged in; a class found in both layouts
+        is taken from the packed store.
+
         Args:
             gt_image_dir: Path to the gt_image/ directory.
             image_path: Path to the source image (used for matching filename).
             image_width: Image width in pixels.
             image_height: Image height in pixels.
             class_names: Mapping of class id to class name.
+            index: Project-wide mask index (see ``ProjectManager.gt_index``).
+                Without it *gt_image_dir* is scanned for this call only.
+            packed: Packed mask store of the project, if any.
 
         Returns:
             List of ``LabelItem`` instances with mask_data loaded.
         """
-        gt_dir = Path(gt_image_dir)
-        if not gt_dir.exists():
-            return []
-
-        img_stem = Path(image_path).stem
-        labels: list[LabelItem] = []
+        if index is None:
+            index = GtMaskIndex(gt_image_dir)
+
+        stem = Path(image_path).stem
+        size = (image_width, image_height)
+        loaded: dict[str, Optional[np.ndarray]] = {}
+        if packed is not None:
+            for class_name, mask in packed.read(stem).items():
+                loaded[class_name] = _normalize_gt_mask(mask, size)
+
+        found = sorted(
+            (name, path) for name, path in index.lookup(stem).items()
+            if name not in loaded
+        )
+        if len(found) == 1:
+            loaded[found[0][0]] = _decode_gt_mask(found[0][1], size)
+        elif found:
+            # cv2 releases the GIL while decoding, so classes load in parallel.
+            masks = _gt_decode_pool().map(
+                _decode_gt_mask, [path for _, path in found], [size] * len(found)
+            )
+            loaded.update(zip((name for name, _ in found), masks))
 
         # Reverse map: class_name -> class_id
         name_to_id = {name: cid for cid, name in class_names.items()}
-
-        for class_dir in gt_dir.iterdir():
-            if not class_dir.is_dir():
+        labels: list[LabelItem] = []
+        for class_name, mask in sorted(loaded.items()):
+            if mask is None:
                 continue
-
-            class_name = class_dir.name
             class_id = name_to_id.get(class_name, -1)
-
-            # Try to find matching mask file (any extension)
-            for mask_file in class_dir.iterdir():
-                if mask_file.is_file() and mask_file.stem == img_stem:
-                    # Load mask
-                    mask = cv2.imread(str(mask_file), cv2.IMREAD_GRAYSCALE)
-                    if mask is None:
-                        continue
-
-                    # Resize if needed (always use INTER_NEAREST to avoid interpolation artifacts)
-                    if mask.shape != (image_height, image_width):
-                        mask = cv2.resize(mask, (image_width, image_height),
-                                         interpolation=cv2.INTER_NEAREST)
-
-                    # Threshold to binary with high threshold (128) to reject JPEG compression noise
-                    mask = (mask >= 128).astype(np.uint8) * 255
-
-                    if mask.max() == 0:
-                        continue
-
-                    labels.append(
-                        LabelItem(
-                            class_id=class_id if class_id >= 0 else 0,
-                            class_name=class_name,
-                            label_type="mask",
-                            points=[],
-                            color=_color_for_class(class_id if class_id >= 0 else 0),
-                            mask_data=mask,
-                        )
-                    )
-                    break  # Only one mask per class per image
-
+            labels.append(
+                LabelItem(
+                    class_id=class_id if class_id >= 0 else 0,
+                    class_name=class_name,
+                    label_type="mask",
+                    points=[],
+                    color=_color_for_class(class_id if class_id >= 0 else 0),
+                    mask_data=mask,
+                )
+            )
         return labels
 
     # ------------------------------------------------------------------
@@ -331,17 +319,12 @@ class ExportManager:
                 mask[mask_binary > 0] = 255
                 continue
 
-            pts = np.array(label.points, dtype=np.int32)
-
-            if label.label_type == "bbox":
-                xs = pts[:, 0]
-                ys = pts[:, 1]
-                x1, x2 = int(xs.min()), int(xs.max())
-                y1, y2 = int(ys.min()), int(ys.max())
+            if label.label_type == "bbox" and label.bounds is not None:
+                x1, y1, x2, y2 = (int(v) for v in label.bounds)
                 cv2.rectangle(mask, (x1, y1), (x2, y2), 255, thickness=-1)
             elif label.label_type == "polygon":
-                if len(pts) >= 3:
-                    cv2.fillPoly(mask, [pts], 255)
+                if label.num_points >= 3:
+                    cv2.fillPoly(mask, [label.xy.astype(np.int32)], 255)
 
         out = Path(output_path)
         out.parent.mkdir(parents=True, exist_ok=True)
@@ -363,16 +346,13 @@ class ExportManager:
             pixel_value = (label.class_id + 1) if multi_label else 255
 
             if label.label_type == "bbox":
-                pts = np.array(label.points, dtype=np.int32)
-                xs = pts[:, 0]
-                ys = pts[:, 1]
-                x1, x2 = int(xs.min()), int(xs.max())
-                y1, y2 = int(ys.min()), int(ys.max())
+                if label.bounds is None:
+                    continue
+                x1, y1, x2, y2 = (int(v) for v in label.bounds)
                 cv2.rectangle(mask, (x1, y1), (x2, y2), pixel_value, thickness=-1)
             elif label.label_type == "polygon":
-                pts = np.array(label.points, dtype=np.int32)
-                if len(pts) >= 3:
-                    cv2.fillPoly(mask, [pts], pixel_value)
+                if label.num_points >= 3:
+                    cv2.fillPoly(mask, [label.xy.astype(np.int32)], pixel_value)
             elif label.label_type == "mask" and label.mask_data is not None:
                 # Directly use the mask data
                 mask_binary = (label.mask_data > 0).astype(np.uint8)
@@ -380,7 +360,14 @@ class ExportManager:
 
         out = Path(output_path)
         out.parent.mkdir(parents=True, exist_ok=True)
-        cv2.imwrite(str(out), mask)
+        # Encode, write to a temp file and rename: a failed write keeps the
+        # old mask, and a hard-linked import is replaced, not written through.
+        ok, data = cv2.imencode(out.suffix or ".png", mask)
+        if not ok:
+            raise OSError(f"Cannot encode mask for {out}")
+        tmp = out.with_name(out.name + ".tmp")
+        tmp.write_bytes(data.tobytes())
+        os.replace(tmp, out)
 
     # ------------------------------------------------------------------
     # Batch save
@@ -411,20 +398,3 @@ class ExportManager:
 
         logger.info("Saved labels for %d images.", count)
         return count
-
-
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
-
-_DEFAULT_COLORS: list[str] = [
-    "#FF3838", "#FF9D97", "#FF701F", "#FFB21D", "#CFD231",
-    "#48F90A", "#92CC17", "#3DDB86", "#1A9334", "#00D4BB",
-    "#2C99A8", "#00C2FF", "#344593", "#6473FF", "#0018EC",
-    "#8438FF", "#520085", "#CB38FF", "#FF95C8", "#FF37C7",
-]
-
-
-def _color_for_class(class_id: int) -> str:
-    """Return a deterministic hex color for a class id."""
-    return _DEFAULT_COLORS[class_id % len(_DEFAULT_COLORS)]
@@ -0,0 +1,102 @@
+"""In-memory index of the GT mask files in a project's ``gt_image/`` folder.
+
+GT masks are stored as ``gt_image/<class_name>/<stem>.<ext>``.  Finding the
+masks of one image used to mean listing every class directory, which made
+each lookup O(total mask files).  :class:`GtMaskIndex` lists the folder once
+with :func:`os.scandir` and keeps a ``stem -> {class_name: path}`` map that
+:class:`~core.save_manager.SaveManager` updates as it writes and deletes
+masks, so per-image lookups are a dictionary access.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+# Left behind by an interrupted atomic write or import; never a mask.
+_INCOMPLETE_SUFFIXES: tuple[str, ...] = (".tmp", ".part")
+
+
+class GtMaskIndex:
+    """``stem -> {class_name: mask path}`` map of a ``gt_image/`` folder.
+
+    The folder is scanned lazily on first access.  Call :meth:`invalidate`
+    after files are added or removed outside :class:`SaveManager` (e.g. an
+    external import) to force a re-scan.
+    """
+
+    def __init__(self, gt_dir: str | Path) -> None:
+        self._gt_dir = Path(gt_dir)
+        self._by_stem: dict[str, dict[str, str]] = {}
+        self._classes: list[str] = []
+        self._built = False
+
+    @property
+    def gt_dir(self) -> Path:
+        return self._gt_dir
+
+    # -- Queries ---------------------------------------------------------------
+
+    def lookup(self, stem: str) -> dict[str, str]:
+        """Return ``{class_name: path}`` of the masks stored for *stem*."""
+        self._ensure_built()
+        return dict(self._by_stem.get(stem, {}))
+
+    def has(self, stem: str) -> bool:
+        self._ensure_built()
+        return bool(self._by_stem.get(stem))
+
+    def class_names(self) -> list[str]:
+        """Names of the class directories under ``gt_image/``."""
+        self._ensure_built()
+        return list(self._classes)
+
+    # -- Updates ---------------------------------------------------------------
+
+    def add(self, stem: str, class_name: str, path: str | Path) -> None:
+        """Record that a mask for *stem* / *class_name* was written to *path*."""
+        if not self._built:
+            return  # picked up by the first scan
+        if class_name not in self._classes:
+            self._classes.append(class_name)
+        self._by_stem.setdefault(stem, {})[class_name] = str(path)
+
+    def discard(self, stem: str) -> list[str]:
+        """Forget every mask of *stem* and return their paths."""
+        self._ensure_built()
+        return list(self._by_stem.pop(stem, {}).values())
+
+    def invalidate(self) -> None:
+        self._by_stem.clear()
+        self._classes.clear()
+        self._built = False
+
+    # -- Internal helpers ------------------------------------------------------
+
+    def _ensure_built(self) -> None:
+        if self._built:
+            return
+        self._built = True
+        try:
+            class_entries = sorted(
+                (e for e in os.scandir(self._gt_dir) if e.is_dir()),
+                key=lambda e: e.name,
+            )
+        except OSError:
+            return
+
+        for class_entry in class_entries:
+            cname = class_entry.name
+            self._classes.append(cname)
+            try:
+                files = list(os.scandir(class_entry.path))
+            except OSError:
+                continue
+            for entry in files:
+                if not entry.is_file() or entry.name.endswith(_INCOMPLETE_SUFFIXES):
+                    continue
+                stem = os.path.splitext(entry.name)[0]
+                # Only one mask per class per image; prefer the lossless PNG.
+                per_stem = self._by_stem.setdefault(stem, {})
+                if cname not in per_stem or entry.name.lower().endswith(".png"):
+                    per_stem[cname] = entry.path
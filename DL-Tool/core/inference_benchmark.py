@@ -0,0 +1,284 @@
+"""Inference benchmark of trained weights.
+
+:func:`run_benchmark` loads weights through :class:`~core.model_manager.ModelManager`
+and times :meth:`~core.model_manager.ModelManager.predict_batch` for every
+combination of inference size and batch size on a sample of images.
+Optionally the weights are exported to ONNX and the same grid is measured
+for the exported model.  The :class:`BenchmarkReport` is saved next to the
+weights as ``benchmark.json`` (full report) and ``benchmark.csv`` (table).
+
+Images are decoded once before timing, so the numbers cover preprocessing,
+the forward pass and NMS -- the part of auto-labeling that depends on the
+model -- but not JPEG decoding.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from core.model_manager import ModelManager
+from core.project_manager import SUPPORTED_IMAGE_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+REPORT_NAME: str = "benchmark.json"
+TABLE_NAME: str = "benchmark.csv"
+
+DEFAULT_INFER_SIZES: tuple[int, ...] = (320, 480, 640)
+DEFAULT_BATCH_SIZES: tuple[int, ...] = (1, 4, 8)
+DEFAULT_SAMPLE_SIZE: int = 32
+
+# Passes over the image sample per (size, batch) point, after one warm-up call.
+DEFAULT_REPEATS: int = 3
+
+# Log callback: one human-readable line.
+LogCallback = Callable[[str], None]
+
+
+@dataclass
+class BenchmarkPoint:
+    """Timings of one ``(backend, infer_size, batch)`` combination.
+
+    Latencies are per ``predict_batch`` call, i.e. per batch.
+    """
+
+    backend: str
+    infer_size: int
+    batch: int
+    calls: int = 0
+    mean_ms: float = 0.0
+    p50_ms: float = 0.0
+    p90_ms: float = 0.0
+    p99_ms: float = 0.0
+    images_per_sec: float = 0.0
+    error: str = ""
+
+
+@dataclass
+class BenchmarkReport:
+    """Benchmark of one weights file, optionally with its ONNX export."""
+
+    weights: str
+    model_type: str
+    images: int
+    created: str = ""
+    system: dict[str, Any] = field(default_factory=dict)
+    onnx_path: str = ""
+    onnx_error: str = ""
+    points: list[BenchmarkPoint] = field(default_factory=list)
+
+    def best(self, backend: str = "pytorch") -> Optional[BenchmarkPoint]:
+        """Return the point with the highest throughput for *backend*."""
+        ok = [p for p in self.points if p.backend == backend and not p.error]
+        return max(ok, key=lambda p: p.images_per_sec, default=None)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def save(self, directory: str) -> Path:
+        """Write ``benchmark.json`` and ``benchmark.csv`` into *directory*."""
+        out = Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        path = out / REPORT_NAME
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, indent=2)
+        with open(out / TABLE_NAME, "w", encoding="utf-8", newline="") as fh:
+            fieldnames = list(BenchmarkPoint.__dataclass_fields__)
+            writer = csv.DictWriter(fh, fieldnames)
+            writer.writeheader()
+            writer.writerows(asdict(p) for p in self.points)
+        return path
+
+    def summary_lines(self) -> list[str]:
+        lines = []
+        for p in self.points:
+            if p.error:
+                lines.append(f"{p.backend:8s} {p.infer_size:5d}px  batch {p.batch:2d}  ERROR: {p.error}")
+                continue
+            lines.append(
+                f"{p.backend:8s} {p.infer_size:5d}px  batch {p.batch:2d}  "
+                f"p50 {p.p50_ms:8.1f} ms  p90 {p.p90_ms:8.1f} ms  "
+                f"p99 {p.p99_ms:8.1f} ms  {p.images_per_sec:7.1f} img/s"
+            )
+        return lines
+
+
+def load_report(weights_path: str) -> Optional[BenchmarkReport]:
+    """Load the report stored next to *weights_path*, if any."""
+    path = Path(weights_path).parent / REPORT_NAME
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    points = [BenchmarkPoint(**p) for p in data.pop("points", [])]
+    known = {k: v for k, v in data.items() if k in BenchmarkReport.__dataclass_fields__}
+    return BenchmarkReport(points=points, **known)
+
+
+def sample_dataset_images(data_yaml_path: str, count: int = DEFAULT_SAMPLE_SIZE) -> list[str]:
+    """Return up to *count* evenly spaced images of a dataset's ``val`` split.
+
+    Falls back to the ``train`` split if ``val`` is missing or empty.
+    """
+    import yaml
+
+    try:
+        with open(data_yaml_path, "r", encoding="utf-8") as fh:
+            data = yaml.safe_load(fh) or {}
+    except (OSError, yaml.YAMLError) as exc:
+        logger.warning("Cannot read %s: %s", data_yaml_path, exc)
+        return []
+
+    root = Path(data.get("path") or Path(data_yaml_path).parent)
+    for split in ("val", "train"):
+        entry = data.get(split)
+        if not entry:
+            continue
+        folder = Path(entry)
+        if not folder.is_absolute():
+            folder = root / folder
+        if not folder.is_dir():
+            continue
+        images = sorted(
+            str(p) for p in folder.iterdir()
+            if p.suffix.lower() in SUPPORTED_IMAGE_EXTENSIONS
+        )
+        if images:
+            step = max(1, len(images) // count)
+            return images[::step][:count]
+    return []
+
+
+def _system_info() -> dict[str, Any]:
+    info: dict[str, Any] = {
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import torch
+
+        info["torch"] = torch.__version__
+        info["threads"] = torch.get_num_threads()
+        if torch.cuda.is_available():
+            info["cuda_device"] = torch.cuda.get_device_name(0)
+    except ImportError:
+        pass
+    return info
+
+
+def benchmark_model(
+    manager: ModelManager,
+    backend: str,
+    images: list[np.ndarray],
+    infer_sizes: tuple[int, ...],
+    batch_sizes: tuple[int, ...],
+    repeats: int = DEFAULT_REPEATS,
+    log: Optional[LogCallback] = None,
+) -> list[BenchmarkPoint]:
+    """Time the active model of *manager* over the size / batch grid."""
+    points: list[BenchmarkPoint] = []
+    for size in infer_sizes:
+        for batch in batch_sizes:
+            point = BenchmarkPoint(backend=backend, infer_size=size, batch=batch)
+            chunks = [images[i:i + batch] for i in range(0, len(images), batch)]
+            chunks = [c for c in chunks if len(c) == batch] or [images[:batch]]
+
+            # Warm-up: first call per shape builds / allocates the graph.
+            if manager.predict_batch(chunks[0], infer_size=size) is None:
+                point.error = "inference failed"
+                points.append(point)
+                continue
+
+            latencies: list[float] = []
+            for _ in range(repeats):
+                for chunk in chunks:
+                    t0 = time.perf_counter()
+                    manager.predict_batch(chunk, infer_size=size)
+                    latencies.append(time.perf_counter() - t0)
+
+            ms = np.asarray(latencies) * 1000.0
+            point.calls = len(latencies)
+            point.mean_ms = float(ms.mean())
+            point.p50_ms, point.p90_ms, point.p99_ms = (
+                float(v) for v in np.percentile(ms, [50, 90, 99])
+            )
+            point.images_per_sec = point.calls * len(chunks[0]) / float(ms.sum() / 1000.0)
+            points.append(point)
+            if log is not None:
+                log(BenchmarkReport("", "", 0, points=[point]).summary_lines()[0])
+    return points
+
+
+def run_benchmark(
+    weights_path: str,
+    model_type: str,
+    image_paths: list[str],
+    infer_sizes: tuple[int, ...] = DEFAULT_INFER_SIZES,
+    batch_sizes: tuple[int, ...] = DEFAULT_BATCH_SIZES,
+    export_onnx: bool = False,
+    repeats: int = DEFAULT_REPEATS,
+    log: Optional[LogCallback] = None,
+) -> Optional[BenchmarkReport]:
+    """Benchmark *weights_path* and save the report next to it.
+
+    Returns ``None`` if the weights cannot be loaded or no sample image is
+    readable.
+    """
+    import cv2
+
+    images = [img for img in (cv2.imread(p) for p in image_paths) if img is not None]
+    if not images:
+        logger.warning("No readable benchmark images.")
+        return None
+
+    manager = ModelManager(max_models=1)
+    if not manager.load_model(weights_path, model_type):
+        return None
+
+    report = BenchmarkReport(
+        weights=weights_path,
+        model_type=model_type,
+        images=len(images),
+        created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        system=_system_info(),
+    )
+    if log is not None:
+        log(f"Benchmarking {weights_path} on {len(images)} images...")
+    report.points += benchmark_model(
+        manager, "pytorch", images, infer_sizes, batch_sizes, repeats, log
+    )
+
+    if export_onnx:
+        try:
+            report.onnx_path = str(
+                manager.get_model().export(
+                    format="onnx", dynamic=True, imgsz=max(infer_sizes)
+                )
+            )
+        except Exception as exc:
+            logger.warning("ONNX export failed: %s", exc)
+            report.onnx_error = str(exc)
+        if report.onnx_path and manager.load_model(report.onnx_path, model_type):
+            report.points += benchmark_model(
+                manager, "onnx", images, infer_sizes, batch_sizes, repeats, log
+            )
+        elif report.onnx_path:
+            report.onnx_error = "cannot load exported model"
+    manager.clear_pool()
+
+    path = report.save(str(Path(weights_path).parent))
+    if log is not None:
+        log(f"Benchmark report saved to: {path}")
+    return report
@@ -0,0 +1,270 @@
+"""Import of external ``labels/`` and ``gt_image/`` folders into a project.
+
+:class:`LabelImporter` lists the source folder once and copies the files on
+a thread pool, so a network share's latency is overlapped and the GUI stays
+responsive (see :class:`LabelImportWorker`):
+
+* a destination file with the same size and modification time as its source
+  is skipped, so re-running an import only transfers what changed -- and an
+  interrupted import resumes where it stopped;
+* every file is written to ``<name>.part`` and renamed into place, so an
+  interruption never leaves a truncated label behind;
+* with ``link=True`` files are hard-linked instead of copied when source and
+  project share a filesystem (falling back to a copy otherwise).  The
+  project writers replace files rather than rewriting them, so editing an
+  imported label never writes through to its source.
+
+The result lists the stems (and GT classes) whose files changed, so the
+caller can refresh only those images instead of the whole project.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from PySide6.QtCore import QThread, Signal
+
+logger = logging.getLogger(__name__)
+
+# Tolerance for comparing modification times: FAT and some SMB servers only
+# keep them at 2 s resolution.
+_MTIME_TOLERANCE_S: float = 2.0
+
+_INFLIGHT_PER_WORKER: int = 16
+
+_COPIED, _LINKED, _SKIPPED = "copied", "linked", "skipped"
+
+
+class ImportCancelled(Exception):
+    """Raised by :meth:`LabelImporter.run` when cancelled.
+
+    :attr:`result` holds the files imported before the cancellation.
+    """
+
+    def __init__(self, result: "LabelImportResult") -> None:
+        super().__init__("import cancelled")
+        self.result = result
+
+
+@dataclass
+class LabelImportResult:
+    copied: int = 0
+    linked: int = 0
+    skipped: int = 0  # unchanged since a previous import
+    failed: int = 0
+    label_stems: list[str] = field(default_factory=list)  # changed label files
+    gt_files: list[tuple[str, str, str]] = field(default_factory=list)  # (stem, class, path)
+
+    @property
+    def changed_stems(self) -> set[str]:
+        return set(self.label_stems) | {stem for stem, _, _ in self.gt_files}
+
+
+@dataclass
+class _Task:
+    src: str
+    dst: Path
+    size: int
+    mtime: float
+    stem: str
+    class_name: Optional[str]  # None for a label file
+
+
+class LabelImporter:
+    """Imports ``<source>/labels/*.txt`` and ``<source>/gt_image/<class>/*``.
+
+    Args:
+        source_dir: Folder containing ``labels/`` and/or ``gt_image/``.
+        label_dir: Destination of the label files (the project label dir).
+        gt_dir: Destination ``gt_image/`` folder of the project.
+        link: Hard-link instead of copying where possible.
+        workers: Thread pool size.
+    """
+
+    def __init__(
+        self,
+        source_dir: str,
+        label_dir: str,
+        gt_dir: str,
+        link: bool = False,
+        workers: int = 4,
+    ) -> None:
+        self._source = Path(source_dir)
+        self._label_dir = Path(label_dir)
+        self._gt_dir = Path(gt_dir)
+        self._link = link
+        self._workers = max(1, workers)
+
+    @staticmethod
+    def has_data(source_dir: str) -> bool:
+        source = Path(source_dir)
+        return (source / "labels").is_dir() or (source / "gt_image").is_dir()
+
+    def run(
+        self,
+        progress: Optional[Callable[[int, int], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> LabelImportResult:
+        if progress is not None:
+            progress(0, 0)  # listing the source can take a while
+        result = LabelImportResult()
+        tasks = self._scan(result, is_cancelled)
+        total = len(tasks)
+        window = self._workers * _INFLIGHT_PER_WORKER
+        done = 0
+        with ThreadPoolExecutor(self._workers, thread_name_prefix="import") as pool:
+            pending: dict[Future, _Task] = {}
+            next_index = 0
+            while done < total:
+                if is_cancelled is not None and is_cancelled():
+                    running = [fut for fut in pending if not fut.cancel()]
+                    for fut in running:
+                        self._tally(result, pending[fut], fut)
+                    raise ImportCancelled(result)
+                while next_index < total and len(pending) < window:
+                    task = tasks[next_index]
+                    pending[pool.submit(self._import_file, task)] = task
+                    next_index += 1
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    self._tally(result, pending.pop(fut), fut)
+                    done += 1
+                if progress is not None:
+                    progress(done, total)
+        return result
+
+    # -- Internal helpers ------------------------------------------------------
+
+    @staticmethod
+    def _tally(result: LabelImportResult, task: _Task, fut: Future) -> None:
+        try:
+            outcome = fut.result()
+        except OSError as exc:
+            logger.warning("Cannot import %s: %s", task.src, exc)
+            result.failed += 1
+            return
+        if outcome == _SKIPPED:
+            result.skipped += 1
+            return
+        if outcome == _LINKED:
+            result.linked += 1
+        else:
+            result.copied += 1
+        if task.class_name is None:
+            result.label_stems.append(task.stem)
+        else:
+            result.gt_files.append((task.stem, task.class_name, str(task.dst)))
+
+    def _scan(
+        self,
+        result: LabelImportResult,
+        is_cancelled: Optional[Callable[[], bool]],
+    ) -> list[_Task]:
+        """List the source files; destination folders are created here."""
+        tasks: list[_Task] = []
+        labels_src = self._source / "labels"
+        if labels_src.is_dir():
+            self._label_dir.mkdir(parents=True, exist_ok=True)
+            tasks.extend(self._scan_dir(labels_src, self._label_dir, None, ".txt"))
+
+        gt_src = self._source / "gt_image"
+        if gt_src.is_dir():
+            for class_entry in sorted(os.scandir(gt_src), key=lambda e: e.name):
+                if is_cancelled is not None and is_cancelled():
+                    raise ImportCancelled(result)
+                if not class_entry.is_dir():
+                    continue
+                dest = self._gt_dir / class_entry.name
+                dest.mkdir(parents=True, exist_ok=True)
+                tasks.extend(self._scan_dir(class_entry.path, dest, class_entry.name, None))
+        return tasks
+
+    @staticmethod
+    def _scan_dir(
+        src_dir, dst_dir: Path, class_name: Optional[str], suffix: Optional[str]
+    ) -> list[_Task]:
+        tasks = []
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(".part") or (suffix and not name.endswith(suffix)):
+                    continue
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                tasks.append(_Task(
+                    entry.path, dst_dir / name, st.st_size, st.st_mtime,
+                    os.path.splitext(name)[0], class_name,
+                ))
+        return tasks
+
+    def _import_file(self, task: _Task) -> str:
+        try:
+            st = os.stat(task.dst)
+        except FileNotFoundError:
+            pass
+        else:
+            if (st.st_size == task.size
+                    and abs(st.st_mtime - task.mtime) <= _MTIME_TOLERANCE_S):
+                return _SKIPPED
+
+        tmp = task.dst.with_name(task.dst.name + ".part")
+        tmp.unlink(missing_ok=True)  # left over from an interrupted import
+        outcome = _COPIED
+        if self._link:
+            try:
+                os.link(task.src, tmp)
+                outcome = _LINKED
+            except OSError:
+                pass  # other filesystem or no hard-link support
+        if outcome == _COPIED:
+            shutil.copy2(task.src, tmp)
+        os.replace(tmp, task.dst)
+        return outcome
+
+
+class LabelImportWorker(QThread):
+    """Runs :meth:`LabelImporter.run` in a background thread.
+
+    Signals:
+        progress(int, int): ``(done, total)`` files; ``(0, 0)`` while listing.
+        finished_import(object): The :class:`LabelImportResult`.
+        cancelled(object): The partial :class:`LabelImportResult` of a
+            cancelled import.
+        error(str): Emitted when the import fails.
+    """
+
+    progress = Signal(int, int)
+    finished_import = Signal(object)
+    cancelled = Signal(object)
+    error = Signal(str)
+
+    def __init__(self, importer: LabelImporter, parent=None) -> None:
+        super().__init__(parent)
+        self._importer = importer
+        self._cancel = False
+
+    def cancel(self) -> None:
+        self._cancel = True
+
+    def run(self) -> None:  # noqa: D401
+        try:
+            result = self._importer.run(
+                progress=self.progress.emit,
+                is_cancelled=lambda: self._cancel,
+            )
+        except ImportCancelled as exc:
+            self.cancelled.emit(exc.result)
+            return
+        except Exception as exc:
+            logger.exception("Label import failed: %s", exc)
+            self.error.emit(str(exc))
+            return
+        self.finished_import.emit(result)
@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Optional
+from collections import Counter
+from collections.abc import Sequence
+from typing import Iterator, Optional, overload
 import numpy as np
 
 from PySide6.QtCore import QObject, Signal
 from PySide6.QtGui import QUndoStack, QUndoCommand
 
 
-@dataclass
+_NO_POINTS = np.zeros((0, 2), dtype=np.float32)
+_NO_POINTS.setflags(write=False)
+
+
 class LabelItem:
     """Represents a single annotation label on an image.
 
@@ -26,26 +30,149 @@ class LabelItem:
         color: Display color as a hex string, e.g. "#FF0000".
         mask_data: Optional numpy array for raster-based segmentation.
                    Only used when label_type is "mask".
+
+    Geometry is stored compactly: a bbox as its normalized ``x1 y1 x2 y2``
+    tuple (:attr:`xyxy`), a polygon as a contiguous ``(N, 2)`` float32
+    array (:attr:`xy`) whose bounds are cached.  :attr:`points` converts to
+    and from tuples for callers that want them; hot paths should use
+    :attr:`xy`, :attr:`bounds`, :meth:`set_bbox` and :meth:`set_point`
+    instead.  Assigning *points* accepts any sequence of pairs or an
+    ``(N, 2)`` array; for a bbox only the bounding rectangle is kept.
     """
 
-    class_id: int
-    class_name: str
-    label_type: str  # "bbox", "polygon", or "mask"
-    points: list[tuple[float, float]] = field(default_factory=list)
-    color: str = "#00FF00"
-    mask_data: Optional[np.ndarray] = None
+    __slots__ = (
+        "class_id", "class_name", "label_type", "color", "mask_data",
+        "_xy", "_bounds",
+    )
+
+    def __init__(
+        self,
+        class_id: int,
+        class_name: str,
+        label_type: str,  # "bbox", "polygon", or "mask"
+        points=None,
+        color: str = "#00FF00",
+        mask_data: Optional[np.ndarray] = None,
+    ) -> None:
+        self.class_id = class_id
+        self.class_name = class_name
+        self.label_type = label_type
+        self.color = color
+        self.mask_data = mask_data
+        self.points = points if points is not None else ()
+
+    # -- Geometry ------------------------------------------------------------
+
+    @property
+    def xy(self) -> np.ndarray:
+        """Read-only ``(N, 2)`` float32 vertices (a bbox yields its 4 corners)."""
+        if self.label_type == "bbox" and self._bounds is not None:
+            x1, y1, x2, y2 = self._bounds
+            corners = np.array(
+                [[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.float32
+            )
+            corners.setflags(write=False)
+            return corners
+        view = self._xy.view()
+        view.setflags(write=False)
+        return view
+
+    @property
+    def xyxy(self) -> Optional[tuple[float, float, float, float]]:
+        """Alias of :attr:`bounds`; for a bbox this is its stored form."""
+        return self.bounds
+
+    @property
+    def bounds(self) -> Optional[tuple[float, float, float, float]]:
+        """``(x1, y1, x2, y2)`` of the vertices, ``None`` without points."""
+        if self._bounds is None and len(self._xy):
+            x1, y1 = self._xy.min(axis=0).tolist()
+            x2, y2 = self._xy.max(axis=0).tolist()
+            self._bounds = (x1, y1, x2, y2)
+        return self._bounds
+
+    @property
+    def num_points(self) -> int:
+        """Number of vertices (4 for a bbox with geometry)."""
+        if self.label_type == "bbox":
+            return 4 if self._bounds is not None else 0
+        return len(self._xy)
+
+    @property
+    def points(self) -> list[tuple[float, float]]:
+        if self.label_type == "bbox":
+            if self._bounds is None:
+                return []
+            x1, y1, x2, y2 = self._bounds
+            return [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+        return [(x, y) for x, y in self._xy.tolist()]
+
+    @points.setter
+    def points(self, points) -> None:
+        self._xy, self._bounds = _NO_POINTS, None
+        if len(points) == 0:
+            return
+        if self.label_type == "bbox":
+            if isinstance(points, np.ndarray):
+                points = points.reshape(-1, 2).tolist()
+            xs, ys = zip(*points)
+            self._bounds = (
+                float(min(xs)), float(min(ys)), float(max(xs)), float(max(ys))
+            )
+        else:
+            self._xy = np.array(points, dtype=np.float32).reshape(-1, 2)
+
+    def set_bbox(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        """Set a bbox from two opposite corners (normalized to min/max)."""
+        self._bounds = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+    def set_point(self, index: int, x: float, y: float) -> None:
+        """Move one polygon vertex in place."""
+        if self.label_type == "bbox" or self._xy is _NO_POINTS:
+            raise ValueError("set_point() needs a polygon with vertices")
+        self._xy[index] = (x, y)
+        self._bounds = None
+
+    # -- Object protocol -----------------------------------------------------
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LabelItem):
+            return NotImplemented
+        if (self.class_id, self.class_name, self.label_type, self.color) != (
+            other.class_id, other.class_name, other.label_type, other.color
+        ):
+            return False
+        if self._bounds != other._bounds and self.label_type == "bbox":
+            return False
+        if not np.array_equal(self._xy, other._xy):
+            return False
+        if self.mask_data is None or other.mask_data is None:
+            return self.mask_data is other.mask_data
+        return self.mask_data is other.mask_data or np.array_equal(
+            self.mask_data, other.mask_data
+        )
+
+    __hash__ = None  # mutable
+
+    def __repr__(self) -> str:
+        return (
+            f"LabelItem(class_id={self.class_id!r}, class_name={self.class_name!r}, "
+            f"label_type={self.label_type!r}, points={self.points!r}, "
+            f"color={self.color!r}, mask_data="
+            f"{'None' if self.mask_data is None else f'<{self.mask_data.shape}>'})"
+        )
 
     def copy(self) -> LabelItem:
         """Return a deep copy of this label item."""
-        mask_copy = self.mask_data.copy() if self.mask_data is not None else None
-        return LabelItem(
-            class_id=self.class_id,
-            class_name=self.class_name,
-            label_type=self.label_type,
-            points=list(self.points),
-            color=self.color,
-            mask_data=mask_copy,
-        )
+        item = LabelItem.__new__(LabelItem)
+        item.class_id = self.class_id
+        item.class_name = self.class_name
+        item.label_type = self.label_type
+        item.color = self.color
+        item.mask_data = self.mask_data.copy() if self.mask_data is not None else None
+        item._xy = self._xy if self._xy is _NO_POINTS else self._xy.copy()
+        item._bounds = self._bounds
+        return item
 
 
 # ---------------------------------------------------------------------------
@@ -71,13 +198,13 @@ class AddLabelCommand(QUndoCommand):
     def redo(self) -> None:
         labels = self._manager._labels.setdefault(self._image_path, [])
         labels.append(self._label)
-        self._manager.labels_changed.emit(self._image_path)
+        self._manager._notify(self._image_path)
 
     def undo(self) -> None:
         labels = self._manager._labels.get(self._image_path, [])
         if self._label in labels:
             labels.remove(self._label)
-        self._manager.labels_changed.emit(self._image_path)
+        self._manager._notify(self._image_path)
 
 
 class RemoveLabelCommand(QUndoCommand):
@@ -101,13 +228,13 @@ class RemoveLabelCommand(QUndoCommand):
         labels = self._manager._labels.get(self._image_path, [])
         if 0 <= self._label_index < len(labels):
             self._label = labels.pop(self._label_index)
-        self._manager.labels_changed.emit(self._image_path)
+        self._manager._notify(self._image_path)
 
     def undo(self) -> None:
         if self._label is not None:
             labels = self._manager._labels.setdefault(self._image_path, [])
             labels.insert(self._label_index, self._label)
-        self._manager.labels_changed.emit(self._image_path)
+        self._manager._notify(self._image_path)
 
 
 class UpdateLabelCommand(QUndoCommand):
@@ -134,14 +261,68 @@ class UpdateLabelCommand(QUndoCommand):
         if 0 <= self._label_index < len(labels):
             self._old_label = labels[self._label_index].copy()
             labels[self._label_index] = self._new_label
-        self._manager.labels_changed.emit(self._image_path)
+        self._manager._notify(self._image_path)
 
     def undo(self) -> None:
         if self._old_label is not None:
             labels = self._manager._labels.get(self._image_path, [])
             if 0 <= self._label_index < len(labels):
                 labels[self._label_index] = self._old_label
-        self._manager.labels_changed.emit(self._image_path)
+        self._manager._notify(self._image_path)
+
+
+class AddLabelsBatchCommand(QUndoCommand):
+    """Undoable command that appends labels to several images at once.
+
+    ``labels_changed`` is emitted once per touched image instead of once per
+    label.  Batches pushed with the same non-``None`` *merge_key* merge into
+    a single undo step (e.g. all results of one auto-label run).
+    """
+
+    MERGE_ID = 1001
+
+    def __init__(
+        self,
+        manager: LabelManager,
+        batch: dict[str, list[LabelItem]],
+        merge_key: Optional[object] = None,
+        parent: Optional[QUndoCommand] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._manager = manager
+        self._batch = {path: list(labels) for path, labels in batch.items() if labels}
+        self._merge_key = merge_key
+        self._update_text()
+
+    def _update_text(self) -> None:
+        count = sum(len(labels) for labels in self._batch.values())
+        self.setText(f"Add {count} labels to {len(self._batch)} images")
+
+    def id(self) -> int:
+        return self.MERGE_ID if self._merge_key is not None else -1
+
+    def mergeWith(self, other: QUndoCommand) -> bool:
+        if not isinstance(other, AddLabelsBatchCommand) or other._merge_key != self._merge_key:
+            return False
+        for path, labels in other._batch.items():
+            self._batch.setdefault(path, []).extend(labels)
+        self._update_text()
+        return True
+
+    def redo(self) -> None:
+        for path, added in self._batch.items():
+            self._manager._labels.setdefault(path, []).extend(added)
+        for path in self._batch:
+            self._manager._notify(path)
+
+    def undo(self) -> None:
+        for path, added in self._batch.items():
+            labels = self._manager._labels.get(path)
+            if labels:
+                added_ids = {id(label) for label in added}
+                labels[:] = [label for label in labels if id(label) not in added_ids]
+        for path in self._batch:
+            self._manager._notify(path)
 
 
 class ClearLabelsCommand(QUndoCommand):
@@ -165,11 +346,65 @@ class ClearLabelsCommand(QUndoCommand):
         # the original objects are later mutated (e.g. mask_data in-place).
         self._old_labels = [l.copy() for l in labels]
         labels.clear()
-        self._manager.labels_changed.emit(self._image_path)
+        self._manager._notify(self._image_path)
 
     def undo(self) -> None:
         self._manager._labels[self._image_path] = [l.copy() for l in self._old_labels]
-        self._manager.labels_changed.emit(self._image_path)
+        self._manager._notify(self._image_path)
+
+
+# ---------------------------------------------------------------------------
+# Read-only views
+# ---------------------------------------------------------------------------
+
+class LabelsView(Sequence):
+    """Read-only, non-copying view of one image's labels.
+
+    The view reads the manager's internal list, so creating it is O(1).
+    ``version`` is the image's version when the view was taken; once the
+    labels change, :attr:`is_stale` becomes true and the view shows the new
+    contents.  Take :meth:`snapshot` to keep a stable copy.  The
+    :class:`LabelItem` objects are shared and must not be mutated.
+    """
+
+    __slots__ = ("_manager", "_image_path", "version")
+
+    def __init__(self, manager: LabelManager, image_path: str) -> None:
+        self._manager = manager
+        self._image_path = image_path
+        self.version = manager.version(image_path)
+
+    @property
+    def _items(self) -> Sequence[LabelItem]:
+        return self._manager._labels.get(self._image_path, ())
+
+    @property
+    def is_stale(self) -> bool:
+        return self.version != self._manager.version(self._image_path)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @overload
+    def __getitem__(self, index: int) -> LabelItem: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> tuple[LabelItem, ...]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._items[index])
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[LabelItem]:
+        return iter(self._items)
+
+    def __repr__(self) -> str:
+        return f"LabelsView({self._image_path!r}, {len(self)} labels, v{self.version})"
+
+    def snapshot(self) -> tuple[LabelItem, ...]:
+        """Immutable copy of the label sequence (items are shared)."""
+        return tuple(self._items)
 
 
 # ---------------------------------------------------------------------------
@@ -188,6 +423,7 @@ class LabelManager(QObject):
     def __init__(self, parent: Optional[QObject] = None) -> None:
         super().__init__(parent)
         self._labels: dict[str, list[LabelItem]] = {}
+        self._versions: dict[str, int] = {}  # bumped on every change of an image
         self._undo_stack = QUndoStack(self)
 
     # -- Public properties ---------------------------------------------------
@@ -197,15 +433,36 @@ class LabelManager(QObject):
         """Expose the undo stack for external binding (e.g. undo/redo actions)."""
         return self._undo_stack
 
+    def _notify(self, image_path: str) -> None:
+        """Bump the image's version and emit ``labels_changed``."""
+        self._versions[image_path] = self._versions.get(image_path, 0) + 1
+        self.labels_changed.emit(image_path)
+
     # -- Query methods -------------------------------------------------------
 
     def get_labels(self, image_path: str) -> list[LabelItem]:
         """Return a *copy* of the label list for the given image."""
         return list(self._labels.get(image_path, []))
 
-    def get_labels_ref(self, image_path: str) -> list[LabelItem]:
-        """Return a direct reference to the internal label list (use with care)."""
-        return self._labels.setdefault(image_path, [])
+    def view(self, image_path: str) -> LabelsView:
+        """Return a read-only, non-copying view of the image's labels."""
+        return LabelsView(self, image_path)
+
+    def version(self, image_path: str) -> int:
+        """Change counter of an image; equal values mean identical labels.
+
+        Starts at 0 and increases with every mutation (including undo/redo,
+        :meth:`set_labels` and :meth:`remove_image`).
+        """
+        return self._versions.get(image_path, 0)
+
+    def has_labels(self, image_path: str) -> bool:
+        """True if the image has at least one label in memory."""
+        return bool(self._labels.get(image_path))
+
+    def count_by_type(self, image_path: str) -> dict[str, int]:
+        """Number of labels per ``label_type`` (only types that occur)."""
+        return dict(Counter(label.label_type for label in self._labels.get(image_path, ())))
 
     def label_count(self, image_path: str) -> int:
         """Return the number of labels for an image."""
@@ -218,6 +475,21 @@ class LabelManager(QObject):
         cmd = AddLabelCommand(self, image_path, label)
         self._undo_stack.push(cmd)
 
+    def add_labels_batch(
+        self,
+        batch: dict[str, list[LabelItem]],
+        merge_key: Optional[object] = None,
+    ) -> None:
+        """Append labels to several images as one undoable command.
+
+        Args:
+            batch: ``{image_path: labels_to_append}``.
+            merge_key: Consecutive batches with the same key are undone
+                together; ``None`` makes this batch its own undo step.
+        """
+        if any(batch.values()):
+            self._undo_stack.push(AddLabelsBatchCommand(self, batch, merge_key))
+
     def remove_label(self, image_path: str, label_index: int) -> None:
         """Remove a label by index from the given image (undoable)."""
         cmd = RemoveLabelCommand(self, image_path, label_index)
@@ -243,8 +515,9 @@ class LabelManager(QObject):
         Use this when loading labels from files, not for user edits.
         """
         self._labels[image_path] = list(labels)
-        self.labels_changed.emit(image_path)
+        self._notify(image_path)
 
     def remove_image(self, image_path: str) -> None:
         """Remove all label data for an image path entirely."""
         self._labels.pop(image_path, None)
+        self._versions[image_path] = self._versions.get(image_path, 0) + 1
@@ -0,0 +1,241 @@
+"""Packed GT mask storage: one file per image instead of one per class.
+
+The classic layout writes ``gt_image/<class>/<stem>.png`` for every mask
+class of an image, plus a blank PNG in every other class folder so class
+counts line up.  The packed layout stores all classes of an image as bits of
+a single PNG under ``gt_packed/``:
+
+* bit *i* of the pixel value belongs to the *i*-th class listed for the image
+  in ``gt_packed/manifest.json``;
+* up to 8 classes fit an 8-bit grayscale PNG, up to 16 a 16-bit one, and up
+  to 64 a 16-bit 4-channel one; more classes spill into further files;
+* classes without pixels are not stored at all -- the manifest lists the
+  project's mask classes once, so every other class is implicitly empty.
+
+Masks may overlap, which an indexed (one class per pixel) image could not
+represent.  :class:`PackedMaskStore` keeps the manifest in memory and writes
+it atomically (tmp file + ``os.replace``).  ``cv2`` is imported on first
+read or write so that :class:`~core.project_manager.ProjectManager` can own a
+store without slowing down startup.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PACKED_DIR: str = "gt_packed"
+MANIFEST_NAME: str = "manifest.json"
+_MANIFEST_VERSION: int = 1
+
+# Storage layouts selectable per project (see AppConfig.gt_mask_layout).
+LAYOUT_FOLDERS: str = "folders"
+LAYOUT_PACKED: str = "packed"
+
+_BITS_PER_CHANNEL: int = 16
+_MAX_CHANNELS: int = 4
+_CLASSES_PER_FILE: int = _BITS_PER_CHANNEL * _MAX_CHANNELS
+
+
+def pack_masks(masks: list[np.ndarray]) -> np.ndarray:
+    """Pack up to 64 equally sized binary masks into one PNG-writable image."""
+    count = len(masks)
+    if not 0 < count <= _CLASSES_PER_FILE:
+        raise ValueError(f"cannot pack {count} masks into one image")
+    h, w = masks[0].shape[:2]
+    if count <= 8:
+        packed = np.zeros((h, w), dtype=np.uint8)
+        for bit, mask in enumerate(masks):
+            packed |= (mask > 0).astype(np.uint8) << bit
+        return packed
+
+    channels = -(-count // _BITS_PER_CHANNEL)
+    if channels == 2:
+        channels = 3  # PNG has no 2-channel colour type in OpenCV
+    packed = np.zeros((h, w, channels), dtype=np.uint16)
+    for i, mask in enumerate(masks):
+        ch, bit = divmod(i, _BITS_PER_CHANNEL)
+        packed[:, :, ch] |= (mask > 0).astype(np.uint16) << bit
+    return packed if channels > 1 else packed[:, :, 0]
+
+
+def unpack_masks(packed: np.ndarray, count: int) -> list[np.ndarray]:
+    """Inverse of :func:`pack_masks`; returns *count* 0/255 uint8 masks."""
+    if packed.ndim == 2:
+        packed = packed[:, :, None]
+    masks = []
+    for i in range(count):
+        ch, bit = divmod(i, _BITS_PER_CHANNEL)
+        plane = (packed[:, :, ch] >> bit) & 1
+        masks.append(plane.astype(np.uint8) * 255)
+    return masks
+
+
+class PackedMaskStore:
+    """Reads and writes the packed masks of one project folder.
+
+    Parameters
+    ----------
+    root:
+        The ``gt_packed/`` directory.  It is created on first write.
+
+    A manifest that cannot be read (or has an unknown version) makes the
+    store read-only: reads see no masks and :meth:`write` / :meth:`discard`
+    raise :class:`OSError`, so the next save cannot overwrite the manifest
+    and lose the masks of every other image.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self._root = Path(root)
+        self._classes: list[str] = []
+        self._images: dict[str, dict] = {}
+        self._loaded = False
+        self._load_error: Optional[str] = None  # why the manifest is not writable
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    # -- Queries ---------------------------------------------------------------
+
+    def class_names(self) -> list[str]:
+        """Every mask class that has been stored in this project."""
+        self._ensure_loaded()
+        return list(self._classes)
+
+    def classes_for(self, stem: str) -> list[str]:
+        """Classes with a non-empty mask for *stem*."""
+        self._ensure_loaded()
+        return list(self._images.get(stem, {}).get("classes", []))
+
+    def has(self, stem: str) -> bool:
+        return bool(self.classes_for(stem))
+
+    def read(self, stem: str) -> dict[str, np.ndarray]:
+        """Return ``{class_name: 0/255 mask}`` at the stored resolution."""
+        self._ensure_loaded()
+        entry = self._images.get(stem)
+        if not entry:
+            return {}
+        import cv2
+
+        classes = entry["classes"]
+        result: dict[str, np.ndarray] = {}
+        for i, name in enumerate(entry["files"]):
+            chunk = classes[i * _CLASSES_PER_FILE:(i + 1) * _CLASSES_PER_FILE]
+            packed = cv2.imread(str(self._root / name), cv2.IMREAD_UNCHANGED)
+            if packed is None:
+                logger.warning("Cannot read packed mask %s", self._root / name)
+                continue
+            result.update(zip(chunk, unpack_masks(packed, len(chunk))))
+        return result
+
+    # -- Updates ---------------------------------------------------------------
+
+    def write(self, stem: str, masks: dict[str, np.ndarray], flush: bool = True) -> None:
+        """Store the masks of *stem*, replacing what was stored before.
+
+        Blank masks are dropped.  With ``flush=False`` the manifest is only
+        written by a later :meth:`flush` (used for bulk saves).
+        """
+        self._ensure_writable()
+        names = [n for n, m in masks.items() if m is not None and m.any()]
+        for name in masks:
+            if name not in self._classes:
+                self._classes.append(name)
+
+        old_files = set(self._images.get(stem, {}).get("files", []))
+        if not names:
+            self._images.pop(stem, None)
+            files: list[str] = []
+        else:
+            import cv2
+
+            self._root.mkdir(parents=True, exist_ok=True)
+            files = []
+            for i in range(0, len(names), _CLASSES_PER_FILE):
+                chunk = names[i:i + _CLASSES_PER_FILE]
+                fname = f"{stem}.png" if i == 0 else f"{stem}.{i // _CLASSES_PER_FILE}.png"
+                path = self._root / fname
+                if not cv2.imwrite(str(path), pack_masks([masks[n] for n in chunk])):
+                    raise OSError(f"Cannot write packed mask {path}")
+                files.append(fname)
+            h, w = masks[names[0]].shape[:2]
+            self._images[stem] = {"classes": names, "files": files, "size": [w, h]}
+
+        for fname in old_files - set(files):
+            (self._root / fname).unlink(missing_ok=True)
+        if flush:
+            self.flush()
+
+    def discard(self, stem: str, flush: bool = True) -> bool:
+        """Delete the packed masks of *stem*; return ``True`` if any existed.
+
+        A stem without packed masks is a no-op, also for a read-only store,
+        so projects with the folder layout are not affected by a broken
+        manifest.
+        """
+        self._ensure_loaded()
+        if stem not in self._images:
+            return False
+        self._ensure_writable()
+        entry = self._images.pop(stem)
+        for fname in entry["files"]:
+            (self._root / fname).unlink(missing_ok=True)
+        if flush:
+            self.flush()
+        return True
+
+    def flush(self) -> None:
+        """Write the manifest atomically."""
+        if not self._loaded or self._load_error or not self._root.is_dir():
+            return
+        path = self._root / MANIFEST_NAME
+        tmp = path.with_suffix(".tmp")
+        data = {"version": _MANIFEST_VERSION, "classes": self._classes, "images": self._images}
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def invalidate(self) -> None:
+        self._classes = []
+        self._images = {}
+        self._loaded = False
+        self._load_error = None
+
+    # -- Internal helpers ------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self._root / MANIFEST_NAME, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            self._load_error = f"cannot read {self._root / MANIFEST_NAME}: {exc}"
+            logger.warning("Packed masks are read-only, %s", self._load_error)
+            return
+        version = data.get("version") if isinstance(data, dict) else None
+        if version != _MANIFEST_VERSION:
+            self._load_error = (
+                f"unsupported version {version!r} of {self._root / MANIFEST_NAME}"
+            )
+            logger.warning("Packed masks are read-only, %s", self._load_error)
+            return
+        self._classes = list(data.get("classes", []))
+        self._images = dict(data.get("images", {}))
+
+    def _ensure_writable(self) -> None:
+        self._ensure_loaded()
+        if self._load_error:
+            raise OSError(f"Refusing to modify packed masks: {self._load_error}")
@@ -2,15 +2,108 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Optional
+import os
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Optional
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, QThread, Signal
 
 logger = logging.getLogger(__name__)
 
 # Default inference image size (width = height in pixels).
 DEFAULT_INFER_SIZE: int = 480
 
+# Default warm-pool limits (overridable per ModelManager instance).
+DEFAULT_POOL_SIZE: int = 3
+DEFAULT_POOL_MEMORY_MB: int = 4096
+
+
+# Progress callback used while loading: ``(percent, status_message)``.
+ProgressCallback = Callable[[int, str], None]
+
+
+class LoadCancelled(Exception):
+    """Raised inside :meth:`ModelManager.prepare_model` when loading is cancelled."""
+
+
+@dataclass
+class InferenceOptions:
+    """Per-run inference settings forwarded to :meth:`ModelManager.predict`.
+
+    Attributes:
+        half: Run YOLO / RT-DETR in FP16.  Ultralytics only honours this on
+            CUDA devices; CPU inference silently stays in FP32.
+        threads: Torch intra-op thread count (``torch.set_num_threads``).
+            ``0`` keeps the framework default.
+        max_det: Maximum number of detections kept per image after NMS.
+        classes: Class ids to keep.  Empty = all classes.  Filtering happens
+            inside NMS, so suppressed classes never reach post-processing.
+        boxes_only: Ignore mask outputs of segmentation models.  Mask
+            polygons (the expensive full-resolution contour extraction) are
+            then never computed.
+    """
+
+    half: bool = False
+    threads: int = 0
+    max_det: int = 300
+    classes: list[int] = field(default_factory=list)
+    boxes_only: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "InferenceOptions":
+        """Build options from a (possibly partial) ``AppConfig`` dict."""
+        if not data:
+            return cls()
+        known = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        opts = cls(**known)
+        opts.classes = sorted({int(c) for c in opts.classes})
+        return opts
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def cache_tag(self) -> str:
+        """Return a short key of the settings that change raw detections.
+
+        Default settings map to an empty string so existing result-cache
+        entries stay valid.  The thread count never changes results and is
+        therefore not part of the tag.
+        """
+        parts: list[str] = []
+        if self.half:
+            parts.append("fp16")
+        if self.max_det != 300:
+            parts.append(f"md{self.max_det}")
+        if self.classes:
+            parts.append("c" + "-".join(str(c) for c in self.classes))
+        if self.boxes_only:
+            parts.append("box")
+        return "_".join(parts)
+
+
+def _file_signature(path: str) -> Optional[tuple[int, int]]:
+    """``(st_mtime_ns, st_size)`` of *path*, or ``None`` if it cannot be read."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+@dataclass
+class LoadedModel:
+    """A loaded, warmed-up model kept in the :class:`ModelManager` pool."""
+
+    path: str
+    model: Any
+    model_type: str
+    keras_class_names: Optional[dict[int, str]]
+    size_bytes: int
+    # (st_mtime_ns, st_size) of the weights file when it was read; a pooled
+    # entry whose file changed since (e.g. retrained best.pt) is reloaded.
+    file_signature: Optional[tuple[int, int]] = None
+
 
 class ModelManager(QObject):
     """Loads and manages models for inference.
@@ -19,20 +112,55 @@ class ModelManager(QObject):
     - ``"YOLO"``    – loaded via ``ultralytics.YOLO``  (.pt files)
     - ``"RT-DETR"`` – loaded via ``ultralytics.RTDETR`` (.pt files)
     - ``"KERAS"``   – loaded via ``keras.models.load_model`` (.h5 files)
+
+    Loaded models are kept in a small warm pool so that switching back to a
+    recently used model is instant.  Every model is warmed up with a dummy
+    inference right after loading, and the least recently used model is
+    evicted once the pool exceeds ``max_models`` entries or
+    ``max_memory_mb`` of estimated weight memory.  The *active* model (the
+    one used by :meth:`predict`) is never evicted.
+
+    :meth:`load_model_async` performs the slow part of loading (framework
+    import, weight deserialisation, warm-up) on a :class:`ModelLoadWorker`
+    thread and only touches the pool on the GUI thread.
     """
 
     model_loaded = Signal(str)  # emitted with the model file path
+    model_evicted = Signal(str)  # emitted with the evicted model file path
+    load_started = Signal(str)  # emitted with the model file path
+    load_progress = Signal(int, str)  # percent, status message
+    load_failed = Signal(str, str)  # model file path, error message
+    load_cancelled = Signal(str)  # emitted with the model file path
 
     # Valid model type identifiers.
     VALID_MODEL_TYPES: set[str] = {"YOLO", "RT-DETR", "KERAS"}
 
-    def __init__(self, parent: Optional[QObject] = None) -> None:
+    def __init__(
+        self,
+        parent: Optional[QObject] = None,
+        max_models: int = DEFAULT_POOL_SIZE,
+        max_memory_mb: int = DEFAULT_POOL_MEMORY_MB,
+    ) -> None:
         super().__init__(parent)
         self._model: Any = None
         self._model_path: Optional[str] = None
         self._model_type: Optional[str] = None
         self._keras_class_names: Optional[dict[int, str]] = None
 
+        # path -> entry, least recently used first.
+        self._pool: OrderedDict[str, LoadedModel] = OrderedDict()
+        self._max_models = max(1, max_models)
+        self._max_memory_bytes = max(0, max_memory_mb) * 1024 * 1024
+
+        # Background loading state.
+        self._load_worker: Optional[ModelLoadWorker] = None
+        self._stale_workers: list[ModelLoadWorker] = []
+
+        # Default options for predict(); thread counts are process wide, so
+        # remember what was applied per framework to avoid redundant calls.
+        self._inference_options = InferenceOptions()
+        self._applied_threads: dict[str, int] = {}
+
     # -- Properties ----------------------------------------------------------
 
     @property
@@ -40,10 +168,43 @@ class ModelManager(QObject):
         """Return ``True`` if a model is currently loaded."""
         return self._model is not None
 
+    @property
+    def is_loading(self) -> bool:
+        """Return ``True`` while a background load is in progress."""
+        return self._load_worker is not None
+
+    @property
+    def inference_options(self) -> InferenceOptions:
+        """Options used by :meth:`predict` when none are passed explicitly."""
+        return self._inference_options
+
+    def set_inference_options(self, options: InferenceOptions) -> None:
+        """Replace the default inference options."""
+        self._inference_options = options
+
+    # -- Pool configuration --------------------------------------------------
+
+    def set_pool_limits(self, max_models: int, max_memory_mb: int) -> None:
+        """Change the warm-pool limits and evict models that no longer fit."""
+        self._max_models = max(1, max_models)
+        self._max_memory_bytes = max(0, max_memory_mb) * 1024 * 1024
+        self._evict_to_limits()
+
+    def loaded_model_paths(self) -> list[str]:
+        """Return the paths of all pooled models, most recently used first."""
+        return [entry.path for entry in reversed(self._pool.values())]
+
+    def is_model_cached(self, path: str) -> bool:
+        """Return ``True`` if the model at *path* is loaded in the pool."""
+        return self._fresh_entry(path) is not None
+
     # -- Public methods ------------------------------------------------------
 
     def load_model(self, path: str, model_type: str) -> bool:
-        """Load a model from *path*.
+        """Load a model from *path* and make it the active model.
+
+        If the model is already in the warm pool with the same type and its
+        file has not changed since, it is activated without loading it again.
 
         Args:
             path: Filesystem path to the model weights file (``.pt`` or ``.h5``).
@@ -56,41 +217,164 @@ class ModelManager(QObject):
             logger.error("Unsupported model type: %s", model_type)
             return False
 
+        entry = self._fresh_entry(path)
+        if entry is not None and entry.model_type == model_type:
+            return self.set_active_model(path)
+
+        entry = self.prepare_model(path, model_type)
+        if entry is None:
+            return False
+        self.adopt_model(entry)
+        return True
+
+    def load_model_async(self, path: str, model_type: str) -> bool:
+        """Load a model on a background thread without blocking the GUI.
+
+        Pooled models whose file is unchanged are activated immediately.  Otherwise a
+        :class:`ModelLoadWorker` is started and progress is reported through
+        :attr:`load_progress`; :attr:`model_loaded`, :attr:`load_failed` or
+        :attr:`load_cancelled` is emitted once it ends.  A load that is
+        still running is cancelled first.
+
+        Returns:
+            ``False`` if *model_type* is invalid, ``True`` otherwise.
+        """
+        if model_type not in self.VALID_MODEL_TYPES:
+            logger.error("Unsupported model type: %s", model_type)
+            return False
+
+        entry = self._fresh_entry(path)
+        if entry is not None and entry.model_type == model_type:
+            self.cancel_loading()
+            return self.set_active_model(path)
+
+        self.cancel_loading()
+        worker = ModelLoadWorker(self, path, model_type)
+        worker.status.connect(self._on_worker_status)
+        worker.loaded.connect(self._on_worker_loaded)
+        worker.failed.connect(self._on_worker_failed)
+        worker.finished.connect(self._on_worker_finished)
+        self._load_worker = worker
+        self.load_started.emit(path)
+        worker.start()
+        return True
+
+    def cancel_loading(self) -> None:
+        """Cancel the running background load, if any.
+
+        Weight deserialisation cannot be interrupted, so the worker finishes
+        its current step in the background and its result is discarded.
+        """
+        worker = self._load_worker
+        if worker is None:
+            return
+        worker.cancel()
+        self._load_worker = None
+        self._stale_workers.append(worker)
+        self.load_cancelled.emit(worker.path)
+
+    def shutdown(self, timeout_ms: int = 3000) -> None:
+        """Cancel background loading and wait for loader threads to exit."""
+        self.cancel_loading()
+        for worker in list(self._stale_workers):
+            worker.wait(timeout_ms)
+
+    def prepare_model(
+        self,
+        path: str,
+        model_type: str,
+        progress: Optional[ProgressCallback] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Optional[LoadedModel]:
+        """Construct and warm up a model without touching the pool.
+
+        Safe to call from a worker thread.  Pass the result to
+        :meth:`adopt_model` on the GUI thread.
+
+        Args:
+            path: Filesystem path to the model weights file.
+            model_type: One of ``"YOLO"``, ``"RT-DETR"``, or ``"KERAS"``.
+            progress: Optional ``(percent, message)`` callback.
+            is_cancelled: Optional callable polled between loading steps.
+
+        Returns:
+            The loaded model, or ``None`` on failure.
+
+        Raises:
+            LoadCancelled: If *is_cancelled* returned ``True``.
+        """
+        def step(percent: int, message: str) -> None:
+            if is_cancelled is not None and is_cancelled():
+                raise LoadCancelled(path)
+            if progress is not None:
+                progress(percent, message)
+
+        name = os.path.basename(path)
+        keras_class_names: Optional[dict[int, str]] = None
+        # Taken before reading, so a file replaced mid-load counts as changed.
+        signature = _file_signature(path)
         try:
-            if model_type == "YOLO":
-                from ultralytics import YOLO
-                self._model = YOLO(path)
-            elif model_type == "RT-DETR":
-                from ultralytics import RTDETR
-                self._model = RTDETR(path)
-            elif model_type == "KERAS":
+            if model_type in ("YOLO", "RT-DETR"):
+                step(5, "Importing ultralytics...")
+                from ultralytics import RTDETR, YOLO
+                step(30, f"Reading weights: {name}")
+                model = YOLO(path) if model_type == "YOLO" else RTDETR(path)
+            else:
+                step(5, "Importing TensorFlow/Keras...")
                 try:
                     from keras.models import load_model
-                    self._model = load_model(path, compile=False)
-                    num_classes = (
-                        self._model.output_shape[-1]
-                        if hasattr(self._model, "output_shape")
-                        else 1
-                    )
-                    self._keras_class_names = {
-                        i: f"class_{i}" for i in range(num_classes)
-                    }
                 except ImportError:
                     logger.error("TensorFlow/Keras not installed. Cannot load .h5 model.")
-                    return False
-
-            self._model_path = path
-            self._model_type = model_type
-            logger.info("Loaded %s model from %s", model_type, path)
-            self.model_loaded.emit(path)
-            return True
-
+                    return None
+                step(30, f"Reading weights: {name}")
+                model = load_model(path, compile=False)
+                num_classes = (
+                    model.output_shape[-1]
+                    if hasattr(model, "output_shape")
+                    else 1
+                )
+                keras_class_names = {i: f"class_{i}" for i in range(num_classes)}
+        except LoadCancelled:
+            raise
         except Exception as exc:
             logger.exception("Failed to load model from %s: %s", path, exc)
-            self._model = None
-            self._model_path = None
-            self._model_type = None
+            return None
+
+        step(70, f"Warming up: {name}")
+        self._warm_up(model, model_type)
+        step(100, f"Ready: {name}")
+        return LoadedModel(
+            path=path,
+            model=model,
+            model_type=model_type,
+            keras_class_names=keras_class_names,
+            size_bytes=self._estimate_size(model, model_type, path),
+            file_signature=signature,
+        )
+
+    def adopt_model(self, entry: LoadedModel) -> None:
+        """Add a prepared model to the pool and make it the active model."""
+        self._pool[self._pool_key(entry.path)] = entry
+        self._activate(entry)
+        self._evict_to_limits()
+        logger.info("Loaded %s model from %s", entry.model_type, entry.path)
+        self.model_loaded.emit(entry.path)
+
+    def set_active_model(self, path: str) -> bool:
+        """Switch the active model to an already pooled model.
+
+        Returns:
+            ``True`` on success, ``False`` if *path* is not in the pool.
+        """
+        key = self._pool_key(path)
+        entry = self._pool.get(key)
+        if entry is None:
             return False
+        self._pool.move_to_end(key)
+        self._activate(entry)
+        logger.info("Activated pooled %s model %s", entry.model_type, entry.path)
+        self.model_loaded.emit(entry.path)
+        return True
 
     def get_model(self) -> Any:
         """Return the underlying model object, or ``None``."""
@@ -106,9 +390,10 @@ class ModelManager(QObject):
 
     def predict(
         self,
-        image_path: str,
+        image_path: Any,
         confidence: float = 0.25,
         infer_size: int = DEFAULT_INFER_SIZE,
+        options: Optional[InferenceOptions] = None,
     ) -> Any:
         """Run inference on a single image.
 
@@ -123,13 +408,17 @@ class ModelManager(QObject):
         mask predictions back to the original resolution.
 
         Args:
-            image_path: Path to the image file.
+            image_path: Path to the image file, or the already decoded BGR
+                        ``numpy`` array.
             confidence: Minimum confidence threshold passed to the model (NMS
                         threshold for YOLO / RT-DETR; per-pixel threshold for
                         Keras segmentation outputs).
             infer_size: Side length (px) used for YOLO / RT-DETR inference.
                         Images are letterboxed to this square before inference,
                         then coordinates are back-projected. Default is 480.
+            options: Precision, thread and filter settings.  ``None`` uses
+                     :attr:`inference_options`.  Only the thread count
+                     applies to Keras models.
 
         Returns:
             Ultralytics ``Results`` list for YOLO / RT-DETR, a ``dict`` for
@@ -139,7 +428,11 @@ class ModelManager(QObject):
             logger.warning("predict() called but no model is loaded.")
             return None
 
+        opts = options if options is not None else self._inference_options
+
         try:
+            self._apply_threads(opts.threads)
+
             if self._model_type in ("YOLO", "RT-DETR"):
                 # imgsz=infer_size → Ultralytics letter-boxes the input and
                 # automatically scales output coordinates back to orig image space.
@@ -147,6 +440,9 @@ class ModelManager(QObject):
                     source=image_path,
                     conf=confidence,
                     imgsz=infer_size,
+                    half=opts.half,
+                    max_det=opts.max_det,
+                    classes=opts.classes or None,
                     verbose=False,
                 )
                 return results
@@ -155,7 +451,7 @@ class ModelManager(QObject):
                 import cv2
                 import numpy as np
 
-                img = cv2.imread(image_path)
+                img = cv2.imread(image_path) if isinstance(image_path, str) else image_path
                 if img is None:
                     return None
 
@@ -186,7 +482,44 @@ class ModelManager(QObject):
                 return None
 
         except Exception as exc:
-            logger.exception("Prediction failed for %s: %s", image_path, exc)
+            source = image_path if isinstance(image_path, str) else "<array>"
+            logger.exception("Prediction failed for %s: %s", source, exc)
+            return None
+
+    def predict_batch(
+        self,
+        images: list[Any],
+        confidence: float = 0.25,
+        infer_size: int = DEFAULT_INFER_SIZE,
+        options: Optional[InferenceOptions] = None,
+    ) -> Optional[list[Any]]:
+        """Run YOLO / RT-DETR inference on several images in one forward pass.
+
+        Args:
+            images: Image paths or BGR ``numpy`` arrays.
+            confidence, infer_size, options: As for :meth:`predict`.
+
+        Returns:
+            One Ultralytics ``Results`` per image, or ``None`` on failure or
+            for Keras models.
+        """
+        if self._model is None or self._model_type not in ("YOLO", "RT-DETR"):
+            return None
+
+        opts = options if options is not None else self._inference_options
+        try:
+            self._apply_threads(opts.threads)
+            return self._model.predict(
+                source=list(images),
+                conf=confidence,
+                imgsz=infer_size,
+                half=opts.half,
+                max_det=opts.max_det,
+                classes=opts.classes or None,
+                verbose=False,
+            )
+        except Exception as exc:
+            logger.exception("Batch prediction failed: %s", exc)
             return None
 
     def get_class_names(self) -> dict[int, str]:
@@ -206,9 +539,194 @@ class ModelManager(QObject):
             return {}
 
     def unload(self) -> None:
-        """Unload the current model and free resources."""
+        """Unload the current model and free resources.
+
+        Other pooled models stay loaded; use :meth:`clear_pool` to drop
+        everything.
+        """
+        if self._model_path is not None:
+            self._pool.pop(self._pool_key(self._model_path), None)
         self._model = None
         self._model_path = None
         self._model_type = None
         self._keras_class_names = None
         logger.info("Model unloaded.")
+
+    def clear_pool(self) -> None:
+        """Unload every pooled model, including the active one."""
+        self.unload()
+        self._pool.clear()
+
+    # -- Internal helpers ----------------------------------------------------
+
+    @staticmethod
+    def _pool_key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def _fresh_entry(self, path: str) -> Optional[LoadedModel]:
+        """The pooled entry of *path*, unless its file changed since loading."""
+        entry = self._pool.get(self._pool_key(path))
+        if entry is None:
+            return None
+        if entry.file_signature != _file_signature(path):
+            logger.info("Model file changed since it was pooled: %s", path)
+            return None
+        return entry
+
+    def _activate(self, entry: LoadedModel) -> None:
+        self._model = entry.model
+        self._model_path = entry.path
+        self._model_type = entry.model_type
+        self._keras_class_names = entry.keras_class_names
+
+    def _apply_threads(self, threads: int) -> None:
+        """Set the torch / TensorFlow intra-op thread count if it changed."""
+        framework = "keras" if self._model_type == "KERAS" else "torch"
+        if threads <= 0 or self._applied_threads.get(framework) == threads:
+            return
+        if framework == "torch":
+            import torch
+
+            torch.set_num_threads(threads)
+        else:
+            import tensorflow as tf
+
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(threads)
+            except RuntimeError:
+                # TensorFlow only accepts this before its runtime starts.
+                logger.info("TensorFlow thread count is fixed once initialised.")
+        self._applied_threads[framework] = threads
+
+    @staticmethod
+    def _warm_up(model: Any, model_type: str) -> None:
+        """Run one dummy inference so the first real call is not slow.
+
+        The first Ultralytics call fuses layers and sets up the predictor;
+        the first Keras call traces the graph.  Failures are only logged.
+        """
+        import numpy as np
+
+        try:
+            if model_type in ("YOLO", "RT-DETR"):
+                dummy = np.zeros((DEFAULT_INFER_SIZE, DEFAULT_INFER_SIZE, 3), dtype=np.uint8)
+                model.predict(source=dummy, imgsz=DEFAULT_INFER_SIZE, verbose=False)
+            else:
+                input_shape = getattr(model, "input_shape", None)
+                if input_shape and len(input_shape) >= 3:
+                    shape = [1] + [d or DEFAULT_INFER_SIZE for d in input_shape[1:]]
+                    model.predict(np.zeros(shape, dtype=np.float32), verbose=0)
+        except Exception as exc:
+            logger.warning("Model warm-up failed (%s); continuing without it.", exc)
+
+    @staticmethod
+    def _estimate_size(model: Any, model_type: str, path: str) -> int:
+        """Estimate the memory held by a model's weights in bytes."""
+        try:
+            if model_type in ("YOLO", "RT-DETR"):
+                return sum(
+                    p.numel() * p.element_size() for p in model.model.parameters()
+                )
+            return int(model.count_params()) * 4
+        except Exception:
+            try:
+                return os.path.getsize(path)
+            except OSError:
+                return 0
+
+    def _evict_to_limits(self) -> None:
+        """Drop least recently used models until the pool fits its limits."""
+        def over_limits() -> bool:
+            if len(self._pool) > self._max_models:
+                return True
+            if self._max_memory_bytes:
+                used = sum(e.size_bytes for e in self._pool.values())
+                return used > self._max_memory_bytes
+            return False
+
+        active_key = self._pool_key(self._model_path) if self._model_path else None
+        while len(self._pool) > 1 and over_limits():
+            victim = next(k for k in self._pool if k != active_key)
+            entry = self._pool.pop(victim)
+            logger.info("Evicted model %s from pool", entry.path)
+            self.model_evicted.emit(entry.path)
+
+    def _on_worker_status(self, percent: int, message: str) -> None:
+        if self.sender() is self._load_worker:
+            self.load_progress.emit(percent, message)
+
+    def _on_worker_loaded(self, entry: LoadedModel) -> None:
+        if self.sender() is self._load_worker:
+            self.adopt_model(entry)
+
+    def _on_worker_failed(self, message: str) -> None:
+        worker = self.sender()
+        if worker is self._load_worker:
+            self.load_failed.emit(worker.path, message)
+
+    def _on_worker_finished(self) -> None:
+        worker = self.sender()
+        if worker is self._load_worker:
+            self._load_worker = None
+        elif worker in self._stale_workers:
+            self._stale_workers.remove(worker)
+        worker.deleteLater()
+
+
+class ModelLoadWorker(QThread):
+    """Background worker that constructs and warms up a single model.
+
+    The worker only builds a :class:`LoadedModel`; adding it to the pool
+    happens in :class:`ModelManager` on the GUI thread.
+
+    Signals:
+        status(int, str): ``(percent, message)`` while loading.
+        loaded(object): The :class:`LoadedModel` on success.
+        failed(str): Error message when loading fails.
+    """
+
+    status = Signal(int, str)
+    loaded = Signal(object)
+    failed = Signal(str)
+
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        path: str,
+        model_type: str,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._model_manager = model_manager
+        self._path = path
+        self._model_type = model_type
+        self._cancelled = False
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def cancel(self) -> None:
+        """Discard the result; takes effect at the next loading step."""
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self) -> None:  # noqa: D401
+        """Load the model and emit the result."""
+        try:
+            entry = self._model_manager.prepare_model(
+                self._path, self._model_type,
+                progress=self.status.emit,
+                is_cancelled=self.is_cancelled,
+            )
+        except LoadCancelled:
+            logger.info("Model load cancelled: %s", self._path)
+            return
+        if self._cancelled:
+            return
+        if entry is None:
+            self.failed.emit(f"Failed to load model: {self._path}")
+        else:
+            self.loaded.emit(entry)
@@ -0,0 +1,196 @@
+"""Hot-path instrumentation: named timers with rolling latency histograms.
+
+Functions on the interactive hot paths are wrapped with :func:`hot_path`::
+
+    @hot_path("canvas.display_labels")
+    def display_labels(self, labels): ...
+
+While instrumentation is disabled (the default) the wrapper costs one global
+lookup and a branch per call.  When enabled, every call's wall time is
+appended to a per-name ring buffer of the last :data:`WINDOW` samples, from
+which :func:`snapshot` derives percentiles and a fixed-bucket histogram for
+the performance dock.  Recording is thread-safe enough for CPython
+(``deque.append`` is atomic), so worker threads may be timed as well.
+
+:class:`ProfileCapture` wraps an on-demand ``cProfile`` session of the GUI
+thread (or ``pyinstrument``, if installed and requested) that is dumped to
+a file.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per timer.
+WINDOW: int = 512
+
+# Histogram bucket upper edges in ms; the last bucket is open-ended.
+BUCKET_EDGES_MS: tuple[float, ...] = (1, 2, 4, 8, 16, 33, 66, 133, 266)
+
+F = TypeVar("F", bound=Callable)
+
+_enabled: bool = False
+_samples: dict[str, deque] = {}
+_totals: dict[str, int] = {}
+
+
+@dataclass
+class TimerStats:
+    name: str
+    calls: int  # total since the last reset
+    window: int  # samples in the rolling window
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    histogram: list[int]  # counts per BUCKET_EDGES_MS bucket (+ overflow)
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    _samples.clear()
+    _totals.clear()
+
+
+def record(name: str, elapsed_ms: float) -> None:
+    """Add one sample for *name* (no-op while disabled)."""
+    if not _enabled:
+        return
+    buf = _samples.get(name)
+    if buf is None:
+        buf = _samples.setdefault(name, deque(maxlen=WINDOW))
+    buf.append(elapsed_ms)
+    _totals[name] = _totals.get(name, 0) + 1
+
+
+def hot_path(name: str) -> Callable[[F], F]:
+    """Decorator that times every call of the wrapped function as *name*."""
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - t0) * 1000.0)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def snapshot() -> list[TimerStats]:
+    """Statistics of every timer, sorted by name."""
+    import numpy as np
+
+    stats: list[TimerStats] = []
+    for name in sorted(_samples):
+        data = np.fromiter(list(_samples[name]), dtype=np.float64)
+        if data.size == 0:
+            continue
+        p50, p90, p99 = (float(v) for v in np.percentile(data, [50, 90, 99]))
+        hist = np.bincount(
+            np.searchsorted(BUCKET_EDGES_MS, data, side="left"),
+            minlength=len(BUCKET_EDGES_MS) + 1,
+        )
+        stats.append(TimerStats(
+            name=name,
+            calls=_totals.get(name, 0),
+            window=int(data.size),
+            mean_ms=float(data.mean()),
+            p50_ms=p50,
+            p90_ms=p90,
+            p99_ms=p99,
+            max_ms=float(data.max()),
+            histogram=hist.tolist(),
+        ))
+    return stats
+
+
+class ProfileCapture:
+    """On-demand profiler session of the calling (GUI) thread.
+
+    :meth:`stop` halts the session so that e.g. a file dialog shown
+    afterwards is not part of it; :meth:`save` then writes the result.
+    """
+
+    def __init__(self) -> None:
+        self._profiler = None
+        self._result = None
+        self._pyinstrument = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._profiler is not None
+
+    @property
+    def writes_html(self) -> bool:
+        """True if the session is saved as pyinstrument HTML, not ``.prof``."""
+        return self._pyinstrument
+
+    def start(self, prefer_pyinstrument: bool = False) -> None:
+        if self._profiler is not None:
+            return
+        self._result = None
+        if prefer_pyinstrument:
+            try:
+                from pyinstrument import Profiler
+
+                self._profiler = Profiler()
+                self._pyinstrument = True
+                self._profiler.start()
+                return
+            except ImportError:
+                logger.info("pyinstrument not installed, using cProfile")
+        import cProfile
+
+        self._profiler = cProfile.Profile()
+        self._pyinstrument = False
+        self._profiler.enable()
+
+    def stop(self) -> None:
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return
+        if self._pyinstrument:
+            profiler.stop()
+        else:
+            profiler.disable()
+        self._result = profiler
+
+    def save(self, path: str) -> None:
+        """Write the last stopped session to *path*.
+
+        cProfile sessions are written as ``.prof`` (``pstats`` format) with a
+        ``.txt`` summary next to it; pyinstrument sessions as HTML.
+        """
+        if self._result is None:
+            return
+        if self._pyinstrument:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(self._result.output_html())
+            return
+        import pstats
+
+        self._result.dump_stats(path)
+        with open(path + ".txt", "w", encoding="utf-8") as fh:
+            pstats.Stats(self._result, stream=fh).sort_stats("cumulative").print_stats(60)
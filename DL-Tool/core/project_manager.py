@@ -8,6 +8,10 @@ from typing import Optional
 
 from PySide6.QtCore import QObject, Signal
 
+from core.annotation_store import BACKEND_FILES, BACKEND_SQLITE, DB_NAME, AnnotationStore
+from core.gt_index import GtMaskIndex
+from core.mask_store import PACKED_DIR, PackedMaskStore
+
 
 # Supported image extensions (case-insensitive matching is handled at scan time).
 SUPPORTED_IMAGE_EXTENSIONS: set[str] = {
@@ -28,6 +32,10 @@ class ProjectManager(QObject):
     extensions and builds an ordered list.  Label files are expected to live
     in a ``labels/`` subdirectory alongside the images, each sharing the
     same stem but with a ``.txt`` extension.
+
+    With ``annotation_backend = BACKEND_SQLITE`` labels are kept in the
+    folder's ``annotations.db`` instead (see :mod:`core.annotation_store`);
+    images without a database record still fall back to the files.
     """
 
     folder_changed = Signal()
@@ -38,6 +46,10 @@ class ProjectManager(QObject):
         self._image_dir: Optional[Path] = None
         self._label_dir: Optional[Path] = None
         self._image_list: list[str] = []
+        self._gt_index: Optional[GtMaskIndex] = None
+        self._mask_store: Optional[PackedMaskStore] = None
+        self._annotation_store: Optional[AnnotationStore] = None
+        self.annotation_backend: str = BACKEND_FILES
 
     # -- Properties ----------------------------------------------------------
 
@@ -61,6 +73,38 @@ class ProjectManager(QObject):
         """Number of images in the current folder."""
         return len(self._image_list)
 
+    @property
+    def gt_index(self) -> Optional[GtMaskIndex]:
+        """Index of the ``gt_image/`` masks, or ``None`` if no folder is open."""
+        if self._image_dir is None:
+            return None
+        if self._gt_index is None:
+            self._gt_index = GtMaskIndex(self._image_dir / "gt_image")
+        return self._gt_index
+
+    @property
+    def mask_store(self) -> Optional[PackedMaskStore]:
+        """Packed ``gt_packed/`` masks, or ``None`` if no folder is open."""
+        if self._image_dir is None:
+            return None
+        if self._mask_store is None:
+            self._mask_store = PackedMaskStore(self._image_dir / PACKED_DIR)
+        return self._mask_store
+
+    @property
+    def annotation_store(self) -> Optional[AnnotationStore]:
+        """The folder's ``annotations.db``, or ``None`` if no folder is open."""
+        if self._image_dir is None:
+            return None
+        if self._annotation_store is None:
+            self._annotation_store = AnnotationStore(self._image_dir / DB_NAME)
+        return self._annotation_store
+
+    @property
+    def uses_database(self) -> bool:
+        """``True`` if labels are persisted to :attr:`annotation_store`."""
+        return self.annotation_backend == BACKEND_SQLITE and self._image_dir is not None
+
     # -- Public methods ------------------------------------------------------
 
     def open_folder(self, path: str) -> bool:
@@ -79,6 +123,9 @@ class ProjectManager(QObject):
         self._label_dir = self._image_dir / "labels"
         self._label_dir.mkdir(exist_ok=True)
 
+        self._gt_index = None
+        self._mask_store = None
+        self.close_annotation_store()
         self._scan_images()
 
         self.folder_changed.emit()
@@ -104,21 +151,22 @@ class ProjectManager(QObject):
         return str(self._label_dir / (img.stem + ".txt"))
 
     def has_labels(self, image_path: str) -> bool:
-        """Return ``True`` if a label txt file or GT mask image exists for the image."""
+        """Return ``True`` if a label txt file or GT mask image exists for the image.
+
+        With the database backend a record of the image decides instead.
+        """
+        if self.uses_database:
+            count = self.annotation_store.label_count(Path(image_path).name)
+            if count is not None:
+                return count > 0
         label_path = self.get_label_path(image_path)
         if os.path.isfile(label_path):
             return True
-        # Also check gt_image/<class>/<stem>.* directories
-        if self._image_dir is not None:
-            gt_dir = self._image_dir / "gt_image"
-            if gt_dir.is_dir():
-                img_stem = Path(image_path).stem
-                for class_dir in gt_dir.iterdir():
-                    if class_dir.is_dir():
-                        for f in class_dir.iterdir():
-                            if f.is_file() and f.stem == img_stem:
-                                return True
-        return False
+        # Also check gt_image/<class>/<stem>.* and packed masks
+        if self._image_dir is None:
+            return False
+        stem = Path(image_path).stem
+        return self.gt_index.has(stem) or self.mask_store.has(stem)
 
     def get_image_index(self, image_path: str) -> int:
         """Return the index of *image_path* in the image list, or -1."""
@@ -141,9 +189,23 @@ class ProjectManager(QObject):
     def refresh(self) -> None:
         """Re-scan the current folder for images."""
         if self._image_dir is not None:
+            self.invalidate_gt_index()
             self._scan_images()
             self.image_list_updated.emit()
 
+    def invalidate_gt_index(self) -> None:
+        """Force a re-scan of the GT masks after they were changed externally."""
+        if self._gt_index is not None:
+            self._gt_index.invalidate()
+        if self._mask_store is not None:
+            self._mask_store.invalidate()
+
+    def close_annotation_store(self) -> None:
+        """Close the database connections (reopened on next use)."""
+        if self._annotation_store is not None:
+            self._annotation_store.close()
+            self._annotation_store = None
+
     def set_custom_label_dir(self, path: str) -> bool:
         """Set a custom label directory path.
 
@@ -0,0 +1,328 @@
+"""Persistent cache of raw auto-label detections.
+
+Model inference dominates auto-labeling time, while the score filter applied
+afterwards is cheap.  This module stores the *raw* detections produced for an
+image so that re-running auto-labeling with a different score threshold, or
+re-opening earlier results, is pure post-processing.
+
+Entries are keyed by ``(model file hash, image content hash, infer_size,
+confidence, options tag)`` and stored as small uncompressed ``.npz`` files::
+
+    <cache_root>/<model_hash>/<infer_size>_<confidence>[_<tag>]/<ab>/<image_hash>.npz
+
+The optional tag is :meth:`core.model_manager.InferenceOptions.cache_tag`.
+
+The cache is bounded by a byte budget (``AppConfig.autolabel_cache_max_mb``):
+a hit refreshes the entry's modification time, and once the entries exceed
+the budget the least recently used ones are deleted.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config import CONFIG_DIR
+
+logger = logging.getLogger(__name__)
+
+# Default on-disk location shared by all projects (entries are content-keyed).
+DEFAULT_CACHE_DIR: str = os.path.join(CONFIG_DIR, "autolabel_cache")
+
+# Bump when the on-disk layout of an entry changes.
+_FORMAT_VERSION: int = 1
+
+_HASH_CHUNK: int = 1 << 20
+
+# Default byte budget of the cache; 0 means unbounded.
+DEFAULT_MAX_BYTES: int = 2048 * 1024 * 1024
+
+# Eviction deletes entries until the cache is at this fraction of its
+# budget, so that the next writes do not trigger another scan right away.
+_EVICT_TO: float = 0.8
+
+
+def file_digest(path: str) -> str:
+    """Return a hex BLAKE2b digest (128 bit) of the file content at *path*."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass
+class RawDetections:
+    """Model detections for one image before any score filtering.
+
+    Attributes:
+        boxes: ``(N, 4)`` float32 ``xyxy`` boxes in original image pixels.
+        scores: ``(N,)`` float32 confidence scores.
+        classes: ``(N,)`` int32 class ids.
+        poly_offsets: ``(N + 1,)`` int32 offsets into *poly_xy*; detection
+            ``i`` owns ``poly_xy[poly_offsets[i]:poly_offsets[i + 1]]``.
+            Detections without a mask own an empty slice.
+        poly_xy: ``(M, 2)`` float32 polygon vertices in original image pixels.
+    """
+
+    boxes: np.ndarray
+    scores: np.ndarray
+    classes: np.ndarray
+    poly_offsets: np.ndarray
+    poly_xy: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.scores.shape[0])
+
+    @classmethod
+    def empty(cls) -> "RawDetections":
+        return cls(
+            boxes=np.zeros((0, 4), dtype=np.float32),
+            scores=np.zeros((0,), dtype=np.float32),
+            classes=np.zeros((0,), dtype=np.int32),
+            poly_offsets=np.zeros((1,), dtype=np.int32),
+            poly_xy=np.zeros((0, 2), dtype=np.float32),
+        )
+
+    @classmethod
+    def from_parts(
+        cls,
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        classes: np.ndarray,
+        polygons: Optional[list[np.ndarray]] = None,
+    ) -> "RawDetections":
+        """Build detections from per-detection arrays and optional polygons.
+
+        *polygons* must have one ``(K, 2)`` array per detection when given;
+        pass an empty array for detections without a mask.
+        """
+        n = int(len(scores))
+        if polygons:
+            lengths = np.fromiter((len(p) for p in polygons), dtype=np.int32, count=n)
+            offsets = np.zeros(n + 1, dtype=np.int32)
+            np.cumsum(lengths, out=offsets[1:])
+            non_empty = [np.asarray(p, dtype=np.float32).reshape(-1, 2) for p in polygons if len(p)]
+            poly_xy = (
+                np.concatenate(non_empty) if non_empty
+                else np.zeros((0, 2), dtype=np.float32)
+            )
+        else:
+            offsets = np.zeros(n + 1, dtype=np.int32)
+            poly_xy = np.zeros((0, 2), dtype=np.float32)
+        return cls(
+            boxes=np.asarray(boxes, dtype=np.float32).reshape(n, 4),
+            scores=np.asarray(scores, dtype=np.float32).reshape(n),
+            classes=np.asarray(classes, dtype=np.int32).reshape(n),
+            poly_offsets=offsets,
+            poly_xy=poly_xy,
+        )
+
+    def polygon(self, index: int) -> np.ndarray:
+        """Return the ``(K, 2)`` polygon of detection *index* (may be empty)."""
+        return self.poly_xy[self.poly_offsets[index]:self.poly_offsets[index + 1]]
+
+
+class AutoLabelResultCache:
+    """Content-addressed on-disk store of :class:`RawDetections`.
+
+    The cache is safe to use from the auto-label worker thread: writes go to
+    a temporary file that is atomically renamed into place, and the model
+    hash memo is guarded by a lock.
+
+    *max_bytes* bounds the total size of the entries (``0`` = unbounded);
+    the cache directory is scanned for its size on the first write.
+    """
+
+    def __init__(
+        self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self._root = Path(cache_dir)
+        self._max_bytes = max(0, max_bytes)
+        self._size: Optional[int] = None  # bytes of all entries, once scanned
+        self._model_digests: dict[tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._root
+
+    # -- Keys ----------------------------------------------------------------
+
+    def model_digest(self, model_path: str) -> str:
+        """Return the (memoised) content hash of a model weights file.
+
+        Hashing a 100 MB checkpoint takes a noticeable fraction of a second,
+        so the digest is remembered per ``(path, size, mtime)``.
+        """
+        st = os.stat(model_path)
+        memo_key = (os.path.abspath(model_path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._model_digests.get(memo_key)
+        if digest is None:
+            digest = file_digest(model_path)
+            with self._lock:
+                self._model_digests[memo_key] = digest
+        return digest
+
+    def _entry_path(
+        self,
+        model_digest: str,
+        image_digest: str,
+        infer_size: int,
+        confidence: float,
+        variant: str = "",
+    ) -> Path:
+        bucket = f"{int(infer_size)}_{confidence:.4f}"
+        if variant:
+            bucket = f"{bucket}_{variant}"
+        return (
+            self._root / model_digest / bucket
+            / image_digest[:2] / f"{image_digest}.npz"
+        )
+
+    # -- Read / write --------------------------------------------------------
+
+    def get(
+        self,
+        model_digest: str,
+        image_digest: str,
+        infer_size: int,
+        confidence: float,
+        variant: str = "",
+    ) -> Optional[RawDetections]:
+        """Return cached detections, or ``None`` on a miss or a corrupt entry."""
+        path = self._entry_path(model_digest, image_digest, infer_size, confidence, variant)
+        if not path.is_file():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != _FORMAT_VERSION:
+                    return None
+                detections = RawDetections(
+                    boxes=data["boxes"],
+                    scores=data["scores"],
+                    classes=data["classes"],
+                    poly_offsets=data["poly_offsets"],
+                    poly_xy=data["poly_xy"],
+                )
+        except Exception:
+            logger.warning("Discarding unreadable cache entry %s", path)
+            return None
+        try:
+            os.utime(path)  # the modification time is the LRU clock
+        except OSError:
+            pass
+        return detections
+
+    def put(
+        self,
+        model_digest: str,
+        image_digest: str,
+        infer_size: int,
+        confidence: float,
+        detections: RawDetections,
+        variant: str = "",
+    ) -> None:
+        """Store *detections*; failures are logged and otherwise ignored."""
+        path = self._entry_path(model_digest, image_digest, infer_size, confidence, variant)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as fh:
+                np.savez(
+                    fh,
+                    version=np.int32(_FORMAT_VERSION),
+                    boxes=detections.boxes,
+                    scores=detections.scores,
+                    classes=detections.classes,
+                    poly_offsets=detections.poly_offsets,
+                    poly_xy=detections.poly_xy,
+                )
+            size = tmp.stat().st_size
+            # Overwriting an entry only changes the total by the difference.
+            try:
+                size -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("Could not write cache entry %s: %s", path, exc)
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        self._account(size)
+
+    def clear(self, model_digest: Optional[str] = None) -> None:
+        """Delete all entries, or only those belonging to *model_digest*."""
+        import shutil
+
+        target = self._root / model_digest if model_digest else self._root
+        if target.exists():
+            shutil.rmtree(target, ignore_errors=True)
+        with self._lock:
+            self._size = None
+
+    def size_bytes(self) -> int:
+        """Total size of the cache entries (scans the cache directory)."""
+        return sum(size for _, size, _ in self._scan())
+
+    def evict(self, max_bytes: int) -> int:
+        """Delete the least recently used entries until at most *max_bytes*
+        remain; return the number of bytes freed."""
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total - freed <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            freed += size
+        with self._lock:
+            self._size = total - freed
+        if freed:
+            logger.info("Evicted %.1f MB from %s", freed / 1e6, self._root)
+        return freed
+
+    # -- Internal helpers ----------------------------------------------------
+
+    def _account(self, size: int) -> None:
+        """Add the *size* change of a write to the total; evict when over budget."""
+        if not self._max_bytes:
+            return
+        with self._lock:
+            known = self._size is not None
+            if known:
+                self._size += size
+            over = known and self._size > self._max_bytes
+        if not known:
+            # The first write of this instance scans (and trims) the cache.
+            self.evict(self._max_bytes)
+        elif over:
+            self.evict(int(self._max_bytes * _EVICT_TO))
+
+    def _scan(self) -> list[tuple[Path, int, int]]:
+        """``(path, size, mtime_ns)`` of every entry."""
+        entries = []
+        for dirpath, _, filenames in os.walk(self._root):
+            for name in filenames:
+                if not name.endswith(".npz"):
+                    continue
+                path = Path(dirpath) / name
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue  # deleted concurrently
+                entries.append((path, st.st_size, st.st_mtime_ns))
+        return entries
@@ -1,25 +1,37 @@
 """Save/load helpers extracted from MainWindow to keep it lean.
 
 This module owns all disk I/O that is related to persisting and restoring
-label data (YOLO txt files, GT mask PNG files and the images/ copy).
+label data (YOLO txt files, GT mask PNG files and the images/ copy).  With
+the database backend (``ProjectManager.uses_database``) saves go to the
+project's ``annotations.db`` instead and the files are only written by
+:meth:`SaveManager.export_store`.
+
+``cv2`` and :mod:`core.export_manager` are imported on first use so that
+constructing a :class:`SaveManager` at startup stays cheap.
 """
 
 from __future__ import annotations
 
+import json
 import shutil
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-import cv2
-
-from core.export_manager import ExportManager
 from core.label_manager import LabelItem
+from core.mask_store import LAYOUT_FOLDERS, LAYOUT_PACKED
 
 if TYPE_CHECKING:
+    import numpy as np
+
     from core.label_manager import LabelManager
     from core.project_manager import ProjectManager
 
 
+# annotations.db meta key: the class list, label dir and mask layout of the
+# last export_store(), which decide whether an incremental export is valid.
+_EXPORT_STATE_KEY: str = "export_state"
+
+
 class SaveManager:
     """Handles all label persistence for a single project session.
 
@@ -29,15 +41,24 @@ class SaveManager:
         The shared :class:`LabelManager` instance.
     project_manager:
         The shared :class:`ProjectManager` instance.
+    mask_layout:
+        How GT masks are written: ``"folders"`` (one PNG per class in
+        ``gt_image/<class>/``) or ``"packed"`` (one bit-packed PNG per image
+        in ``gt_packed/``, see :mod:`core.mask_store`).  Both layouts are
+        always read.
     """
 
     def __init__(
         self,
         label_manager: "LabelManager",
         project_manager: "ProjectManager",
+        mask_layout: str = LAYOUT_FOLDERS,
     ) -> None:
         self._labels = label_manager
         self._project = project_manager
+        self.mask_layout = mask_layout
+        # image_path -> _save_state() at its last save, for ``only_changed``
+        self._saved_state: dict[str, tuple] = {}
 
     # ------------------------------------------------------------------
     # Public API
@@ -48,11 +69,14 @@ class SaveManager:
         image_path: str,
         class_names: dict[int, str],
         image_size: tuple[int, int],
+        only_changed: bool = False,
     ) -> list[str]:
         """Persist labels for a single image and return a list of saved items.
 
         GT masks are always written as PNG (lossless).
         The original image is copied to ``images/`` using its original extension.
+        With the database backend the labels are written to the annotation
+        store in one transaction instead and no files are touched.
 
         Parameters
         ----------
@@ -62,6 +86,9 @@ class SaveManager:
             Mapping of ``class_id -> class_name`` used for YOLO txt serialisation.
         image_size:
             ``(width, height)`` of the image in pixels.
+        only_changed:
+            Skip the image (returning ``[]``) if its labels, label path,
+            mask layout and class names are the same as at its last save.
 
         Returns
         -------
@@ -69,10 +96,41 @@ class SaveManager:
             Human-readable descriptions of what was saved, e.g.
             ``["3 labels", "GT images (1 classes)", "image"]``.
         """
-        labels = self._labels.get_labels(image_path)
         w, h = image_size
-        if not labels or w == 0 or h == 0 or not self._project.image_dir:
+        if w == 0 or h == 0 or not self._project.image_dir:
             return []
+        if not self._labels.has_labels(image_path):
+            return []
+        state = self._save_state(image_path, tuple(class_names.items()))
+        if only_changed and self._saved_state.get(image_path) == state:
+            return []
+        labels = self._labels.view(image_path)
+
+        if self._project.uses_database:
+            self._project.annotation_store.write(Path(image_path).name, labels, (w, h))
+            n_shapes, n_masks = _count_by_kind(labels)
+            saved: list[str] = []
+            if n_shapes:
+                saved.append(f"{n_shapes} labels")
+            if n_masks:
+                saved.append(f"GT masks ({n_masks} classes)")
+        else:
+            saved = self._write_files(image_path, labels, class_names, w, h)
+
+        self._saved_state[image_path] = state
+        return saved
+
+    def _write_files(
+        self,
+        image_path: str,
+        labels,
+        class_names: dict[int, str],
+        w: int,
+        h: int,
+        flush: bool = True,
+    ) -> list[str]:
+        """Write the YOLO txt, GT masks and ``images/`` copy of one image."""
+        from core.export_manager import ExportManager
 
         bbox_polygon = [l for l in labels if l.label_type in ("bbox", "polygon")]
         mask_labels = [l for l in labels if l.label_type == "mask"]
@@ -91,31 +149,7 @@ class SaveManager:
 
         # ── GT mask PNGs (one per class, organised in gt_image/<class>/) ──
         if mask_labels:
-            gt_dir = Path(self._project.image_dir) / "gt_image"
-            img_file = Path(image_path)
-            mask_class_names = set()
-            for label in mask_labels:
-                class_dir = gt_dir / label.class_name
-                class_dir.mkdir(parents=True, exist_ok=True)
-                gt_path = class_dir / (img_file.stem + ".png")
-                ExportManager.save_semantic_mask(
-                    [label], w, h, str(gt_path), multi_label=False
-                )
-                mask_class_names.add(label.class_name)
-
-            # Create empty GT masks for classes that have a gt_image/<class>/
-            # directory but no mask on this image, so training image counts
-            # stay consistent across all segmentation classes.
-            for cname in class_names.values():
-                if cname not in mask_class_names:
-                    class_dir = gt_dir / cname
-                    if class_dir.is_dir():
-                        gt_path = class_dir / (img_file.stem + ".png")
-                        if not gt_path.exists():
-                            ExportManager.save_semantic_mask(
-                                [], w, h, str(gt_path), multi_label=False
-                            )
-
+            self._write_gt_masks(image_path, mask_labels, class_names, w, h, flush=flush)
             saved.append(f"GT images ({len(mask_labels)} classes)")
 
         # ── Copy original image ────────────────────────────────────────
@@ -126,15 +160,19 @@ class SaveManager:
         if not dest.exists():
             shutil.copy2(image_path, dest)
             saved.append("image")
-
         return saved
 
     def save_all_images(
         self,
         class_names: dict[int, str],
+        only_changed: bool = False,
     ) -> tuple[int, int, int]:
         """Save every image that has labels.
 
+        With *only_changed*, images unchanged since their last save are
+        skipped (see :meth:`save_image_labels`).  With the database backend
+        all images are written in a single transaction.
+
         Returns
         -------
         tuple[int, int, int]
@@ -142,18 +180,27 @@ class SaveManager:
         """
         if not self._project.image_dir:
             return 0, 0, 0
+        if self._project.uses_database:
+            return self._save_all_to_store(class_names, only_changed)
+
+        import cv2
+        from core.export_manager import ExportManager
 
-        gt_dir = Path(self._project.image_dir) / "gt_image"
         images_dir = Path(self._project.image_dir) / "images"
-        gt_dir.mkdir(parents=True, exist_ok=True)
+        if self.mask_layout != LAYOUT_PACKED:
+            (Path(self._project.image_dir) / "gt_image").mkdir(parents=True, exist_ok=True)
         images_dir.mkdir(parents=True, exist_ok=True)
 
         label_count = gt_count = image_count = 0
+        names_key = tuple(class_names.items())
 
         for img_path in self._project.image_list:
-            labels = self._labels.get_labels(img_path)
-            if not labels:
+            if not self._labels.has_labels(img_path):
                 continue
+            state = self._save_state(img_path, names_key)
+            if only_changed and self._saved_state.get(img_path) == state:
+                continue
+            labels = self._labels.view(img_path)
 
             img = cv2.imread(img_path)
             if img is None:
@@ -170,55 +217,230 @@ class SaveManager:
                     label_count += 1
 
             if mask_labels:
-                img_file = Path(img_path)
-                mask_class_names = set()
-                for label in mask_labels:
-                    class_dir = gt_dir / label.class_name
-                    class_dir.mkdir(parents=True, exist_ok=True)
-                    gt_path = class_dir / (img_file.stem + ".png")
-                    ExportManager.save_semantic_mask(
-                        [label], w, h, str(gt_path), multi_label=False
-                    )
-                    mask_class_names.add(label.class_name)
-
-                # Create empty GT for classes with existing gt_image/ dirs
-                for cname in class_names.values():
-                    if cname not in mask_class_names:
-                        class_dir = gt_dir / cname
-                        if class_dir.is_dir():
-                            gt_path = class_dir / (img_file.stem + ".png")
-                            if not gt_path.exists():
-                                ExportManager.save_semantic_mask(
-                                    [], w, h, str(gt_path), multi_label=False
-                                )
-
+                self._write_gt_masks(img_path, mask_labels, class_names, w, h, flush=False)
                 gt_count += 1
 
             dest = images_dir / Path(img_path).name
             if not dest.exists():
                 shutil.copy2(img_path, dest)
                 image_count += 1
+            self._saved_state[img_path] = state
 
+        self._project.mask_store.flush()
         return label_count, gt_count, image_count
 
+    def _save_all_to_store(
+        self,
+        class_names: dict[int, str],
+        only_changed: bool,
+    ) -> tuple[int, int, int]:
+        store = self._project.annotation_store
+        names_key = tuple(class_names.items())
+        label_count = gt_count = 0
+        saved_states: dict[str, tuple] = {}
+
+        with store.batch():
+            for img_path in self._project.image_list:
+                if not self._labels.has_labels(img_path):
+                    continue
+                state = self._save_state(img_path, names_key)
+                if only_changed and self._saved_state.get(img_path) == state:
+                    continue
+                labels = self._labels.view(img_path)
+                store.write(Path(img_path).name, labels)
+                n_shapes, n_masks = _count_by_kind(labels)
+                label_count += n_shapes > 0
+                gt_count += n_masks > 0
+                saved_states[img_path] = state
+
+        # Only recorded once the transaction has committed.
+        self._saved_state.update(saved_states)
+        return label_count, gt_count, 0
+
+    def export_store(
+        self,
+        class_names: dict[int, str],
+        register_class_cb,
+        only_changed: bool = True,
+    ) -> tuple[int, int, int]:
+        """Write the annotation database out as YOLO txt and GT mask files.
+
+        The files are the ones a save with the file backend would produce
+        (GT masks in the current :attr:`mask_layout`), for training and
+        external tools.  Cleared records remove the files of their image.
+
+        Parameters
+        ----------
+        class_names:
+            Current ``class_id -> class_name`` mapping.
+        register_class_cb:
+            Callable ``(class_name: str) -> int`` for classes found in the
+            database but not in *class_names*, as in
+            :meth:`load_labels_from_disk`.
+        only_changed:
+            Only export images modified since their last export.  A full
+            export is done anyway when the class list, label directory or
+            mask layout differs from the last export, since every file
+            written with the old ones may be stale.
+
+        Returns
+        -------
+        tuple[int, int, int]
+            ``(label_file_count, gt_image_count, image_copy_count)``
+        """
+        store = self._project.annotation_store
+        if store is None or not store.exists():
+            return 0, 0, 0
+
+        import cv2
+
+        for cname in store.class_names():
+            if cname not in class_names.values():
+                new_idx = register_class_cb(cname)
+                class_names = {**class_names, new_idx: cname}
+
+        export_state = json.dumps({
+            "classes": sorted(class_names.items()),
+            "label_dir": str(self._project.label_dir),
+            "mask_layout": self.mask_layout,
+        })
+        if store.get_meta(_EXPORT_STATE_KEY) != export_state:
+            only_changed = False
+
+        image_dir = Path(self._project.image_dir)
+        label_count = gt_count = image_count = 0
+        names = store.image_names_to_export() if only_changed else store.image_names()
+        exported: list[str] = []
+        for name in names:
+            image_path = str(image_dir / name)
+            if not store.label_count(name):
+                self._delete_files(image_path)
+                exported.append(name)
+                continue
+            size = store.image_size(name)
+            if size is None:
+                img = cv2.imread(image_path)
+                if img is None:
+                    continue
+                size = img.shape[1], img.shape[0]
+            labels = store.read(name, class_names, size)
+            saved = self._write_files(image_path, labels, class_names, *size, flush=False)
+            n_shapes, n_masks = _count_by_kind(labels)
+            label_count += n_shapes > 0
+            gt_count += n_masks > 0
+            image_count += "image" in saved
+            exported.append(name)
+
+        self._project.mask_store.flush()
+        store.mark_exported(exported)
+        store.set_meta(_EXPORT_STATE_KEY, export_state)
+        return label_count, gt_count, image_count
+
+    def _save_state(self, image_path: str, names_key: tuple) -> tuple:
+        """Everything a save of *image_path* depends on besides the image."""
+        return (
+            self._labels.version(image_path),
+            self._project.get_label_path(image_path),
+            self.mask_layout,
+            names_key,
+        )
+
+    def _write_gt_masks(
+        self,
+        image_path: str,
+        mask_labels: list[LabelItem],
+        class_names: dict[int, str],
+        w: int,
+        h: int,
+        flush: bool = True,
+    ) -> None:
+        """Write the GT masks of *image_path* in the configured layout.
+
+        Masks of the image stored in the other layout are removed, so a
+        project migrates image by image as it is re-saved.
+        """
+        index = self._project.gt_index
+        store = self._project.mask_store
+        stem = Path(image_path).stem
+
+        if self.mask_layout == LAYOUT_PACKED:
+            masks: dict[str, "np.ndarray"] = {}
+            for label in mask_labels:
+                if label.mask_data is None:
+                    continue
+                binary = label.mask_data > 0
+                if label.class_name in masks:
+                    masks[label.class_name] |= binary
+                else:
+                    masks[label.class_name] = binary
+            store.write(stem, masks, flush=flush)
+            for path in index.discard(stem):
+                Path(path).unlink(missing_ok=True)
+            return
+
+        store.discard(stem, flush=flush)
+        self._write_gt_folders(stem, mask_labels, class_names, w, h)
+
+    def _write_gt_folders(
+        self,
+        stem: str,
+        mask_labels: list[LabelItem],
+        class_names: dict[int, str],
+        w: int,
+        h: int,
+    ) -> None:
+        """Write one GT PNG per mask class to ``gt_image/<class>/<stem>.png``."""
+        from core.export_manager import ExportManager
+
+        index = self._project.gt_index
+        gt_dir = index.gt_dir
+        mask_class_names = set()
+        for label in mask_labels:
+            class_dir = gt_dir / label.class_name
+            class_dir.mkdir(parents=True, exist_ok=True)
+            gt_path = class_dir / (stem + ".png")
+            ExportManager.save_semantic_mask(
+                [label], w, h, str(gt_path), multi_label=False
+            )
+            index.add(stem, label.class_name, gt_path)
+            mask_class_names.add(label.class_name)
+
+        # Create empty GT masks for classes that have a gt_image/<class>/
+        # directory but no mask on this image, so training image counts
+        # stay consistent across all segmentation classes.
+        existing = index.lookup(stem)
+        class_dirs = set(index.class_names())
+        for cname in class_names.values():
+            if cname in mask_class_names or cname in existing or cname not in class_dirs:
+                continue
+            gt_path = gt_dir / cname / (stem + ".png")
+            ExportManager.save_semantic_mask(
+                [], w, h, str(gt_path), multi_label=False
+            )
+            index.add(stem, cname, gt_path)
+
     def delete_image_labels(self, image_path: str) -> None:
-        """Remove the YOLO txt and any GT mask PNGs for *image_path*."""
+        """Remove the YOLO txt and any GT mask PNGs for *image_path*.
+
+        With the database backend the image's record is cleared instead.
+        """
         if not self._project.image_dir:
             return
+        self._saved_state.pop(image_path, None)
+        if self._project.uses_database:
+            self._project.annotation_store.clear(Path(image_path).name)
+            return
+        self._delete_files(image_path)
 
+    def _delete_files(self, image_path: str) -> None:
         label_path = self._project.get_label_path(image_path)
         if label_path and Path(label_path).exists():
             Path(label_path).unlink()
 
-        gt_dir = Path(self._project.image_dir) / "gt_image"
-        if gt_dir.exists():
-            img_stem = Path(image_path).stem
-            for class_dir in gt_dir.iterdir():
-                if class_dir.is_dir():
-                    for ext in (".png", ".jpg", ".bmp", ".tiff"):
-                        f = class_dir / (img_stem + ext)
-                        if f.exists():
-                            f.unlink()
+        stem = Path(image_path).stem
+        for path in self._project.gt_index.discard(stem):
+            Path(path).unlink(missing_ok=True)
+        self._project.mask_store.discard(stem)
 
     def load_labels_from_disk(
         self,
@@ -245,11 +467,26 @@ class SaveManager:
         -------
         list[LabelItem]
             All labels loaded from disk.  Empty list if nothing found.
+
+        With the database backend an image that has a record is loaded from
+        the annotation store only; other images fall back to the files.
         """
         w, h = image_size
         if w == 0 or h == 0:
             return []
 
+        if self._project.uses_database:
+            store = self._project.annotation_store
+            name = Path(image_path).name
+            if store.contains(name):
+                for cname in store.classes_for(name):
+                    if cname not in class_names.values():
+                        new_idx = register_class_cb(cname)
+                        class_names = {**class_names, new_idx: cname}
+                return store.read(name, class_names, (w, h))
+
+        from core.export_manager import ExportManager
+
         all_labels: list[LabelItem] = []
 
         # ── YOLO txt ──────────────────────────────────────────────────
@@ -264,21 +501,32 @@ class SaveManager:
             all_labels.extend(labels)
 
         # ── GT masks ──────────────────────────────────────────────────
-        if self._project.image_dir:
-            gt_dir = Path(self._project.image_dir) / "gt_image"
-            if gt_dir.exists():
-                # Auto-register classes from subdirectory names
-                for class_dir in gt_dir.iterdir():
-                    if class_dir.is_dir():
-                        cname = class_dir.name
-                        if cname not in {v for v in class_names.values()}:
-                            new_idx = register_class_cb(cname)
-                            class_names = {**class_names, new_idx: cname}
-
-                # Reload class_names after potential new registrations
-                gt_labels = ExportManager.load_gt_masks(
-                    str(gt_dir), image_path, w, h, class_names
-                )
-                all_labels.extend(gt_labels)
+        index = self._project.gt_index
+        if index is not None:
+            store = self._project.mask_store
+            # Auto-register classes from subdirectory names and the packed manifest
+            for cname in dict.fromkeys(index.class_names() + store.class_names()):
+                if cname not in {v for v in class_names.values()}:
+                    new_idx = register_class_cb(cname)
+                    class_names = {**class_names, new_idx: cname}
+
+            # Reload class_names after potential new registrations
+            gt_labels = ExportManager.load_gt_masks(
+                str(index.gt_dir), image_path, w, h, class_names,
+                index=index, packed=store,
+            )
+            all_labels.extend(gt_labels)
 
         return all_labels
+
+
+def _count_by_kind(labels) -> tuple[int, int]:
+    """``(bbox/polygon label count, mask class count)`` of *labels*."""
+    n_shapes = 0
+    mask_classes = set()
+    for label in labels:
+        if label.label_type == "mask":
+            mask_classes.add(label.class_name)
+        else:
+            n_shapes += 1
+    return n_shapes, len(mask_classes)
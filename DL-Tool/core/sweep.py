@@ -0,0 +1,415 @@
+"""Hyperparameter sweeps on top of the training runner.
+
+A :class:`SweepSpace` lists candidate values for ``imgsz``, learning rate
+and batch size; :meth:`SweepSpace.grid` enumerates every combination and
+:meth:`SweepSpace.sample` draws a random subset.  :class:`SweepScheduler`
+turns each point into a :class:`~core.trainer.TrainJob` derived from a base
+job and runs them in child processes
+(:class:`~core.train_runner.TrainProcessWorker`), several at a time when
+:func:`plan_concurrency` finds enough cores, memory or GPUs.
+
+All runs share one ``data.yaml`` and therefore one prepared dataset and
+image cache; the disk cache is prepared for the largest ``imgsz`` of the
+sweep and Ultralytics downsizes the arrays for smaller runs.
+
+Results (final mAP, validation inference time, training throughput) are
+kept per run and written to ``sweep_results.csv`` in the sweep directory
+after every finished run.
+"""
+
+from __future__ import annotations
+
+import csv
+import dataclasses
+import itertools
+import logging
+import os
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+from core.train_runner import TrainProcessWorker
+from core.trainer import TrainJob
+from core.training_metrics import TrainingMetrics
+
+logger = logging.getLogger(__name__)
+
+RESULTS_NAME: str = "sweep_results.csv"
+
+# Rough memory model of one training run: fixed framework / model overhead
+# plus activations proportional to the pixels of a batch.
+_RUN_BASE_MB: int = 1500
+_BYTES_PER_BATCH_PIXEL: int = 160
+
+# CPU runs get at least this many torch threads each.
+_MIN_THREADS_PER_RUN: int = 4
+
+
+@dataclass
+class SweepSpace:
+    """Candidate values of the swept hyperparameters."""
+
+    imgsz: list[int] = field(default_factory=lambda: [640])
+    lr: list[float] = field(default_factory=lambda: [0.001])
+    batch_size: list[int] = field(default_factory=lambda: [16])
+
+    @property
+    def size(self) -> int:
+        return len(self.imgsz) * len(self.lr) * len(self.batch_size)
+
+    def grid(self) -> list[dict[str, Any]]:
+        """Return every combination, ordered by ``imgsz``, ``lr``, ``batch_size``."""
+        return [
+            {"imgsz": i, "lr": lr, "batch_size": b}
+            for i, lr, b in itertools.product(self.imgsz, self.lr, self.batch_size)
+        ]
+
+    def sample(self, count: int, seed: int = 0) -> list[dict[str, Any]]:
+        """Return *count* distinct random combinations (all if fewer exist)."""
+        points = self.grid()
+        if count >= len(points):
+            return points
+        return random.Random(seed).sample(points, count)
+
+
+@dataclass
+class SweepRun:
+    """One point of a sweep and its outcome."""
+
+    params: dict[str, Any]
+    job: TrainJob
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    run_dir: str = ""
+    best_path: str = ""
+    error: str = ""
+    epoch: int = 0
+    map50: Optional[float] = None
+    map50_95: Optional[float] = None
+    inference_ms: Optional[float] = None
+    train_images_per_sec: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    def update(self, record: TrainingMetrics) -> None:
+        self.epoch = record.epoch
+        self.elapsed_seconds = record.elapsed_seconds
+        if record.images_per_sec:
+            self.train_images_per_sec = record.images_per_sec
+        if record.kind != "epoch":
+            return
+        map50_95 = record.metric("mAP50-95")
+        if map50_95 is not None:
+            self.map50_95 = map50_95
+            self.map50 = record.metric("mAP50(")
+        self.inference_ms = record.metric("speed/inference")
+
+    def sort_key(self) -> tuple:
+        """Best mAP50-95 first; ties go to the faster model."""
+        return (
+            -(self.map50_95 if self.map50_95 is not None else -1.0),
+            self.inference_ms if self.inference_ms is not None else float("inf"),
+        )
+
+    def to_row(self) -> dict[str, Any]:
+        return {
+            "name": self.job.name,
+            **self.params,
+            "status": self.status,
+            "epoch": self.epoch,
+            "mAP50": self.map50,
+            "mAP50-95": self.map50_95,
+            "inference_ms": self.inference_ms,
+            "train_img_per_sec": round(self.train_images_per_sec, 2),
+            "elapsed_s": round(self.elapsed_seconds, 1),
+            "best": self.best_path,
+        }
+
+
+def available_memory_bytes() -> int:
+    """Return the available physical memory, or ``0`` if unknown."""
+    try:
+        import psutil  # installed with ultralytics
+        return int(psutil.virtual_memory().available)
+    except ImportError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def estimate_run_memory(job: TrainJob, ram_cache_bytes: int = 0) -> int:
+    """Rough peak memory of one training run in bytes.
+
+    *ram_cache_bytes* is added for ``cache="ram"``: every run process holds
+    its own copy of the decoded images.
+    """
+    pixels = job.batch_size * job.imgsz * job.imgsz
+    total = _RUN_BASE_MB * 1024 * 1024 + pixels * _BYTES_PER_BATCH_PIXEL
+    if job.cache == "ram":
+        total += ram_cache_bytes
+    return total
+
+
+def plan_concurrency(
+    jobs: list[TrainJob],
+    device: str,
+    ram_cache_bytes: int = 0,
+) -> tuple[int, list[str], int]:
+    """Decide how many runs execute at the same time.
+
+    Returns ``(slots, devices, threads)``: the number of parallel runs, the
+    device string of every slot and the torch threads per CPU run
+    (``0`` = unrestricted).
+
+    * Explicit GPUs (``"0,1"``) get one run each.
+    * ``"cpu"`` is limited by cores (:data:`_MIN_THREADS_PER_RUN` each) and
+      by available memory for the largest run.
+    * Auto (``""``) or a single GPU runs one job at a time, since the GPU
+      memory cannot be checked without importing torch.
+    """
+    if not jobs:
+        return 0, [], 0
+    gpus = [d.strip() for d in device.split(",") if d.strip()]
+    if device != "cpu" and len(gpus) > 1:
+        slots = min(len(jobs), len(gpus))
+        return slots, gpus[:slots], 0
+    if device != "cpu":
+        return 1, [device], 0
+
+    cpus = os.cpu_count() or 1
+    slots = max(1, min(len(jobs), cpus // _MIN_THREADS_PER_RUN))
+    available = available_memory_bytes()
+    if available:
+        per_run = max(estimate_run_memory(j, ram_cache_bytes) for j in jobs)
+        slots = max(1, min(slots, available // per_run))
+    threads = cpus // slots if slots > 1 else 0
+    return int(slots), ["cpu"] * int(slots), threads
+
+
+class SweepScheduler(QObject):
+    """Runs the points of a sweep, up to ``slots`` at a time.
+
+    Args:
+        base_job: Settings shared by every run (dataset, model, epochs,
+            device, cache); ``imgsz``, ``lr`` and ``batch_size`` are replaced
+            per point.
+        points: Parameter dicts from :meth:`SweepSpace.grid` /
+            :meth:`SweepSpace.sample`.
+        sweep_dir: Ultralytics ``project`` directory of all runs; results
+            are written here.
+        max_parallel: Upper bound for parallel runs; ``0`` uses
+            :func:`plan_concurrency` alone.
+        ram_cache_bytes: Estimated RAM cache size, for memory planning.
+
+    Signals:
+        run_started(int): Index of a run that started.
+        run_updated(int): New metrics for a run.
+        run_finished(int): A run ended (any status).
+        log_message(str): Scheduler messages and child log lines, prefixed
+            with the run name.
+        finished(): Every run has ended.
+    """
+
+    run_started = Signal(int)
+    run_updated = Signal(int)
+    run_finished = Signal(int)
+    log_message = Signal(str)
+    finished = Signal()
+
+    def __init__(
+        self,
+        base_job: TrainJob,
+        points: list[dict[str, Any]],
+        sweep_dir: str,
+        max_parallel: int = 0,
+        ram_cache_bytes: int = 0,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._sweep_dir = Path(sweep_dir)
+        self._runs: list[SweepRun] = []
+        for i, params in enumerate(points, start=1):
+            name = "run{:02d}_img{}_lr{:g}_b{}".format(
+                i, params["imgsz"], params["lr"], params["batch_size"]
+            )
+            # Runs share the machine, so a post-training benchmark would
+            # time contended hardware and add minutes per run; benchmark the
+            # chosen run afterwards instead.
+            job = dataclasses.replace(
+                base_job,
+                resume=False,
+                benchmark=False,
+                benchmark_onnx=False,
+                project=str(self._sweep_dir),
+                name=name,
+                **params,
+            )
+            self._runs.append(SweepRun(params=dict(params), job=job))
+
+        slots, devices, threads = plan_concurrency(
+            [r.job for r in self._runs], base_job.device, ram_cache_bytes
+        )
+        if max_parallel > 0 and slots > max_parallel:
+            slots = max_parallel
+            devices = devices[:slots]
+            if threads:
+                threads = (os.cpu_count() or 1) // slots if slots > 1 else 0
+        self._devices = devices
+        self._threads = threads
+        self._workers: dict[TrainProcessWorker, int] = {}
+        self._free_devices = list(devices)
+        self._stopping = False
+
+    # -- Properties ----------------------------------------------------------
+
+    @property
+    def runs(self) -> list[SweepRun]:
+        return list(self._runs)
+
+    @property
+    def slots(self) -> int:
+        return len(self._devices)
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def results_path(self) -> Path:
+        return self._sweep_dir / RESULTS_NAME
+
+    def ranked(self) -> list[int]:
+        """Run indices sorted by mAP50-95 (desc) and inference time (asc)."""
+        return sorted(range(len(self._runs)), key=lambda i: self._runs[i].sort_key())
+
+    # -- Control -------------------------------------------------------------
+
+    def start(self) -> None:
+        self._stopping = False
+        self.log_message.emit(
+            "Sweep: {} runs, {} in parallel{}".format(
+                len(self._runs),
+                self.slots,
+                f", {self._threads} threads each" if self._threads else "",
+            )
+        )
+        self._fill_slots()
+
+    def stop(self) -> None:
+        """Cancel pending runs and terminate the running ones."""
+        self._stopping = True
+        for run in self._runs:
+            if run.status == "queued":
+                run.status = "cancelled"
+        for worker in self._workers:
+            worker.cancel()
+        if not self._workers:
+            self.finished.emit()
+
+    def shutdown(self, timeout_ms: int = 10000) -> None:
+        self.stop()
+        for worker in list(self._workers):
+            worker.wait(timeout_ms)
+
+    # -- Internal ------------------------------------------------------------
+
+    def _fill_slots(self) -> None:
+        while self._free_devices and not self._stopping:
+            index = next(
+                (i for i, r in enumerate(self._runs) if r.status == "queued"), -1
+            )
+            if index < 0:
+                break
+            device = self._free_devices.pop(0)
+            run = self._runs[index]
+            run.job = dataclasses.replace(run.job, device=device, threads=self._threads)
+            run.status = "running"
+
+            worker = TrainProcessWorker(run.job, self)
+            worker.log_message.connect(self._on_log)
+            worker.metrics.connect(self._on_metrics)
+            worker.run_dir.connect(self._on_run_dir)
+            worker.finished_training.connect(self._on_finished)
+            worker.error.connect(self._on_error)
+            worker.cancelled.connect(self._on_cancelled)
+            worker.finished.connect(self._on_worker_finished)
+            self._workers[worker] = index
+            self.run_started.emit(index)
+            worker.start()
+
+        if not self._workers:
+            self._write_results()
+            self.finished.emit()
+
+    def _run_for_sender(self) -> tuple[int, Optional[SweepRun]]:
+        index = self._workers.get(self.sender(), -1)
+        return index, (self._runs[index] if index >= 0 else None)
+
+    @Slot(str)
+    def _on_log(self, text: str) -> None:
+        index, run = self._run_for_sender()
+        if run is not None:
+            self.log_message.emit(f"[{run.job.name}] {text}")
+
+    @Slot(object)
+    def _on_metrics(self, record: TrainingMetrics) -> None:
+        index, run = self._run_for_sender()
+        if run is not None:
+            run.update(record)
+            self.run_updated.emit(index)
+
+    @Slot(str)
+    def _on_run_dir(self, run_dir: str) -> None:
+        index, run = self._run_for_sender()
+        if run is not None:
+            run.run_dir = run_dir
+
+    @Slot(str)
+    def _on_finished(self, best_path: str) -> None:
+        index, run = self._run_for_sender()
+        if run is not None:
+            run.status = "done"
+            run.best_path = best_path
+
+    @Slot(str)
+    def _on_error(self, message: str) -> None:
+        index, run = self._run_for_sender()
+        if run is not None:
+            run.status = "failed"
+            run.error = message
+            self.log_message.emit(f"[{run.job.name}] ERROR: {message}")
+
+    @Slot()
+    def _on_cancelled(self) -> None:
+        index, run = self._run_for_sender()
+        if run is not None:
+            run.status = "cancelled"
+
+    @Slot()
+    def _on_worker_finished(self) -> None:
+        worker = self.sender()
+        index = self._workers.pop(worker, -1)
+        if index < 0:
+            return
+        worker.deleteLater()
+        self._free_devices.append(self._runs[index].job.device)
+        self._write_results()
+        self.run_finished.emit(index)
+        self._fill_slots()
+
+    def _write_results(self) -> None:
+        """Write every run, best first, to :attr:`results_path`."""
+        rows = [self._runs[i].to_row() for i in self.ranked()]
+        if not rows:
+            return
+        try:
+            self._sweep_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.results_path, "w", encoding="utf-8", newline="") as fh:
+                writer = csv.DictWriter(fh, list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+        except OSError as exc:
+            logger.warning("Cannot write sweep results: %s", exc)
@@ -0,0 +1,350 @@
+"""Pre-resized image cache for training.
+
+Ultralytics loads ``<image stem>.npy`` instead of decoding the image when
+such a file exists next to it.  :class:`TrainImageCache` writes those files
+for a built dataset (see :mod:`core.dataset_builder`), already resized so
+that the long side equals the training ``imgsz``; every epoch then reads a
+small uncompressed array (memory-mappable with ``np.load(mmap_mode="r")``)
+instead of decoding a full-resolution JPEG.  Training must run with
+``cache="disk"`` so that Ultralytics keeps using the files.
+
+A manifest records the source signature and size of every entry, so a
+rebuild only converts new or changed images and removes stale arrays.
+
+:func:`estimate_cache` samples a few images to predict the cache size and
+the speedup of the image loading stage; it is shown before training starts.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+
+from core.project_manager import SUPPORTED_IMAGE_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME: str = ".cache_manifest.json"
+
+# Bump when the array layout changes; older manifests trigger a full rebuild.
+_MANIFEST_VERSION: int = 1
+
+# Number of images decoded by estimate_cache().
+DEFAULT_SAMPLE_SIZE: int = 16
+
+# Progress callback: ``(done, total)``.
+CacheProgress = Callable[[int, int], None]
+
+
+class CacheCancelled(Exception):
+    """Raised inside :meth:`TrainImageCache.prepare` when it is cancelled."""
+
+
+@dataclass
+class CacheEstimate:
+    """Predicted cost and benefit of caching a set of images.
+
+    Attributes:
+        image_count: Number of images the estimate covers.
+        cache_bytes: Size of the resized images (RAM cache) or ``.npy``
+            files (disk cache).
+        decode_ms: Mean time to decode and resize one source image.
+        cached_ms: Mean time to load one cached array.  Measured by reading
+            back a just-written probe file, i.e. from a hot page cache: a
+            good figure for the RAM cache, a best case for the disk cache.
+    """
+
+    image_count: int
+    cache_bytes: int
+    decode_ms: float
+    cached_ms: float
+
+    @property
+    def speedup(self) -> float:
+        """Expected speedup of the image loading stage."""
+        return self.decode_ms / self.cached_ms if self.cached_ms > 0 else 0.0
+
+
+@dataclass
+class CachePrepareResult:
+    written: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    cache_bytes: int = 0
+
+
+def _resize_to(img: np.ndarray, imgsz: int) -> np.ndarray:
+    """Resize *img* so that its long side is at most *imgsz* (never upscale).
+
+    Matches Ultralytics ``BaseDataset.load_image``, which keeps the aspect
+    ratio and uses ``INTER_AREA`` when shrinking.
+    """
+    import cv2
+
+    h, w = img.shape[:2]
+    r = imgsz / max(h, w)
+    if r >= 1.0:
+        return img
+    size = (min(int(round(w * r)), imgsz), min(int(round(h * r)), imgsz))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def estimate_cache(
+    image_paths: list[str],
+    imgsz: int,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+) -> Optional[CacheEstimate]:
+    """Estimate cache size and loading speedup from a sample of images.
+
+    Returns ``None`` if none of the sampled images could be read.  The
+    cached read time comes from the OS page cache (see
+    :attr:`CacheEstimate.cached_ms`).
+    """
+    import cv2
+
+    if not image_paths:
+        return None
+    step = max(1, len(image_paths) // sample_size)
+    sample = image_paths[::step][:sample_size]
+
+    decode_s = cached_s = 0.0
+    nbytes = 0
+    measured = 0
+    fd, tmp_name = tempfile.mkstemp(prefix="visionace_cache_probe_", suffix=".npy")
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        for path in sample:
+            t0 = time.perf_counter()
+            img = cv2.imread(path)
+            if img is None:
+                continue
+            img = _resize_to(img, imgsz)
+            t1 = time.perf_counter()
+            np.save(tmp, img, allow_pickle=False)
+            t2 = time.perf_counter()
+            np.load(tmp)
+            t3 = time.perf_counter()
+            decode_s += t1 - t0
+            cached_s += t3 - t2
+            nbytes += img.nbytes
+            measured += 1
+    finally:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+    if not measured:
+        return None
+    return CacheEstimate(
+        image_count=len(image_paths),
+        cache_bytes=int(nbytes / measured * len(image_paths)),
+        decode_ms=decode_s / measured * 1000.0,
+        cached_ms=cached_s / measured * 1000.0,
+    )
+
+
+class TrainImageCache:
+    """Maintains pre-resized ``.npy`` arrays next to the images of a dataset.
+
+    Args:
+        dataset_dir: Dataset root as written by
+            :class:`~core.dataset_builder.DatasetBuilder`.
+        imgsz: Training image size; arrays are resized so their long side
+            is at most this value.
+        workers: Threads used for decoding (OpenCV releases the GIL).
+    """
+
+    def __init__(self, dataset_dir: str, imgsz: int, workers: int = 4) -> None:
+        self._root = Path(dataset_dir)
+        self._imgsz = int(imgsz)
+        self._workers = max(1, workers)
+
+    def image_paths(self) -> list[Path]:
+        """Return every image below ``images/`` of the dataset."""
+        images_dir = self._root / "images"
+        if not images_dir.is_dir():
+            return []
+        return sorted(
+            p for p in images_dir.rglob("*")
+            if p.is_file() and p.suffix.lower() in SUPPORTED_IMAGE_EXTENSIONS
+        )
+
+    def prepare(
+        self,
+        progress: Optional[CacheProgress] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> CachePrepareResult:
+        """Create or refresh the arrays of every dataset image.
+
+        Raises:
+            CacheCancelled: If *is_cancelled* returned ``True``.
+        """
+        import cv2
+
+        old = self._load_manifest()
+        images = self.image_paths()
+        result = CachePrepareResult()
+        manifest: dict[str, list] = {}
+        todo: list[tuple[str, Path, list]] = []
+
+        for img_path in images:
+            key = img_path.relative_to(self._root).as_posix()
+            st = img_path.stat()
+            entry = [st.st_size, st.st_mtime_ns, self._imgsz]
+            npy = img_path.with_suffix(".npy")
+            if old.get(key, [None])[:3] == entry and npy.is_file():
+                manifest[key] = old[key]
+                result.unchanged += 1
+                result.cache_bytes += old[key][3]
+            else:
+                todo.append((key, img_path, entry))
+
+        # Arrays whose image left the dataset.
+        for key in old.keys() - {p.relative_to(self._root).as_posix() for p in images}:
+            try:
+                (self._root / key).with_suffix(".npy").unlink()
+                result.removed += 1
+            except FileNotFoundError:
+                pass
+
+        def convert(item: tuple[str, Path, list]) -> tuple[str, list]:
+            key, img_path, entry = item
+            img = cv2.imread(str(img_path))
+            if img is None:
+                return key, []
+            img = _resize_to(img, self._imgsz)
+            npy = img_path.with_suffix(".npy")
+            tmp = npy.with_name(npy.stem + ".tmp.npy")
+            np.save(tmp, img, allow_pickle=False)
+            os.replace(tmp, npy)
+            return key, entry + [img.nbytes]
+
+        total = len(todo)
+        try:
+            with ThreadPoolExecutor(max_workers=self._workers) as pool:
+                for done, (key, entry) in enumerate(pool.map(convert, todo), start=1):
+                    if entry:
+                        manifest[key] = entry
+                        result.written += 1
+                        result.cache_bytes += entry[3]
+                    else:
+                        logger.warning("Cannot read %s; not cached.", key)
+                    if progress is not None and (done % 64 == 0 or done == total):
+                        progress(done, total)
+                    if is_cancelled is not None and is_cancelled():
+                        pool.shutdown(wait=True, cancel_futures=True)
+                        raise CacheCancelled()
+        finally:
+            self._save_manifest(manifest)
+        return result
+
+    # -- Manifest ------------------------------------------------------------
+
+    def _load_manifest(self) -> dict[str, list]:
+        try:
+            with open(self._root / MANIFEST_NAME, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != _MANIFEST_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def _save_manifest(self, entries: dict[str, list]) -> None:
+        path = self._root / MANIFEST_NAME
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"version": _MANIFEST_VERSION, "entries": entries},
+                fh,
+                separators=(",", ":"),
+            )
+        os.replace(tmp, path)
+
+
+class CacheEstimateWorker(QThread):
+    """Runs :func:`estimate_cache` off the GUI thread.
+
+    If *label_path_fn* is given, only images whose label file exists are
+    counted, matching what :class:`~core.dataset_builder.DatasetBuilder`
+    puts into the dataset.
+
+    Signals:
+        estimated(object): The :class:`CacheEstimate`, or ``None``.
+    """
+
+    estimated = Signal(object)
+
+    def __init__(
+        self,
+        image_paths: list[str],
+        imgsz: int,
+        label_path_fn: Optional[Callable[[str], str]] = None,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self._image_paths = list(image_paths)
+        self._imgsz = imgsz
+        self._label_path_fn = label_path_fn
+
+    def run(self) -> None:  # noqa: D401
+        paths = self._image_paths
+        if self._label_path_fn is not None:
+            paths = [p for p in paths if os.path.isfile(self._label_path_fn(p))]
+        try:
+            estimate = estimate_cache(paths, self._imgsz)
+        except Exception as exc:
+            logger.warning("Cache estimate failed: %s", exc)
+            estimate = None
+        self.estimated.emit(estimate)
+
+
+class CachePrepareWorker(QThread):
+    """Runs :meth:`TrainImageCache.prepare` in a background thread.
+
+    Signals:
+        progress(int, int): ``(done, total)`` images converted.
+        finished_prepare(object): The :class:`CachePrepareResult`.
+        cancelled(): Emitted when preparation was cancelled.
+        error(str): Emitted when preparation fails.
+    """
+
+    progress = Signal(int, int)
+    finished_prepare = Signal(object)
+    cancelled = Signal()
+    error = Signal(str)
+
+    def __init__(self, cache: TrainImageCache, parent=None) -> None:
+        super().__init__(parent)
+        self._cache = cache
+        self._cancel = False
+
+    def cancel(self) -> None:
+        self._cancel = True
+
+    def run(self) -> None:  # noqa: D401
+        try:
+            result = self._cache.prepare(
+                progress=self.progress.emit,
+                is_cancelled=lambda: self._cancel,
+            )
+        except CacheCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as exc:
+            logger.exception("Cache preparation failed: %s", exc)
+            self.error.emit(str(exc))
+            return
+        self.finished_prepare.emit(result)
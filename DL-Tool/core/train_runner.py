@@ -0,0 +1,376 @@
+"""Out-of-process training with a sequential job queue.
+
+Each :class:`~core.trainer.TrainJob` runs in a *spawned* child process so
+that the dataloader does not compete with the GUI for the GIL and an
+out-of-memory kill or native crash only ends the child.  The child sends
+its log lines, metrics records and outcome over a pipe::
+
+    ("log", str) | ("metrics", TrainingMetrics) | ("run_dir", str)
+    ("finished", best_path) | ("error", message)
+
+Cancelling terminates the child; Ultralytics writes ``last.pt`` after every
+epoch, so an interrupted or crashed run can be resumed from there.
+
+Frozen builds must call ``multiprocessing.freeze_support()`` first thing in
+``main()`` for the child process to start.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import multiprocessing
+import sys
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+from core.trainer import TrainJob, run_training
+from core.training_metrics import TrainingMetrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the child to exit after SIGTERM before killing it.
+_TERMINATE_TIMEOUT: float = 5.0
+
+# Pipe poll interval of the supervising thread, in seconds.
+_POLL_INTERVAL: float = 0.1
+
+
+class _LineCapture(io.TextIOBase):
+    """Text stream that forwards complete lines to a callback.
+
+    A progress bar (tqdm) redraws its line with ``\\r`` many times per
+    second; only the state the line has when it is ended with ``\\n`` is
+    forwarded, so the log gets one line per bar instead of every refresh.
+    """
+
+    def __init__(self, callback) -> None:
+        super().__init__()
+        self._callback = callback
+        self._pending = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        *lines, pending = (self._pending + text).split("\n")
+        for line in lines:
+            line = line.rstrip("\r").rsplit("\r", 1)[-1]
+            if line.strip():
+                self._callback(line)
+        # Keep only the latest redraw of the unfinished line.
+        self._pending = pending[pending.rstrip("\r").rfind("\r") + 1:]
+        return len(text)
+
+
+def _child_main(job_data: dict[str, Any], conn: Any) -> None:
+    """Entry point of the training child process."""
+    lock = threading.Lock()
+
+    def send(kind: str, payload: Any) -> None:
+        with lock:
+            try:
+                conn.send((kind, payload))
+            except (BrokenPipeError, OSError):
+                pass
+
+    # Redirect before Ultralytics is imported: its logger binds sys.stdout
+    # at import time.  tqdm progress bars go to stderr.
+    sys.stdout = _LineCapture(lambda text: send("log", text))
+    sys.stderr = _LineCapture(lambda text: send("log", text))
+
+    try:
+        best_path = run_training(
+            TrainJob(**job_data),
+            lambda record: send("metrics", record),
+            lambda run_dir: send("run_dir", run_dir),
+            lambda text: send("log", text),
+        )
+        send("finished", best_path)
+    except BaseException as exc:  # noqa: BLE001 - report everything to the parent
+        send("error", f"{type(exc).__name__}: {exc}")
+    finally:
+        conn.close()
+
+
+class TrainProcessWorker(QThread):
+    """Runs one :class:`TrainJob` in a child process and relays its output.
+
+    The thread only supervises the child; it has the signals of
+    :class:`~core.trainer.TrainWorker` plus :attr:`cancelled`.
+
+    Signals:
+        log_message(str): Log lines written by the child.
+        progress(int, int, float): ``(current_epoch, total_epochs, loss)``
+        metrics(object): :class:`~core.training_metrics.TrainingMetrics`
+        run_dir(str): Ultralytics run directory, once training has started.
+        finished_training(str): Path to the best model weights file.
+        error(str): Training failed or the child process died.
+        cancelled(): The child was terminated by :meth:`cancel`.
+    """
+
+    log_message = Signal(str)
+    progress = Signal(int, int, float)
+    metrics = Signal(object)
+    run_dir = Signal(str)
+    finished_training = Signal(str)
+    error = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, job: TrainJob, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._job = job
+        self._cancel = threading.Event()
+
+    @property
+    def job(self) -> TrainJob:
+        return self._job
+
+    def cancel(self) -> None:
+        """Terminate the training process (returns immediately)."""
+        self._cancel.set()
+
+    def run(self) -> None:  # noqa: D401
+        """Start the child process and relay its messages until it exits."""
+        ctx = multiprocessing.get_context("spawn")
+        recv_conn, send_conn = ctx.Pipe(duplex=False)
+        # Not a daemon: Ultralytics starts dataloader worker processes.
+        proc = ctx.Process(
+            target=_child_main,
+            args=(asdict(self._job), send_conn),
+            name="visionace-train",
+        )
+        try:
+            proc.start()
+        except Exception as exc:
+            logger.exception("Cannot start training process")
+            self.error.emit(str(exc))
+            return
+        finally:
+            send_conn.close()
+
+        outcome_sent = False
+        while True:
+            if self._cancel.is_set():
+                self._terminate(proc)
+                self.cancelled.emit()
+                outcome_sent = True
+                break
+            try:
+                if not recv_conn.poll(_POLL_INTERVAL):
+                    if not proc.is_alive() and not recv_conn.poll(0):
+                        break
+                    continue
+                kind, payload = recv_conn.recv()
+            except (EOFError, OSError):
+                break
+            if self._dispatch(kind, payload):
+                outcome_sent = True
+
+        proc.join(_TERMINATE_TIMEOUT)
+        recv_conn.close()
+        if not outcome_sent:
+            self.error.emit(
+                f"Training process exited unexpectedly (exit code {proc.exitcode})."
+            )
+
+    def _dispatch(self, kind: str, payload: Any) -> bool:
+        """Emit the signal for one message; return ``True`` for an outcome."""
+        if kind == "log":
+            self.log_message.emit(payload)
+        elif kind == "metrics":
+            record: TrainingMetrics = payload
+            self.metrics.emit(record)
+            if record.kind == "epoch":
+                self.progress.emit(record.epoch, record.epochs, record.total_loss)
+        elif kind == "run_dir":
+            self.run_dir.emit(payload)
+        elif kind == "finished":
+            self.finished_training.emit(payload)
+            return True
+        elif kind == "error":
+            self.error.emit(payload)
+            return True
+        return False
+
+    @staticmethod
+    def _terminate(proc: Any) -> None:
+        if not proc.is_alive():
+            return
+        proc.terminate()
+        proc.join(_TERMINATE_TIMEOUT)
+        if proc.is_alive():
+            proc.kill()
+            proc.join(_TERMINATE_TIMEOUT)
+
+
+@dataclass
+class QueuedJob:
+    """A :class:`TrainJob` together with its queue state."""
+
+    job: TrainJob
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    run_dir: str = ""
+    best_path: str = ""
+    error: str = ""
+
+    @property
+    def last_checkpoint(self) -> str:
+        """``last.pt`` of this run if it exists, for resuming."""
+        if not self.run_dir:
+            return ""
+        last = Path(self.run_dir) / "weights" / "last.pt"
+        return str(last) if last.is_file() else ""
+
+
+class TrainingQueue(QObject):
+    """Runs queued training jobs one after another in child processes.
+
+    Worker output of the running job is forwarded through
+    :attr:`log_message`, :attr:`progress` and :attr:`metrics`.
+
+    Signals:
+        job_added(int): Index of a newly queued job.
+        job_started(int): Index of the job that started running.
+        job_finished(int, str): Index and best weights path.
+        job_failed(int, str): Index and error message.
+        job_cancelled(int): Index of a job cancelled while running.
+        idle(): No job is running and none is pending.
+    """
+
+    job_added = Signal(int)
+    job_started = Signal(int)
+    job_finished = Signal(int, str)
+    job_failed = Signal(int, str)
+    job_cancelled = Signal(int)
+    idle = Signal()
+
+    log_message = Signal(str)
+    progress = Signal(int, int, float)
+    metrics = Signal(object)
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._jobs: list[QueuedJob] = []
+        self._current = -1
+        self._worker: Optional[TrainProcessWorker] = None
+
+    # -- Properties ----------------------------------------------------------
+
+    @property
+    def jobs(self) -> list[QueuedJob]:
+        return list(self._jobs)
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None
+
+    @property
+    def current_index(self) -> int:
+        """Index of the running job, or ``-1``."""
+        return self._current if self._worker is not None else -1
+
+    # -- Public methods ------------------------------------------------------
+
+    def enqueue(self, job: TrainJob) -> int:
+        """Append *job*; it starts immediately if nothing is running."""
+        self._jobs.append(QueuedJob(job))
+        index = len(self._jobs) - 1
+        self.job_added.emit(index)
+        if self._worker is None:
+            self._start_next()
+        return index
+
+    def cancel_current(self) -> None:
+        """Terminate the running job; pending jobs continue afterwards."""
+        if self._worker is not None:
+            self._worker.cancel()
+
+    def clear_pending(self) -> None:
+        """Mark every job that has not started yet as cancelled."""
+        for entry in self._jobs:
+            if entry.status == "queued":
+                entry.status = "cancelled"
+
+    def stop_all(self) -> None:
+        """Drop pending jobs and terminate the running one."""
+        self.clear_pending()
+        self.cancel_current()
+
+    def shutdown(self, timeout_ms: int = 10000) -> None:
+        """Stop everything and wait for the child process to exit."""
+        self.stop_all()
+        if self._worker is not None:
+            self._worker.wait(timeout_ms)
+
+    # -- Internal ------------------------------------------------------------
+
+    def _start_next(self) -> None:
+        for index, entry in enumerate(self._jobs):
+            if entry.status == "queued":
+                break
+        else:
+            self._current = -1
+            self.idle.emit()
+            return
+
+        self._current = index
+        entry.status = "running"
+        worker = TrainProcessWorker(entry.job, self)
+        worker.log_message.connect(self.log_message)
+        worker.progress.connect(self.progress)
+        worker.metrics.connect(self.metrics)
+        worker.run_dir.connect(self._on_run_dir)
+        worker.finished_training.connect(self._on_finished)
+        worker.error.connect(self._on_error)
+        worker.cancelled.connect(self._on_cancelled)
+        worker.finished.connect(self._on_worker_finished)
+        self._worker = worker
+        self.job_started.emit(index)
+        worker.start()
+
+    def _entry_for_sender(self) -> Optional[QueuedJob]:
+        if self.sender() is not self._worker or self._current < 0:
+            return None
+        return self._jobs[self._current]
+
+    @Slot(str)
+    def _on_run_dir(self, run_dir: str) -> None:
+        entry = self._entry_for_sender()
+        if entry is not None:
+            entry.run_dir = run_dir
+
+    @Slot(str)
+    def _on_finished(self, best_path: str) -> None:
+        entry = self._entry_for_sender()
+        if entry is not None:
+            entry.status = "done"
+            entry.best_path = best_path
+            self.job_finished.emit(self._current, best_path)
+
+    @Slot(str)
+    def _on_error(self, message: str) -> None:
+        entry = self._entry_for_sender()
+        if entry is not None:
+            entry.status = "failed"
+            entry.error = message
+            self.job_failed.emit(self._current, message)
+
+    @Slot()
+    def _on_cancelled(self) -> None:
+        entry = self._entry_for_sender()
+        if entry is not None:
+            entry.status = "cancelled"
+            self.job_cancelled.emit(self._current)
+
+    @Slot()
+    def _on_worker_finished(self) -> None:
+        if self.sender() is not self._worker:
+            return
+        self._worker.deleteLater()
+        self._worker = None
+        self._start_next()
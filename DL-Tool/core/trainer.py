@@ -1,86 +1,222 @@
-"""Training execution via Ultralytics in a background thread."""
+"""Training execution via Ultralytics.
+
+:func:`run_training` performs one :class:`TrainJob`.  It runs either in a
+background thread (:class:`TrainWorker`) or in a child process
+(:class:`core.train_runner.TrainProcessWorker`), which isolates the GUI from
+dataloader load and crashes.
+"""
 
 from __future__ import annotations
 
-import io
 import logging
-import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
-import yaml
 from PySide6.QtCore import QThread, Signal
 
+# Re-exported: data.yaml is written by the dataset builder.
+from core.dataset_builder import generate_data_yaml  # noqa: F401
+from core.training_metrics import MetricsCollector, TrainingMetrics
+
 logger = logging.getLogger(__name__)
 
 
-def generate_data_yaml(
-    train_path: str,
-    val_path: str,
-    class_names: list[str],
-    output_path: str,
-) -> str:
-    """Create a YOLO-format ``data.yaml`` file.
+@dataclass
+class TrainJob:
+    """Settings of one training run.
+
+    With ``resume=True``, *base_model_path* must be the ``last.pt`` of an
+    interrupted run; Ultralytics then restores every other setting from
+    that checkpoint.
 
-    Args:
-        train_path: Absolute path to the training images directory.
-        val_path: Absolute path to the validation images directory.
-        class_names: Ordered list of class names (index == class id).
-        output_path: Where to write the YAML file.
+    *cache* is Ultralytics' image cache: ``""`` (off), ``"ram"`` or
+    ``"disk"``; use ``"disk"`` for datasets prepared with
+    :class:`core.train_cache.TrainImageCache`.  *workers* is the number of
+    dataloader processes (``-1`` keeps the Ultralytics default).
+    *project* / *name* place the run directory (``<project>/<name>``);
+    *threads* caps the torch CPU threads of the run (``0`` = all cores),
+    which matters when several runs share one machine.
+    *benchmark* times the best weights after training (see
+    :mod:`core.inference_benchmark`), optionally with an ONNX export.
+    """
+
+    model_type: str
+    base_model_path: str
+    data_yaml_path: str
+    epochs: int = 100
+    batch_size: int = 16
+    imgsz: int = 640
+    lr: float = 0.01
+    device: str = ""
+    metrics_file: str = ""
+    resume: bool = False
+    cache: str = ""
+    workers: int = -1
+    project: str = ""
+    name: str = ""
+    threads: int = 0
+    benchmark: bool = False
+    benchmark_onnx: bool = False
+
+    def train_kwargs(self) -> dict[str, Any]:
+        """Return the keyword arguments for ``model.train()``."""
+        if self.resume:
+            kwargs: dict[str, Any] = {"resume": True}
+        else:
+            kwargs = {
+                "data": self.data_yaml_path,
+                "epochs": self.epochs,
+                "batch": self.batch_size,
+                "imgsz": self.imgsz,
+                "lr0": self.lr,
+                "verbose": True,
+            }
+            if self.cache:
+                kwargs["cache"] = self.cache
+            if self.project:
+                kwargs["project"] = self.project
+            if self.name:
+                kwargs["name"] = self.name
+        if self.workers >= 0:
+            kwargs["workers"] = self.workers
+        if self.device:
+            kwargs["device"] = self.device
+        return kwargs
+
+
+def run_training(
+    job: TrainJob,
+    on_metrics: Callable[[TrainingMetrics], None],
+    on_run_dir: Optional[Callable[[str], None]] = None,
+    on_log: Optional[Callable[[str], None]] = None,
+) -> str:
+    """Train *job* and return the path of the best weights (``""`` if unknown).
 
-    Returns:
-        The absolute path to the written YAML file.
+    *on_metrics* receives :class:`TrainingMetrics` records and *on_run_dir*
+    the Ultralytics run directory as soon as training starts.  *on_log*
+    receives the lines of the post-training benchmark (default: the module
+    logger).  All are called on the calling thread.  Exceptions propagate
+    to the caller.
+    """
+    if job.model_type == "RT-DETR":
+        from ultralytics import RTDETR
+        model = RTDETR(job.base_model_path)
+    else:
+        from ultralytics import YOLO
+        model = YOLO(job.base_model_path)
+
+    if job.threads > 0:
+        import torch
+        torch.set_num_threads(job.threads)
+
+    collector = MetricsCollector(on_metrics, job.metrics_file)
+    collector.attach(model)
+    if on_run_dir is not None:
+        model.add_callback("on_train_start", lambda trainer: on_run_dir(str(trainer.save_dir)))
+
+    try:
+        results = model.train(**job.train_kwargs())
+    finally:
+        collector.close()
+    best_path = find_best_weights(model, results)
+    if job.benchmark and best_path:
+        _benchmark_weights(job, best_path, on_log or logger.info)
+    return best_path
+
+
+def _benchmark_weights(job: TrainJob, best_path: str, log: Callable[[str], None]) -> None:
+    """Benchmark *best_path* on validation images; failures are only logged."""
+    from core.inference_benchmark import (
+        DEFAULT_INFER_SIZES, run_benchmark, sample_dataset_images,
+    )
+
+    try:
+        run_benchmark(
+            best_path,
+            job.model_type,
+            sample_dataset_images(job.data_yaml_path),
+            infer_sizes=tuple(sorted(set(DEFAULT_INFER_SIZES) | {job.imgsz})),
+            export_onnx=job.benchmark_onnx,
+            log=log,
+        )
+    except Exception as exc:
+        logger.exception("Benchmark of %s failed: %s", best_path, exc)
+        log(f"Benchmark failed: {exc}")
+
+
+def find_best_weights(model: Any, results: Any) -> str:
+    """Resolve the path to the best trained weights.
+
+    Ultralytics typically saves the best weights at
+    ``<project>/train/weights/best.pt``.
     """
-    data: dict[str, Any] = {
-        "train": train_path,
-        "val": val_path,
-        "nc": len(class_names),
-        "names": class_names,
-    }
+    try:
+        # results may expose save_dir or the trainer has it.
+        save_dir = getattr(results, "save_dir", None)
+        if save_dir is not None:
+            best = Path(save_dir) / "weights" / "best.pt"
+            if best.exists():
+                return str(best)
+    except Exception:
+        pass
+
+    # Fallback: try model.trainer.
+    try:
+        trainer = getattr(model, "trainer", None)
+        if trainer is not None:
+            best = Path(trainer.save_dir) / "weights" / "best.pt"
+            if best.exists():
+                return str(best)
+    except Exception:
+        pass
+
+    return ""
 
-    out = Path(output_path)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    with open(out, "w", encoding="utf-8") as fh:
-        yaml.dump(data, fh, default_flow_style=False, sort_keys=False)
 
-    logger.info("data.yaml written to %s", out)
-    return str(out.resolve())
+# Logger Ultralytics writes its training log to.
+_ULTRALYTICS_LOGGER: str = "ultralytics"
 
 
-class _StdoutCapture(io.TextIOBase):
-    """Thin wrapper that intercepts ``write()`` calls and forwards the text
-    to a callback while still writing to the original stream."""
+class _CallbackLogHandler(logging.Handler):
+    """Logging handler that forwards each formatted record to a callback."""
 
-    def __init__(self, callback, original_stream):
+    def __init__(self, callback) -> None:
         super().__init__()
         self._callback = callback
-        self._original = original_stream
 
-    def write(self, text: str) -> int:
-        if text and text.strip():
-            self._callback(text.rstrip("\n"))
-        if self._original is not None:
-            return self._original.write(text)
-        return len(text)
-
-    def flush(self) -> None:
-        if self._original is not None:
-            self._original.flush()
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._callback(self.format(record))
+        except Exception:
+            self.handleError(record)
 
 
 class TrainWorker(QThread):
-    """Background worker that trains a YOLO or RT-DETR model.
+    """Background worker that trains a YOLO or RT-DETR model in-process.
+
+    Progress is read from Ultralytics trainer callbacks via a
+    :class:`~core.training_metrics.MetricsCollector`; the log view gets the
+    records of the Ultralytics logger through a handler, so ``sys.stdout``
+    of the process is left alone.  The GUI uses the out-of-process
+    :class:`core.train_runner.TrainProcessWorker`, which has the same
+    signals.
 
     Signals:
-        log_message(str): Raw training log lines captured from stdout.
+        log_message(str): Training log lines of the Ultralytics logger.
         progress(int, int, float): ``(current_epoch, total_epochs, loss)``
-            *Note*: loss may be ``0.0`` if it cannot be parsed from the log.
+            emitted after every epoch; loss is the sum of the training losses.
+        metrics(object): :class:`~core.training_metrics.TrainingMetrics`
+            per epoch and (rate limited) per batch.
+        run_dir(str): Ultralytics run directory, once training has started.
         finished_training(str): Path to the best model weights file.
         error(str): Emitted when training fails.
     """
 
     log_message = Signal(str)
     progress = Signal(int, int, float)
+    metrics = Signal(object)
+    run_dir = Signal(str)
     finished_training = Signal(str)
     error = Signal(str)
 
@@ -94,52 +230,49 @@ class TrainWorker(QThread):
         imgsz: int = 640,
         lr: float = 0.01,
         device: str = "",
+        metrics_file: str = "",
+        cache: str = "",
+        workers: int = -1,
         parent: Optional[QThread] = None,
     ) -> None:
+        """Initialise the worker.
+
+        *metrics_file* optionally names a ``.jsonl`` / ``.csv`` file that
+        receives every batch and epoch record; a relative name is placed in
+        the Ultralytics run directory next to ``results.csv``.  *cache* and
+        *workers* are described in :class:`TrainJob`.
+        """
         super().__init__(parent)
-        self._model_type = model_type
-        self._base_model_path = base_model_path
-        self._data_yaml_path = data_yaml_path
-        self._epochs = epochs
-        self._batch_size = batch_size
-        self._imgsz = imgsz
-        self._lr = lr
-        self._device = device
+        self._job = TrainJob(
+            model_type=model_type,
+            base_model_path=base_model_path,
+            data_yaml_path=data_yaml_path,
+            epochs=epochs,
+            batch_size=batch_size,
+            imgsz=imgsz,
+            lr=lr,
+            device=device,
+            metrics_file=metrics_file,
+            cache=cache,
+            workers=workers,
+        )
+
+    @property
+    def job(self) -> TrainJob:
+        return self._job
 
     # -- Thread entry --------------------------------------------------------
 
     def run(self) -> None:  # noqa: D401
         """Instantiate the model and run ``model.train()``."""
-        original_stdout = sys.stdout
-        capture = _StdoutCapture(self._on_log_line, original_stdout)
+        handler = _CallbackLogHandler(self._on_log_line)
+        ultralytics_logger = logging.getLogger(_ULTRALYTICS_LOGGER)
+        ultralytics_logger.addHandler(handler)
 
         try:
-            # Load the model.
-            if self._model_type == "RT-DETR":
-                from ultralytics import RTDETR
-                model = RTDETR(self._base_model_path)
-            else:
-                from ultralytics import YOLO
-                model = YOLO(self._base_model_path)
-
-            # Redirect stdout so we can capture training logs.
-            sys.stdout = capture
-
-            train_kwargs: dict[str, Any] = {
-                "data": self._data_yaml_path,
-                "epochs": self._epochs,
-                "batch": self._batch_size,
-                "imgsz": self._imgsz,
-                "lr0": self._lr,
-                "verbose": True,
-            }
-            if self._device:
-                train_kwargs["device"] = self._device
-
-            results = model.train(**train_kwargs)
-
-            # Determine best weights path.
-            best_path = self._find_best_weights(model, results)
+            best_path = run_training(
+                self._job, self._on_metrics, self.run_dir.emit, self._on_log_line
+            )
             self.finished_training.emit(best_path)
 
         except Exception as exc:
@@ -147,70 +280,16 @@ class TrainWorker(QThread):
             self.error.emit(str(exc))
 
         finally:
-            sys.stdout = original_stdout
+            ultralytics_logger.removeHandler(handler)
 
     # -- Internal helpers ----------------------------------------------------
 
     def _on_log_line(self, text: str) -> None:
         """Handle a single captured log line."""
         self.log_message.emit(text)
-        self._try_parse_progress(text)
-
-    def _try_parse_progress(self, text: str) -> None:
-        """Attempt to extract epoch and loss information from a log line.
-
-        Ultralytics log lines during training typically look like:
-            ``     1/100   ...  0.1234  ...``
-        We try to parse epoch info from this pattern.
-        """
-        parts = text.split()
-        for part in parts:
-            if "/" in part:
-                tokens = part.split("/")
-                if len(tokens) == 2:
-                    try:
-                        current = int(tokens[0])
-                        total = int(tokens[1])
-                        # Try to grab a loss value from subsequent numeric tokens.
-                        loss = 0.0
-                        for p in parts:
-                            try:
-                                val = float(p)
-                                if 0 < val < 100:
-                                    loss = val
-                                    break
-                            except ValueError:
-                                continue
-                        self.progress.emit(current, total, loss)
-                        return
-                    except ValueError:
-                        continue
-
-    @staticmethod
-    def _find_best_weights(model: Any, results: Any) -> str:
-        """Resolve the path to the best trained weights.
-
-        Ultralytics typically saves the best weights at
-        ``<project>/train/weights/best.pt``.
-        """
-        try:
-            # results may expose save_dir or the trainer has it.
-            save_dir = getattr(results, "save_dir", None)
-            if save_dir is not None:
-                best = Path(save_dir) / "weights" / "best.pt"
-                if best.exists():
-                    return str(best)
-        except Exception:
-            pass
-
-        # Fallback: try model.trainer.
-        try:
-            trainer = getattr(model, "trainer", None)
-            if trainer is not None:
-                best = Path(trainer.save_dir) / "weights" / "best.pt"
-                if best.exists():
-                    return str(best)
-        except Exception:
-            pass
 
-        return ""
+    def _on_metrics(self, record: TrainingMetrics) -> None:
+        """Forward a collector record (called on the training thread)."""
+        self.metrics.emit(record)
+        if record.kind == "epoch":
+            self.progress.emit(record.epoch, record.epochs, record.total_loss)
@@ -0,0 +1,295 @@
+"""Structured training metrics collected from Ultralytics trainer callbacks.
+
+:class:`MetricsCollector` registers itself on an Ultralytics model and turns
+trainer state into :class:`TrainingMetrics` records: one per training batch
+(losses, learning rate, throughput, ETA) and one per epoch after validation
+(additionally mAP / precision / recall).  Batch records are rate limited
+before they reach the UI; every record can be written to a
+:class:`MetricsSink` (JSON Lines or CSV).
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Minimum interval between two batch records forwarded to the UI.
+DEFAULT_BATCH_INTERVAL: float = 0.25
+
+# Smoothing factor of the exponential moving average of the batch time.
+_EMA_ALPHA: float = 0.1
+
+
+@dataclass
+class TrainingMetrics:
+    """One snapshot of the training state.
+
+    Attributes:
+        kind: ``"batch"`` or ``"epoch"``.
+        epoch: 1-based epoch number.
+        epochs: Total number of epochs.
+        batch: 1-based batch index within the epoch (``batches`` for epoch
+            records).
+        batches: Number of batches per epoch.
+        losses: Running mean of each training loss in the current epoch,
+            e.g. ``{"box_loss": 1.2, "cls_loss": 0.8, "dfl_loss": 1.1}``.
+        lr: Learning rate of the first parameter group.
+        images_per_sec: Smoothed training throughput.
+        eta_seconds: Estimated time until training ends (validation time is
+            not included).
+        elapsed_seconds: Time since training started.
+        metrics: Validation metrics (epoch records only), e.g.
+            ``{"metrics/mAP50(B)": 0.61, "metrics/mAP50-95(B)": 0.42}``, and
+            the validator's per-image timings (``"speed/inference(ms)"``).
+    """
+
+    kind: str
+    epoch: int
+    epochs: int
+    batch: int
+    batches: int
+    losses: dict[str, float] = field(default_factory=dict)
+    lr: float = 0.0
+    images_per_sec: float = 0.0
+    eta_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    metrics: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total_loss(self) -> float:
+        return float(sum(self.losses.values()))
+
+    @property
+    def progress(self) -> float:
+        """Overall progress in ``[0, 1]``."""
+        if self.epochs <= 0 or self.batches <= 0:
+            return 0.0
+        return ((self.epoch - 1) + self.batch / self.batches) / self.epochs
+
+    def metric(self, suffix: str) -> Optional[float]:
+        """Return the first validation metric whose key contains *suffix*.
+
+        ``metric("mAP50-95")`` matches ``metrics/mAP50-95(B)`` as well as the
+        mask variant of segmentation models.
+        """
+        for key, value in self.metrics.items():
+            if suffix in key:
+                return value
+        return None
+
+    def to_row(self) -> dict[str, Any]:
+        """Flatten the record for CSV / JSON output."""
+        row = asdict(self)
+        losses = row.pop("losses")
+        metrics = row.pop("metrics")
+        row.update({f"train/{k}": v for k, v in losses.items()})
+        row.update(metrics)
+        return row
+
+
+class MetricsSink:
+    """Append-only writer of :class:`TrainingMetrics` records.
+
+    The format follows the file extension: ``.csv`` writes a table, anything
+    else writes JSON Lines.  CSV columns cannot grow after the header is
+    written, so rows are buffered until the first epoch record (which
+    carries the validation metrics) fixes the header.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._csv = self._path.suffix.lower() == ".csv"
+        self._fh = open(self._path, "w", encoding="utf-8", newline="")
+        self._writer: Optional[csv.DictWriter] = None
+        self._pending: list[dict[str, Any]] = []
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def write(self, record: TrainingMetrics) -> None:
+        row = record.to_row()
+        if not self._csv:
+            self._fh.write(json.dumps(row) + "\n")
+            return
+        if self._writer is None:
+            self._pending.append(row)
+            if record.kind == "epoch":
+                self._flush_pending()
+            return
+        self._writer.writerow(row)
+
+    def close(self) -> None:
+        if self._csv and self._writer is None and self._pending:
+            self._flush_pending()
+        self._fh.close()
+
+    def _flush_pending(self) -> None:
+        fieldnames: list[str] = []
+        for row in self._pending:
+            fieldnames.extend(k for k in row if k not in fieldnames)
+        self._writer = csv.DictWriter(self._fh, fieldnames, extrasaction="ignore")
+        self._writer.writeheader()
+        self._writer.writerows(self._pending)
+        self._pending.clear()
+
+
+class MetricsCollector:
+    """Turns Ultralytics trainer callbacks into :class:`TrainingMetrics`.
+
+    Args:
+        on_record: Called with every epoch record and with batch records at
+            most every *batch_interval* seconds (the last batch of an epoch
+            is always reported).  Runs on the training thread.
+        sink_path: Optional file receiving *every* record.  A relative path
+            is resolved against the trainer's ``save_dir``.
+        batch_interval: Rate limit for batch records, in seconds.
+    """
+
+    def __init__(
+        self,
+        on_record: Callable[[TrainingMetrics], None],
+        sink_path: str = "",
+        batch_interval: float = DEFAULT_BATCH_INTERVAL,
+    ) -> None:
+        self._on_record = on_record
+        self._sink_path = sink_path
+        self._batch_interval = batch_interval
+        self._sink: Optional[MetricsSink] = None
+
+        self._start = 0.0
+        self._last_batch_end = 0.0
+        self._last_emit = 0.0
+        self._batch_time = 0.0  # EMA of seconds per batch
+        self._batch_i = 0
+
+    @property
+    def sink_path(self) -> Optional[Path]:
+        return self._sink.path if self._sink is not None else None
+
+    def attach(self, model: Any) -> None:
+        """Register the callbacks on an Ultralytics ``YOLO`` / ``RTDETR`` model."""
+        model.add_callback("on_train_start", self._on_train_start)
+        model.add_callback("on_train_epoch_start", self._on_epoch_start)
+        model.add_callback("on_train_batch_end", self._on_batch_end)
+        model.add_callback("on_fit_epoch_end", self._on_fit_epoch_end)
+        model.add_callback("on_train_end", self._on_train_end)
+
+    def close(self) -> None:
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    # -- Callbacks (training thread) -----------------------------------------
+
+    def _on_train_start(self, trainer: Any) -> None:
+        self._start = time.perf_counter()
+        if self._sink_path:
+            path = self._sink_path
+            if not os.path.isabs(path):
+                path = os.path.join(str(trainer.save_dir), path)
+            try:
+                self._sink = MetricsSink(path)
+            except OSError as exc:
+                logger.warning("Cannot open metrics file %s: %s", path, exc)
+
+    def _on_epoch_start(self, trainer: Any) -> None:
+        self._batch_i = 0
+        self._last_batch_end = time.perf_counter()
+
+    def _on_batch_end(self, trainer: Any) -> None:
+        now = time.perf_counter()
+        self._batch_i += 1
+        dt = now - self._last_batch_end
+        self._last_batch_end = now
+        self._batch_time = (
+            dt if self._batch_time == 0.0
+            else (1.0 - _EMA_ALPHA) * self._batch_time + _EMA_ALPHA * dt
+        )
+
+        batches = self._batch_count(trainer)
+        last_in_epoch = self._batch_i >= batches
+        record = self._record(trainer, "batch", self._batch_i, batches, now)
+        if self._sink is not None:
+            self._sink.write(record)
+        if last_in_epoch or now - self._last_emit >= self._batch_interval:
+            self._last_emit = now
+            self._on_record(record)
+
+    def _on_fit_epoch_end(self, trainer: Any) -> None:
+        batches = self._batch_count(trainer)
+        record = self._record(trainer, "epoch", batches, batches, time.perf_counter())
+        record.metrics = {
+            k: float(v) for k, v in (getattr(trainer, "metrics", None) or {}).items()
+        }
+        # Per-image validation timings, e.g. "speed/inference(ms)".
+        speed = getattr(getattr(trainer, "validator", None), "speed", None) or {}
+        record.metrics.update({f"speed/{k}(ms)": float(v) for k, v in speed.items()})
+        if self._sink is not None:
+            self._sink.write(record)
+        self._on_record(record)
+
+    def _on_train_end(self, trainer: Any) -> None:
+        self.close()
+
+    # -- Helpers -------------------------------------------------------------
+
+    @staticmethod
+    def _batch_count(trainer: Any) -> int:
+        try:
+            return max(1, len(trainer.train_loader))
+        except TypeError:
+            return 1
+
+    def _record(
+        self,
+        trainer: Any,
+        kind: str,
+        batch: int,
+        batches: int,
+        now: float,
+    ) -> TrainingMetrics:
+        epoch = int(trainer.epoch) + 1
+        epochs = int(trainer.epochs)
+        remaining = (epochs - epoch) * batches + (batches - batch)
+        batch_size = getattr(trainer, "batch_size", 0) or 0
+        return TrainingMetrics(
+            kind=kind,
+            epoch=epoch,
+            epochs=epochs,
+            batch=batch,
+            batches=batches,
+            losses=self._losses(trainer),
+            lr=self._learning_rate(trainer),
+            images_per_sec=batch_size / self._batch_time if self._batch_time > 0 else 0.0,
+            eta_seconds=remaining * self._batch_time,
+            elapsed_seconds=now - self._start,
+        )
+
+    @staticmethod
+    def _losses(trainer: Any) -> dict[str, float]:
+        tloss = getattr(trainer, "tloss", None)
+        if tloss is None:
+            return {}
+        values = tloss.tolist() if hasattr(tloss, "tolist") else tloss
+        if not isinstance(values, list):
+            values = [values]
+        names = list(getattr(trainer, "loss_names", None) or [])
+        names += [f"loss{i}" for i in range(len(names), len(values))]
+        return {name: float(v) for name, v in zip(names, values)}
+
+    @staticmethod
+    def _learning_rate(trainer: Any) -> float:
+        try:
+            return float(trainer.optimizer.param_groups[0]["lr"])
+        except (AttributeError, IndexError, KeyError, TypeError):
+            return 0.0
@@ -0,0 +1,391 @@
+"""Bulk NumPy codec for YOLO ``.txt`` annotation files.
+
+A file (or a concatenated batch of files) is parsed into a single
+:class:`YoloLabels` structure of flat arrays instead of one Python object
+per line::
+
+    class_ids  (n,)    int32    class id of every row
+    offsets    (n+1,)  int64    row i owns coords[offsets[i]:offsets[i+1]]
+    coords     (m,)    float64  normalized values, x/y interleaved
+
+Rows are ragged: bbox rows hold 4 values (``cx cy w h``), polygon rows an
+even number >= 6.  Numbers are parsed in one ``np.fromstring`` call and
+tokens per line are counted on the raw bytes, so no Python loop touches
+individual values.  Writing builds one ``%``-format string for the whole
+file and applies it in a single call, like ``np.savetxt`` without the
+per-row loop.
+
+:class:`~core.label_manager.LabelItem` objects are only created by
+:meth:`YoloLabels.to_label_items`, for the rows that are actually shown.
+
+Files in the legacy ``<class_name> <class_id> ...`` layout are read by a
+slower per-line fallback; their names are kept in :attr:`YoloLabels.names`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import warnings
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from core.label_manager import LabelItem
+
+logger = logging.getLogger(__name__)
+
+# Rows with fewer tokens (class id + 4 values) are ignored, as before.
+_MIN_TOKENS: int = 5
+
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[[9, 10, 11, 12, 13, 32]] = True
+
+_DEFAULT_COLORS: list[str] = [
+    "#FF3838", "#FF9D97", "#FF701F", "#FFB21D", "#CFD231",
+    "#48F90A", "#92CC17", "#3DDB86", "#1A9334", "#00D4BB",
+    "#2C99A8", "#00C2FF", "#344593", "#6473FF", "#0018EC",
+    "#8438FF", "#520085", "#CB38FF", "#FF95C8", "#FF37C7",
+]
+
+
+def color_for_class(class_id: int) -> str:
+    """Return a deterministic hex color for a class id."""
+    return _DEFAULT_COLORS[class_id % len(_DEFAULT_COLORS)]
+
+
+@dataclass
+class YoloLabels:
+    """Struct-of-arrays view of YOLO annotation rows.
+
+    Attributes:
+        class_ids: Class id of every row.
+        offsets: Row boundaries into :attr:`coords` (length ``n + 1``).
+        coords: Normalized coordinates of all rows, concatenated.
+        names: Per-row class names of legacy files, else ``None``.
+        file_index: For batches, the index of the source file of every row.
+    """
+
+    class_ids: np.ndarray
+    offsets: np.ndarray
+    coords: np.ndarray
+    names: Optional[list[str]] = None
+    file_index: Optional[np.ndarray] = None
+
+    @classmethod
+    def empty(cls) -> "YoloLabels":
+        return cls(
+            np.zeros(0, dtype=np.int32),
+            np.zeros(1, dtype=np.int64),
+            np.zeros(0, dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of coordinate values per row."""
+        return np.diff(self.offsets)
+
+    @property
+    def is_bbox(self) -> np.ndarray:
+        return self.lengths == 4
+
+    @property
+    def is_standard(self) -> bool:
+        """``False`` if the rows came from a legacy (class name first) file."""
+        return self.names is None
+
+    def row(self, i: int) -> np.ndarray:
+        return self.coords[self.offsets[i]:self.offsets[i + 1]]
+
+    def bboxes(self) -> np.ndarray:
+        """Return ``(k, 4)`` ``cx cy w h`` of the bbox rows."""
+        starts = self.offsets[:-1][self.is_bbox]
+        return self.coords[starts[:, None] + np.arange(4)]
+
+    def class_counts(self, minlength: int = 0) -> np.ndarray:
+        """Return the number of rows per class id."""
+        if not len(self):
+            return np.zeros(minlength, dtype=np.int64)
+        return np.bincount(self.class_ids, minlength=minlength)
+
+    def select(self, rows: np.ndarray) -> "YoloLabels":
+        """Return the rows at the given indices (or boolean mask)."""
+        rows = np.arange(len(self))[rows]
+        lengths = self.lengths[rows]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        take = np.repeat(self.offsets[rows] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return YoloLabels(
+            class_ids=self.class_ids[rows],
+            offsets=offsets,
+            coords=self.coords[take],
+            names=[self.names[i] for i in rows] if self.names is not None else None,
+            file_index=self.file_index[rows] if self.file_index is not None else None,
+        )
+
+    def for_file(self, index: int) -> "YoloLabels":
+        """Return the rows of file *index* of a batch."""
+        if self.file_index is None:
+            return self
+        return self.select(np.flatnonzero(self.file_index == index))
+
+    # -- Conversion ----------------------------------------------------------
+
+    def to_label_items(
+        self,
+        image_width: int,
+        image_height: int,
+        class_names: dict[int, str],
+    ) -> list[LabelItem]:
+        """Create :class:`LabelItem` objects in absolute pixel coordinates."""
+        if not len(self):
+            return []
+        # x at even, y at odd positions within each row (rows may be odd-sized
+        # in malformed files; the trailing value is then dropped below).
+        pos = np.arange(len(self.coords)) - np.repeat(self.offsets[:-1], self.lengths)
+        scale = np.where(pos % 2 == 0, image_width, image_height)
+        pixels = (self.coords * scale).astype(np.float32)
+
+        # bbox: cx cy w h -> xyxy.
+        bbox_rows = np.flatnonzero(self.is_bbox)
+        boxes: dict[int, tuple[float, float, float, float]] = {}
+        if len(bbox_rows):
+            b = self.bboxes() * (image_width, image_height, image_width, image_height)
+            x1 = b[:, 0] - b[:, 2] / 2.0
+            y1 = b[:, 1] - b[:, 3] / 2.0
+            x2 = b[:, 0] + b[:, 2] / 2.0
+            y2 = b[:, 1] + b[:, 3] / 2.0
+            boxes = dict(zip(bbox_rows.tolist(), zip(
+                x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist()
+            )))
+
+        offsets = self.offsets.tolist()
+        items: list[LabelItem] = []
+        for i, class_id in enumerate(self.class_ids.tolist()):
+            name = self.names[i] if self.names is not None else None
+            if not name:
+                name = class_names.get(class_id, str(class_id))
+            box = boxes.get(i)
+            item = LabelItem(
+                class_id=class_id,
+                class_name=name,
+                label_type="bbox" if box is not None else "polygon",
+                color=color_for_class(class_id),
+            )
+            if box is not None:
+                item.set_bbox(*box)
+            else:
+                start, end = offsets[i], offsets[i + 1]
+                end -= (end - start) % 2
+                item.points = pixels[start:end].reshape(-1, 2)
+            items.append(item)
+        return items
+
+    @classmethod
+    def from_flat(
+        cls,
+        class_ids: Sequence[int],
+        lengths: Sequence[int],
+        coords: np.ndarray,
+    ) -> "YoloLabels":
+        """Build from concatenated coordinates and the value count per row."""
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(
+            class_ids=np.asarray(class_ids, dtype=np.int32),
+            offsets=offsets,
+            coords=np.asarray(coords, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_rows(
+        cls,
+        class_ids: Sequence[int],
+        rows: Sequence[Sequence[float]],
+    ) -> "YoloLabels":
+        """Build from per-row normalized coordinates."""
+        return cls.from_flat(
+            class_ids,
+            [len(r) for r in rows],
+            np.fromiter((v for r in rows for v in r), dtype=np.float64),
+        )
+
+    def to_text(self, precision: int = 6) -> str:
+        """Format all rows as standard YOLO lines (trailing newline included)."""
+        if not len(self):
+            return ""
+        lengths = self.lengths
+        row_fmt: dict[int, str] = {}
+        for n in np.unique(lengths).tolist():
+            row_fmt[n] = "%d" + f" %.{precision}f" * n + "\n"
+        fmt = "".join([row_fmt[n] for n in lengths.tolist()])
+        # Class ids interleaved in front of each row's coordinates.
+        values = np.insert(self.coords, self.offsets[:-1], self.class_ids)
+        return fmt % tuple(values.tolist())
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def _token_counts(data: bytes) -> np.ndarray:
+    """Return the number of whitespace-separated tokens on every line."""
+    b = np.frombuffer(data, dtype=np.uint8)
+    if not len(b):
+        return np.zeros(0, dtype=np.int64)
+    ws = _WHITESPACE[b]
+    starts = ~ws
+    starts[1:] &= ws[:-1]
+    line = np.cumsum(b == 10) - (b == 10)  # newline belongs to its own line
+    n_lines = int(line[-1]) + 1
+    return np.bincount(line[starts], minlength=n_lines)
+
+
+def _parse_legacy(text: str) -> YoloLabels:
+    """Per-line parser for files that may contain class-name columns."""
+    class_ids: list[int] = []
+    names: list[str] = []
+    rows: list[list[float]] = []
+    legacy = False
+    for raw_line in text.splitlines():
+        parts = raw_line.split()
+        if len(parts) < _MIN_TOKENS:
+            continue
+        try:
+            float(parts[0])
+            class_id, name, values = int(float(parts[0])), "", parts[1:]
+        except ValueError:
+            legacy = True
+            try:
+                class_id, name, values = int(parts[1]), parts[0], parts[2:]
+            except ValueError:
+                continue
+        try:
+            rows.append([float(v) for v in values])
+        except ValueError:
+            continue
+        class_ids.append(class_id)
+        names.append(name)
+    labels = YoloLabels.from_rows(class_ids, rows)
+    if legacy:
+        labels.names = [n or None for n in names]
+    return labels
+
+
+def parse_yolo_bytes(data: bytes) -> YoloLabels:
+    """Parse the contents of one YOLO ``.txt`` file."""
+    counts = _token_counts(data)
+    if not counts.any():
+        return YoloLabels.empty()
+    try:
+        with warnings.catch_warnings():
+            # NumPy < 2 warns instead of raising on non-numeric tokens.
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(data, dtype=np.float64, sep=" ")
+    except (ValueError, DeprecationWarning):
+        values = None
+    if values is None or len(values) != int(counts.sum()):
+        return _parse_legacy(data.decode("utf-8", errors="replace"))
+
+    # Drop the values of blank and short rows.
+    line_starts = np.zeros(len(counts), dtype=np.int64)
+    np.cumsum(counts[:-1], out=line_starts[1:])
+    keep = counts >= _MIN_TOKENS
+    if not keep.all():
+        labels = YoloLabels(
+            class_ids=np.zeros(len(counts), dtype=np.int32),
+            offsets=np.concatenate((line_starts, [len(values)])),
+            coords=values,
+        ).select(np.flatnonzero(keep))
+        values = labels.coords
+        counts = counts[keep]
+        line_starts = labels.offsets[:-1]
+
+    class_ids = values[line_starts].astype(np.int32)
+    is_coord = np.ones(len(values), dtype=bool)
+    is_coord[line_starts] = False
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts - 1, out=offsets[1:])
+    return YoloLabels(class_ids=class_ids, offsets=offsets, coords=values[is_coord])
+
+
+def read_yolo_file(path: str) -> YoloLabels:
+    """Parse one YOLO ``.txt`` file; a missing file yields no rows."""
+    try:
+        with open(path, "rb") as fh:
+            return parse_yolo_bytes(fh.read())
+    except FileNotFoundError:
+        return YoloLabels.empty()
+
+
+def read_yolo_files(paths: Sequence[str]) -> YoloLabels:
+    """Parse many files in one pass; :attr:`YoloLabels.file_index` maps rows back.
+
+    Missing files contribute no rows.  Files are concatenated and parsed
+    together unless one of them is in the legacy layout.
+    """
+    chunks: list[bytes] = []
+    for path in paths:
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            data = b""
+        if data and not data.endswith(b"\n"):
+            data += b"\n"
+        chunks.append(data)
+
+    joined = b"".join(chunks)
+    labels = parse_yolo_bytes(joined)
+    if labels.is_standard:
+        # Row -> file: rows are in file order, so count each file's rows.
+        rows_per_file = [int((_token_counts(c) >= _MIN_TOKENS).sum()) for c in chunks]
+        if sum(rows_per_file) == len(labels):
+            labels.file_index = np.repeat(
+                np.arange(len(paths), dtype=np.int32), rows_per_file
+            )
+            return labels
+
+    # Mixed or legacy batch: parse file by file.
+    parts = [parse_yolo_bytes(c) for c in chunks]
+    return concat(parts)
+
+
+def concat(parts: Sequence[YoloLabels]) -> YoloLabels:
+    """Concatenate per-file labels, setting :attr:`YoloLabels.file_index`."""
+    if not parts:
+        return YoloLabels.empty()
+    lengths = np.concatenate([p.lengths for p in parts])
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    names = None
+    if any(p.names is not None for p in parts):
+        names = []
+        for p in parts:
+            names.extend(p.names if p.names is not None else [None] * len(p))
+    return YoloLabels(
+        class_ids=np.concatenate([p.class_ids for p in parts]).astype(np.int32),
+        offsets=offsets,
+        coords=np.concatenate([p.coords for p in parts]),
+        names=names,
+        file_index=np.repeat(
+            np.arange(len(parts), dtype=np.int32), [len(p) for p in parts]
+        ),
+    )
+
+
+def write_yolo_file(path: str, labels: YoloLabels, precision: int = 6) -> None:
+    """Write *labels* to *path*, replacing the file atomically.
+
+    The text goes to ``<path>.tmp`` first and is renamed over *path*, so a
+    failed write keeps the old file and a hard link to the source of an
+    import (see :mod:`core.label_import`) is replaced, never written through.
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(labels.to_text(precision))
+    os.replace(tmp, path)
@@ -10,6 +10,16 @@ EN = {
     "action_load_model": "Load Model (.pt, .h5)",
     "action_save_labels": "Save Labels",
     "action_export_masks": "Export Binary Masks",
+    "action_export_dataset": "Export COCO / VOC...",
+    "export_dataset_title": "Export Dataset",
+    "export_dataset_format": "Annotation format:",
+    "export_dataset_coco": "COCO instance JSON (RLE masks)",
+    "export_dataset_voc": "Pascal VOC XML",
+    "export_dataset_both": "COCO JSON + Pascal VOC XML",
+    "export_dataset_running": "Exporting annotations...",
+    "export_dataset_complete": "Exported {images} images, {annotations} annotations to {path}",
+    "export_dataset_cancelled": "Dataset export cancelled.",
+    "export_dataset_error": "Dataset export failed:\n{error}",
     "action_exit": "Exit",
 
     # Menu - Edit
@@ -26,6 +36,16 @@ EN = {
     # Menu - Settings
     "menu_settings": "&Settings",
     "action_set_label_dir": "Set Label Folder...",
+    "action_packed_masks": "Packed GT Masks (one file per image)",
+    "action_packed_masks_tooltip": "Save all mask classes of an image as one bit-packed PNG in gt_packed/ instead of one PNG per class in gt_image/<class>/. Both layouts are always loaded.",
+    "packed_masks_on": "GT masks are now saved packed to gt_packed/",
+    "packed_masks_off": "GT masks are now saved per class to gt_image/<class>/",
+    "action_annotation_db": "Annotation Database (annotations.db)",
+    "action_annotation_db_tooltip": "Save labels and masks to a single SQLite file in the image folder instead of labels/ and gt_image/. YOLO txt and GT PNG files are then written by File > Export Database to YOLO/PNG (and before training).",
+    "annotation_db_on": "Labels are now saved to annotations.db",
+    "annotation_db_off": "Labels are now saved to labels/ and gt_image/ ({labels} label files, {gt} GT images exported)",
+    "action_export_annotation_db": "Export Database to YOLO/PNG",
+    "export_annotation_db_done": "Exported from annotations.db: {labels} label files, {gt} GT images, {images} images copied",
     "action_lang_ko": "Korean (한국어)",
     "action_lang_en": "English",
 
@@ -83,6 +103,11 @@ EN = {
     "auto_label_progress_pct": "{current} / {total}  ({pct}%)",
     "auto_label_time_info": "Speed: {speed} img/s  |  ETA: {eta}  |  Elapsed: {elapsed}",
     "auto_label_elapsed": "Total time: {elapsed}",
+    "auto_label_stage_decode": "Decode",
+    "auto_label_stage_preprocess": "Pre",
+    "auto_label_stage_inference": "Infer",
+    "auto_label_stage_postprocess": "Post",
+    "auto_label_stage_apply": "Apply",
     "auto_label_complete": "Auto labeling complete: {count} labels generated",
     "auto_label_no_model": "No model loaded. Please load a model first.",
     "auto_label_score_threshold": "Score Threshold:",
@@ -99,6 +124,44 @@ EN = {
         "Minimum confidence passed to the model (NMS threshold). "
         "Use a low value to catch more detections, then filter with Score Threshold."
     ),
+    "auto_label_use_cache": "Reuse cached detections",
+    "auto_label_use_cache_tooltip": (
+        "Store raw model detections per model and image. Re-running with the "
+        "same confidence and inference size only re-applies the score "
+        "threshold instead of running the model again."
+    ),
+    "auto_label_clear_cache": "Clear Cache",
+    "auto_label_clear_cache_tooltip": (
+        "Delete all cached detections. The cache is also trimmed automatically: "
+        "the least recently used entries are removed once it exceeds its size limit."
+    ),
+    "auto_label_cache_cleared": "Cache cleared ({mb} MB freed)",
+    "auto_label_options": "Inference Options",
+    "auto_label_threads": "CPU Threads:",
+    "auto_label_threads_auto": "Auto",
+    "auto_label_threads_tooltip": (
+        "Number of intra-op threads used by PyTorch / TensorFlow for inference. "
+        "Auto keeps the framework default."
+    ),
+    "auto_label_max_det": "Max. Detections:",
+    "auto_label_max_det_tooltip": "Maximum number of detections kept per image after NMS.",
+    "auto_label_classes": "Classes:",
+    "auto_label_classes_all": "All classes",
+    "auto_label_classes_tooltip": (
+        "Comma-separated class ids or names to detect. Other classes are dropped "
+        "inside NMS. Leave empty to keep all classes."
+    ),
+    "auto_label_half": "Half precision (FP16)",
+    "auto_label_half_tooltip": (
+        "Run YOLO / RT-DETR inference in FP16. Only effective on CUDA GPUs; "
+        "CPU inference stays in FP32."
+    ),
+    "auto_label_boxes_only": "Boxes only (skip masks)",
+    "auto_label_boxes_only_tooltip": (
+        "Ignore the mask output of segmentation models and create bounding boxes "
+        "only. Skips the costly polygon extraction."
+    ),
+    "auto_label_unknown_class": "Unknown class in filter: {name}",
 
     # Training dialog
     "training_title": "Model Training",
@@ -117,6 +180,114 @@ EN = {
     "training_log": "Training Log",
     "training_progress": "Epoch {epoch}/{total} - Loss: {loss:.4f}",
     "training_complete": "Training complete! Best model saved at: {path}",
+    "training_build_dataset": "Build train/val dataset from project labels",
+    "training_build_dataset_tooltip": (
+        "Create images/train, images/val and data.yaml in the dataset path from the "
+        "labeled project images. Images are hard-linked instead of copied, the split "
+        "is stratified by class and later builds only update changed images."
+    ),
+    "training_val_ratio": "Validation Ratio:",
+    "training_building_dataset": "Building dataset at: {path}",
+    "training_dataset_ready": (
+        "Dataset ready: {train} train / {val} val images "
+        "({linked} linked, {copied} copied, {unchanged} unchanged, {removed} removed)"
+    ),
+    "training_dataset_empty": "No labeled images found in the project.",
+    "training_save_metrics": "Save per-batch metrics (metrics.jsonl)",
+    "training_save_metrics_tooltip": (
+        "Write losses, learning rate, throughput and validation metrics of every "
+        "batch and epoch to metrics.jsonl in the training run directory."
+    ),
+    "training_batch_info": (
+        "Epoch {epoch}/{epochs}  |  Batch {batch}/{batches}  |  Loss: {loss:.4f}  |  "
+        "LR: {lr:.6f}  |  {speed:.1f} img/s  |  ETA: {eta}"
+    ),
+    "training_val_info": "Epoch {epoch} validation  |  mAP50: {map50:.3f}  |  mAP50-95: {map50_95:.3f}",
+    "training_queue": "Training Queue:",
+    "training_add_to_queue": "Add to Queue",
+    "training_resume": "Resume",
+    "training_resume_tooltip": "Continue the last stopped or crashed run from its last.pt checkpoint.",
+    "training_resuming": "Resuming from: {path}",
+    "training_job_item": "{index}. {model} {base}  |  {epochs} epochs  |  {imgsz}px  |  {status}",
+    "training_job_resumed": "(resume)",
+    "training_job_queued": "Queued",
+    "training_job_running": "Running",
+    "training_job_done": "Done",
+    "training_job_failed": "Failed",
+    "training_job_cancelled": "Stopped",
+    "training_cache": "Image Cache:",
+    "training_cache_off": "Off",
+    "training_cache_ram": "RAM",
+    "training_cache_disk": "Disk (pre-resized)",
+    "training_cache_tooltip": (
+        "RAM keeps decoded images in memory after the first pass. Disk pre-resizes "
+        "every dataset image to the image size once and stores it as a .npy array "
+        "next to the image, so epochs no longer decode full-resolution JPEGs."
+    ),
+    "training_workers": "Dataloader Workers:",
+    "training_workers_tooltip": "Number of dataloader processes (0 loads images in the training process).",
+    "training_cache_estimating": "Estimating cache size...",
+    "training_cache_no_estimate": "Cannot estimate the cache size (no readable labeled images).",
+    "training_cache_estimate_ram": (
+        "RAM needed: ~{size} for {count} images  |  image loading ~{speedup:.1f}x faster "
+        "({decode:.1f} ms -> {cached:.1f} ms per image)"
+    ),
+    "training_cache_estimate_disk": (
+        "Disk needed: ~{size} for {count} images  |  image loading up to ~{speedup:.1f}x faster "
+        "({decode:.1f} ms -> {cached:.1f} ms per image when the cache is in the OS file cache)"
+    ),
+    "training_preparing_cache": "Pre-resizing dataset images into the disk cache...",
+    "training_cache_ready": (
+        "Image cache ready: {written} written, {unchanged} unchanged, "
+        "{removed} removed ({size})"
+    ),
+    "training_sweep": "Sweep...",
+    "training_sweep_tooltip": (
+        "Train several runs over a grid or random set of image sizes, learning "
+        "rates and batch sizes and compare them by mAP and inference speed."
+    ),
+    "training_sweep_busy": "Wait for the running training to finish before starting a sweep.",
+    "sweep_title": "Hyperparameter Sweep",
+    "sweep_space": "Search Space",
+    "sweep_values_tooltip": "One or more values separated by commas or spaces.",
+    "sweep_mode": "Search:",
+    "sweep_mode_grid": "Grid (all combinations)",
+    "sweep_mode_random": "Random",
+    "sweep_count_prefix": "Runs: ",
+    "sweep_parallel": "Parallel Runs:",
+    "sweep_parallel_tooltip": (
+        "Maximum number of runs trained at the same time. Auto uses one run per "
+        "listed GPU, or as many CPU runs as cores and free memory allow."
+    ),
+    "sweep_plan": "{runs} of {grid} combinations  |  {parallel} in parallel",
+    "sweep_invalid_value": "Invalid value: {value}",
+    "sweep_results": "Results (best mAP50-95 first, then fastest inference):",
+    "sweep_start": "Start Sweep",
+    "sweep_finished": "Sweep finished. Results: {path}",
+    "sweep_best": "Best run: {name} ({path})",
+    "sweep_stop_confirm": "The sweep is running. Stop all runs and close?",
+    "sweep_col_run": "Run",
+    "sweep_col_imgsz": "Size",
+    "sweep_col_lr": "LR",
+    "sweep_col_batch": "Batch",
+    "sweep_col_status": "Status",
+    "sweep_col_epoch": "Epoch",
+    "sweep_col_map50": "mAP50",
+    "sweep_col_map50_95": "mAP50-95",
+    "sweep_col_infer": "Infer ms/img",
+    "sweep_col_speed": "Train img/s",
+    "training_benchmark": "Benchmark best.pt after training",
+    "training_benchmark_tooltip": (
+        "Measure latency percentiles and throughput of the trained model for several "
+        "inference sizes and batch sizes on validation images. The report is saved as "
+        "benchmark.json / benchmark.csv next to the weights."
+    ),
+    "training_benchmark_onnx": "Also export ONNX",
+    "training_benchmark_onnx_tooltip": "Export the weights to ONNX and benchmark the exported model too.",
+    "training_benchmark_best": (
+        "Fastest {backend}: {size}px, batch {batch}  |  {speed:.1f} img/s  |  "
+        "p50 {p50:.1f} ms per batch"
+    ),
     "training_generate_yaml": "Auto-generate data.yaml",
     "training_classes": "Classes:",
     "training_train_path": "Train Path:",
@@ -129,6 +300,10 @@ EN = {
     "status_cursor": "({x}, {y})",
     "status_model_loaded": "Model loaded: {name}",
     "status_no_model": "No model loaded",
+    "status_model_loading": "Loading model: {name}...",
+    "status_model_load_cancelled": "Model loading cancelled: {name}",
+    "status_action_queued": "Waiting for the model to finish loading...",
+    "model_load_cancel": "Cancel Loading",
 
     # General
     "ok": "OK",
@@ -206,6 +381,23 @@ EN = {
     "menu_help": "&Help",
     "action_help_dialog": "Help Dialog",
     "action_toggle_help_panel": "Show Help Panel",
+    "action_perf_monitor": "Performance Monitor",
+    "action_perf_monitor_tooltip": "Show timings of image loading, label drawing, saving and auto-labeling",
+    "perf_dock_title": "Performance Monitor",
+    "perf_enable": "Record timings",
+    "perf_reset": "Reset",
+    "perf_capture_start": "Start Profiling",
+    "perf_capture_stop": "Stop && Save Profile...",
+    "perf_capture_save": "Save Profile",
+    "perf_col_name": "Operation",
+    "perf_col_calls": "Calls",
+    "perf_col_mean": "Mean ms",
+    "perf_col_p50": "p50 ms",
+    "perf_col_p90": "p90 ms",
+    "perf_col_p99": "p99 ms",
+    "perf_col_max": "Max ms",
+    "perf_col_histogram": "Histogram",
+    "perf_histogram_hint": "Statistics cover the last {window} calls. Histogram buckets (ms): ≤ {edges}, more.",
 
     # Help dock
     "help_dock_title": "Help (F1 or ? button)",
@@ -215,6 +407,7 @@ EN = {
     "menu_recent_models": "Recent Models",
     "menu_recent_none": "(None)",
     "menu_recent_clear": "Clear List",
+    "menu_recent_model_loaded": "● {name}",
 
     # Navigation actions
     "action_prev_image": "Previous Image (A)",
@@ -274,7 +467,14 @@ EN = {
     "import_select_folder": "Select External Labels Folder",
     "import_no_project": "Please open an image folder first.",
     "import_no_data": "No labels/ or gt_image/ folder found in selected folder.",
-    "import_complete": "Import complete: {labels} labels, {gt} GT images copied",
+    "import_complete": "Import complete: {labels} labels, {gt} GT images imported, {skipped} unchanged skipped, {failed} failed",
+    "import_running": "Importing labels and GT images...",
+    "import_cancelled": "Import cancelled after {labels} labels and {gt} GT images. Import the folder again to resume.",
+    "import_error": "Import failed:\n{error}",
+    "import_resume_title": "Resume Import",
+    "import_resume_message": "The import from\n{path}\nwas interrupted. Resume it?\n\nFiles that were already imported are skipped.",
+    "action_import_hard_links": "Hard-link Imported Files",
+    "action_import_hard_links_tooltip": "Import external labels and GT images as hard links instead of copies when they are on the same drive as the project. Saving an imported label replaces the link, so the source is never modified.",
 
     # Mask edit
     "mask_edit_status": "Mask edit mode - Modify with brush, Enter to finish",
@@ -331,6 +531,8 @@ EN = {
         "\n"
         "If the folder contains a labels/ or gt_image/ subfolder,\n"
         "those files are copied into the current project folder.\n"
+        "Files unchanged since a previous import are skipped, so an\n"
+        "interrupted import resumes where it stopped.\n"
         "\n"
         "Expected external folder structure:\n"
         "  external_folder/\n"
@@ -10,6 +10,16 @@ KO = {
     "action_load_model": "모델 로드 (.pt, .h5)",
     "action_save_labels": "라벨 저장",
     "action_export_masks": "바이너리 마스크 내보내기",
+    "action_export_dataset": "COCO / VOC 내보내기...",
+    "export_dataset_title": "데이터셋 내보내기",
+    "export_dataset_format": "어노테이션 형식:",
+    "export_dataset_coco": "COCO instance JSON (RLE 마스크)",
+    "export_dataset_voc": "Pascal VOC XML",
+    "export_dataset_both": "COCO JSON + Pascal VOC XML",
+    "export_dataset_running": "어노테이션 내보내는 중...",
+    "export_dataset_complete": "이미지 {images}개, 어노테이션 {annotations}개를 {path} 에 내보냈습니다",
+    "export_dataset_cancelled": "데이터셋 내보내기가 취소되었습니다.",
+    "export_dataset_error": "데이터셋 내보내기 실패:\n{error}",
     "action_exit": "종료",
 
     # Menu - Edit
@@ -26,6 +36,16 @@ KO = {
     # Menu - Settings
     "menu_settings": "설정(&S)",
     "action_set_label_dir": "라벨 폴더 지정...",
+    "action_packed_masks": "GT 마스크 묶음 저장 (이미지당 1개 파일)",
+    "action_packed_masks_tooltip": "이미지의 모든 마스크 클래스를 gt_image/<클래스>/ 의 클래스별 PNG 대신 gt_packed/ 의 비트 패킹 PNG 하나로 저장합니다. 두 형식 모두 항상 불러옵니다.",
+    "packed_masks_on": "이제 GT 마스크를 gt_packed/ 에 묶음으로 저장합니다",
+    "packed_masks_off": "이제 GT 마스크를 gt_image/<클래스>/ 에 클래스별로 저장합니다",
+    "action_annotation_db": "어노테이션 데이터베이스 (annotations.db)",
+    "action_annotation_db_tooltip": "라벨과 마스크를 labels/, gt_image/ 대신 이미지 폴더의 SQLite 파일 하나에 저장합니다. YOLO txt 와 GT PNG 파일은 파일 > 데이터베이스를 YOLO/PNG로 내보내기 (및 학습 전)에서 생성됩니다.",
+    "annotation_db_on": "이제 라벨을 annotations.db 에 저장합니다",
+    "annotation_db_off": "이제 라벨을 labels/, gt_image/ 에 저장합니다 (라벨 파일 {labels}개, GT 이미지 {gt}개 내보냄)",
+    "action_export_annotation_db": "데이터베이스를 YOLO/PNG로 내보내기",
+    "export_annotation_db_done": "annotations.db 에서 내보냄: 라벨 파일 {labels}개, GT 이미지 {gt}개, 이미지 {images}개 복사",
     "action_lang_ko": "한국어",
     "action_lang_en": "English",
 
@@ -83,6 +103,11 @@ KO = {
     "auto_label_progress_pct": "{current} / {total}  ({pct}%)",
     "auto_label_time_info": "속도: {speed} img/s  |  남은 시간: {eta}  |  경과: {elapsed}",
     "auto_label_elapsed": "총 소요 시간: {elapsed}",
+    "auto_label_stage_decode": "디코드",
+    "auto_label_stage_preprocess": "전처리",
+    "auto_label_stage_inference": "추론",
+    "auto_label_stage_postprocess": "후처리",
+    "auto_label_stage_apply": "적용",
     "auto_label_complete": "오토 라벨링 완료: {count}개 라벨 생성",
     "auto_label_no_model": "모델이 로드되지 않았습니다. 먼저 모델을 로드해주세요.",
     "auto_label_score_threshold": "점수 임계값:",
@@ -101,6 +126,44 @@ KO = {
         "낮게 설정하면 더 많은 탐지 결과를 얻을 수 있으며, "
         "점수 임계값으로 추가 필터링하세요."
     ),
+    "auto_label_use_cache": "캐시된 탐지 결과 재사용",
+    "auto_label_use_cache_tooltip": (
+        "모델과 이미지별로 원본 탐지 결과를 저장합니다. "
+        "같은 신뢰도와 추론 크기로 다시 실행하면 모델을 다시 돌리지 않고 "
+        "점수 임계값만 다시 적용합니다."
+    ),
+    "auto_label_clear_cache": "캐시 비우기",
+    "auto_label_clear_cache_tooltip": (
+        "캐시된 탐지 결과를 모두 삭제합니다. 캐시가 크기 제한을 넘으면 "
+        "가장 오래 사용하지 않은 항목부터 자동으로 삭제됩니다."
+    ),
+    "auto_label_cache_cleared": "캐시를 비웠습니다 ({mb} MB 확보)",
+    "auto_label_options": "추론 옵션",
+    "auto_label_threads": "CPU 스레드:",
+    "auto_label_threads_auto": "자동",
+    "auto_label_threads_tooltip": (
+        "추론에 사용할 PyTorch / TensorFlow 연산 스레드 수입니다. "
+        "자동은 프레임워크 기본값을 사용합니다."
+    ),
+    "auto_label_max_det": "최대 탐지 수:",
+    "auto_label_max_det_tooltip": "NMS 이후 이미지당 유지할 최대 탐지 개수입니다.",
+    "auto_label_classes": "클래스:",
+    "auto_label_classes_all": "모든 클래스",
+    "auto_label_classes_tooltip": (
+        "탐지할 클래스 ID 또는 이름을 쉼표로 구분해 입력합니다. 나머지 클래스는 "
+        "NMS 단계에서 제외됩니다. 비워 두면 모든 클래스를 유지합니다."
+    ),
+    "auto_label_half": "반정밀도 (FP16)",
+    "auto_label_half_tooltip": (
+        "YOLO / RT-DETR 추론을 FP16으로 실행합니다. CUDA GPU에서만 적용되며 "
+        "CPU 추론은 FP32로 유지됩니다."
+    ),
+    "auto_label_boxes_only": "박스만 생성 (마스크 생략)",
+    "auto_label_boxes_only_tooltip": (
+        "세그멘테이션 모델의 마스크 출력을 무시하고 바운딩 박스만 생성합니다. "
+        "비용이 큰 폴리곤 추출을 건너뜁니다."
+    ),
+    "auto_label_unknown_class": "필터에 알 수 없는 클래스가 있습니다: {name}",
 
     # Training dialog
     "training_title": "모델 학습",
@@ -119,6 +182,113 @@ KO = {
     "training_log": "학습 로그",
     "training_progress": "에포크 {epoch}/{total} - 손실: {loss:.4f}",
     "training_complete": "학습 완료! 최적 모델 저장 위치: {path}",
+    "training_build_dataset": "프로젝트 라벨로 학습/검증 데이터셋 생성",
+    "training_build_dataset_tooltip": (
+        "라벨이 있는 프로젝트 이미지로 데이터셋 경로에 images/train, images/val 및 "
+        "data.yaml을 생성합니다. 이미지는 복사하지 않고 하드 링크하며, 클래스 기준으로 "
+        "층화 분할하고 이후에는 변경된 이미지만 갱신합니다."
+    ),
+    "training_val_ratio": "검증 비율:",
+    "training_building_dataset": "데이터셋 생성 중: {path}",
+    "training_dataset_ready": (
+        "데이터셋 준비 완료: 학습 {train}장 / 검증 {val}장 "
+        "(링크 {linked}, 복사 {copied}, 변경 없음 {unchanged}, 삭제 {removed})"
+    ),
+    "training_dataset_empty": "프로젝트에 라벨이 있는 이미지가 없습니다.",
+    "training_save_metrics": "배치별 지표 저장 (metrics.jsonl)",
+    "training_save_metrics_tooltip": (
+        "모든 배치와 에폭의 손실, 학습률, 처리 속도 및 검증 지표를 "
+        "학습 실행 폴더의 metrics.jsonl에 기록합니다."
+    ),
+    "training_batch_info": (
+        "에폭 {epoch}/{epochs}  |  배치 {batch}/{batches}  |  손실: {loss:.4f}  |  "
+        "학습률: {lr:.6f}  |  {speed:.1f} img/s  |  남은 시간: {eta}"
+    ),
+    "training_val_info": "에폭 {epoch} 검증  |  mAP50: {map50:.3f}  |  mAP50-95: {map50_95:.3f}",
+    "training_queue": "학습 대기열:",
+    "training_add_to_queue": "대기열에 추가",
+    "training_resume": "이어서 학습",
+    "training_resume_tooltip": "중지되었거나 비정상 종료된 마지막 학습을 last.pt 체크포인트부터 이어서 진행합니다.",
+    "training_resuming": "이어서 학습: {path}",
+    "training_job_item": "{index}. {model} {base}  |  {epochs} 에폭  |  {imgsz}px  |  {status}",
+    "training_job_resumed": "(이어서)",
+    "training_job_queued": "대기 중",
+    "training_job_running": "실행 중",
+    "training_job_done": "완료",
+    "training_job_failed": "실패",
+    "training_job_cancelled": "중지됨",
+    "training_cache": "이미지 캐시:",
+    "training_cache_off": "사용 안 함",
+    "training_cache_ram": "RAM",
+    "training_cache_disk": "디스크 (사전 리사이즈)",
+    "training_cache_tooltip": (
+        "RAM은 첫 번째 패스 이후 디코딩된 이미지를 메모리에 유지합니다. 디스크는 데이터셋 "
+        "이미지를 이미지 크기로 한 번 리사이즈하여 이미지 옆에 .npy 배열로 저장하므로, "
+        "에폭마다 원본 해상도 JPEG를 디코딩하지 않습니다."
+    ),
+    "training_workers": "데이터로더 워커:",
+    "training_workers_tooltip": "데이터로더 프로세스 수 (0이면 학습 프로세스에서 이미지를 로드합니다).",
+    "training_cache_estimating": "캐시 크기 추정 중...",
+    "training_cache_no_estimate": "캐시 크기를 추정할 수 없습니다 (읽을 수 있는 라벨 이미지 없음).",
+    "training_cache_estimate_ram": (
+        "필요 RAM: 약 {size} ({count}장)  |  이미지 로딩 약 {speedup:.1f}배 빠름 "
+        "(이미지당 {decode:.1f} ms -> {cached:.1f} ms)"
+    ),
+    "training_cache_estimate_disk": (
+        "필요 디스크: 약 {size} ({count}장)  |  이미지 로딩 최대 약 {speedup:.1f}배 빠름 "
+        "(캐시가 OS 파일 캐시에 있을 때 이미지당 {decode:.1f} ms -> {cached:.1f} ms)"
+    ),
+    "training_preparing_cache": "데이터셋 이미지를 디스크 캐시로 리사이즈하는 중...",
+    "training_cache_ready": (
+        "이미지 캐시 준비 완료: {written}개 작성, {unchanged}개 변경 없음, "
+        "{removed}개 삭제 ({size})"
+    ),
+    "training_sweep": "스윕...",
+    "training_sweep_tooltip": (
+        "이미지 크기, 학습률, 배치 크기의 그리드 또는 무작위 조합으로 여러 번 학습하고 "
+        "mAP와 추론 속도로 비교합니다."
+    ),
+    "training_sweep_busy": "스윕을 시작하기 전에 실행 중인 학습이 끝날 때까지 기다리세요.",
+    "sweep_title": "하이퍼파라미터 스윕",
+    "sweep_space": "탐색 공간",
+    "sweep_values_tooltip": "쉼표나 공백으로 구분한 하나 이상의 값.",
+    "sweep_mode": "탐색 방식:",
+    "sweep_mode_grid": "그리드 (모든 조합)",
+    "sweep_mode_random": "무작위",
+    "sweep_count_prefix": "실행 수: ",
+    "sweep_parallel": "동시 실행:",
+    "sweep_parallel_tooltip": (
+        "동시에 학습하는 최대 실행 수. 자동은 지정된 GPU당 하나, CPU에서는 코어 수와 "
+        "여유 메모리가 허용하는 만큼 실행합니다."
+    ),
+    "sweep_plan": "{grid}개 조합 중 {runs}개  |  동시 {parallel}개",
+    "sweep_invalid_value": "잘못된 값: {value}",
+    "sweep_results": "결과 (mAP50-95 높은 순, 다음으로 추론 속도 빠른 순):",
+    "sweep_start": "스윕 시작",
+    "sweep_finished": "스윕 완료. 결과: {path}",
+    "sweep_best": "최고 실행: {name} ({path})",
+    "sweep_stop_confirm": "스윕이 실행 중입니다. 모든 실행을 중지하고 닫으시겠습니까?",
+    "sweep_col_run": "실행",
+    "sweep_col_imgsz": "크기",
+    "sweep_col_lr": "학습률",
+    "sweep_col_batch": "배치",
+    "sweep_col_status": "상태",
+    "sweep_col_epoch": "에폭",
+    "sweep_col_map50": "mAP50",
+    "sweep_col_map50_95": "mAP50-95",
+    "sweep_col_infer": "추론 ms/장",
+    "sweep_col_speed": "학습 장/s",
+    "training_benchmark": "학습 후 best.pt 벤치마크",
+    "training_benchmark_tooltip": (
+        "검증 이미지로 여러 추론 크기와 배치 크기에서 학습된 모델의 지연 시간 백분위수와 "
+        "처리량을 측정합니다. 보고서는 가중치 옆에 benchmark.json / benchmark.csv로 저장됩니다."
+    ),
+    "training_benchmark_onnx": "ONNX도 내보내기",
+    "training_benchmark_onnx_tooltip": "가중치를 ONNX로 내보내고 내보낸 모델도 벤치마크합니다.",
+    "training_benchmark_best": (
+        "가장 빠른 {backend}: {size}px, 배치 {batch}  |  {speed:.1f} 장/s  |  "
+        "배치당 p50 {p50:.1f} ms"
+    ),
     "training_generate_yaml": "data.yaml 자동 생성",
     "training_classes": "클래스:",
     "training_train_path": "학습 경로:",
@@ -131,6 +301,10 @@ KO = {
     "status_cursor": "({x}, {y})",
     "status_model_loaded": "모델 로드됨: {name}",
     "status_no_model": "모델 없음",
+    "status_model_loading": "모델 로드 중: {name}...",
+    "status_model_load_cancelled": "모델 로드 취소됨: {name}",
+    "status_action_queued": "모델 로드가 끝나면 실행됩니다...",
+    "model_load_cancel": "로드 취소",
 
     # General
     "ok": "확인",
@@ -208,6 +382,23 @@ KO = {
     "menu_help": "도움말(&H)",
     "action_help_dialog": "도움말 대화상자",
     "action_toggle_help_panel": "도움말 패널 표시",
+    "action_perf_monitor": "성능 모니터",
+    "action_perf_monitor_tooltip": "이미지 로드, 라벨 표시, 저장, 자동 라벨링 소요 시간 표시",
+    "perf_dock_title": "성능 모니터",
+    "perf_enable": "시간 기록",
+    "perf_reset": "초기화",
+    "perf_capture_start": "프로파일링 시작",
+    "perf_capture_stop": "중지 및 프로파일 저장...",
+    "perf_capture_save": "프로파일 저장",
+    "perf_col_name": "작업",
+    "perf_col_calls": "호출 수",
+    "perf_col_mean": "평균 ms",
+    "perf_col_p50": "p50 ms",
+    "perf_col_p90": "p90 ms",
+    "perf_col_p99": "p99 ms",
+    "perf_col_max": "최대 ms",
+    "perf_col_histogram": "히스토그램",
+    "perf_histogram_hint": "최근 {window}회 호출 기준 통계입니다. 히스토그램 구간(ms): ≤ {edges}, 초과.",
 
     # Help dock
     "help_dock_title": "도움말 (F1 또는 ? 버튼)",
@@ -217,6 +408,7 @@ KO = {
     "menu_recent_models": "최근 모델",
     "menu_recent_none": "(없음)",
     "menu_recent_clear": "목록 지우기",
+    "menu_recent_model_loaded": "● {name}",
 
     # Navigation actions
     "action_prev_image": "이전 이미지 (A)",
@@ -276,7 +468,14 @@ KO = {
     "import_select_folder": "외부 라벨 폴더 선택",
     "import_no_project": "먼저 이미지 폴더를 열어주세요.",
     "import_no_data": "선택한 폴더에 labels/ 또는 gt_image/ 폴더가 없습니다.",
-    "import_complete": "가져오기 완료: {labels}개 라벨, {gt}개 GT 이미지 복사됨",
+    "import_complete": "가져오기 완료: 라벨 {labels}개, GT 이미지 {gt}개 가져옴, 변경 없음 {skipped}개 건너뜀, 실패 {failed}개",
+    "import_running": "라벨과 GT 이미지를 가져오는 중...",
+    "import_cancelled": "라벨 {labels}개, GT 이미지 {gt}개를 가져온 뒤 취소되었습니다. 같은 폴더를 다시 가져오면 이어서 진행합니다.",
+    "import_error": "가져오기 실패:\n{error}",
+    "import_resume_title": "가져오기 재개",
+    "import_resume_message": "다음 폴더에서의 가져오기가 중단되었습니다:\n{path}\n이어서 진행하시겠습니까?\n\n이미 가져온 파일은 건너뜁니다.",
+    "action_import_hard_links": "가져온 파일 하드 링크",
+    "action_import_hard_links_tooltip": "외부 라벨과 GT 이미지가 프로젝트와 같은 드라이브에 있으면 복사 대신 하드 링크로 가져옵니다. 가져온 라벨을 저장하면 링크가 교체되므로 원본은 수정되지 않습니다.",
 
     # Mask edit
     "mask_edit_status": "마스크 편집 모드 - 브러시로 수정 후 Enter로 완료",
@@ -333,6 +532,8 @@ KO = {
         "\n"
         "선택한 폴더 안에 labels/ 또는 gt_image/ 폴더가 있으면\n"
         "현재 프로젝트 폴더로 복사됩니다.\n"
+        "이전 가져오기 이후 변경되지 않은 파일은 건너뛰므로\n"
+        "중단된 가져오기는 멈춘 곳부터 이어집니다.\n"
         "\n"
         "외부 폴더 구조 예시:\n"
         "  외부폴더/\n"
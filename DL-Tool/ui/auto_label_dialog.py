@@ -1,22 +1,27 @@
 """Auto labeling dialog for batch inference."""
 
+import logging
+import os
 import time
-from collections import deque
 
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLabel, QDoubleSpinBox, QSpinBox, QRadioButton,
     QPushButton, QProgressBar, QButtonGroup, QGroupBox,
-    QMessageBox, QWidget,
+    QMessageBox, QWidget, QCheckBox, QLineEdit,
 )
 from PySide6.QtCore import Signal, Slot, Qt
 
 from i18n import tr
-from core.auto_labeler import AutoLabelWorker
-from core.model_manager import DEFAULT_INFER_SIZE
+from config import CONFIG_DIR, get_config
+from core.auto_labeler import AutoLabelWorker, TimingSummary
+from core.model_manager import DEFAULT_INFER_SIZE, InferenceOptions
+from core.result_cache import AutoLabelResultCache
 
-# Rolling-window size for speed estimation (number of recent steps to average).
-_SPEED_WINDOW = 8
+logger = logging.getLogger(__name__)
+
+# Every run appends its per-stage timing summary here.
+TIMING_LOG_PATH = os.path.join(CONFIG_DIR, "logs", "autolabel.log")
 
 
 def _fmt_seconds(secs: float) -> str:
@@ -36,6 +41,9 @@ def _fmt_seconds(secs: float) -> str:
 
 class AutoLabelDialog(QDialog):
     labels_generated = Signal(str, list)  # image_path, list[LabelItem]
+    # Emitted when a run ends, before its timing summary is written, so the
+    # receiver can apply the labels it still buffers (see record_apply()).
+    run_finished = Signal()
 
     def __init__(self, model_manager, image_paths: list[str],
                  current_index: int = 0, parent: QWidget = None):
@@ -44,10 +52,12 @@ class AutoLabelDialog(QDialog):
         self._image_paths = image_paths
         self._current_index = current_index
         self._worker = None
+        self._config = get_config()
 
         # Timing state (reset on each run)
         self._start_time: float = 0.0
-        self._step_times: deque = deque(maxlen=_SPEED_WINDOW)
+        self._timings: TimingSummary = TimingSummary()
+        self._run_context: dict = {}
 
         self._setup_ui()
 
@@ -96,8 +106,58 @@ class AutoLabelDialog(QDialog):
         self._infer_size_spin.setToolTip(tr("auto_label_infer_size_tooltip"))
         form.addRow(tr("auto_label_infer_size"), self._infer_size_spin)
 
+        # Raw-detection cache – re-runs with another score threshold skip
+        # the model entirely.
+        self._cache_check = QCheckBox(tr("auto_label_use_cache"))
+        self._cache_check.setChecked(self._config.autolabel_cache_enabled)
+        self._cache_check.setToolTip(tr("auto_label_use_cache_tooltip"))
+        self._clear_cache_btn = QPushButton(tr("auto_label_clear_cache"))
+        self._clear_cache_btn.setToolTip(tr("auto_label_clear_cache_tooltip"))
+        self._clear_cache_btn.clicked.connect(self._on_clear_cache)
+        cache_row = QHBoxLayout()
+        cache_row.addWidget(self._cache_check)
+        cache_row.addStretch()
+        cache_row.addWidget(self._clear_cache_btn)
+        form.addRow(cache_row)
+
         layout.addLayout(form)
 
+        # ── Inference options (remembered in AppConfig) ────────────────
+        options = InferenceOptions.from_dict(self._config.inference_options)
+        options_group = QGroupBox(tr("auto_label_options"))
+        options_form = QFormLayout(options_group)
+
+        self._threads_spin = QSpinBox()
+        self._threads_spin.setRange(0, os.cpu_count() or 1)
+        self._threads_spin.setSpecialValueText(tr("auto_label_threads_auto"))
+        self._threads_spin.setValue(min(options.threads, self._threads_spin.maximum()))
+        self._threads_spin.setToolTip(tr("auto_label_threads_tooltip"))
+        options_form.addRow(tr("auto_label_threads"), self._threads_spin)
+
+        self._max_det_spin = QSpinBox()
+        self._max_det_spin.setRange(1, 3000)
+        self._max_det_spin.setSingleStep(50)
+        self._max_det_spin.setValue(options.max_det)
+        self._max_det_spin.setToolTip(tr("auto_label_max_det_tooltip"))
+        options_form.addRow(tr("auto_label_max_det"), self._max_det_spin)
+
+        self._classes_edit = QLineEdit(", ".join(str(c) for c in options.classes))
+        self._classes_edit.setPlaceholderText(tr("auto_label_classes_all"))
+        self._classes_edit.setToolTip(tr("auto_label_classes_tooltip"))
+        options_form.addRow(tr("auto_label_classes"), self._classes_edit)
+
+        self._half_check = QCheckBox(tr("auto_label_half"))
+        self._half_check.setChecked(options.half)
+        self._half_check.setToolTip(tr("auto_label_half_tooltip"))
+        options_form.addRow(self._half_check)
+
+        self._boxes_only_check = QCheckBox(tr("auto_label_boxes_only"))
+        self._boxes_only_check.setChecked(options.boxes_only)
+        self._boxes_only_check.setToolTip(tr("auto_label_boxes_only_tooltip"))
+        options_form.addRow(self._boxes_only_check)
+
+        layout.addWidget(options_group)
+
         # ── Scope selection ────────────────────────────────────────────
         scope_group = QGroupBox(tr("auto_label_scope"))
         scope_layout = QVBoxLayout(scope_group)
@@ -134,6 +194,12 @@ class AutoLabelDialog(QDialog):
         self._time_label.setStyleSheet("color: #888888; font-size: 11px;")
         layout.addWidget(self._time_label)
 
+        # Line 3: rolling mean per pipeline stage
+        self._stage_label = QLabel("")
+        self._stage_label.setAlignment(Qt.AlignCenter)
+        self._stage_label.setStyleSheet("color: #888888; font-size: 11px;")
+        layout.addWidget(self._stage_label)
+
         # ── Buttons ────────────────────────────────────────────────────
         btn_layout = QHBoxLayout()
         self._start_btn = QPushButton(tr("auto_label_start"))
@@ -146,6 +212,29 @@ class AutoLabelDialog(QDialog):
 
         layout.addLayout(btn_layout)
 
+    def _parse_classes(self) -> list[int]:
+        """Parse the class filter field (ids or names, comma separated).
+
+        Raises:
+            ValueError: With the offending token if a name is unknown.
+        """
+        names = {
+            name.lower(): cls_id
+            for cls_id, name in self._model_manager.get_class_names().items()
+        }
+        class_ids: set[int] = set()
+        for token in self._classes_edit.text().replace(";", ",").split(","):
+            token = token.strip()
+            if not token:
+                continue
+            if token.isdigit():
+                class_ids.add(int(token))
+            elif token.lower() in names:
+                class_ids.add(int(names[token.lower()]))
+            else:
+                raise ValueError(token)
+        return sorted(class_ids)
+
     # ------------------------------------------------------------------
     # Slots
     # ------------------------------------------------------------------
@@ -165,16 +254,52 @@ class AutoLabelDialog(QDialog):
         score_threshold = self._score_spin.value()
         infer_size = self._infer_size_spin.value()
 
+        try:
+            classes = self._parse_classes()
+        except ValueError as exc:
+            QMessageBox.warning(
+                self, tr("warning"), tr("auto_label_unknown_class").format(name=exc)
+            )
+            return
+
+        options = InferenceOptions(
+            half=self._half_check.isChecked(),
+            threads=self._threads_spin.value(),
+            max_det=self._max_det_spin.value(),
+            classes=classes,
+            boxes_only=self._boxes_only_check.isChecked(),
+        )
+        self._model_manager.set_inference_options(options)
+
+        use_cache = self._cache_check.isChecked()
+        if (use_cache != self._config.autolabel_cache_enabled
+                or options.to_dict() != self._config.inference_options):
+            self._config.autolabel_cache_enabled = use_cache
+            self._config.inference_options = options.to_dict()
+            self._config.save()
+
         # Reset timing state.
         self._start_time = time.monotonic()
-        self._step_times.clear()
+        self._timings = TimingSummary()
+        self._run_context = {
+            "model": f"{self._model_manager.get_model_type()} "
+                     f"{os.path.basename(self._model_manager.get_model_path())}",
+            "images": len(paths),
+            "infer_size": infer_size,
+            "confidence": confidence,
+            "score_threshold": score_threshold,
+            "options": options.to_dict(),
+            "cache": use_cache,
+        }
 
         self._progress_bar.setVisible(True)
         self._progress_bar.setMaximum(len(paths))
         self._progress_bar.setValue(0)
         self._status_label.setText("")
         self._time_label.setText("")
+        self._stage_label.setText("")
         self._start_btn.setEnabled(False)
+        self._clear_cache_btn.setEnabled(False)
 
         self._worker = AutoLabelWorker(
             self._model_manager,
@@ -182,17 +307,32 @@ class AutoLabelDialog(QDialog):
             confidence=confidence,
             score_threshold=score_threshold,
             infer_size=infer_size,
+            result_cache=self._result_cache() if use_cache else None,
+            inference_options=options,
         )
         self._worker.progress.connect(self._on_progress)
         self._worker.image_done.connect(self._on_image_done)
+        self._worker.timing.connect(self._on_timing)
         self._worker.finished_all.connect(self._on_finished)
         self._worker.error.connect(self._on_error)
         self._worker.start()
 
+    def _result_cache(self) -> AutoLabelResultCache:
+        return AutoLabelResultCache(
+            max_bytes=max(0, self._config.autolabel_cache_max_mb) * 1024 * 1024
+        )
+
+    def _on_clear_cache(self):
+        cache = self._result_cache()
+        freed = cache.size_bytes()
+        cache.clear()
+        self._status_label.setText(
+            tr("auto_label_cache_cleared").format(mb=f"{freed / (1024 * 1024):.1f}")
+        )
+
     @Slot(int, int)
     def _on_progress(self, current: int, total: int):
         now = time.monotonic()
-        self._step_times.append(now)
 
         # Update progress bar value (format string already shows %).
         self._progress_bar.setValue(current)
@@ -208,13 +348,11 @@ class AutoLabelDialog(QDialog):
         # ── Speed & ETA ───────────────────────────────────────────────
         elapsed = now - self._start_time
 
-        # Rolling-window speed: use the last _SPEED_WINDOW completions so
-        # the estimate reacts quickly to slow/fast images without being
-        # dominated by a single outlier.
-        if len(self._step_times) >= 2:
-            window_elapsed = self._step_times[-1] - self._step_times[0]
-            window_count   = len(self._step_times) - 1
-            speed = window_count / window_elapsed if window_elapsed > 0 else 0.0
+        # Rolling-window speed reported by the worker (last RATE_WINDOW
+        # images), so the estimate reacts quickly to slow/fast images without
+        # being dominated by a single outlier.
+        if self._timings.images_per_sec > 0:
+            speed = self._timings.images_per_sec
         elif elapsed > 0:
             speed = current / elapsed
         else:
@@ -231,23 +369,58 @@ class AutoLabelDialog(QDialog):
             )
         )
 
+    @Slot(object)
+    def _on_timing(self, timing):
+        self._timings.add(timing)
+        self._stage_label.setText(self._format_stages(self._timings.rolling_ms()))
+
     @Slot(str, list)
     def _on_image_done(self, image_path: str, labels: list):
         self.labels_generated.emit(image_path, labels)
 
+    def record_apply(self, images: int, elapsed_ms: float):
+        """Record the "apply" stage: *elapsed_ms* spent adding the labels of
+        *images* images to the project (the receiver applies them in batches)."""
+        if images > 0:
+            self._timings.record("apply", elapsed_ms, images)
+
+    @staticmethod
+    def _format_stages(stages_ms: dict[str, float]) -> str:
+        return "  |  ".join(
+            f"{tr('auto_label_stage_' + stage)} {ms:.1f} ms" for stage, ms in stages_ms.items()
+        )
+
+    def _write_timing_log(self):
+        """Append the run's stage summary to :data:`TIMING_LOG_PATH` (once)."""
+        timings, self._timings = self._timings, TimingSummary()
+        if not timings.images:
+            return
+        try:
+            timings.write_log(
+                TIMING_LOG_PATH, time.monotonic() - self._start_time, self._run_context
+            )
+        except OSError as exc:
+            logger.warning("Cannot write %s: %s", TIMING_LOG_PATH, exc)
+
     @Slot()
     def _on_finished(self):
+        self.run_finished.emit()
         elapsed = time.monotonic() - self._start_time
         self._start_btn.setEnabled(True)
+        self._clear_cache_btn.setEnabled(True)
         self._status_label.setText(tr("auto_label_complete").format(count=""))
         self._time_label.setText(
             tr("auto_label_elapsed").format(elapsed=_fmt_seconds(elapsed))
         )
+        if self._timings.images:
+            self._stage_label.setText(self._format_stages(self._timings.mean_ms()))
+        self._write_timing_log()
         self._worker = None
 
     @Slot(str)
     def _on_error(self, msg: str):
         self._start_btn.setEnabled(True)
+        self._clear_cache_btn.setEnabled(True)
         self._time_label.setText("")
         QMessageBox.critical(self, tr("error"), msg)
         self._worker = None
@@ -257,6 +430,8 @@ class AutoLabelDialog(QDialog):
             self._worker.abort()
             self._worker.wait(3000)
             self._worker = None
+            self.run_finished.emit()
+            self._write_timing_log()
         self.reject()
 
     def closeEvent(self, event):
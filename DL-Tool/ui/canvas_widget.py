@@ -3,7 +3,6 @@
 import os
 from typing import Optional
 import numpy as np
-import cv2
 
 from PySide6.QtWidgets import (
     QGraphicsView, QGraphicsScene, QGraphicsPixmapItem,
@@ -17,6 +16,7 @@ from PySide6.QtGui import (
 from PySide6.QtCore import Signal, Qt, QPointF, QRectF
 
 from core.label_manager import LabelItem
+from core.profiling import hot_path
 from ui.toolbar_widget import ToolMode
 from i18n import tr
 
@@ -66,7 +66,8 @@ class CanvasWidget(QWidget):
         self._edit_label_index = -1
         self._edit_handle_index = -1  # bbox: 0-3=corners, 4=center; polygon: vertex index
         self._edit_start_pos: Optional[QPointF] = None
-        self._edit_original_points: list[tuple[float, float]] = []  # pre-edit snapshot for undo
+        # Pre-edit snapshot for undo: bbox bounds, or a copy of the polygon vertices
+        self._edit_original_points = []
         self._handle_items: list[QGraphicsEllipseItem] = []
 
         # Brush/mask state
@@ -114,6 +115,7 @@ class CanvasWidget(QWidget):
 
     # --- Public API ---
 
+    @hot_path("canvas.load_image")
     def load_image(self, image_path: str):
         if not os.path.isfile(image_path):
             return
@@ -247,6 +249,7 @@ class CanvasWidget(QWidget):
         w, h = self._image_pixmap.width(), self._image_pixmap.height()
         # Resize mask if needed
         if mask_data.shape != (h, w):
+            import cv2
             mask_data = cv2.resize(mask_data, (w, h), interpolation=cv2.INTER_NEAREST)
         self._current_mask = mask_data
         self._current_mask_color = color
@@ -291,7 +294,12 @@ class CanvasWidget(QWidget):
                 self._scene.removeItem(self._mask_pixmap_item)
                 self._mask_pixmap_item = None
 
-    def display_labels(self, labels: list[LabelItem]):
+    @hot_path("canvas.display_labels")
+    def display_labels(
+        self, labels: list[LabelItem], visibility: Optional[list[bool]] = None
+    ):
+        """Replace the label graphics; *visibility* (per label) hides items
+        as they are created instead of one ``set_label_visible`` call each."""
         # Remove old label graphics
         for li in self._label_items:
             if li.graphics_item.scene():
@@ -302,8 +310,10 @@ class CanvasWidget(QWidget):
         self._selected_index = -1
         self._clear_edit_handles()
 
-        for label in labels:
+        for i, label in enumerate(labels):
             gfx = self._create_label_graphics(label)
+            if visibility is not None and i < len(visibility) and not visibility[i]:
+                gfx.setVisible(False)
             self._label_items.append(LabelGraphicsItem(label, gfx))
 
     def set_label_visible(self, index: int, visible: bool):
@@ -336,11 +346,10 @@ class CanvasWidget(QWidget):
         label = self._label_items[index].label
 
         if label.label_type == "bbox":
+            if label.bounds is None:
+                return
             # 4 corners + center handle + 4 edge midpoints for easier resizing
-            xs = [p[0] for p in label.points]
-            ys = [p[1] for p in label.points]
-            x1, y1 = min(xs), min(ys)
-            x2, y2 = max(xs), max(ys)
+            x1, y1, x2, y2 = label.bounds
             cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
 
             # Calculate bbox size for dynamic handle sizing
@@ -359,7 +368,7 @@ class CanvasWidget(QWidget):
                 (cx, cy)  # center
             ]
         else:  # polygon
-            handle_positions = label.points
+            handle_positions = label.xy.tolist()
             base_handle_size = 10
             center_handle_size = 10
 
@@ -409,11 +418,8 @@ class CanvasWidget(QWidget):
         brush_color.setAlpha(40)
         brush = QBrush(brush_color)
 
-        if label.label_type == "bbox" and len(label.points) == 4:
-            xs = [p[0] for p in label.points]
-            ys = [p[1] for p in label.points]
-            x1, y1 = min(xs), min(ys)
-            x2, y2 = max(xs), max(ys)
+        if label.label_type == "bbox" and label.bounds is not None:
+            x1, y1, x2, y2 = label.bounds
             rect = QRectF(x1, y1, x2 - x1, y2 - y1)
             item = self._scene.addRect(rect, pen, brush)
             return item
@@ -435,7 +441,7 @@ class CanvasWidget(QWidget):
             return item
         else:
             # Polygon
-            polygon = QPolygonF([QPointF(p[0], p[1]) for p in label.points])
+            polygon = QPolygonF([QPointF(x, y) for x, y in label.xy.tolist()])
             item = self._scene.addPolygon(polygon, pen, brush)
             return item
 
@@ -461,20 +467,14 @@ class CanvasWidget(QWidget):
 
     def _update_bbox_with_handle(self, label: LabelItem, handle_idx: int, new_pos: QPointF):
         """Update bbox points when dragging a handle."""
-        xs = [p[0] for p in label.points]
-        ys = [p[1] for p in label.points]
-        x1, y1 = min(xs), min(ys)
-        x2, y2 = max(xs), max(ys)
+        if label.bounds is None:
+            return
+        x1, y1, x2, y2 = label.bounds
 
         if handle_idx == 8:  # Center handle - move entire bbox
             delta_x = new_pos.x() - (x1 + x2) / 2
             delta_y = new_pos.y() - (y1 + y2) / 2
-            label.points = [
-                (x1 + delta_x, y1 + delta_y),
-                (x2 + delta_x, y1 + delta_y),
-                (x2 + delta_x, y2 + delta_y),
-                (x1 + delta_x, y2 + delta_y),
-            ]
+            label.set_bbox(x1 + delta_x, y1 + delta_y, x2 + delta_x, y2 + delta_y)
         elif handle_idx < 4:  # Corner handles - resize
             if handle_idx == 0:  # Top-left
                 x1, y1 = new_pos.x(), new_pos.y()
@@ -485,12 +485,7 @@ class CanvasWidget(QWidget):
             elif handle_idx == 3:  # Bottom-left
                 x1, y2 = new_pos.x(), new_pos.y()
 
-            label.points = [
-                (x1, y1),
-                (x2, y1),
-                (x2, y2),
-                (x1, y2),
-            ]
+            label.set_bbox(x1, y1, x2, y2)
         else:  # Edge midpoint handles - resize along one axis
             if handle_idx == 4:  # Top edge
                 y1 = new_pos.y()
@@ -501,17 +496,12 @@ class CanvasWidget(QWidget):
             elif handle_idx == 7:  # Left edge
                 x1 = new_pos.x()
 
-            label.points = [
-                (x1, y1),
-                (x2, y1),
-                (x2, y2),
-                (x1, y2),
-            ]
+            label.set_bbox(x1, y1, x2, y2)
 
     def _update_polygon_vertex(self, label: LabelItem, vertex_idx: int, new_pos: QPointF):
         """Update polygon vertex when dragging a handle."""
-        if 0 <= vertex_idx < len(label.points):
-            label.points[vertex_idx] = (new_pos.x(), new_pos.y())
+        if 0 <= vertex_idx < label.num_points:
+            label.set_point(vertex_idx, new_pos.x(), new_pos.y())
 
     def _refresh_label_graphics(self, index: int):
         """Refresh the graphics item for a label after editing."""
@@ -588,6 +578,7 @@ class CanvasWidget(QWidget):
         radius = self._brush_size // 2
 
         if self._brush_shape == "circle":
+            import cv2  # deferred: keeps cv2 off the startup path
             cv2.circle(self._current_mask, (x, y), radius, value, -1)
         else:  # square
             x1 = max(0, x - radius)
@@ -599,6 +590,7 @@ class CanvasWidget(QWidget):
         # Update mask display
         self._update_mask_display()
 
+    @hot_path("canvas.update_mask_display")
     def _update_mask_display(self):
         """Update the mask overlay display."""
         if self._current_mask is None:
@@ -744,7 +736,9 @@ class CanvasWidget(QWidget):
                     self._edit_start_pos = scene_pos
                     # Save pre-edit points so undo captures the original state
                     label = self._label_items[self._selected_index].label
-                    self._edit_original_points = list(label.points)
+                    self._edit_original_points = (
+                        label.bounds if label.label_type == "bbox" else label.xy.copy()
+                    )
                     return
 
         if self._mode == ToolMode.DETECTION:
@@ -848,14 +842,20 @@ class CanvasWidget(QWidget):
         # Finish editing
         if self._editing:
             label = self._label_items[self._edit_label_index].label
-            # Capture the modified points before restoring the original
-            new_points = list(label.points)
-            # Restore original pre-edit points on the shared object so that
-            # UpdateLabelCommand.redo() captures the true pre-edit state.
-            label.points = list(self._edit_original_points)
-            # Create a separate copy with the modified points
-            updated = label.copy()
-            updated.points = new_points
+            # Restore the original pre-edit geometry on the shared object so
+            # that UpdateLabelCommand.redo() captures the true pre-edit state,
+            # and move the modified geometry to a separate copy.  Bboxes go
+            # through their float64 bounds: xy is float32.
+            if label.label_type == "bbox":
+                new_bounds = label.bounds
+                label.set_bbox(*self._edit_original_points)
+                updated = label.copy()
+                updated.set_bbox(*new_bounds)
+            else:
+                new_points = label.xy.copy()
+                label.points = self._edit_original_points
+                updated = label.copy()
+                updated.points = new_points
             self.label_updated.emit(self._edit_label_index, updated)
             self._editing = False
             self._edit_label_index = -1
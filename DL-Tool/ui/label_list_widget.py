@@ -225,34 +225,51 @@ class LabelListWidget(QWidget):
         return list(self._visibility)
 
     def _refresh_instance_list(self):
-        """Re-render instance list with current coordinate format."""
-        self._instance_list.blockSignals(True)
-        self._instance_list.clear()
+        """Re-render instance list with current coordinate format.
+
+        Existing rows are updated in place and only rows whose text, color
+        or check state changed are touched, so refreshing after a single
+        edit does not rebuild the whole list.
+        """
+        lst = self._instance_list
+        lst.blockSignals(True)
+        lst.setCurrentRow(-1)
         labels = self._current_labels
         if not labels:
+            lst.clear()
             self._no_labels_label.show()
-            self._instance_list.blockSignals(False)
+            lst.blockSignals(False)
             return
 
         self._no_labels_label.hide()
         fmt = self._coord_combo.currentData()
         img_w, img_h = self._image_size
 
+        while lst.count() > len(labels):
+            lst.takeItem(lst.count() - 1)
         for i, label in enumerate(labels):
             type_tag = "□" if label.label_type == "bbox" else "◇"
             coord_info = self._format_coords(label, fmt, img_w, img_h)
             text = f"{type_tag} [{label.class_id}] {label.class_name}  {coord_info}"
-            item = QListWidgetItem(text)
-            color = QColor(label.color)
-            pixmap = QPixmap(12, 12)
-            pixmap.fill(color)
-            item.setIcon(QIcon(pixmap))
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
             visible = self._visibility[i] if i < len(self._visibility) else True
-            item.setCheckState(Qt.CheckState.Checked if visible else Qt.CheckState.Unchecked)
-            self._instance_list.addItem(item)
-
-        self._instance_list.blockSignals(False)
+            check = Qt.CheckState.Checked if visible else Qt.CheckState.Unchecked
+
+            item = lst.item(i)
+            if item is None:
+                item = QListWidgetItem()
+                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+                lst.addItem(item)
+            if item.text() != text:
+                item.setText(text)
+            if item.data(Qt.ItemDataRole.UserRole) != label.color:
+                pixmap = QPixmap(12, 12)
+                pixmap.fill(QColor(label.color))
+                item.setIcon(QIcon(pixmap))
+                item.setData(Qt.ItemDataRole.UserRole, label.color)
+            if item.checkState() != check:
+                item.setCheckState(check)
+
+        lst.blockSignals(False)
 
     def _format_coords(self, label, fmt: str, img_w: int, img_h: int) -> str:
         """Format coordinate info string based on selected format."""
@@ -261,11 +278,8 @@ class LabelListWidget(QWidget):
                 pixel_count = int((label.mask_data > 0).sum())
                 return f"mask ({pixel_count}px)"
             return "mask"
-        if label.label_type == "bbox" and len(label.points) == 4:
-            xs = [p[0] for p in label.points]
-            ys = [p[1] for p in label.points]
-            x1, y1 = min(xs), min(ys)
-            x2, y2 = max(xs), max(ys)
+        if label.label_type == "bbox" and label.bounds is not None:
+            x1, y1, x2, y2 = label.bounds
             if fmt == "relative" and img_w > 0 and img_h > 0:
                 cx = ((x1 + x2) / 2.0) / img_w
                 cy = ((y1 + y2) / 2.0) / img_h
@@ -275,7 +289,7 @@ class LabelListWidget(QWidget):
             else:
                 return f"[{x1:.0f}, {y1:.0f}, {x2:.0f}, {y2:.0f}]"
         else:
-            n = len(label.points)
+            n = label.num_points
             if fmt == "relative":
                 return f"{n}pts (norm)"
             return f"{n}pts"
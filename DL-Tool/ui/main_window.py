@@ -1,42 +1,73 @@
 """Main window for VisionAce application."""
 
 import os
-import shutil
+import time
 
 from PySide6.QtWidgets import (
     QMainWindow, QSplitter, QFileDialog, QMessageBox,
     QStatusBar, QMenuBar, QWidget, QApplication, QDockWidget,
+    QProgressBar, QPushButton, QInputDialog, QProgressDialog,
 )
 from PySide6.QtGui import QAction, QKeySequence
-from PySide6.QtCore import Qt, Slot
+from PySide6.QtCore import Qt, Slot, QTimer
 
 from i18n import tr, set_language, get_language
 from config import get_config
+from core.annotation_store import BACKEND_FILES, BACKEND_SQLITE
 from core.project_manager import ProjectManager
 from core.label_manager import LabelManager, LabelItem
 from core.model_manager import ModelManager
-from core.export_manager import ExportManager
+from core.mask_store import LAYOUT_FOLDERS, LAYOUT_PACKED
+from core.profiling import hot_path
 from core.save_manager import SaveManager
 from ui.canvas_widget import CanvasWidget
 from ui.file_list_widget import FileListWidget
 from ui.label_list_widget import LabelListWidget
 from ui.toolbar_widget import ToolbarWidget, ToolMode
-from ui.auto_label_dialog import AutoLabelDialog
-from ui.help_dialog import HelpDialog
 from ui.help_panel import HelpPanel
 
+# Auto-label results are buffered and applied at most once per this many ms.
+AUTO_LABEL_APPLY_INTERVAL_MS = 33
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self._config = get_config()
         self._project = ProjectManager()
+        self._project.annotation_backend = self._config.annotation_backend
         self._labels = LabelManager()
-        self._model = ModelManager()
-        self._saver = SaveManager(self._labels, self._project)
+        self._model = ModelManager(
+            max_models=self._config.model_pool_size,
+            max_memory_mb=self._config.model_pool_memory_mb,
+        )
+        self._saver = SaveManager(
+            self._labels, self._project, mask_layout=self._config.gt_mask_layout
+        )
         self._current_image_path = ""
         self._skip_auto_load_mask = False  # suppress auto-load during explicit mask edit
         self._discard_pending_mask = False  # discard (not finalize) mask on next image switch
+        self._pending_model_actions = []  # actions queued until a background model load ends
+        self._training_dialog = None  # kept alive while training jobs run
+        self._export_worker = None  # COCO / VOC export in progress
+        self._export_progress = None
+        self._import_worker = None  # external label import in progress
+        self._import_progress = None
+        self._perf_dock = None  # created on first use of Help > Performance Monitor
+        self._pending_auto_labels: dict[str, list] = {}  # results not yet applied
+        self._auto_label_dialog = None  # receives the apply timing of the running dialog
+        self._auto_label_run = 0  # merge key: one undo step per auto-label run
+        self._auto_label_timer = QTimer(self)
+        self._auto_label_timer.setSingleShot(True)
+        self._auto_label_timer.setInterval(AUTO_LABEL_APPLY_INTERVAL_MS)
+        self._auto_label_timer.timeout.connect(self._apply_pending_auto_labels)
+        # labels_changed is coalesced: each changed image is refreshed once per
+        # event-loop tick, however many mutations it went through.
+        self._changed_label_paths: dict[str, None] = {}
+        self._label_refresh_timer = QTimer(self)
+        self._label_refresh_timer.setSingleShot(True)
+        self._label_refresh_timer.setInterval(0)
+        self._label_refresh_timer.timeout.connect(self._flush_label_changes)
 
         self._setup_ui()
         self._setup_menu()
@@ -73,6 +104,18 @@ class MainWindow(QMainWindow):
         self._status_bar = QStatusBar(self)
         self.setStatusBar(self._status_bar)
 
+        # Background model-load indicator (hidden while idle)
+        self._model_load_bar = QProgressBar(self)
+        self._model_load_bar.setRange(0, 100)
+        self._model_load_bar.setMaximumWidth(160)
+        self._model_load_bar.setMaximumHeight(16)
+        self._model_load_bar.hide()
+        self._status_bar.addPermanentWidget(self._model_load_bar)
+        self._model_load_cancel_btn = QPushButton(tr("model_load_cancel"), self)
+        self._model_load_cancel_btn.clicked.connect(self._model.cancel_loading)
+        self._model_load_cancel_btn.hide()
+        self._status_bar.addPermanentWidget(self._model_load_cancel_btn)
+
         # Help dock widget (collapsible panel)
         self._help_dock = QDockWidget(tr("help_dock_title"), self)
         self._help_panel = HelpPanel(self)
@@ -123,6 +166,10 @@ class MainWindow(QMainWindow):
         self._action_export_mask.triggered.connect(self._on_export_masks)
         file_menu.addAction(self._action_export_mask)
 
+        self._action_export_dataset = QAction(tr("action_export_dataset"), self)
+        self._action_export_dataset.triggered.connect(self._on_export_dataset)
+        file_menu.addAction(self._action_export_dataset)
+
         file_menu.addSeparator()
 
         # Import external labels/GT
@@ -130,6 +177,13 @@ class MainWindow(QMainWindow):
         self._action_import_labels.triggered.connect(self._on_import_external_labels)
         file_menu.addAction(self._action_import_labels)
 
+        self._action_export_annotation_db = QAction(tr("action_export_annotation_db"), self)
+        self._action_export_annotation_db.setEnabled(
+            self._config.annotation_backend == BACKEND_SQLITE
+        )
+        self._action_export_annotation_db.triggered.connect(self._on_export_annotation_db)
+        file_menu.addAction(self._action_export_annotation_db)
+
         file_menu.addSeparator()
 
         self._action_exit = QAction(tr("action_exit"), self)
@@ -187,6 +241,10 @@ class MainWindow(QMainWindow):
         self._action_auto_label.triggered.connect(self._on_auto_label)
         tools_menu.addAction(self._action_auto_label)
 
+        self._action_training = QAction(tr("action_training"), self)
+        self._action_training.triggered.connect(self._on_training)
+        tools_menu.addAction(self._action_training)
+
         # --- Settings menu ---
         settings_menu = menubar.addMenu(tr("menu_settings"))
 
@@ -194,6 +252,27 @@ class MainWindow(QMainWindow):
         self._action_set_label_dir.triggered.connect(self._on_set_label_dir)
         settings_menu.addAction(self._action_set_label_dir)
 
+        self._action_packed_masks = QAction(tr("action_packed_masks"), self)
+        self._action_packed_masks.setCheckable(True)
+        self._action_packed_masks.setChecked(self._config.gt_mask_layout == LAYOUT_PACKED)
+        self._action_packed_masks.setToolTip(tr("action_packed_masks_tooltip"))
+        self._action_packed_masks.toggled.connect(self._on_toggle_packed_masks)
+        settings_menu.addAction(self._action_packed_masks)
+
+        self._action_annotation_db = QAction(tr("action_annotation_db"), self)
+        self._action_annotation_db.setCheckable(True)
+        self._action_annotation_db.setChecked(self._config.annotation_backend == BACKEND_SQLITE)
+        self._action_annotation_db.setToolTip(tr("action_annotation_db_tooltip"))
+        self._action_annotation_db.toggled.connect(self._on_toggle_annotation_db)
+        settings_menu.addAction(self._action_annotation_db)
+
+        self._action_import_hard_links = QAction(tr("action_import_hard_links"), self)
+        self._action_import_hard_links.setCheckable(True)
+        self._action_import_hard_links.setChecked(self._config.import_hard_links)
+        self._action_import_hard_links.setToolTip(tr("action_import_hard_links_tooltip"))
+        self._action_import_hard_links.toggled.connect(self._on_toggle_import_hard_links)
+        settings_menu.addAction(self._action_import_hard_links)
+
         settings_menu.addSeparator()
 
         self._action_lang_ko = QAction(tr("action_lang_ko"), self)
@@ -216,6 +295,17 @@ class MainWindow(QMainWindow):
         self._action_help_dialog.triggered.connect(self._on_help)
         help_menu.addAction(self._action_help_dialog)
 
+        help_menu.addSeparator()
+
+        self._action_perf_monitor = QAction(tr("action_perf_monitor"), self)
+        self._action_perf_monitor.setCheckable(True)
+        self._action_perf_monitor.setChecked(
+            self._perf_dock is not None and not self._perf_dock.isHidden()
+        )
+        self._action_perf_monitor.setToolTip(tr("action_perf_monitor_tooltip"))
+        self._action_perf_monitor.toggled.connect(self._on_toggle_perf_monitor)
+        help_menu.addAction(self._action_perf_monitor)
+
     def _setup_connections(self):
         # Toolbar mode change and brush size
         self._toolbar.mode_changed.connect(self._on_mode_changed)
@@ -261,6 +351,11 @@ class MainWindow(QMainWindow):
 
         # Model loaded
         self._model.model_loaded.connect(self._on_model_loaded)
+        self._model.model_evicted.connect(lambda _path: self._update_recent_models_menu())
+        self._model.load_started.connect(self._on_model_load_started)
+        self._model.load_progress.connect(self._on_model_load_progress)
+        self._model.load_failed.connect(self._on_model_load_failed)
+        self._model.load_cancelled.connect(self._on_model_load_cancelled)
 
         # Project changes
         self._project.folder_changed.connect(self._on_folder_loaded)
@@ -285,18 +380,7 @@ class MainWindow(QMainWindow):
             self._config.recent_model_path = os.path.dirname(path)
             self._config.add_recent_model(path)
             self._update_recent_models_menu()
-            try:
-                # Detect model type from file extension and filename
-                basename = os.path.basename(path).lower()
-                if path.endswith('.h5'):
-                    model_type = "KERAS"
-                elif "rtdetr" in basename or "rt-detr" in basename:
-                    model_type = "RT-DETR"
-                else:
-                    model_type = "YOLO"
-                self._model.load_model(path, model_type)
-            except Exception as e:
-                QMessageBox.critical(self, tr("error"), str(e))
+            self._load_model_file(path)
 
     def _on_save_labels(self):
         if not self._project.image_dir:
@@ -326,8 +410,7 @@ class MainWindow(QMainWindow):
 
         # Update file list label status
         for i, img_path in enumerate(self._project.image_list):
-            has = len(self._labels.get_labels(img_path)) > 0
-            self._file_list.update_label_status(i, has)
+            self._file_list.update_label_status(i, self._labels.has_labels(img_path))
 
     def _on_export_masks(self):
         if not self._project.image_dir:
@@ -344,6 +427,7 @@ class MainWindow(QMainWindow):
 
         import cv2
         from pathlib import Path
+        from core.export_manager import ExportManager
 
         # Create gt_image folder
         gt_image_dir = Path(self._project.image_dir) / "gt_image"
@@ -367,77 +451,236 @@ class MainWindow(QMainWindow):
             f"Exported {count} {mask_type} mask files to gt_image/", 3000
         )
 
+    def _on_export_dataset(self):
+        """Export all labels as COCO instance JSON and/or Pascal VOC XML."""
+        if not self._project.image_dir or self._export_worker is not None:
+            return
+
+        formats = {
+            tr("export_dataset_coco"): ("coco",),
+            tr("export_dataset_voc"): ("voc",),
+            tr("export_dataset_both"): ("coco", "voc"),
+        }
+        choice, ok = QInputDialog.getItem(
+            self, tr("export_dataset_title"), tr("export_dataset_format"),
+            list(formats), 0, False,
+        )
+        if not ok:
+            return
+        out_dir = QFileDialog.getExistingDirectory(
+            self, tr("export_dataset_title"),
+            self._config.recent_export_dir or str(self._project.image_dir),
+        )
+        if not out_dir:
+            return
+        self._config.recent_export_dir = out_dir
+
+        from core.dataset_export import (
+            DatasetExporter, DatasetExportWorker, project_label_loader,
+        )
+
+        if self._canvas.has_unfinished_mask():
+            self._canvas.finalize_pending_mask()
+
+        # Images not loaded yet are read in the workers, which cannot add
+        # classes: unknown mask classes would be exported as class 0.
+        self._register_stored_classes()
+        classes = self._label_list.get_classes()
+        class_names = {i: c["name"] for i, c in enumerate(classes)}
+        image_list = self._project.image_list
+        # Snapshot taken on the GUI thread; images not loaded yet are read from disk.
+        in_memory = {}
+        for img_path in image_list:
+            labels = self._labels.get_labels(img_path)
+            if labels:
+                in_memory[img_path] = labels
+
+        exporter = DatasetExporter(
+            image_list, class_names, out_dir,
+            project_label_loader(self._project, class_names, in_memory),
+            formats=formats[choice],
+            workers=min(8, os.cpu_count() or 1),
+        )
+        self._export_progress = QProgressDialog(
+            tr("export_dataset_running"), tr("cancel"), 0, len(image_list), self
+        )
+        self._export_progress.setWindowTitle(tr("export_dataset_title"))
+        self._export_progress.setMinimumDuration(0)
+        self._export_worker = DatasetExportWorker(exporter, self)
+        self._export_progress.canceled.connect(self._export_worker.cancel)
+        self._export_worker.progress.connect(self._on_export_dataset_progress)
+        self._export_worker.finished_export.connect(self._on_export_dataset_finished)
+        self._export_worker.cancelled.connect(self._on_export_dataset_cancelled)
+        self._export_worker.error.connect(self._on_export_dataset_error)
+        self._export_worker.finished.connect(self._on_export_worker_done)
+        self._export_worker.start()
+
+    def _register_stored_classes(self):
+        """Add every class found in the project's stored masks / database."""
+        names = self._project.gt_index.class_names() + self._project.mask_store.class_names()
+        if self._project.uses_database:
+            names += self._project.annotation_store.class_names()
+        for name in dict.fromkeys(names):
+            self._label_list.add_class(name)
+
+    def _on_export_dataset_progress(self, done: int, total: int):
+        if self.sender() is self._export_worker and self._export_progress is not None:
+            self._export_progress.setValue(done)
+
+    def _on_export_dataset_finished(self, result):
+        if self.sender() is not self._export_worker:
+            return
+        self._status_bar.showMessage(
+            tr("export_dataset_complete").format(
+                images=result.images, annotations=result.annotations,
+                path=result.coco_path or result.voc_dir,
+            ),
+            8000,
+        )
+
+    def _on_export_dataset_cancelled(self):
+        if self.sender() is self._export_worker:
+            self._status_bar.showMessage(tr("export_dataset_cancelled"), 3000)
+
+    def _on_export_dataset_error(self, message: str):
+        if self.sender() is self._export_worker:
+            QMessageBox.warning(self, tr("error"), tr("export_dataset_error").format(error=message))
+
+    def _on_export_worker_done(self):
+        if self.sender() is not self._export_worker:
+            return
+        self._export_worker.deleteLater()
+        self._export_worker = None
+        if self._export_progress is not None:
+            self._export_progress.close()
+            self._export_progress.deleteLater()
+            self._export_progress = None
+
     def _on_import_external_labels(self):
         """Import labels and GT images from an external folder."""
         if not self._project.image_dir:
             QMessageBox.warning(self, tr("warning"), tr("import_no_project"))
             return
+        if self._import_worker is not None:
+            return
 
-        from pathlib import Path
+        from core.label_import import LabelImporter, LabelImportWorker
+
+        project_dir = str(self._project.image_dir)
+        ext_dir = ""
+        interrupted = self._config.interrupted_import
+        if interrupted.get("project") == project_dir and os.path.isdir(
+            interrupted.get("source", "")
+        ):
+            reply = QMessageBox.question(
+                self, tr("import_resume_title"),
+                tr("import_resume_message").format(path=interrupted["source"]),
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                ext_dir = interrupted["source"]
+        if not ext_dir:
+            ext_dir = QFileDialog.getExistingDirectory(
+                self, tr("import_select_folder"), self._config.recent_image_dir
+            )
+            if not ext_dir:
+                return
+            if not LabelImporter.has_data(ext_dir):
+                QMessageBox.warning(self, tr("warning"), tr("import_no_data"))
+                return
+
+        # Remembered until the import completes, so it can be resumed.
+        self._config.interrupted_import = {"source": ext_dir, "project": project_dir}
+        self._config.save()
 
-        ext_dir = QFileDialog.getExistingDirectory(
-            self, tr("import_select_folder"), self._config.recent_image_dir
+        importer = LabelImporter(
+            ext_dir,
+            str(self._project.label_dir),
+            str(self._project.gt_index.gt_dir),
+            link=self._config.import_hard_links,
         )
-        if not ext_dir:
+        self._import_progress = QProgressDialog(
+            tr("import_running"), tr("cancel"), 0, 0, self
+        )
+        self._import_progress.setWindowTitle(tr("action_import_labels"))
+        self._import_progress.setMinimumDuration(0)
+        self._import_worker = LabelImportWorker(importer, self)
+        self._import_progress.canceled.connect(self._import_worker.cancel)
+        self._import_worker.progress.connect(self._on_import_progress)
+        self._import_worker.finished_import.connect(self._on_import_finished)
+        self._import_worker.cancelled.connect(self._on_import_cancelled)
+        self._import_worker.error.connect(self._on_import_error)
+        self._import_worker.finished.connect(self._on_import_worker_done)
+        self._import_worker.start()
+
+    def _on_import_progress(self, done: int, total: int):
+        if self.sender() is self._import_worker and self._import_progress is not None:
+            self._import_progress.setMaximum(total)
+            self._import_progress.setValue(done)
+
+    def _on_import_finished(self, result):
+        if self.sender() is not self._import_worker:
             return
+        self._config.interrupted_import = {}
+        self._config.save()
+        self._apply_import_result(result)
+        self._status_bar.showMessage(
+            tr("import_complete").format(
+                labels=len(result.label_stems), gt=len(result.gt_files),
+                skipped=result.skipped, failed=result.failed,
+            ),
+            5000,
+        )
 
-        ext_path = Path(ext_dir)
-        ext_labels_dir = ext_path / "labels"
-        ext_gt_dir = ext_path / "gt_image"
-
-        if not ext_labels_dir.exists() and not ext_gt_dir.exists():
-            QMessageBox.warning(self, tr("warning"), tr("import_no_data"))
+    def _on_import_cancelled(self, result):
+        if self.sender() is not self._import_worker:
             return
-
-        project_path = Path(self._project.image_dir)
-        label_count = 0
-        gt_count = 0
-
-        # Copy label files
-        if ext_labels_dir.exists():
-            dest_labels_dir = project_path / "labels"
-            dest_labels_dir.mkdir(parents=True, exist_ok=True)
-            for label_file in ext_labels_dir.iterdir():
-                if label_file.is_file() and label_file.suffix == ".txt":
-                    dest = dest_labels_dir / label_file.name
-                    shutil.copy2(str(label_file), str(dest))
-                    label_count += 1
-
-        # Copy GT images (preserving class directory structure)
-        if ext_gt_dir.exists():
-            dest_gt_dir = project_path / "gt_image"
-            dest_gt_dir.mkdir(parents=True, exist_ok=True)
-            for class_dir in ext_gt_dir.iterdir():
-                if class_dir.is_dir():
-                    dest_class_dir = dest_gt_dir / class_dir.name
-                    dest_class_dir.mkdir(parents=True, exist_ok=True)
-                    for gt_file in class_dir.iterdir():
-                        if gt_file.is_file():
-                            dest = dest_class_dir / gt_file.name
-                            shutil.copy2(str(gt_file), str(dest))
-                            gt_count += 1
-
+        self._apply_import_result(result)
         self._status_bar.showMessage(
-            tr("import_complete").format(labels=label_count, gt=gt_count), 5000
+            tr("import_cancelled").format(
+                labels=len(result.label_stems), gt=len(result.gt_files)
+            ),
+            5000,
         )
 
-        # Clear label cache (non-undoable) so re-load picks up new files
-        for img_path in self._project.image_list:
-            self._labels.remove_image(img_path)
+    def _on_import_error(self, message: str):
+        if self.sender() is self._import_worker:
+            QMessageBox.warning(self, tr("error"), tr("import_error").format(error=message))
 
-        # Update file list label status
-        for i, img_path in enumerate(self._project.image_list):
-            has = self._project.has_labels(img_path)
-            self._file_list.update_label_status(i, has)
+    def _on_import_worker_done(self):
+        if self.sender() is not self._import_worker:
+            return
+        self._import_worker.deleteLater()
+        self._import_worker = None
+        if self._import_progress is not None:
+            self._import_progress.close()
+            self._import_progress.deleteLater()
+            self._import_progress = None
+
+    def _apply_import_result(self, result):
+        """Refresh only the images whose label or GT files were imported."""
+        from pathlib import Path
 
-        # Reload current image labels
-        if self._current_image_path:
-            self._load_labels_from_disk(self._current_image_path)
-            labels = self._labels.get_labels(self._current_image_path)
-            self._canvas.display_labels(labels)
-            w, h = self._canvas.get_image_size()
-            self._label_list.set_image_size(w, h)
-            self._label_list.set_instances(labels)
+        index = self._project.gt_index
+        for stem, class_name, path in result.gt_files:
+            index.add(stem, class_name, path)
+        changed = result.changed_stems
+        if not changed:
+            return
+
+        store = self._project.annotation_store if self._project.uses_database else None
+        for i, img_path in enumerate(self._project.image_list):
+            if Path(img_path).stem not in changed:
+                continue
+            if store is not None:
+                # The imported files replace the database record.
+                store.delete(Path(img_path).name)
+            # Drop the cached labels (non-undoable) so they re-load from disk
+            self._labels.remove_image(img_path)
+            self._file_list.update_label_status(i, self._project.has_labels(img_path))
+            if img_path == self._current_image_path:
+                self._load_labels_from_disk(img_path)
+                # Refreshed by _flush_label_changes (also when nothing loaded).
+                self._on_labels_changed(img_path)
 
     def _on_undo(self):
         self._labels.undo_stack.undo()
@@ -453,23 +696,72 @@ class MainWindow(QMainWindow):
                 self._labels.remove_label(self._current_image_path, selected_idx)
 
     def _on_auto_label(self):
+        if self._queue_until_model_ready(self._on_auto_label):
+            return
         if not self._model.is_loaded:
             QMessageBox.warning(self, tr("warning"), tr("auto_label_no_model"))
             return
         if not self._project.image_list:
             return
 
+        from ui.auto_label_dialog import AutoLabelDialog
+
         dialog = AutoLabelDialog(
             self._model,
             self._project.image_list,
             self._file_list.current_index(),
             self,
         )
+        self._auto_label_run += 1
         dialog.labels_generated.connect(self._on_auto_labels_received)
-        dialog.exec()
+        dialog.run_finished.connect(self._apply_pending_auto_labels)
+        self._auto_label_dialog = dialog
+        try:
+            dialog.exec()
+        finally:
+            self._auto_label_dialog = None
+        self._apply_pending_auto_labels()
+
+    def _on_training(self):
+        if self._queue_until_model_ready(self._on_training):
+            return
+
+        from ui.training_dialog import TrainingDialog
+
+        # The dataset builder reads labels from disk.
+        self._save_current_labels()
+        if self._project.uses_database:
+            self._export_annotation_db()
+
+        # Non-modal: training runs in a child process and labelling goes on.
+        # A dialog with running or queued jobs is brought back instead.
+        dialog = self._training_dialog
+        if dialog is None or not (dialog.isVisible() or dialog.is_busy):
+            classes = self._label_list.get_classes()
+            dialog = TrainingDialog(
+                [c["name"] for c in classes],
+                str(self._project.image_dir) if self._project.image_dir else "",
+                self,
+                project=self._project,
+            )
+            dialog.training_complete.connect(self._on_training_complete)
+            if self._training_dialog is not None:
+                self._training_dialog.deleteLater()
+            self._training_dialog = dialog
+        dialog.show()
+        dialog.raise_()
+        dialog.activateWindow()
+
+    @Slot(str)
+    def _on_training_complete(self, best_path: str):
+        if best_path:
+            self._config.add_recent_model(best_path)
+            self._update_recent_models_menu()
 
     def _on_help(self):
         """Show help dialog (from menu)."""
+        from ui.help_dialog import HelpDialog
+
         dialog = HelpDialog(self)
         dialog.exec()
 
@@ -494,6 +786,31 @@ class MainWindow(QMainWindow):
         """Sync help panel toggle action with dock visibility."""
         self._action_toggle_help_panel.setChecked(visible)
 
+    def _on_toggle_perf_monitor(self, visible: bool):
+        """Show the performance dock; timers only record while it is shown."""
+        if self._perf_dock is None:
+            if not visible:
+                return
+            from ui.profiling_dock import PerformancePanel
+
+            self._perf_dock = QDockWidget(tr("perf_dock_title"), self)
+            self._perf_dock.setObjectName("perf_dock")
+            self._perf_panel = PerformancePanel(self)
+            self._perf_dock.setWidget(self._perf_panel)
+            self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self._perf_dock)
+            self._perf_dock.visibilityChanged.connect(self._on_perf_dock_visibility_changed)
+        self._perf_dock.setVisible(visible)
+        self._perf_panel.set_monitoring(visible)
+        if visible:
+            self._perf_dock.raise_()
+
+    def _on_perf_dock_visibility_changed(self, visible: bool):
+        """Stop recording when the dock is closed (not merely tabbed away)."""
+        shown = not self._perf_dock.isHidden()
+        self._action_perf_monitor.setChecked(shown)
+        if not shown:
+            self._perf_panel.set_monitoring(False)
+
     def _on_set_label_dir(self):
         """Set a custom label directory."""
         if not self._project.image_dir:
@@ -578,12 +895,13 @@ class MainWindow(QMainWindow):
         if self._canvas._mode == ToolMode.SEGMENTATION:
             self._auto_load_mask_for_segmentation(img_path)
 
-        # Display labels (mask labels already removed if in SEGMENTATION)
-        labels = self._labels.get_labels(img_path)
-        self._canvas.display_labels(labels)
-        w, h = self._canvas.get_image_size()
-        self._label_list.set_image_size(w, h)
-        self._label_list.set_instances(labels)
+        # Display labels (mask labels already removed if in SEGMENTATION);
+        # the refresh queued by loading them is folded into this one.
+        self._changed_label_paths.pop(img_path, None)
+        self._refresh_current_labels()
+        idx = self._project.get_image_index(img_path)
+        if idx >= 0:
+            self._file_list.update_label_status(idx, self._labels.label_count(img_path) > 0)
 
         # Update status bar
         w, h = self._canvas.get_image_size()
@@ -736,12 +1054,12 @@ class MainWindow(QMainWindow):
 
     def _auto_load_mask_for_segmentation(self, img_path: str):
         """If in SEGMENTATION mode and image has mask labels, auto-load them into the brush canvas."""
-        # Use get_labels_ref so id()-based removal below works on the
-        # actual internal objects (get_labels returns copies).
-        labels = self._labels.get_labels_ref(img_path)
-        mask_labels = [l for l in labels if l.label_type == "mask"]
-        if not mask_labels:
+        # Read through a view so id()-based removal below works on the
+        # actual internal objects without copying the list.
+        if not self._labels.count_by_type(img_path).get("mask"):
             return
+        labels = self._labels.view(img_path)
+        mask_labels = [l for l in labels if l.label_type == "mask"]
         import numpy as np
         w, h = self._canvas.get_image_size()
         if w == 0 or h == 0:
@@ -765,11 +1083,8 @@ class MainWindow(QMainWindow):
 
         # Remove the merged mask labels from label manager in one batch
         # to avoid N separate labels_changed emissions (one per remove).
-        # Use get_labels_ref so we work on the actual internal list objects
-        # (get_labels returns copies whose id() would never match).
         selected_set = set(id(m) for m in selected_masks)
-        ref_labels = self._labels.get_labels_ref(img_path)
-        remaining = [l for l in ref_labels if id(l) not in selected_set]
+        remaining = [l for l in self._labels.view(img_path) if id(l) not in selected_set]
         self._labels.set_labels(img_path, remaining)
 
     @Slot(int)
@@ -880,34 +1195,98 @@ class MainWindow(QMainWindow):
 
     @Slot(str)
     def _on_labels_changed(self, image_path: str):
-        if image_path == self._current_image_path:
-            # Remember selection so we can restore after refresh
-            prev_selected = self._canvas.get_selected_index()
-
-            labels = self._labels.get_labels(image_path)
-            self._canvas.display_labels(labels)
-            w, h = self._canvas.get_image_size()
-            self._label_list.set_image_size(w, h)
-            self._label_list.set_instances(labels)
-
-            # Re-apply preserved visibility state to canvas items
-            for i, vis in enumerate(self._label_list.get_visibility()):
-                self._canvas.set_label_visible(i, vis)
-
-            # Restore selection when the index is still valid (e.g. after
-            # an update_label edit) so edit handles persist.
-            if 0 <= prev_selected < len(labels):
-                self._canvas.highlight_label(prev_selected)
-                self._label_list.select_instance(prev_selected)
-
-        # Update file list icon
-        idx = self._project.get_image_index(image_path)
-        if idx >= 0:
-            has = len(self._labels.get_labels(image_path)) > 0
-            self._file_list.update_label_status(idx, has)
+        self._changed_label_paths[image_path] = None
+        if not self._label_refresh_timer.isActive():
+            self._label_refresh_timer.start()
+
+    @Slot()
+    def _flush_label_changes(self):
+        """Refresh the views once for every image changed since the last tick."""
+        self._label_refresh_timer.stop()
+        paths, self._changed_label_paths = self._changed_label_paths, {}
+        for image_path in paths:
+            if image_path == self._current_image_path:
+                self._refresh_current_labels(keep_selection=True)
+
+            # Update file list icon
+            idx = self._project.get_image_index(image_path)
+            if idx >= 0:
+                self._file_list.update_label_status(idx, self._labels.label_count(image_path) > 0)
+
+    @hot_path("main.refresh_current_labels")
+    def _refresh_current_labels(self, keep_selection: bool = False):
+        """Rebuild the canvas and instance list of the current image in one pass."""
+        # Remember selection so we can restore after refresh
+        prev_selected = self._canvas.get_selected_index() if keep_selection else -1
+
+        labels = self._labels.get_labels(self._current_image_path)
+        w, h = self._canvas.get_image_size()
+        self._label_list.set_image_size(w, h)
+        # The list decides which per-label visibility survives the change;
+        # the canvas then creates hidden items hidden.
+        self._label_list.set_instances(labels)
+        self._canvas.display_labels(labels, self._label_list.get_visibility())
+
+        # Restore selection when the index is still valid (e.g. after
+        # an update_label edit) so edit handles persist.
+        if 0 <= prev_selected < len(labels):
+            self._canvas.highlight_label(prev_selected)
+            self._label_list.select_instance(prev_selected)
+
+    @Slot(str)
+    def _on_model_load_started(self, path: str):
+        self._model_load_bar.setValue(0)
+        self._model_load_bar.show()
+        self._model_load_cancel_btn.show()
+        self._status_bar.showMessage(
+            tr("status_model_loading").format(name=os.path.basename(path))
+        )
+
+    @Slot(int, str)
+    def _on_model_load_progress(self, percent: int, message: str):
+        self._model_load_bar.setValue(percent)
+        self._status_bar.showMessage(message)
+
+    def _hide_model_load_indicator(self):
+        self._model_load_bar.hide()
+        self._model_load_cancel_btn.hide()
+
+    @Slot(str, str)
+    def _on_model_load_failed(self, path: str, message: str):
+        self._hide_model_load_indicator()
+        self._pending_model_actions.clear()
+        QMessageBox.critical(self, tr("error"), message)
+
+    @Slot(str)
+    def _on_model_load_cancelled(self, path: str):
+        self._hide_model_load_indicator()
+        self._pending_model_actions.clear()
+        self._status_bar.showMessage(
+            tr("status_model_load_cancelled").format(name=os.path.basename(path)), 3000
+        )
+
+    def _queue_until_model_ready(self, action) -> bool:
+        """Defer *action* while a model is loading in the background.
+
+        Returns ``True`` if the action was queued (the caller should return),
+        ``False`` if it can run right away.
+        """
+        if not self._model.is_loading:
+            return False
+        if action not in self._pending_model_actions:
+            self._pending_model_actions.append(action)
+        self._status_bar.showMessage(tr("status_action_queued"), 3000)
+        return True
+
+    def _run_pending_model_actions(self):
+        actions, self._pending_model_actions = self._pending_model_actions, []
+        for action in actions:
+            action()
 
     @Slot(str)
     def _on_model_loaded(self, path: str):
+        self._hide_model_load_indicator()
+        self._update_recent_models_menu()
         name = os.path.basename(path)
         self._status_bar.showMessage(
             tr("status_model_loaded").format(name=name), 5000
@@ -924,16 +1303,38 @@ class MainWindow(QMainWindow):
                 })
             self._label_list.set_classes(classes)
 
+        # Open dialogs that were requested while the model was loading
+        if self._pending_model_actions:
+            QTimer.singleShot(0, self._run_pending_model_actions)
+
     @Slot(str, list)
     def _on_auto_labels_received(self, image_path: str, labels: list):
-        for label in labels:
-            self._labels.add_label(image_path, label)
+        if not labels:
+            return
+        self._pending_auto_labels.setdefault(image_path, []).extend(labels)
+        if not self._auto_label_timer.isActive():
+            self._auto_label_timer.start()
+
+    @hot_path("main.apply_auto_labels")
+    def _apply_pending_auto_labels(self):
+        """Apply buffered auto-label results as one (merged) undo step."""
+        self._auto_label_timer.stop()
+        batch, self._pending_auto_labels = self._pending_auto_labels, {}
+        if not batch:
+            return
+        t0 = time.perf_counter()
+        self._labels.add_labels_batch(batch, merge_key=("auto_label", self._auto_label_run))
+        if self._auto_label_dialog is not None:
+            self._auto_label_dialog.record_apply(
+                len(batch), (time.perf_counter() - t0) * 1000.0
+            )
 
     # --- Helpers ---
 
+    @hot_path("main.load_labels_from_disk")
     def _load_labels_from_disk(self, image_path: str):
         """Load labels from YOLO txt file and GT masks if they exist."""
-        if self._labels.get_labels(image_path):
+        if self._labels.has_labels(image_path):
             return  # Already loaded
 
         classes = self._label_list.get_classes()
@@ -957,6 +1358,7 @@ class MainWindow(QMainWindow):
         if all_labels:
             self._labels.set_labels(image_path, all_labels)
 
+    @hot_path("main.save_current_labels")
     def _save_current_labels(self):
         """Save labels for current image to disk."""
         if not self._current_image_path or not self._project.image_dir:
@@ -966,10 +1368,8 @@ class MainWindow(QMainWindow):
         if self._canvas.has_unfinished_mask():
             self._canvas.finalize_pending_mask()
 
-        labels = self._labels.get_labels(self._current_image_path)
-
         # No labels → delete any stale files
-        if not labels:
+        if not self._labels.has_labels(self._current_image_path):
             self._saver.delete_image_labels(self._current_image_path)
             return
 
@@ -977,8 +1377,9 @@ class MainWindow(QMainWindow):
         class_names = {i: c["name"] for i, c in enumerate(classes)}
         w, h = self._canvas.get_image_size()
 
+        # Auto-save on image switch: skip images unchanged since their last save.
         saved_items = self._saver.save_image_labels(
-            self._current_image_path, class_names, (w, h)
+            self._current_image_path, class_names, (w, h), only_changed=True
         )
 
         if saved_items:
@@ -986,6 +1387,59 @@ class MainWindow(QMainWindow):
             img_name = Path(self._current_image_path).name
             self._status_bar.showMessage(f"Saved {img_name}: {', '.join(saved_items)}", 2000)
 
+    def _on_toggle_packed_masks(self, checked: bool):
+        layout = LAYOUT_PACKED if checked else LAYOUT_FOLDERS
+        self._config.gt_mask_layout = layout
+        self._config.save()
+        self._saver.mask_layout = layout
+        self._status_bar.showMessage(
+            tr("packed_masks_on") if checked else tr("packed_masks_off"), 3000
+        )
+
+    def _on_toggle_annotation_db(self, checked: bool):
+        if self._canvas.has_unfinished_mask():
+            self._canvas.finalize_pending_mask()
+        labels = gt = 0
+        if not checked and self._project.uses_database:
+            # Bring the files up to date before they become the source again.
+            labels, gt, _ = self._export_annotation_db()
+        self._config.annotation_backend = BACKEND_SQLITE if checked else BACKEND_FILES
+        self._config.save()
+        self._project.annotation_backend = self._config.annotation_backend
+        self._action_export_annotation_db.setEnabled(checked)
+        self._status_bar.showMessage(
+            tr("annotation_db_on") if checked
+            else tr("annotation_db_off").format(labels=labels, gt=gt),
+            3000,
+        )
+
+    def _on_toggle_import_hard_links(self, checked: bool):
+        self._config.import_hard_links = checked
+        self._config.save()
+
+    def _on_export_annotation_db(self):
+        if not self._project.uses_database:
+            return
+        if self._canvas.has_unfinished_mask():
+            self._canvas.finalize_pending_mask()
+        labels, gt, images = self._export_annotation_db(only_changed=False)
+        self._status_bar.showMessage(
+            tr("export_annotation_db_done").format(labels=labels, gt=gt, images=images), 5000
+        )
+
+    def _export_annotation_db(self, only_changed: bool = True) -> tuple[int, int, int]:
+        """Save pending labels to annotations.db, then write it out as files."""
+        classes = self._label_list.get_classes()
+        class_names = {i: c["name"] for i, c in enumerate(classes)}
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            self._saver.save_all_images(class_names, only_changed=True)
+            return self._saver.export_store(
+                class_names, self._label_list.add_class, only_changed=only_changed
+            )
+        finally:
+            QApplication.restoreOverrideCursor()
+
     def _switch_language(self, lang: str):
         set_language(lang)
         self._config.language = lang
@@ -1000,6 +1454,10 @@ class MainWindow(QMainWindow):
         self._canvas.retranslate()
         self._help_panel.retranslate()
         self._help_dock.setWindowTitle(tr("help_dock_title"))
+        if self._perf_dock is not None:
+            self._perf_dock.setWindowTitle(tr("perf_dock_title"))
+            self._perf_panel.retranslate()
+        self._model_load_cancel_btn.setText(tr("model_load_cancel"))
 
         # Re-create menus
         self.menuBar().clear()
@@ -1063,8 +1521,10 @@ class MainWindow(QMainWindow):
 
         for path in recent_models:
             if os.path.exists(path):
-                # Show model filename and type
+                # Show model filename and type; mark models kept in the warm pool
                 model_name = os.path.basename(path)
+                if self._model.is_model_cached(path):
+                    model_name = tr("menu_recent_model_loaded").format(name=model_name)
                 action = QAction(f"{model_name}  ({path})", self)
                 action.triggered.connect(lambda checked=False, p=path: self._on_open_recent_model(p))
                 self._recent_models_menu.addAction(action)
@@ -1081,18 +1541,8 @@ class MainWindow(QMainWindow):
             self._config.recent_model_path = os.path.dirname(path)
             self._config.add_recent_model(path)
             self._update_recent_models_menu()
-            try:
-                # Detect model type from file extension and filename
-                basename = os.path.basename(path).lower()
-                if path.endswith('.h5'):
-                    model_type = "KERAS"
-                elif "rtdetr" in basename or "rt-detr" in basename:
-                    model_type = "RT-DETR"
-                else:
-                    model_type = "YOLO"
-                self._model.load_model(path, model_type)
-            except Exception as e:
-                QMessageBox.critical(self, tr("error"), str(e))
+            # Pooled models are activated instantly without reloading weights.
+            self._load_model_file(path)
         else:
             QMessageBox.warning(
                 self,
@@ -1100,6 +1550,20 @@ class MainWindow(QMainWindow):
                 tr("model_not_found_msg").format(path=path)
             )
 
+    @staticmethod
+    def _detect_model_type(path: str) -> str:
+        """Detect model type from file extension and filename."""
+        basename = os.path.basename(path).lower()
+        if path.endswith('.h5'):
+            return "KERAS"
+        if "rtdetr" in basename or "rt-detr" in basename:
+            return "RT-DETR"
+        return "YOLO"
+
+    def _load_model_file(self, path: str):
+        """Load the model at *path* in the background (pooled models switch instantly)."""
+        self._model.load_model_async(path, self._detect_model_type(path))
+
     def _on_clear_recent_models(self):
         """Clear the recent models list."""
         self._config.recent_models = []
@@ -1115,6 +1579,25 @@ class MainWindow(QMainWindow):
         self._status_bar.showMessage(f"{tr('status_ready')}  |  {model_status}")
 
     def closeEvent(self, event):
+        # Training runs in a child process; let the dialog confirm stopping it.
+        if self._training_dialog is not None and not self._training_dialog.close():
+            event.ignore()
+            return
+
+        # Stop any background model load before the window goes away
+        self._model.shutdown()
+
+        if self._export_worker is not None:
+            self._export_worker.cancel()
+            self._export_worker.wait()
+
+        if self._import_worker is not None:
+            self._import_worker.cancel()
+            self._import_worker.wait()
+
+        if self._perf_dock is not None:
+            self._perf_panel.stop_capture()
+
         # Finalize any pending mask
         if self._canvas.has_unfinished_mask():
             self._canvas.finalize_pending_mask()
@@ -1123,7 +1606,8 @@ class MainWindow(QMainWindow):
         if self._config.auto_save and self._project.image_dir:
             classes = self._label_list.get_classes()
             class_names = {i: c["name"] for i, c in enumerate(classes)}
-            self._saver.save_all_images(class_names)
+            self._saver.save_all_images(class_names, only_changed=True)
+        self._project.close_annotation_store()
 
         self._config.window_width = self.width()
         self._config.window_height = self.height()
@@ -0,0 +1,142 @@
+"""Performance monitor panel: live hot-path timings and profiler capture."""
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QPushButton, QCheckBox, QLabel, QFileDialog, QHeaderView, QAbstractItemView,
+    QMessageBox,
+)
+from PySide6.QtCore import Qt, QTimer
+
+from core import profiling
+from i18n import tr
+
+REFRESH_MS = 1000
+_SPARK = " ▁▂▃▄▅▆▇█"
+_COLUMNS = ("perf_col_name", "perf_col_calls", "perf_col_mean", "perf_col_p50",
+            "perf_col_p90", "perf_col_p99", "perf_col_max", "perf_col_histogram")
+
+
+def _sparkline(counts: list[int]) -> str:
+    top = max(counts) if counts else 0
+    if top == 0:
+        return ""
+    steps = len(_SPARK) - 1
+    return "".join(_SPARK[(c * steps + top - 1) // top] for c in counts)
+
+
+class PerformancePanel(QWidget):
+    """Table of :func:`core.profiling.snapshot`, refreshed while visible."""
+
+    def __init__(self, parent: QWidget = None):
+        super().__init__(parent)
+        self._capture = profiling.ProfileCapture()
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self._setup_ui()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+
+        controls = QHBoxLayout()
+        self._enable_check = QCheckBox(tr("perf_enable"))
+        self._enable_check.setChecked(profiling.is_enabled())
+        self._enable_check.toggled.connect(self._on_enable_toggled)
+        controls.addWidget(self._enable_check)
+        controls.addStretch()
+        self._reset_btn = QPushButton(tr("perf_reset"))
+        self._reset_btn.clicked.connect(self._on_reset)
+        controls.addWidget(self._reset_btn)
+        self._capture_btn = QPushButton(tr("perf_capture_start"))
+        self._capture_btn.clicked.connect(self._on_capture_clicked)
+        controls.addWidget(self._capture_btn)
+        layout.addLayout(controls)
+
+        self._table = QTableWidget(0, len(_COLUMNS))
+        self._table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self._table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self._table.verticalHeader().setVisible(False)
+        self._table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+        layout.addWidget(self._table)
+
+        self._hint = QLabel()
+        self._hint.setWordWrap(True)
+        self._hint.setStyleSheet("color: #888;")
+        layout.addWidget(self._hint)
+        self.retranslate()
+
+    def retranslate(self):
+        self._enable_check.setText(tr("perf_enable"))
+        self._reset_btn.setText(tr("perf_reset"))
+        self._capture_btn.setText(
+            tr("perf_capture_stop") if self._capture.is_running else tr("perf_capture_start")
+        )
+        self._table.setHorizontalHeaderLabels([tr(key) for key in _COLUMNS])
+        edges = ", ".join(f"{e:g}" for e in profiling.BUCKET_EDGES_MS)
+        self._hint.setText(
+            tr("perf_histogram_hint").format(window=profiling.WINDOW, edges=edges)
+        )
+
+    def set_monitoring(self, active: bool):
+        """Start or stop recording and the refresh timer together."""
+        self._enable_check.setChecked(active)
+        if active:
+            self.refresh()
+
+    def refresh(self):
+        stats = profiling.snapshot()
+        self._table.setRowCount(len(stats))
+        for row, s in enumerate(stats):
+            values = (
+                s.name, str(s.calls), f"{s.mean_ms:.2f}", f"{s.p50_ms:.2f}",
+                f"{s.p90_ms:.2f}", f"{s.p99_ms:.2f}", f"{s.max_ms:.2f}",
+                _sparkline(s.histogram),
+            )
+            for col, text in enumerate(values):
+                item = self._table.item(row, col)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if 0 < col < len(values) - 1:
+                        item.setTextAlignment(
+                            Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+                        )
+                    self._table.setItem(row, col, item)
+                item.setText(text)
+
+    def stop_capture(self):
+        """Discard a running capture (used when the window closes)."""
+        self._capture.stop()
+
+    def _on_enable_toggled(self, checked: bool):
+        profiling.set_enabled(checked)
+        if checked:
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+    def _on_reset(self):
+        profiling.reset()
+        self.refresh()
+
+    def _on_capture_clicked(self):
+        if not self._capture.is_running:
+            self._capture.start(prefer_pyinstrument=True)
+            self._capture_btn.setText(tr("perf_capture_stop"))
+            return
+
+        self._capture.stop()
+        self._capture_btn.setText(tr("perf_capture_start"))
+        html = self._capture.writes_html
+        path, _ = QFileDialog.getSaveFileName(
+            self, tr("perf_capture_save"), "profile.html" if html else "profile.prof",
+            "HTML (*.html)" if html else "cProfile (*.prof)",
+        )
+        if not path:
+            return
+        try:
+            self._capture.save(path)
+        except OSError as e:
+            QMessageBox.warning(self, tr("error"), str(e))
@@ -0,0 +1,392 @@
+"""Hyperparameter sweep dialog."""
+
+import dataclasses
+import os
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
+    QLabel, QComboBox, QSpinBox, QLineEdit,
+    QPushButton, QProgressBar, QTextEdit, QGroupBox,
+    QMessageBox, QWidget, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView,
+)
+from PySide6.QtCore import Signal, Slot
+
+from i18n import tr
+from core.dataset_builder import DatasetBuilder, DatasetBuildWorker
+from core.sweep import SweepScheduler, SweepSpace, plan_concurrency
+from core.train_cache import CachePrepareWorker, TrainImageCache
+from core.trainer import TrainJob
+
+_COLUMNS = [
+    "sweep_col_run", "sweep_col_imgsz", "sweep_col_lr", "sweep_col_batch",
+    "sweep_col_status", "sweep_col_epoch", "sweep_col_map50",
+    "sweep_col_map50_95", "sweep_col_infer", "sweep_col_speed",
+]
+
+
+def _parse_list(text: str, cast) -> list:
+    """Parse ``"320, 480 640"`` into distinct values in input order."""
+    values = []
+    for token in text.replace(",", " ").split():
+        try:
+            value = cast(token)
+        except ValueError:
+            raise ValueError(token) from None
+        if value <= 0:
+            raise ValueError(token)
+        if value not in values:
+            values.append(value)
+    if not values:
+        raise ValueError(text)
+    return values
+
+
+def _fmt(value, spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+class SweepDialog(QDialog):
+    """Runs a grid or random search over ``imgsz``, learning rate and batch.
+
+    *base_job* carries every other setting from the training dialog.  If
+    *builder* is given the dataset is (re)built first and *base_job*'s
+    ``data_yaml_path`` is replaced by the built one.
+    """
+
+    sweep_complete = Signal(str)  # best model path
+
+    def __init__(self, base_job: TrainJob, sweep_dir: str,
+                 builder: DatasetBuilder = None, parent: QWidget = None):
+        super().__init__(parent)
+        self._base_job = base_job
+        self._sweep_dir = sweep_dir
+        self._builder = builder
+        self._scheduler = None
+        self._prep_worker = None
+        self._points: list[dict] = []
+        self._setup_ui()
+        self._update_plan()
+
+    @property
+    def is_busy(self) -> bool:
+        return self._prep_worker is not None or (
+            self._scheduler is not None and self._scheduler.is_running
+        )
+
+    def _setup_ui(self):
+        self.setWindowTitle(tr("sweep_title"))
+        self.setMinimumSize(760, 560)
+        layout = QVBoxLayout(self)
+
+        # --- Search space ---
+        space_group = QGroupBox(tr("sweep_space"))
+        form = QFormLayout(space_group)
+
+        self._imgsz_edit = QLineEdit(str(self._base_job.imgsz))
+        form.addRow(tr("training_img_size"), self._imgsz_edit)
+        self._lr_edit = QLineEdit(f"{self._base_job.lr:g}")
+        form.addRow(tr("training_lr"), self._lr_edit)
+        self._batch_edit = QLineEdit(str(self._base_job.batch_size))
+        form.addRow(tr("training_batch_size"), self._batch_edit)
+        for edit in (self._imgsz_edit, self._lr_edit, self._batch_edit):
+            edit.setToolTip(tr("sweep_values_tooltip"))
+            edit.textChanged.connect(self._update_plan)
+
+        mode_layout = QHBoxLayout()
+        self._mode_combo = QComboBox()
+        self._mode_combo.addItem(tr("sweep_mode_grid"), "grid")
+        self._mode_combo.addItem(tr("sweep_mode_random"), "random")
+        self._mode_combo.currentIndexChanged.connect(self._update_plan)
+        mode_layout.addWidget(self._mode_combo)
+        self._count_spin = QSpinBox()
+        self._count_spin.setRange(1, 1000)
+        self._count_spin.setValue(8)
+        self._count_spin.setPrefix(tr("sweep_count_prefix"))
+        self._count_spin.valueChanged.connect(self._update_plan)
+        mode_layout.addWidget(self._count_spin)
+        form.addRow(tr("sweep_mode"), mode_layout)
+
+        self._parallel_spin = QSpinBox()
+        self._parallel_spin.setRange(0, os.cpu_count() or 1)
+        self._parallel_spin.setSpecialValueText(tr("auto_label_threads_auto"))
+        self._parallel_spin.setToolTip(tr("sweep_parallel_tooltip"))
+        self._parallel_spin.valueChanged.connect(self._update_plan)
+        form.addRow(tr("sweep_parallel"), self._parallel_spin)
+
+        self._plan_label = QLabel("")
+        self._plan_label.setStyleSheet("color: #888888; font-size: 11px;")
+        form.addRow(self._plan_label)
+        layout.addWidget(space_group)
+
+        # --- Results ---
+        self._table = QTableWidget(0, len(_COLUMNS))
+        self._table.setHorizontalHeaderLabels([tr(key) for key in _COLUMNS])
+        self._table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self._table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self._table.verticalHeader().setVisible(False)
+        self._table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+        layout.addWidget(QLabel(tr("sweep_results")))
+        layout.addWidget(self._table, 1)
+
+        self._progress_bar = QProgressBar()
+        self._progress_bar.setVisible(False)
+        layout.addWidget(self._progress_bar)
+
+        self._log_text = QTextEdit()
+        self._log_text.setReadOnly(True)
+        self._log_text.setMaximumHeight(140)
+        layout.addWidget(self._log_text)
+
+        btn_layout = QHBoxLayout()
+        self._start_btn = QPushButton(tr("sweep_start"))
+        self._start_btn.clicked.connect(self._on_start)
+        btn_layout.addWidget(self._start_btn)
+        self._stop_btn = QPushButton(tr("training_stop"))
+        self._stop_btn.setEnabled(False)
+        self._stop_btn.clicked.connect(self._on_stop)
+        btn_layout.addWidget(self._stop_btn)
+        self._close_btn = QPushButton(tr("training_close"))
+        self._close_btn.clicked.connect(self.close)
+        btn_layout.addWidget(self._close_btn)
+        layout.addLayout(btn_layout)
+
+    # -- Planning ------------------------------------------------------------
+
+    def _space(self) -> SweepSpace:
+        return SweepSpace(
+            imgsz=_parse_list(self._imgsz_edit.text(), int),
+            lr=_parse_list(self._lr_edit.text(), float),
+            batch_size=_parse_list(self._batch_edit.text(), int),
+        )
+
+    def _make_points(self, space: SweepSpace) -> list[dict]:
+        if self._mode_combo.currentData() == "random":
+            return space.sample(self._count_spin.value())
+        return space.grid()
+
+    @Slot()
+    def _update_plan(self, *_):
+        self._count_spin.setEnabled(self._mode_combo.currentData() == "random")
+        if self.is_busy:
+            return
+        try:
+            space = self._space()
+        except ValueError as exc:
+            self._plan_label.setText(tr("sweep_invalid_value").format(value=exc))
+            self._start_btn.setEnabled(False)
+            return
+        points = self._make_points(space)
+        jobs = [dataclasses.replace(self._base_job, **p) for p in points]
+        slots, _, _ = plan_concurrency(jobs, self._base_job.device)
+        limit = self._parallel_spin.value()
+        if limit:
+            slots = min(slots, limit)
+        self._plan_label.setText(
+            tr("sweep_plan").format(runs=len(points), grid=space.size, parallel=slots)
+        )
+        self._start_btn.setEnabled(bool(points))
+
+    # -- Run -----------------------------------------------------------------
+
+    def _on_start(self):
+        try:
+            self._points = self._make_points(self._space())
+        except ValueError as exc:
+            QMessageBox.warning(
+                self, tr("warning"), tr("sweep_invalid_value").format(value=exc)
+            )
+            return
+        self._log_text.clear()
+        self._table.setRowCount(0)
+        self._set_running(True)
+        if self._builder is not None:
+            self._log_text.append(
+                tr("training_building_dataset").format(path=self._builder.dataset_dir)
+            )
+            self._start_prep(DatasetBuildWorker(self._builder))
+            self._prep_worker.finished_build.connect(self._on_dataset_built)
+        else:
+            self._prepare_cache()
+
+    def _start_prep(self, worker):
+        self._prep_worker = worker
+        self._progress_bar.setVisible(True)
+        self._progress_bar.setMaximum(0)
+        worker.progress.connect(self._on_prep_progress)
+        worker.cancelled.connect(self._on_prep_cancelled)
+        worker.error.connect(self._on_prep_error)
+        worker.start()
+
+    @Slot(object)
+    def _on_dataset_built(self, result):
+        self._prep_worker = None
+        self._log_text.append(
+            tr("training_dataset_ready").format(
+                train=result.train_count,
+                val=result.val_count,
+                linked=result.linked,
+                copied=result.copied,
+                unchanged=result.unchanged,
+                removed=result.removed,
+            )
+        )
+        if result.train_count == 0:
+            self._on_prep_error(tr("training_dataset_empty"))
+            return
+        self._base_job.data_yaml_path = result.data_yaml
+        self._prepare_cache()
+
+    def _prepare_cache(self):
+        """Prepare the disk cache once, for the largest ``imgsz`` of the sweep."""
+        if self._base_job.cache != "disk" or self._builder is None:
+            self._start_sweep()
+            return
+        imgsz = max(p["imgsz"] for p in self._points)
+        self._log_text.append(tr("training_preparing_cache"))
+        cache = TrainImageCache(
+            str(self._builder.dataset_dir), imgsz, workers=os.cpu_count() or 1
+        )
+        self._start_prep(CachePrepareWorker(cache))
+        self._prep_worker.finished_prepare.connect(self._on_cache_prepared)
+
+    @Slot(object)
+    def _on_cache_prepared(self, result):
+        self._prep_worker = None
+        self._log_text.append(
+            tr("training_cache_ready").format(
+                written=result.written,
+                unchanged=result.unchanged,
+                removed=result.removed,
+                size=f"{result.cache_bytes / 1024 ** 2:.1f} MB",
+            )
+        )
+        self._start_sweep()
+
+    def _start_sweep(self):
+        scheduler = SweepScheduler(
+            self._base_job,
+            self._points,
+            self._sweep_dir,
+            max_parallel=self._parallel_spin.value(),
+            parent=self,
+        )
+        scheduler.log_message.connect(self._log_text.append)
+        scheduler.run_started.connect(self._refresh_table)
+        scheduler.run_updated.connect(self._refresh_table)
+        scheduler.run_finished.connect(self._on_run_finished)
+        scheduler.finished.connect(self._on_sweep_finished)
+        self._scheduler = scheduler
+
+        self._progress_bar.setVisible(True)
+        self._progress_bar.setMaximum(len(self._points))
+        self._progress_bar.setValue(0)
+        self._refresh_table()
+        scheduler.start()
+
+    @Slot(int, int)
+    def _on_prep_progress(self, done: int, total: int):
+        self._progress_bar.setMaximum(total)
+        self._progress_bar.setValue(done)
+
+    @Slot()
+    def _on_prep_cancelled(self):
+        self._prep_worker = None
+        self._set_running(False)
+
+    @Slot(str)
+    def _on_prep_error(self, msg: str):
+        self._prep_worker = None
+        self._set_running(False)
+        self._log_text.append(f"ERROR: {msg}")
+        QMessageBox.critical(self, tr("error"), msg)
+
+    @Slot(int)
+    def _on_run_finished(self, index: int):
+        self._progress_bar.setValue(
+            sum(r.status in ("done", "failed", "cancelled") for r in self._scheduler.runs)
+        )
+        self._refresh_table()
+
+    @Slot()
+    def _on_sweep_finished(self):
+        self._set_running(False)
+        self._refresh_table()
+        ranked = self._scheduler.ranked()
+        runs = self._scheduler.runs
+        best = next((runs[i] for i in ranked if runs[i].best_path), None)
+        self._log_text.append(
+            tr("sweep_finished").format(path=str(self._scheduler.results_path))
+        )
+        if best is not None:
+            self._log_text.append(
+                tr("sweep_best").format(name=best.job.name, path=best.best_path)
+            )
+            self.sweep_complete.emit(best.best_path)
+
+    @Slot()
+    def _refresh_table(self, *_):
+        if self._scheduler is None:
+            return
+        runs = self._scheduler.runs
+        ranked = self._scheduler.ranked()
+        self._table.setRowCount(len(ranked))
+        for row, index in enumerate(ranked):
+            run = runs[index]
+            values = [
+                run.job.name,
+                str(run.params["imgsz"]),
+                f"{run.params['lr']:g}",
+                str(run.params["batch_size"]),
+                tr(f"training_job_{run.status}"),
+                f"{run.epoch}/{run.job.epochs}",
+                _fmt(run.map50, ".3f"),
+                _fmt(run.map50_95, ".3f"),
+                _fmt(run.inference_ms, ".1f"),
+                _fmt(run.train_images_per_sec or None, ".1f"),
+            ]
+            for col, text in enumerate(values):
+                item = QTableWidgetItem(text)
+                if run.error:
+                    item.setToolTip(run.error)
+                self._table.setItem(row, col, item)
+
+    def _set_running(self, running: bool):
+        self._start_btn.setEnabled(not running)
+        self._stop_btn.setEnabled(running)
+        for widget in (self._imgsz_edit, self._lr_edit, self._batch_edit,
+                       self._mode_combo, self._count_spin, self._parallel_spin):
+            widget.setEnabled(not running)
+        if not running:
+            self._progress_bar.setVisible(False)
+            self._update_plan()
+
+    def _on_stop(self):
+        if self._prep_worker is not None and self._prep_worker.isRunning():
+            self._prep_worker.cancel()
+            self._prep_worker.wait(3000)
+            self._prep_worker = None
+            self._set_running(False)
+        if self._scheduler is not None:
+            self._scheduler.stop()
+        self._stop_btn.setEnabled(False)
+
+    def closeEvent(self, event):
+        if self.is_busy:
+            reply = QMessageBox.question(
+                self, tr("warning"),
+                tr("sweep_stop_confirm"),
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            )
+            if reply == QMessageBox.StandardButton.No:
+                event.ignore()
+                return
+            if self._prep_worker is not None:
+                self._prep_worker.cancel()
+                self._prep_worker.wait(3000)
+                self._prep_worker = None
+            if self._scheduler is not None:
+                self._scheduler.shutdown()
+        super().closeEvent(event)
@@ -1,28 +1,94 @@
 """Training configuration and execution dialog."""
 
+import dataclasses
+import os
+import time
+
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLabel, QComboBox, QSpinBox, QDoubleSpinBox,
     QPushButton, QProgressBar, QTextEdit, QLineEdit,
     QFileDialog, QGroupBox, QWidget, QMessageBox, QCheckBox,
+    QListWidget,
 )
-from PySide6.QtCore import Signal, Slot
+from PySide6.QtCore import Signal, Slot, QTimer
 
 from i18n import tr
-from core.trainer import TrainWorker, generate_data_yaml
+from core.dataset_builder import DatasetBuilder, DatasetBuildWorker, DEFAULT_VAL_RATIO
+from core.inference_benchmark import load_report
+from core.train_cache import CacheEstimateWorker, CachePrepareWorker, TrainImageCache
+from core.train_runner import TrainingQueue
+from core.trainer import TrainJob, generate_data_yaml
+
+# Progress-bar steps per epoch (batch records advance the bar in between).
+_STEPS_PER_EPOCH = 100
+
+# File name of the per-batch metrics log inside the Ultralytics run directory.
+_METRICS_FILE = "metrics.jsonl"
+
+# Image cache modes (Ultralytics ``cache`` argument) and their labels.
+_CACHE_MODES = [("", "training_cache_off"), ("ram", "training_cache_ram"),
+                ("disk", "training_cache_disk")]
+
+# Delay before re-estimating the cache after a setting changed.
+_ESTIMATE_DELAY_MS = 400
+
+
+def _fmt_eta(secs: float) -> str:
+    secs = max(0, int(secs))
+    h, rem = divmod(secs, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h {m:02d}m" if h else f"{m}m {s:02d}s"
+
+
+def _fmt_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
 
 
 class TrainingDialog(QDialog):
     training_complete = Signal(str)  # best model path
 
     def __init__(self, class_names: list[str], project_dir: str = "",
-                 parent: QWidget = None):
+                 parent: QWidget = None, project=None):
         super().__init__(parent)
         self._class_names = class_names
         self._project_dir = project_dir
-        self._worker = None
+        self._project = project  # ProjectManager; enables the dataset builder
+        self._build_worker = None
+        self._cache_worker = None
+        self._estimate_worker = None
+        self._pending_yaml = ""
+        self._sweep_dialog = None
+        self._train_params: dict = {}
+
+        # Jobs run one after another in a child process each.
+        self._queue = TrainingQueue(self)
+        self._queue.log_message.connect(self._on_log)
+        self._queue.progress.connect(self._on_progress)
+        self._queue.metrics.connect(self._on_metrics)
+        self._queue.job_added.connect(self._refresh_queue_list)
+        self._queue.job_started.connect(self._on_job_started)
+        self._queue.job_finished.connect(self._on_finished)
+        self._queue.job_failed.connect(self._on_job_failed)
+        self._queue.job_cancelled.connect(self._on_job_cancelled)
+        self._queue.idle.connect(self._on_queue_idle)
+
         self._setup_ui()
 
+    @property
+    def is_busy(self) -> bool:
+        """``True`` while a dataset build, cache preparation or training job runs."""
+        return (
+            self._build_worker is not None
+            or self._cache_worker is not None
+            or self._queue.is_running
+            or (self._sweep_dialog is not None and self._sweep_dialog.is_busy)
+        )
+
     def _setup_ui(self):
         self.setWindowTitle(tr("training_title"))
         self.setMinimumSize(550, 600)
@@ -50,7 +116,11 @@ class TrainingDialog(QDialog):
         data_group = QGroupBox(tr("training_dataset"))
         data_form = QFormLayout(data_group)
 
-        self._dataset_edit = QLineEdit(self._project_dir)
+        can_build = self._project is not None and self._project.image_count > 0
+        default_dataset = (
+            os.path.join(self._project_dir, "dataset") if can_build else self._project_dir
+        )
+        self._dataset_edit = QLineEdit(default_dataset)
         dataset_layout = QHBoxLayout()
         dataset_layout.addWidget(self._dataset_edit)
         self._browse_dataset_btn = QPushButton(tr("training_browse"))
@@ -58,8 +128,26 @@ class TrainingDialog(QDialog):
         dataset_layout.addWidget(self._browse_dataset_btn)
         data_form.addRow(tr("training_dataset"), dataset_layout)
 
+        # Build (or incrementally update) a train/val dataset from the
+        # project labels; images are linked, not copied.
+        self._build_check = QCheckBox(tr("training_build_dataset"))
+        self._build_check.setToolTip(tr("training_build_dataset_tooltip"))
+        self._build_check.setEnabled(can_build)
+        self._build_check.setChecked(can_build)
+        self._build_check.toggled.connect(self._on_build_toggled)
+        data_form.addRow(self._build_check)
+
+        self._val_ratio_spin = QDoubleSpinBox()
+        self._val_ratio_spin.setRange(0.05, 0.5)
+        self._val_ratio_spin.setSingleStep(0.05)
+        self._val_ratio_spin.setDecimals(2)
+        self._val_ratio_spin.setValue(DEFAULT_VAL_RATIO)
+        self._val_ratio_spin.setEnabled(can_build)
+        data_form.addRow(tr("training_val_ratio"), self._val_ratio_spin)
+
         self._generate_yaml_check = QCheckBox(tr("training_generate_yaml"))
         self._generate_yaml_check.setChecked(True)
+        self._generate_yaml_check.setEnabled(not can_build)
         data_form.addRow(self._generate_yaml_check)
 
         self._classes_label = QLabel(", ".join(self._class_names) if self._class_names else "-")
@@ -98,6 +186,51 @@ class TrainingDialog(QDialog):
         self._device_combo.addItems(["auto", "cpu", "0", "0,1"])
         hyper_form.addRow(tr("training_device"), self._device_combo)
 
+        # Decoding full-resolution images dominates CPU-only epochs; a cache
+        # decodes (and, for disk, pre-resizes) every image once.
+        self._cache_combo = QComboBox()
+        for mode, key in _CACHE_MODES:
+            self._cache_combo.addItem(tr(key), mode)
+        self._cache_combo.setToolTip(tr("training_cache_tooltip"))
+        hyper_form.addRow(tr("training_cache"), self._cache_combo)
+
+        cpus = os.cpu_count() or 1
+        self._workers_spin = QSpinBox()
+        self._workers_spin.setRange(0, cpus)
+        self._workers_spin.setValue(min(8, cpus))
+        self._workers_spin.setToolTip(tr("training_workers_tooltip"))
+        hyper_form.addRow(tr("training_workers"), self._workers_spin)
+
+        self._cache_info_label = QLabel("")
+        self._cache_info_label.setWordWrap(True)
+        self._cache_info_label.setStyleSheet("color: #888888; font-size: 11px;")
+        hyper_form.addRow(self._cache_info_label)
+
+        self._estimate_timer = QTimer(self)
+        self._estimate_timer.setSingleShot(True)
+        self._estimate_timer.setInterval(_ESTIMATE_DELAY_MS)
+        self._estimate_timer.timeout.connect(self._start_cache_estimate)
+        self._cache_combo.currentIndexChanged.connect(self._on_cache_settings_changed)
+        self._imgsz_combo.currentIndexChanged.connect(self._on_cache_settings_changed)
+
+        self._metrics_log_check = QCheckBox(tr("training_save_metrics"))
+        self._metrics_log_check.setToolTip(tr("training_save_metrics_tooltip"))
+        hyper_form.addRow(self._metrics_log_check)
+
+        # Time best.pt on validation images once training ends; the report
+        # is stored next to the weights.
+        self._benchmark_check = QCheckBox(tr("training_benchmark"))
+        self._benchmark_check.setToolTip(tr("training_benchmark_tooltip"))
+        self._benchmark_check.setChecked(True)
+        self._onnx_check = QCheckBox(tr("training_benchmark_onnx"))
+        self._onnx_check.setToolTip(tr("training_benchmark_onnx_tooltip"))
+        self._benchmark_check.toggled.connect(self._onnx_check.setEnabled)
+        benchmark_layout = QHBoxLayout()
+        benchmark_layout.addWidget(self._benchmark_check)
+        benchmark_layout.addWidget(self._onnx_check)
+        benchmark_layout.addStretch()
+        hyper_form.addRow(benchmark_layout)
+
         layout.addWidget(hyper_group)
 
         # --- Log output ---
@@ -112,6 +245,20 @@ class TrainingDialog(QDialog):
         self._progress_bar.setVisible(False)
         layout.addWidget(self._progress_bar)
 
+        # Live metrics from the trainer callbacks (batch / epoch).
+        self._batch_label = QLabel("")
+        self._batch_label.setStyleSheet("color: #888888; font-size: 11px;")
+        layout.addWidget(self._batch_label)
+        self._val_label = QLabel("")
+        self._val_label.setStyleSheet("color: #888888; font-size: 11px;")
+        layout.addWidget(self._val_label)
+
+        # --- Job queue ---
+        layout.addWidget(QLabel(tr("training_queue")))
+        self._queue_list = QListWidget()
+        self._queue_list.setMaximumHeight(90)
+        layout.addWidget(self._queue_list)
+
         # --- Buttons ---
         btn_layout = QHBoxLayout()
         self._start_btn = QPushButton(tr("training_start"))
@@ -123,6 +270,17 @@ class TrainingDialog(QDialog):
         self._stop_btn.clicked.connect(self._on_stop)
         btn_layout.addWidget(self._stop_btn)
 
+        self._resume_btn = QPushButton(tr("training_resume"))
+        self._resume_btn.setToolTip(tr("training_resume_tooltip"))
+        self._resume_btn.setEnabled(False)
+        self._resume_btn.clicked.connect(self._on_resume)
+        btn_layout.addWidget(self._resume_btn)
+
+        self._sweep_btn = QPushButton(tr("training_sweep"))
+        self._sweep_btn.setToolTip(tr("training_sweep_tooltip"))
+        self._sweep_btn.clicked.connect(self._on_sweep)
+        btn_layout.addWidget(self._sweep_btn)
+
         self._close_btn = QPushButton(tr("training_close"))
         self._close_btn.clicked.connect(self.close)
         btn_layout.addWidget(self._close_btn)
@@ -141,29 +299,59 @@ class TrainingDialog(QDialog):
         if path:
             self._dataset_edit.setText(path)
 
+    @Slot(bool)
+    def _on_build_toggled(self, checked: bool):
+        self._val_ratio_spin.setEnabled(checked)
+        self._generate_yaml_check.setEnabled(not checked)
+
     def _on_start(self):
         dataset_path = self._dataset_edit.text().strip()
         if not dataset_path:
             QMessageBox.warning(self, tr("warning"), "Dataset path is required.")
             return
 
+        self._train_params = self._collect_train_params()
+
+        if not self._queue.is_running:
+            self._log_text.clear()
+
+        if self._build_check.isChecked():
+            self._start_btn.setEnabled(False)
+            self._stop_btn.setEnabled(True)
+            self._start_dataset_build(dataset_path)
+            return
+
+        self._start_training(self._write_data_yaml(dataset_path))
+
+    def _collect_train_params(self) -> dict:
+        """Return the :class:`TrainJob` fields set in the dialog (no dataset)."""
         model_type_text = self._model_type_combo.currentText()
         if model_type_text == "RT-DETR":
             model_type = "RT-DETR"
         else:
             model_type = "YOLO"
 
-        base_model = self._base_model_edit.text().strip()
-        epochs = self._epochs_spin.value()
-        batch_size = self._batch_spin.value()
-        imgsz = int(self._imgsz_combo.currentText())
-        lr = self._lr_spin.value()
         device = self._device_combo.currentText()
         if device == "auto":
             device = ""
 
-        # Generate data.yaml if requested
-        import os
+        return dict(
+            model_type=model_type,
+            base_model_path=self._base_model_edit.text().strip(),
+            epochs=self._epochs_spin.value(),
+            batch_size=self._batch_spin.value(),
+            imgsz=int(self._imgsz_combo.currentText()),
+            lr=self._lr_spin.value(),
+            device=device,
+            metrics_file=_METRICS_FILE if self._metrics_log_check.isChecked() else "",
+            cache=self._cache_combo.currentData(),
+            workers=self._workers_spin.value(),
+            benchmark=self._benchmark_check.isChecked(),
+            benchmark_onnx=self._benchmark_check.isChecked() and self._onnx_check.isChecked(),
+        )
+
+    def _write_data_yaml(self, dataset_path: str) -> str:
+        """Return the dataset's data.yaml path, generating it if requested."""
         data_yaml_path = os.path.join(dataset_path, "data.yaml")
         if self._generate_yaml_check.isChecked():
             train_path = os.path.join(dataset_path, "images", "train")
@@ -174,38 +362,267 @@ class TrainingDialog(QDialog):
                 val_path = train_path
             generate_data_yaml(train_path, val_path, self._class_names, data_yaml_path)
             self._log_text.append(f"Generated data.yaml at: {data_yaml_path}")
+        return data_yaml_path
+
+    def _make_builder(self, dataset_path: str) -> DatasetBuilder:
+        return DatasetBuilder(
+            self._project.image_list,
+            self._project.get_label_path,
+            self._class_names,
+            dataset_path,
+            val_ratio=self._val_ratio_spin.value(),
+        )
+
+    def _on_sweep(self):
+        if self._sweep_dialog is not None and self._sweep_dialog.isVisible():
+            self._sweep_dialog.raise_()
+            self._sweep_dialog.activateWindow()
+            return
+        if self.is_busy:
+            QMessageBox.warning(self, tr("warning"), tr("training_sweep_busy"))
+            return
+        dataset_path = self._dataset_edit.text().strip()
+        if not dataset_path:
+            QMessageBox.warning(self, tr("warning"), "Dataset path is required.")
+            return
+
+        params = self._collect_train_params()
+        if self._build_check.isChecked():
+            builder, data_yaml_path = self._make_builder(dataset_path), ""
+        else:
+            builder, data_yaml_path = None, self._write_data_yaml(dataset_path)
+        sweep_dir = os.path.join(
+            self._project_dir or dataset_path, "sweeps", time.strftime("%Y%m%d-%H%M%S")
+        )
+
+        from ui.sweep_dialog import SweepDialog
 
-        self._log_text.clear()
+        dialog = SweepDialog(
+            TrainJob(data_yaml_path=data_yaml_path, **params), sweep_dir, builder, self
+        )
+        dialog.sweep_complete.connect(self.training_complete)
+        if self._sweep_dialog is not None:
+            self._sweep_dialog.deleteLater()
+        self._sweep_dialog = dialog
+        dialog.show()
+
+    def _start_dataset_build(self, dataset_path: str):
+        builder = self._make_builder(dataset_path)
         self._progress_bar.setVisible(True)
-        self._progress_bar.setMaximum(epochs)
-        self._progress_bar.setValue(0)
+        self._progress_bar.setMaximum(0)  # busy until the first progress report
+        self._log_text.append(tr("training_building_dataset").format(path=dataset_path))
+
+        self._build_worker = DatasetBuildWorker(builder)
+        self._build_worker.progress.connect(self._on_build_progress)
+        self._build_worker.finished_build.connect(self._on_build_finished)
+        self._build_worker.cancelled.connect(self._on_build_cancelled)
+        self._build_worker.error.connect(self._on_error)
+        self._build_worker.start()
+
+    def _start_training(self, data_yaml_path: str):
+        self._queue.enqueue(TrainJob(data_yaml_path=data_yaml_path, **self._train_params))
+
+    # -- Image cache ---------------------------------------------------------
+
+    @Slot()
+    def _on_cache_settings_changed(self, *_):
+        self._cache_info_label.setText("")
+        if self._cache_combo.currentData() and self._project is not None:
+            self._estimate_timer.start()
+
+    @Slot()
+    def _start_cache_estimate(self):
+        if self._estimate_worker is not None:
+            # Re-run once the current estimate has finished.
+            self._estimate_timer.start()
+            return
+        worker = CacheEstimateWorker(
+            self._project.image_list,
+            int(self._imgsz_combo.currentText()),
+            label_path_fn=self._project.get_label_path,
+        )
+        worker.estimated.connect(self._on_cache_estimated)
+        worker.finished.connect(worker.deleteLater)
+        self._estimate_worker = worker
+        self._cache_info_label.setText(tr("training_cache_estimating"))
+        worker.start()
+
+    @Slot(object)
+    def _on_cache_estimated(self, estimate):
+        if self.sender() is not self._estimate_worker:
+            return
+        self._estimate_worker = None
+        mode = self._cache_combo.currentData()
+        if not mode:
+            self._cache_info_label.setText("")
+            return
+        if estimate is None:
+            self._cache_info_label.setText(tr("training_cache_no_estimate"))
+            return
+        self._cache_info_label.setText(
+            tr(f"training_cache_estimate_{mode}").format(
+                size=_fmt_bytes(estimate.cache_bytes),
+                count=estimate.image_count,
+                decode=estimate.decode_ms,
+                cached=estimate.cached_ms,
+                speedup=estimate.speedup,
+            )
+        )
+
+    def _start_cache_prepare(self, dataset_dir: str, data_yaml_path: str):
+        """Pre-resize the built dataset into ``.npy`` arrays, then train."""
+        self._pending_yaml = data_yaml_path
+        self._progress_bar.setVisible(True)
+        self._progress_bar.setMaximum(0)
+        self._log_text.append(tr("training_preparing_cache"))
         self._start_btn.setEnabled(False)
         self._stop_btn.setEnabled(True)
 
-        self._worker = TrainWorker(
-            model_type=model_type,
-            base_model_path=base_model,
-            data_yaml_path=data_yaml_path,
-            epochs=epochs,
-            batch_size=batch_size,
-            imgsz=imgsz,
-            lr=lr,
-            device=device,
+        cache = TrainImageCache(
+            dataset_dir,
+            self._train_params["imgsz"],
+            workers=os.cpu_count() or 1,
+        )
+        self._cache_worker = CachePrepareWorker(cache)
+        self._cache_worker.progress.connect(self._on_build_progress)
+        self._cache_worker.finished_prepare.connect(self._on_cache_prepared)
+        self._cache_worker.cancelled.connect(self._on_cache_cancelled)
+        self._cache_worker.error.connect(self._on_cache_error)
+        self._cache_worker.start()
+
+    @Slot(object)
+    def _on_cache_prepared(self, result):
+        self._cache_worker = None
+        self._log_text.append(
+            tr("training_cache_ready").format(
+                written=result.written,
+                unchanged=result.unchanged,
+                removed=result.removed,
+                size=_fmt_bytes(result.cache_bytes),
+            )
+        )
+        self._start_btn.setEnabled(True)
+        self._stop_btn.setEnabled(self._queue.is_running)
+        self._start_training(self._pending_yaml)
+
+    @Slot()
+    def _on_cache_cancelled(self):
+        self._cache_worker = None
+        self._start_btn.setEnabled(True)
+        if not self._queue.is_running:
+            self._progress_bar.setVisible(False)
+
+    @Slot(str)
+    def _on_cache_error(self, msg: str):
+        self._cache_worker = None
+        self._on_error(msg)
+
+    def _refresh_queue_list(self, *_):
+        self._queue_list.clear()
+        for i, entry in enumerate(self._queue.jobs):
+            job = entry.job
+            text = tr("training_job_item").format(
+                index=i + 1,
+                model=job.model_type,
+                base=os.path.basename(job.base_model_path),
+                epochs=job.epochs,
+                imgsz=job.imgsz,
+                status=tr(f"training_job_{entry.status}"),
+            )
+            if job.resume:
+                text += "  " + tr("training_job_resumed")
+            self._queue_list.addItem(text)
+
+    @Slot(int)
+    def _on_job_started(self, index: int):
+        job = self._queue.jobs[index].job
+        self._progress_bar.setVisible(True)
+        self._progress_bar.setMaximum(job.epochs * _STEPS_PER_EPOCH)
+        self._progress_bar.setValue(0)
+        self._batch_label.setText("")
+        self._val_label.setText("")
+        self._start_btn.setText(tr("training_add_to_queue"))
+        self._stop_btn.setEnabled(True)
+        self._resume_btn.setEnabled(False)
+        self._refresh_queue_list()
+
+    @Slot()
+    def _on_queue_idle(self):
+        self._start_btn.setText(tr("training_start"))
+        self._stop_btn.setEnabled(self._build_worker is not None)
+        self._resume_btn.setEnabled(bool(self._resumable_job()))
+        self._refresh_queue_list()
+
+    def _resumable_job(self):
+        """Return the latest failed / cancelled job that has a ``last.pt``."""
+        for entry in reversed(self._queue.jobs):
+            if entry.status in ("failed", "cancelled") and entry.last_checkpoint:
+                return entry
+        return None
+
+    def _on_resume(self):
+        entry = self._resumable_job()
+        if entry is None:
+            return
+        self._log_text.append(
+            tr("training_resuming").format(path=entry.last_checkpoint)
+        )
+        self._resume_btn.setEnabled(False)
+        self._queue.enqueue(
+            dataclasses.replace(
+                entry.job, base_model_path=entry.last_checkpoint, resume=True
+            )
         )
-        self._worker.log_message.connect(self._on_log)
-        self._worker.progress.connect(self._on_progress)
-        self._worker.finished_training.connect(self._on_finished)
-        self._worker.error.connect(self._on_error)
-        self._worker.start()
+
+    @Slot(int, int)
+    def _on_build_progress(self, done: int, total: int):
+        self._progress_bar.setMaximum(total)
+        self._progress_bar.setValue(done)
+
+    @Slot(object)
+    def _on_build_finished(self, result):
+        self._build_worker = None
+        self._log_text.append(
+            tr("training_dataset_ready").format(
+                train=result.train_count,
+                val=result.val_count,
+                linked=result.linked,
+                copied=result.copied,
+                unchanged=result.unchanged,
+                removed=result.removed,
+            )
+        )
+        self._start_btn.setEnabled(True)
+        self._stop_btn.setEnabled(self._queue.is_running)
+        if result.train_count == 0:
+            self._on_error(tr("training_dataset_empty"))
+            return
+        if self._train_params.get("cache") == "disk":
+            self._start_cache_prepare(str(result.dataset_dir), result.data_yaml)
+            return
+        self._start_training(result.data_yaml)
+
+    @Slot()
+    def _on_build_cancelled(self):
+        self._build_worker = None
+        self._start_btn.setEnabled(True)
+        if not self._queue.is_running:
+            self._progress_bar.setVisible(False)
 
     def _on_stop(self):
-        if self._worker and self._worker.isRunning():
-            self._worker.terminate()
-            self._worker.wait(3000)
-            self._worker = None
+        if self._build_worker and self._build_worker.isRunning():
+            self._build_worker.cancel()
+            self._build_worker.wait(3000)
+            self._build_worker = None
+        if self._cache_worker and self._cache_worker.isRunning():
+            self._cache_worker.cancel()
+            self._cache_worker.wait(3000)
+            self._cache_worker = None
+        # Terminates the training process; last.pt allows resuming.
+        self._queue.stop_all()
         self._start_btn.setEnabled(True)
         self._stop_btn.setEnabled(False)
-        self._log_text.append("Training stopped by user.")
+        self._refresh_queue_list()
 
     @Slot(str)
     def _on_log(self, msg: str):
@@ -213,27 +630,90 @@ class TrainingDialog(QDialog):
 
     @Slot(int, int, float)
     def _on_progress(self, epoch: int, total: int, loss: float):
-        self._progress_bar.setValue(epoch)
+        self._progress_bar.setValue(epoch * _STEPS_PER_EPOCH)
         self._log_text.append(
             tr("training_progress").format(epoch=epoch, total=total, loss=loss)
         )
 
-    @Slot(str)
-    def _on_finished(self, best_path: str):
-        self._start_btn.setEnabled(True)
-        self._stop_btn.setEnabled(False)
+    @Slot(object)
+    def _on_metrics(self, record):
+        self._progress_bar.setValue(
+            int(record.progress * record.epochs * _STEPS_PER_EPOCH)
+        )
+        self._batch_label.setText(
+            tr("training_batch_info").format(
+                epoch=record.epoch,
+                epochs=record.epochs,
+                batch=record.batch,
+                batches=record.batches,
+                loss=record.total_loss,
+                lr=record.lr,
+                speed=record.images_per_sec,
+                eta=_fmt_eta(record.eta_seconds),
+            )
+        )
+        if record.kind == "epoch":
+            map50 = record.metric("mAP50(")
+            map50_95 = record.metric("mAP50-95")
+            if map50 is not None and map50_95 is not None:
+                self._val_label.setText(
+                    tr("training_val_info").format(
+                        epoch=record.epoch, map50=map50, map50_95=map50_95
+                    )
+                )
+
+    @Slot(int, str)
+    def _on_finished(self, index: int, best_path: str):
         self._log_text.append(tr("training_complete").format(path=best_path))
+        report = load_report(best_path) if best_path else None
+        if report is not None:
+            for backend in ("pytorch", "onnx"):
+                point = report.best(backend)
+                if point is not None:
+                    self._log_text.append(
+                        tr("training_benchmark_best").format(
+                            backend=backend,
+                            size=point.infer_size,
+                            batch=point.batch,
+                            speed=point.images_per_sec,
+                            p50=point.p50_ms,
+                        )
+                    )
+        self._refresh_queue_list()
         self.training_complete.emit(best_path)
 
+    @Slot(int, str)
+    def _on_job_failed(self, index: int, msg: str):
+        self._log_text.append(f"ERROR: {msg}")
+        self._refresh_queue_list()
+        QMessageBox.critical(self, tr("error"), msg)
+
+    @Slot(int)
+    def _on_job_cancelled(self, index: int):
+        self._log_text.append("Training stopped by user.")
+        self._refresh_queue_list()
+
     @Slot(str)
     def _on_error(self, msg: str):
+        self._build_worker = None
         self._start_btn.setEnabled(True)
-        self._stop_btn.setEnabled(False)
+        self._stop_btn.setEnabled(self._queue.is_running)
         self._log_text.append(f"ERROR: {msg}")
         QMessageBox.critical(self, tr("error"), msg)
 
     def closeEvent(self, event):
-        if self._worker and self._worker.isRunning():
+        if self._sweep_dialog is not None and not self._sweep_dialog.close():
+            event.ignore()
+            return
+        if self._build_worker and self._build_worker.isRunning():
+            self._build_worker.cancel()
+            self._build_worker.wait(3000)
+        if self._cache_worker and self._cache_worker.isRunning():
+            self._cache_worker.cancel()
+            self._cache_worker.wait(3000)
+        if self._estimate_worker is not None:
+            self._estimate_worker.wait()
+        if self._queue.is_running:
             reply = QMessageBox.question(
                 self, tr("warning"),
                 "Training is running. Stop and close?",
@@ -242,6 +722,5 @@ class TrainingDialog(QDialog):
             if reply == QMessageBox.StandardButton.No:
                 event.ignore()
                 return
-            self._worker.terminate()
-            self._worker.wait(3000)
+        self._queue.shutdown()
         super().closeEvent(event)